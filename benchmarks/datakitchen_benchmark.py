@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+"""
+Measure the throughput and latency of the DataKitchen client workflows against a local stand-in
+for the DataKitchen platform API, which replays recorded responses with a configurable latency.
+
+Usage:
+    python benchmarks/datakitchen_benchmark.py [--latency-ms MS] [--scales N [N ...]]
+        [--repeat N] [SCENARIO ...]
+
+Scenarios (the scale is in parentheses):
+    monitor_order_runs         monitor order runs (order runs)
+    create_and_monitor_orders  create orders and monitor their order runs (orders)
+    order_run_monitor          OrderRunMonitor.monitor on an order run (nodes, 100 log entries each)
+    get_test_infos             extract the tests of recipes (recipes)
+
+No request leaves the host, so the results only reflect the client side overhead and the number
+of requests, amplified by the configured latency.
+"""
+import argparse
+import sys
+import time
+
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from dkutils.datakitchen_api.datakitchen_client import DataKitchenClient  # noqa: E402
+from dkutils.datakitchen_api.order_run_monitor import OrderRunMonitor  # noqa: E402
+from dkutils.datakitchen_api.tests_utils import get_test_infos  # noqa: E402
+from dkutils.instrumentation import MetricsRegistry, set_instrumentation  # noqa: E402
+
+from mock_datakitchen_server import MockDataKitchenServer  # noqa: E402
+
+DEFAULT_SCALES = [1, 10, 50]
+LOG_ENTRIES_PER_NODE = 100
+TIMEOUT_SECS = 600
+
+
+def get_client(server):
+    return DataKitchenClient('username', 'password', base_url=server.url, kitchen=server.kitchen)
+
+
+def monitor_order_runs(server, scale):
+    client = get_client(server)
+    order_run_ids = {f'order-run-{index}': server.kitchen for index in range(scale)}
+    return lambda: client.monitor_order_runs(0, TIMEOUT_SECS, order_run_ids)
+
+
+def create_and_monitor_orders(server, scale):
+    client = get_client(server)
+    orders_details = [{
+        'kitchen': server.kitchen,
+        'recipe': recipe,
+        'variation': server.variation,
+        'parameters': {}
+    } for recipe in server.recipes]
+    return lambda: client.create_and_monitor_orders(orders_details, 0, TIMEOUT_SECS)
+
+
+def order_run_monitor(server, scale):
+    client = get_client(server)
+
+    def monitor():
+        OrderRunMonitor(
+            client, 'events_api_key', 'Benchmark_Pipeline', 'order-run', sleep_time_secs=0, host=server.url
+        ).monitor()
+
+    return monitor
+
+
+def get_recipe_test_infos(server, scale):
+    client = get_client(server)
+    return lambda: get_test_infos(client, datetime.now(), server.recipes, max_workers=4)
+
+
+# Scenario name: (function creating the run of the scenario, function returning the keyword
+# arguments of the mock server for a scale)
+SCENARIOS = {
+    'monitor_order_runs': (monitor_order_runs, lambda scale: {}),
+    'create_and_monitor_orders': (create_and_monitor_orders, lambda scale: {'num_recipes': scale}),
+    'order_run_monitor': (
+        order_run_monitor,
+        lambda scale: {'num_nodes': scale, 'num_log_entries': scale * LOG_ENTRIES_PER_NODE}
+    ),
+    'get_test_infos': (get_recipe_test_infos, lambda scale: {'num_recipes': scale}),
+}
+
+
+def measure(scenario, scale, latency_secs, repeat):
+    """
+    Return the best run time of the scenario at the provided scale, the number of requests the
+    mock server received during that run (including Events Ingestion API requests), and the mean
+    latency of its DataKitchen platform API requests, as observed by the client.
+    """
+    create_run, get_server_kwargs = SCENARIOS[scenario]
+    best = None
+    for _ in range(repeat):
+        with MockDataKitchenServer(latency_secs=latency_secs, **get_server_kwargs(scale)) as server:
+            run = create_run(server, scale)
+            registry = MetricsRegistry()
+            set_instrumentation(registry)
+            request_count = server.request_count
+            try:
+                start = time.perf_counter()
+                run()
+                secs = time.perf_counter() - start
+            finally:
+                set_instrumentation(None)
+            requests = server.request_count - request_count
+        summary = registry.summary()
+        api_requests = sum(row['requests'] for row in summary)
+        mean_request_secs = sum(row['total_secs'] for row in summary) / api_requests if api_requests else 0
+        if best is None or secs < best[0]:
+            best = (secs, requests, mean_request_secs)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument('scenarios', nargs='*', help='Scenarios to run (default: all)')
+    parser.add_argument(
+        '--latency-ms', type=float, default=5, help='Latency of each mock server response in milliseconds'
+    )
+    parser.add_argument('--scales', type=int, nargs='+', default=DEFAULT_SCALES, help='Scales of each scenario')
+    parser.add_argument('--repeat', type=int, default=3, help='Number of timed runs per scenario and scale')
+    args = parser.parse_args()
+    unknown_scenarios = set(args.scenarios) - set(SCENARIOS)
+    if unknown_scenarios:
+        parser.error(f'Unknown scenarios: {", ".join(sorted(unknown_scenarios))}')
+
+    print(f'{"scenario":<28} {"scale":>6} {"best s":>9} {"requests":>9} {"req/s":>9} {"mean req ms":>12}')
+    for scenario in args.scenarios or SCENARIOS:
+        for scale in args.scales:
+            secs, requests, mean_request_secs = measure(scenario, scale, args.latency_ms / 1000, args.repeat)
+            print(
+                f'{scenario:<28} {scale:>6} {secs:>9.3f} {requests:>9} {requests / secs:>9.1f} '
+                f'{mean_request_secs * 1000:>12.2f}'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+"""
+Measure the cold start import time of each dkutils module, each in a new interpreter, with
+python -X importtime.
+
+Usage:
+    python benchmarks/import_time_benchmark.py [--repeat N] [--max-ms MS] [MODULE ...]
+
+If no modules are provided, every dkutils module is measured. The heavy dependencies imported by
+each module (e.g. pandas or sqlalchemy) are listed, so that a module importing one at module level
+rather than with dkutils.lazy_import stands out. The exit status is 1 if a module fails to import
+or, with --max-ms, if its import time exceeds the provided budget.
+"""
+import argparse
+import re
+import subprocess
+import sys
+
+from pathlib import Path
+
+PACKAGE_DIR = Path(__file__).resolve().parents[1] / 'dkutils'
+
+# Dependencies taking more than 20 ms to import, which modules should only import when used
+HEAVY_DEPENDENCIES = [
+    'events_ingestion_client',
+    'google_auth_oauthlib',
+    'googleapiclient',
+    'jira',
+    'numpy',
+    'pandas',
+    'paramiko',
+    'pyarrow',
+    'sqlalchemy',
+]
+
+IMPORT_TIME_PATTERN = re.compile(r'^import time:\s+\d+ \|\s+(\d+) \|\s*(\S+)$')
+
+
+def get_modules():
+    modules = []
+    for path in sorted(PACKAGE_DIR.rglob('*.py')):
+        parts = path.relative_to(PACKAGE_DIR.parent).with_suffix('').parts
+        if parts[-1] == '__init__':
+            parts = parts[:-1]
+        modules.append('.'.join(parts))
+    return modules
+
+
+def measure(module):
+    """
+    Return the cumulative import time of the module in seconds, and the heavy dependencies it
+    imported.
+
+    Raises
+    ------
+    ImportError
+        If the module fails to import.
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=PACKAGE_DIR.parent,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise ImportError(result.stderr.strip().splitlines()[-1])
+    cumulative_micros = None
+    dependencies = set()
+    for line in result.stderr.splitlines():
+        match = IMPORT_TIME_PATTERN.match(line)
+        if match is None:
+            continue
+        name = match.group(2)
+        if name == module:
+            cumulative_micros = int(match.group(1))
+        elif name.split('.')[0] in HEAVY_DEPENDENCIES:
+            dependencies.add(name.split('.')[0])
+    return cumulative_micros / 1e6, sorted(dependencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument('modules', nargs='*', help='Modules to import (default: all dkutils modules)')
+    parser.add_argument('--repeat', type=int, default=5, help='Number of imports per module')
+    parser.add_argument('--max-ms', type=float, help='Import time budget of each module in milliseconds')
+    args = parser.parse_args()
+
+    failed_modules = []
+    print(f'{"module":<50} {"best ms":>9}  heavy dependencies')
+    for module in args.modules or get_modules():
+        best_secs = float('inf')
+        try:
+            for _ in range(args.repeat):
+                secs, dependencies = measure(module)
+                best_secs = min(best_secs, secs)
+        except ImportError as e:
+            print(f'{module:<50} {"failed":>9}  {e}')
+            failed_modules.append(module)
+            continue
+        print(f'{module:<50} {best_secs * 1000:>9.1f}  {", ".join(dependencies)}')
+        if args.max_ms is not None and best_secs * 1000 > args.max_ms:
+            failed_modules.append(module)
+
+    if failed_modules:
+        print(f'Modules failing to import or exceeding the import time budget: {", ".join(failed_modules)}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
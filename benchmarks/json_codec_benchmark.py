@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+"""
+Compare the decode time and peak memory of the available JSON backends on recorded payloads.
+
+Usage:
+    python benchmarks/json_codec_benchmark.py [--repeat N] [PAYLOAD.json ...]
+
+If no payloads are provided, the JSON fixtures recorded under tests/ are used. Each payload is
+also decoded recursively, as extract_tests_from_files does with the recipe file contents embedded
+in recipe get responses.
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from dkutils import json_codec  # noqa: E402
+
+DEFAULT_PAYLOADS_DIR = Path(__file__).resolve().parents[1] / 'tests'
+
+
+def decode_embedded(value):
+    """
+    Decode JSON documents embedded as strings in the json field of recipe file details.
+    """
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if key == 'json' and isinstance(item, str):
+                try:
+                    json_codec.loads(item)
+                except ValueError:
+                    pass
+            else:
+                decode_embedded(item)
+    elif isinstance(value, list):
+        for item in value:
+            decode_embedded(item)
+
+
+def decode(payload):
+    decode_embedded(json_codec.loads(payload))
+
+
+def measure(payload, repeat):
+    best_secs = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        decode(payload)
+        best_secs = min(best_secs, time.perf_counter() - start)
+
+    tracemalloc.start()
+    decode(payload)
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best_secs, peak_bytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument('payloads', nargs='*', type=Path, help='JSON payloads to decode')
+    parser.add_argument('--repeat', type=int, default=20, help='Number of timed decodes per payload')
+    args = parser.parse_args()
+
+    payload_paths = args.payloads or sorted(DEFAULT_PAYLOADS_DIR.rglob('*.json'))
+    backends = json_codec.get_json_backends()
+    if json_codec.ORJSON not in backends:
+        print('orjson is not installed, only the json backend is measured (pip install DKUtils[orjson])')
+
+    default_backend = json_codec.get_json_backend()
+    print(f'{"payload":<50} {"bytes":>10} {"backend":>8} {"best ms":>10} {"peak KiB":>10}')
+    try:
+        for payload_path in payload_paths:
+            payload = payload_path.read_bytes()
+            try:
+                json_codec.loads(payload)
+            except ValueError:
+                print(f'Skipping {payload_path}, which is not valid JSON')
+                continue
+            for backend in backends:
+                json_codec.set_json_backend(backend)
+                best_secs, peak_bytes = measure(payload, args.repeat)
+                print(
+                    f'{payload_path.name:<50} {len(payload):>10} {backend:>8} '
+                    f'{best_secs * 1000:>10.3f} {peak_bytes / 1024:>10.1f}'
+                )
+    finally:
+        json_codec.set_json_backend(default_backend)
+
+
+if __name__ == '__main__':
+    main()
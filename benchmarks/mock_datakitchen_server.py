@@ -0,0 +1,237 @@
+"""
+Local stand-in for the DataKitchen platform API and the Events Ingestion API, for benchmarking the
+clients offline. Responses are built from the payloads recorded under tests/ (order run details
+and logs, user info, and recipe get responses), scaled to the configured number of recipes,
+nodes, and log entries, and delayed by a configurable latency. Order runs complete after a
+configurable number of status polls.
+
+Usage:
+    with MockDataKitchenServer(latency_secs=0.01) as server:
+        client = DataKitchenClient('username', 'password', base_url=server.url)
+"""
+import copy
+import json
+import re
+import sys
+import threading
+import time
+import uuid
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from dkutils.constants import COMPLETED_SERVING, PLANNED_SERVING  # noqa: E402
+from tests.datakitchen_api.test_order_run_monitor import (  # noqa: E402
+    LOG_ENTRIES,
+    ORDER_RUN_DETAILS,
+    USER_INFO,
+)
+
+RECORDED_RESPONSES_DIR = Path(__file__).resolve().parents[1] / 'tests' / 'datakitchen_api'
+RECORDED_RECIPE = 'Training_Sales_Forecast'
+
+DEFAULT_KITCHEN = 'Benchmark_Kitchen'
+DEFAULT_VARIATION = 'Benchmark_Variation'
+
+
+def _load_recorded_response(filename) -> str:
+    return (RECORDED_RESPONSES_DIR / filename).read_text()
+
+
+class MockDataKitchenServer:
+
+    def __init__(
+        self,
+        latency_secs=0.0,
+        polls_to_complete=2,
+        num_recipes=1,
+        num_nodes=None,
+        num_log_entries=None,
+        kitchen=DEFAULT_KITCHEN,
+        variation=DEFAULT_VARIATION,
+    ):
+        """
+        Parameters
+        ----------
+        latency_secs : float, optional
+            Delay before each response is sent (default: 0).
+        polls_to_complete : int, optional
+            Number of times the status of an order run is retrieved before it's completed
+            (default: 2).
+        num_recipes : int, optional
+            Number of recipes in the kitchen, each a copy of the recorded recipe (default: 1).
+        num_nodes : int, optional
+            Number of nodes in order run details, cloned from the recorded ones. If None, the
+            recorded nodes are used.
+        num_log_entries : int, optional
+            Number of entries in order run logs, cloned from the recorded ones. If None, the
+            recorded entries are used.
+        kitchen : str, optional
+            Name of the only kitchen.
+        variation : str, optional
+            Name of the only variation of each recipe.
+        """
+        self.latency_secs = latency_secs
+        self.polls_to_complete = polls_to_complete
+        self.kitchen = kitchen
+        self.variation = variation
+        self.recipes = [f'Recipe_{index}' for index in range(num_recipes)]
+        self.order_run_details = self._get_order_run_details(num_nodes)
+        self.log_response = json.dumps({
+            'servings': [{
+                'log': {
+                    'lines': self._get_log_entries(num_log_entries)
+                }
+            }]
+        }).encode()
+        self._recipe_tree_response = _load_recorded_response('get_recipe_with_tests.json')
+        self._recipe_files = json.loads(_load_recorded_response('get_recipe_only_test_files_no_tree.json'))
+        self._polls = {}
+        self._lock = threading.Lock()
+        self._request_count = 0
+        self._server = None
+        self._thread = None
+
+    @staticmethod
+    def _get_order_run_details(num_nodes) -> dict:
+        details = copy.deepcopy(ORDER_RUN_DETAILS)
+        if num_nodes is not None:
+            recorded_nodes = list(details['summary']['nodes'].items())
+            details['summary']['nodes'] = {
+                f'{name}_{index}': copy.deepcopy(info)
+                for index in range(0, num_nodes, len(recorded_nodes))
+                for name, info in recorded_nodes
+            }
+            details['summary']['nodes'] = dict(list(details['summary']['nodes'].items())[:num_nodes])
+        return details
+
+    @staticmethod
+    def _get_log_entries(num_log_entries) -> list:
+        if num_log_entries is None:
+            return LOG_ENTRIES
+        return [LOG_ENTRIES[index % len(LOG_ENTRIES)] for index in range(num_log_entries)]
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    @property
+    def request_count(self) -> int:
+        return self._request_count
+
+    def start(self):
+        server = self
+
+        class Handler(_RequestHandler):
+            mock_server = server
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def get_order_run_status(self, order_run_id) -> str:
+        with self._lock:
+            polls = self._polls[order_run_id] = self._polls.get(order_run_id, 0) + 1
+        return COMPLETED_SERVING if polls >= self.polls_to_complete else PLANNED_SERVING
+
+    def get_recipe(self, recipe, payload) -> str:
+        if payload.get('include-recipe-tree'):
+            return self._recipe_tree_response.replace(RECORDED_RECIPE, recipe)
+        # Only return the requested files, as the API does
+        recipe_files = set(payload.get('recipe-files') or [])
+        recipes = {}
+        for recipe_name, recipe_contents in self._recipe_files['recipes'].items():
+            recipes[recipe] = {
+                file_dir.replace(RECORDED_RECIPE, recipe, 1): [
+                    file_info for file_info in files
+                    if str(Path(file_dir) / file_info['filename'])[len(recipe_name) + 1:] in recipe_files
+                ]
+                for file_dir, files in recipe_contents.items()
+            }
+        return json.dumps({'recipes': recipes})
+
+    def handle(self, method, path, payload):
+        """
+        Return the status code and body of the response to the provided request.
+        """
+        with self._lock:
+            self._request_count += 1
+        if self.latency_secs:
+            time.sleep(self.latency_secs)
+        if path.startswith('/events/v1/'):
+            return 200, '{}'
+        segments = path.split('?', 1)[0].strip('/').split('/')[1:]
+        route = '/'.join(segments[:2])
+        if route == 'login':
+            return 200, 'token'
+        if route in ('validatetoken', 'vault/config'):
+            return 200, '{}'
+        if route == 'userinfo':
+            return 200, json.dumps(USER_INFO)
+        if route == 'kitchen/list':
+            return 200, json.dumps({'kitchens': [{'name': self.kitchen, 'kitchen-staff': []}]})
+        if route == 'kitchen/recipenames':
+            return 200, json.dumps({'recipes': self.recipes})
+        if route == 'recipe/file':
+            variations = {'variation-list': {self.variation: {}}}
+            return 200, json.dumps({'contents': json.dumps(variations)})
+        if route == 'recipe/get':
+            return 200, self.get_recipe(segments[3], payload)
+        if route == 'order/create':
+            return 200, json.dumps({'order_id': str(uuid.uuid4())})
+        if route == 'order/servings':
+            return 200, json.dumps({'servings': [{'hid': f'{segments[3]}-run'}]})
+        if route == 'order/status':
+            # Not an ingredient order run
+            return 200, json.dumps({'orders': [{'input_settings': {}}]})
+        if route == 'order/details':
+            if payload.get('logs'):
+                return 200, self.log_response
+            details = dict(self.order_run_details, status=self.get_order_run_status(payload['serving_hid']))
+            return 200, json.dumps({'servings': [details]})
+        return 404, json.dumps({'error': f'{method} {path} is not supported by the mock server'})
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    mock_server = None
+
+    def _handle(self):
+        content_length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(content_length) if content_length else b''
+        content_type = self.headers.get('Content-Type') or ''
+        payload = {}
+        if body and 'json' in content_type:
+            payload = json.loads(body)
+        elif body and 'x-www-form-urlencoded' in content_type:
+            payload = dict(re.findall(r'([^&=]+)=([^&]*)', body.decode()))
+        status, response_body = self.mock_server.handle(self.command, self.path, payload)
+        if isinstance(response_body, str):
+            response_body = response_body.encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(response_body)))
+        self.end_headers()
+        self.wfile.write(response_body)
+
+    do_DELETE = do_GET = do_POST = do_PUT = _handle
+
+    def log_message(self, format, *args):
+        pass
@@ -0,0 +1,28 @@
+from dkutils.lazy_import import lazy_submodules
+
+__getattr__, __dir__ = lazy_submodules(
+    __name__, [
+        'alteryx_api',
+        'circuit_breaker',
+        'constants',
+        'datakitchen_api',
+        'decorators',
+        'dictionary_comparator',
+        'gmail_api',
+        'instrumentation',
+        'jira_api',
+        'json_codec',
+        'lazy_import',
+        'rate_limiter',
+        'reporting',
+        'retry',
+        'smtp_api',
+        'ssh',
+        'streamsets_api',
+        'tracing',
+        'util',
+        'validation',
+        'veeva_network_api',
+        'wait_loop',
+    ]
+)
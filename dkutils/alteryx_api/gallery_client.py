@@ -1,22 +1,42 @@
 import logging
+import re
 from dataclasses import dataclass, is_dataclass
 from datetime import datetime
 from enum import Enum
+from functools import partial
+from itertools import count
 from typing import List
 
 import dateutil.parser as date_parser
 import requests
 from requests_oauthlib import OAuth1
 
+from dkutils.instrumentation import GALLERY_CLIENT, get_endpoint_template, observe_request
 from dkutils.wait_loop import WaitLoop
 
 logger = logging.getLogger(__name__)
 
+# API path segments that are endpoint names rather than identifiers (e.g. app or job ids), used to
+# aggregate request metrics per endpoint
+ENDPOINT_NAMES = {'admin', 'all', 'jobs', 'subscription', 'v1', 'workflows'}
+
 
 class GalleryException(Exception):
     pass
 
 
+def _get_resource(suffix):
+    """
+    Return the resource of an API path (e.g. workflows for /admin/v1/workflows/all/), skipping the admin and version
+    prefixes.
+    """
+    segments = [
+        segment for segment in suffix.split('/')
+        if segment and segment != 'admin' and not re.fullmatch(r'v\d+', segment)
+    ]
+    return segments[0] if segments else ''
+
+
 def nested_dataclass_decorator(*args, **kwargs):
     """
     Returns
@@ -203,12 +223,23 @@ class GalleryClient:
         api_secret: str
             The api secret used to authenticate access to the Gallery API. Then can be found in the Keys section of
             account settings on the Alteryx Gallery.
+        retry_policy: RetryPolicy, optional
+            :class:`~dkutils.retry.RetryPolicy` for retrying API calls that fail with a retryable error. If None,
+            failed calls are not retried.
+        circuit_breaker: CircuitBreaker, optional
+            :class:`~dkutils.circuit_breaker.CircuitBreaker` tracking failures per resource (e.g. workflows or jobs),
+            so that calls to a resource that keeps failing raise a CircuitBreakerOpenError without being made. If None,
+            calls are always made.
         """
 
-    def __init__(self, api_location: str, api_key: str, api_secret: str) -> None:
+    def __init__(
+        self, api_location: str, api_key: str, api_secret: str, retry_policy=None, circuit_breaker=None
+    ) -> None:
         self.api_location = api_location
         self.api_key = api_key
         self.api_secret = api_secret
+        self._retry_policy = retry_policy
+        self._circuit_breaker = circuit_breaker
 
     @property
     def api_location(self):
@@ -264,11 +295,7 @@ class GalleryClient:
             An object deserialized from the JSON returned in the response
 
         """
-        response = requests.get(
-            self.api_location + suffix, auth=self._get_authentication(), params=params, **kwargs
-        )
-        response.raise_for_status()
-        return response.json()
+        return self._request('get', suffix, params, **kwargs)
 
     def _post(self, suffix, params=None, **kwargs):
         """
@@ -294,11 +321,36 @@ class GalleryClient:
             An object deserialized from the JSON returned in the response
 
         """
-        response = requests.post(
-            self.api_location + suffix, auth=self._get_authentication(), params=params, **kwargs
-        )
-        response.raise_for_status()
-        return response.json()
+        return self._request('post', suffix, params, **kwargs)
+
+    def _request(self, http_method, suffix, params=None, **kwargs):
+        """
+        Sends a request with the provided HTTP method, retrying it according to the retry policy
+        """
+        api_request = getattr(requests, http_method)
+
+        endpoint_template = get_endpoint_template(suffix, ENDPOINT_NAMES)
+        attempts = count()
+
+        def send_request():
+            response = observe_request(
+                GALLERY_CLIENT,
+                http_method,
+                endpoint_template,
+                partial(
+                    api_request, self.api_location + suffix, auth=self._get_authentication(), params=params, **kwargs
+                ),
+                attempt=next(attempts)
+            )
+            response.raise_for_status()
+            return response.json()
+
+        send = send_request
+        if self._circuit_breaker is not None:
+            send = partial(self._circuit_breaker.call, _get_resource(suffix), send_request)
+        if self._retry_policy is None:
+            return send()
+        return self._retry_policy.call(send)
 
     def _get_authentication(self):
         """
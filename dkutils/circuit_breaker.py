@@ -0,0 +1,189 @@
+import logging
+import threading
+import time
+
+from dkutils.retry import is_retryable_error
+
+logger = logging.getLogger(__name__)
+
+# Circuit states
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RECOVERY_TIMEOUT_SECS = 30
+DEFAULT_HALF_OPEN_MAX_CALLS = 1
+
+
+class CircuitBreakerOpenError(Exception):
+    """
+    Raised instead of calling an endpoint whose circuit is open.
+    """
+
+    def __init__(self, endpoint, retry_after_secs):
+        super().__init__(
+            f'Circuit for {endpoint} is open after repeated failures, retry in {retry_after_secs:.1f} seconds'
+        )
+        self.endpoint = endpoint
+        self.retry_after_secs = retry_after_secs
+
+
+class _Circuit:
+
+    def __init__(self):
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_time = None
+        self.probes = 0
+
+
+class CircuitBreaker:
+
+    def __init__(
+        self,
+        failure_threshold=DEFAULT_FAILURE_THRESHOLD,
+        recovery_timeout_secs=DEFAULT_RECOVERY_TIMEOUT_SECS,
+        half_open_max_calls=DEFAULT_HALF_OPEN_MAX_CALLS,
+        is_failure=is_retryable_error,
+    ):
+        """
+        Stop calling an endpoint that keeps failing, so that calls during an outage fail fast
+        instead of piling up latency. Each endpoint has its own circuit, which is closed (calls are
+        made) until failure_threshold consecutive calls fail. The circuit is then open (calls raise a
+        :class:`CircuitBreakerOpenError` without being made) for recovery_timeout_secs, after which
+        it's half open: up to half_open_max_calls probe calls are made, and the circuit closes if
+        one succeeds or opens again if one fails.
+
+        Share an instance between clients of the same service to share the circuits.
+
+        Parameters
+        ----------
+        failure_threshold : int, optional
+            Number of consecutive failures after which a circuit opens (default: 5).
+        recovery_timeout_secs : float, optional
+            Number of seconds a circuit stays open before probe calls are made (default: 30).
+        half_open_max_calls : int, optional
+            Max number of concurrent probe calls of a half open circuit (default: 1).
+        is_failure : callable, optional
+            Function accepting an exception and returning True if it indicates the endpoint is
+            unhealthy (default: :func:`~dkutils.retry.is_retryable_error`, i.e. 5xx and 429 status
+            codes, connection errors, and timeouts). Other exceptions (e.g. 404 status codes) show
+            the endpoint is responsive and count as successes.
+
+        Raises
+        ------
+        ValueError
+            If failure_threshold or half_open_max_calls is less than 1.
+        """
+        if failure_threshold < 1:
+            raise ValueError(f'Failure threshold must be at least 1, not {failure_threshold}')
+        if half_open_max_calls < 1:
+            raise ValueError(f'Half open max calls must be at least 1, not {half_open_max_calls}')
+        self._failure_threshold = failure_threshold
+        self._recovery_timeout_secs = recovery_timeout_secs
+        self._half_open_max_calls = half_open_max_calls
+        self._is_failure = is_failure
+        self._circuits = {}
+        self._lock = threading.Lock()
+
+    def _get_circuit(self, endpoint) -> _Circuit:
+        circuit = self._circuits.get(endpoint)
+        if circuit is None:
+            circuit = self._circuits[endpoint] = _Circuit()
+        if circuit.state == OPEN and time.monotonic() - circuit.opened_time >= self._recovery_timeout_secs:
+            circuit.state = HALF_OPEN
+            circuit.probes = 0
+        return circuit
+
+    def get_state(self, endpoint=None) -> str:
+        """
+        Return the state of the provided endpoint's circuit: CLOSED, OPEN, or HALF_OPEN.
+        """
+        with self._lock:
+            return self._get_circuit(endpoint).state
+
+    def reset(self, endpoint=None) -> None:
+        """
+        Close the provided endpoint's circuit.
+        """
+        with self._lock:
+            self._circuits.pop(endpoint, None)
+
+    def before_call(self, endpoint=None) -> None:
+        """
+        Register a call to the provided endpoint.
+
+        Raises
+        ------
+        CircuitBreakerOpenError
+            If the endpoint's circuit is open, or half open with the max number of probe calls in
+            progress.
+        """
+        with self._lock:
+            circuit = self._get_circuit(endpoint)
+            if circuit.state == CLOSED:
+                return
+            if circuit.state == HALF_OPEN and circuit.probes < self._half_open_max_calls:
+                circuit.probes += 1
+                logger.info(f'Probing {endpoint} to determine whether it recovered')
+                return
+            if circuit.state == OPEN:
+                retry_after_secs = self._recovery_timeout_secs - (time.monotonic() - circuit.opened_time)
+            else:
+                retry_after_secs = 0
+        raise CircuitBreakerOpenError(endpoint, retry_after_secs)
+
+    def on_success(self, endpoint=None) -> None:
+        with self._lock:
+            circuit = self._get_circuit(endpoint)
+            if circuit.state != CLOSED:
+                logger.info(f'Circuit for {endpoint} is closed, the endpoint recovered')
+            circuit.state = CLOSED
+            circuit.failures = 0
+
+    def on_failure(self, endpoint=None) -> None:
+        with self._lock:
+            circuit = self._get_circuit(endpoint)
+            circuit.failures += 1
+            if circuit.state == HALF_OPEN or circuit.failures >= self._failure_threshold:
+                if circuit.state != OPEN:
+                    logger.warning(
+                        f'Circuit for {endpoint} is open after {circuit.failures} consecutive failures, '
+                        f'calls will fail for {self._recovery_timeout_secs} seconds'
+                    )
+                circuit.state = OPEN
+                circuit.opened_time = time.monotonic()
+
+    def call(self, endpoint, f, *args, **kwargs):
+        """
+        Call the provided function, unless the endpoint's circuit is open, and record the outcome.
+
+        Parameters
+        ----------
+        endpoint : str
+            Endpoint called by the function.
+        f : callable
+            Function to call with the provided args and kwargs.
+
+        Raises
+        ------
+        CircuitBreakerOpenError
+            If the endpoint's circuit is open.
+
+        Returns
+        -------
+        object
+            Value returned by the function.
+        """
+        self.before_call(endpoint)
+        try:
+            result = f(*args, **kwargs)
+        except Exception as e:
+            if self._is_failure(e):
+                self.on_failure(endpoint)
+            else:
+                self.on_success(endpoint)
+            raise
+        self.on_success(endpoint)
+        return result
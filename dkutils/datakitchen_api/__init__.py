@@ -0,0 +1,18 @@
+from dkutils.lazy_import import lazy_submodules
+
+__getattr__, __dir__ = lazy_submodules(
+    __name__, [
+        'client_registry',
+        'datakitchen_client',
+        'datetime_utils',
+        'duration_predictor',
+        'kitchen',
+        'order_run_history',
+        'order_run_monitor',
+        'overrides_utils',
+        'recipe',
+        'recipe_mirror',
+        'tests_utils',
+        'vault',
+    ]
+)
@@ -0,0 +1,166 @@
+import copy
+import hashlib
+import hmac
+import logging
+import secrets
+import threading
+
+from typing import NamedTuple
+
+from dkutils.constants import DEFAULT_DATAKITCHEN_URL
+from .datakitchen_client import DataKitchenClient, get_context_credentials
+
+logger = logging.getLogger(__name__)
+
+
+class ClientKey(NamedTuple):
+    base_url: str
+    username: str
+    password_hmac: str
+    is_api_token: bool
+
+
+def get_client_key(username, password, secret, base_url=None, is_api_token=False) -> ClientKey:
+    """
+    Return the key of the clients authenticated with the provided credentials. Rather than the
+    password, the key holds its HMAC-SHA256 with the provided secret, so that the password cannot
+    be recovered from the key without the secret. Keys should nonetheless never be logged.
+    """
+    return ClientKey(
+        base_url=base_url if base_url else DEFAULT_DATAKITCHEN_URL,
+        username=username,
+        password_hmac=hmac.new(secret, password.encode(), hashlib.sha256).hexdigest(),
+        is_api_token=is_api_token
+    )
+
+
+class ClientRegistry:
+
+    def __init__(self):
+        """
+        Thread-safe cache of authenticated :class:`DataKitchenClient` objects, keyed by base URL and
+        credentials, so that creating several clients for the same user only logs in once.
+
+        The cached clients are never handed out. Instead, each call returns a copy of the cached
+        client with its own kitchen, recipe, variation, rate limiter, retry policy, and circuit
+        breaker, which costs no request and may be modified without affecting the other copies.
+        The copies share the token of the cached client, so a refreshed token is used by all of
+        them. For read-only views of a client, see :meth:`DataKitchenClient.scope`.
+        """
+        self._clients = {}
+        # Secret with which the passwords in the keys of the cached clients are hashed. It's only
+        # held in memory, so the keys are only meaningful within the registry.
+        self._secret = secrets.token_bytes(32)
+        # Clients are created outside of the registry lock, so that logging in a user doesn't
+        # block the users already logged in. A lock per key ensures each user only logs in once.
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    def __len__(self):
+        with self._lock:
+            return len(self._clients)
+
+    def get_client(
+        self,
+        username,
+        password,
+        base_url=None,
+        kitchen=None,
+        recipe=None,
+        variation=None,
+        is_api_token=False,
+        rate_limiter=None,
+        retry_policy=None,
+        circuit_breaker=None,
+        retry_non_idempotent=False
+    ) -> DataKitchenClient:
+        """
+        Return a client authenticated with the provided credentials, logging in only if no client
+        is cached for them. See :class:`DataKitchenClient` for a description of the parameters.
+
+        Raises
+        ------
+        HTTPError
+            If a client is created and fails to log in, in which case it isn't cached.
+
+        Returns
+        -------
+        DataKitchenClient
+            Copy of the cached client with the provided kitchen, recipe, variation, rate_limiter,
+            retry_policy, circuit_breaker, and retry_non_idempotent.
+        """
+        key = get_client_key(username, password, self._secret, base_url=base_url, is_api_token=is_api_token)
+        client = self._get_cached_client(key)
+        if client is None:
+            with self._get_key_lock(key):
+                client = self._get_cached_client(key)
+                if client is None:
+                    logger.info(f'Logging in {username} to {key.base_url}')
+                    client = DataKitchenClient(
+                        username, password, base_url=base_url, is_api_token=is_api_token
+                    )
+                    with self._lock:
+                        self._clients[key] = client
+        client = copy.copy(client)
+        client.kitchen = kitchen
+        client.recipe = recipe
+        client.variation = variation
+        client.rate_limiter = rate_limiter
+        client.retry_policy = retry_policy
+        client.circuit_breaker = circuit_breaker
+        client.retry_non_idempotent = retry_non_idempotent
+        return client
+
+    def get_context_client(self, context='default', **kwargs) -> DataKitchenClient:
+        """
+        Like :func:`~dkutils.datakitchen_api.datakitchen_client.create_using_context`, but return a
+        copy of the client cached for the credentials of the context (see :meth:`get_client`).
+        Since the context is read on each call, updated credentials log in again.
+
+        Parameters
+        ----------
+        context: str, optional
+            The name of a context created by DKCloudCommand
+        kwargs
+            Optional kitchen, recipe, variation, rate_limiter, retry_policy, circuit_breaker, and
+            retry_non_idempotent keyword arguments of :meth:`get_client`.
+        """
+        return self.get_client(**get_context_credentials(context), **kwargs)
+
+    def remove(self, username, password, base_url=None, is_api_token=False) -> bool:
+        """
+        Remove the client cached for the provided credentials, e.g. after the user logged out.
+
+        Returns
+        -------
+        bool
+            True if a client was cached for the credentials, False otherwise.
+        """
+        key = get_client_key(username, password, self._secret, base_url=base_url, is_api_token=is_api_token)
+        with self._lock:
+            self._key_locks.pop(key, None)
+            return self._clients.pop(key, None) is not None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._clients.clear()
+            self._key_locks.clear()
+
+    def _get_cached_client(self, key):
+        with self._lock:
+            return self._clients.get(key)
+
+    def _get_key_lock(self, key):
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+
+_default_registry = ClientRegistry()
+
+
+def get_default_registry() -> ClientRegistry:
+    """
+    Return the registry shared by the process, e.g. to share clients between the modules of a
+    notebook or script.
+    """
+    return _default_registry
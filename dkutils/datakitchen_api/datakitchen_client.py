@@ -1,9 +1,14 @@
+import contextvars
 import copy
 import json
 import logging
 import os
+import threading
+import time
 import traceback
-from functools import cmp_to_key
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import count
 
 import requests
 from requests.exceptions import HTTPError
@@ -28,7 +33,11 @@ from dkutils.constants import (
     STOPPED_STATUS_TYPES,
     VARIATION,
 )
-from dkutils.dictionary_comparator import DictionaryComparator
+from dkutils.dictionary_comparator import DictionaryComparator, apply_patch
+from dkutils.instrumentation import DATAKITCHEN_CLIENT, get_endpoint_template, observe_request
+from dkutils.json_codec import iter_json_array, loads, response_json
+from dkutils.retry import is_throttled_error
+from dkutils.tracing import start_as_current_span, traced
 from dkutils.validation import get_max_concurrency, skip_token_validation
 from dkutils.wait_loop import WaitLoop
 from .datetime_utils import get_utc_timestamp
@@ -40,11 +49,110 @@ logger = logging.getLogger(__name__)
 # 100K exceeds the max order runs a given order will ever contain.
 DEFAULT_SERVINGS_COUNT = 100000
 
+# Size in bytes of the chunks read from streamed responses (e.g. order run logs)
+DEFAULT_STREAM_CHUNK_SIZE = 64 * 1024
 
-def create_using_context(context="default", kitchen=None, recipe=None, variation=None):
+# Default number of threads creating orders concurrently in create_and_monitor_orders
+DEFAULT_MAX_SUBMIT_WORKERS = 8
+
+# Seconds during which a valid kitchen, recipe, or variation is not looked up again, so that one
+# deleted or renamed meanwhile (e.g. by another client) is eventually detected
+ATTRIBUTE_TTL_SECS = 300
+
+# Seconds during which an invalid kitchen, recipe, or variation is not looked up again, so that one
+# created meanwhile is eventually found
+ATTRIBUTE_ERROR_TTL_SECS = 60
+
+# Path to the log entries in an order run details response
+ORDER_RUN_LOG_LINES_PATH = ('servings', 0, 'log', 'lines')
+
+# API path segments that are endpoint names rather than identifiers (e.g. kitchen or recipe names),
+# used to aggregate request metrics per endpoint
+ENDPOINT_NAMES = {
+    'config', 'create', 'delete', 'details', 'file', 'get', 'kitchen', 'list', 'login', 'order',
+    'recipe', 'recipenames', 'resume', 'serving', 'servings', 'status', 'update', 'userinfo',
+    'validatetoken', 'vault'
+}
+
+# Requests that repeat their effect if sent again (e.g. create a second order), keyed by the first
+# segments of their API path
+NON_IDEMPOTENT_REQUESTS = {('kitchen', 'create'), ('order', 'create'), ('order', 'resume'), ('recipe', 'create')}
+
+# POST requests that may be sent again without repeating their effect, since they only retrieve
+# data or set it to the provided value, keyed by the first segments of their API path
+IDEMPOTENT_POST_REQUESTS = {
+    ('kitchen', 'update'), ('login',), ('order', 'details'), ('recipe', 'get'), ('recipe', 'update'),
+    ('secret',), ('vault', 'config')
+}
+
+
+def is_idempotent_request(http_method, path) -> bool:
+    """
+    Return True if the provided DataKitchen API request may be sent again without repeating its
+    effect, and may thus be retried after failing once the platform processed it (e.g. on a read
+    timeout). POST requests are assumed not to be idempotent unless they're listed in
+    IDEMPOTENT_POST_REQUESTS, whereas the requests listed in NON_IDEMPOTENT_REQUESTS aren't
+    idempotent regardless of their method.
+
+    Parameters
+    ----------
+    http_method : str
+        HTTP method of the request (e.g. post).
+    path : str
+        API path of the request, relative to the API version (e.g. order/create/kitchen).
+
+    Returns
+    -------
+    bool
+        True if the request is idempotent.
+    """
+    segments = tuple(path.split('/'))
+    if segments[:2] in NON_IDEMPOTENT_REQUESTS:
+        return False
+    if http_method == API_POST:
+        return segments[:1] in IDEMPOTENT_POST_REQUESTS or segments[:2] in IDEMPOTENT_POST_REQUESTS
+    return True
+
+
+def get_context_credentials(context='default') -> dict:
+    """
+    Read the credentials of a context created by DKCloudCommand.
+
+    Parameters
+    ----------
+    context: str, optional
+        The name of a context created by DKCloudCommand
+
+    Returns
+    -------
+    dict
+        The username, password, and base_url keyword arguments of :class:`DataKitchenClient`.
+    """
+    context_path = os.path.expanduser(f'~/.dk/{context}/config.json')
+    with open(context_path) as json_file:
+        data = json.load(json_file)
+    return {
+        'username': data['dk-cloud-username'],
+        'password': data['dk-cloud-password'],
+        'base_url': f"{data['dk-cloud-ip']}:{data['dk-cloud-port']}",
+    }
+
+
+def create_using_context(
+    context="default",
+    kitchen=None,
+    recipe=None,
+    variation=None,
+    rate_limiter=None,
+    retry_policy=None,
+    circuit_breaker=None,
+    validate_attributes=True,
+    retry_non_idempotent=False
+):
     """
     This is a factory method that can be used to create a client using the context created by
-    DKCloudCommand
+    DKCloudCommand. Each call logs in with a new client. To reuse an authenticated client, see
+    :meth:`~dkutils.datakitchen_api.client_registry.ClientRegistry.get_context_client`.
 
     Parameters
     ----------
@@ -56,23 +164,36 @@ def create_using_context(context="default", kitchen=None, recipe=None, variation
         Recipe to use in API requests
     variation : str, optional
         Variation to use in API requests
+    rate_limiter : RateLimiter, optional
+        Rate limiter shared by the API requests (see :class:`~dkutils.rate_limiter.RateLimiter`)
+    retry_policy : RetryPolicy, optional
+        Policy for retrying failed API requests (see :class:`~dkutils.retry.RetryPolicy`)
+    circuit_breaker : CircuitBreaker, optional
+        Circuit breaker failing requests fast during outages (see
+        :class:`~dkutils.circuit_breaker.CircuitBreaker`)
+    validate_attributes : bool, optional
+        If False, the recipe and variation aren't looked up before their first use (see
+        :class:`DataKitchenClient`)
+    retry_non_idempotent : bool, optional
+        If True, the retry_policy also retries requests that aren't idempotent, such as order
+        creation (see :class:`DataKitchenClient`)
 
     Returns
     -------
     DataKitchenClient
         Client object for invoking DataKitchen API calls
     """
-    context_path = os.path.expanduser(f'~/.dk/{context}/config.json')
-    with open(context_path) as json_file:
-        data = json.load(json_file)
-        return DataKitchenClient(
-            username=data['dk-cloud-username'],
-            password=data['dk-cloud-password'],
-            base_url=f"{data['dk-cloud-ip']}:{data['dk-cloud-port']}",
-            kitchen=kitchen,
-            recipe=recipe,
-            variation=variation
-        )
+    return DataKitchenClient(
+        **get_context_credentials(context),
+        kitchen=kitchen,
+        recipe=recipe,
+        variation=variation,
+        rate_limiter=rate_limiter,
+        retry_policy=retry_policy,
+        circuit_breaker=circuit_breaker,
+        validate_attributes=validate_attributes,
+        retry_non_idempotent=retry_non_idempotent
+    )
 
 
 def ensure_and_get_kitchen(kitchen, kitchens):
@@ -102,6 +223,92 @@ def ensure_and_get_kitchen(kitchen, kitchens):
     return kitchens[kitchen]
 
 
+class OrderCreationError(Exception):
+    """
+    Raised by :meth:`DataKitchenClient.create_and_monitor_orders` once the orders that were
+    created have been monitored, if any order could not be created.
+    """
+
+    def __init__(self, failed_orders, completed_orders, active_orders, queued_orders):
+        super().__init__(
+            f'Failed to create {len(failed_orders)} orders: {[str(e) for _, e in failed_orders]}'
+        )
+        self.failed_orders = failed_orders
+        self.completed_orders = completed_orders
+        self.active_orders = active_orders
+        self.queued_orders = queued_orders
+
+
+class _AuthState:
+
+    def __init__(self):
+        """
+        Token and headers of a client, shared by its copies and scoped views (see
+        :meth:`DataKitchenClient.scope`), so that they log in once.
+        """
+        self.token = None
+        self.headers = None
+        self.lock = threading.Lock()
+
+
+class _AttributeValidator:
+
+    def __init__(self, ttl_secs=ATTRIBUTE_TTL_SECS, error_ttl_secs=ATTRIBUTE_ERROR_TTL_SECS):
+        """
+        Memoized validation of the kitchen, recipe, and variation of a client, keyed by the
+        (kitchen, recipe, variation) tuple and shared by its copies and scoped views, so that each
+        tuple is looked up once per ttl_secs. Invalid tuples are cached for error_ttl_secs. The
+        client clears the cache when it creates, deletes, or updates kitchens and recipes.
+        """
+        self._ttl_secs = ttl_secs
+        self._error_ttl_secs = error_ttl_secs
+        self._errors = {}
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    def validate(self, key, validate):
+        """
+        Call validate, unless the key was already validated, and raise the ValueError it raised, if
+        any. Other errors (e.g. HTTPError) are not cached. Concurrent calls for the same key call
+        validate once.
+        """
+        error = self._get_error(key)
+        if error is None:
+            with self._get_key_lock(key):
+                error = self._get_error(key)
+                if error is None:
+                    try:
+                        validate()
+                        error = ('', time.monotonic() + self._ttl_secs)
+                    except ValueError as e:
+                        error = (str(e), time.monotonic() + self._error_ttl_secs)
+                    with self._lock:
+                        self._errors[key] = error
+        message = error[0]
+        if message:
+            raise ValueError(message)
+
+    def clear(self):
+        with self._lock:
+            self._errors.clear()
+
+    def _get_error(self, key):
+        """
+        Return the cached (message, expiry time) of the key, where the message is empty if it's
+        valid, or None if the key wasn't validated or its error expired.
+        """
+        with self._lock:
+            error = self._errors.get(key)
+            if error is not None and error[1] <= time.monotonic():
+                del self._errors[key]
+                return None
+            return error
+
+    def _get_key_lock(self, key):
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+
 class DataKitchenClient:
 
     def __init__(
@@ -112,7 +319,12 @@ class DataKitchenClient:
         kitchen=None,
         recipe=None,
         variation=None,
-        is_api_token=False
+        is_api_token=False,
+        rate_limiter=None,
+        retry_policy=None,
+        circuit_breaker=None,
+        validate_attributes=True,
+        retry_non_idempotent=False
     ):
         """
         Client object for invoking DataKitchen API calls. If the API call requires a kitchen,
@@ -136,18 +348,96 @@ class DataKitchenClient:
             Variation to use in API requests
         is_api_token: bool, optional
             Indicates whether username and possword are an api token pair
-        """
+        rate_limiter : RateLimiter, optional
+            :class:`~dkutils.rate_limiter.RateLimiter` limiting the rate and concurrency of API
+            requests, keyed by the first element of the endpoint path (e.g. order or recipe), and
+            retrying throttled requests. Share an instance between clients to share the limits. If
+            None, requests are not limited.
+        retry_policy : RetryPolicy, optional
+            :class:`~dkutils.retry.RetryPolicy` for retrying API requests that fail with a
+            retryable error (e.g. 5xx or 429 status codes, connection errors, and timeouts). Unless
+            retry_non_idempotent is True, requests that aren't idempotent, such as order creation,
+            are not retried (see :func:`is_idempotent_request`). If a rate_limiter is also
+            provided, throttled requests are only retried by the rate limiter. If None, failed
+            requests are not retried.
+        circuit_breaker : CircuitBreaker, optional
+            :class:`~dkutils.circuit_breaker.CircuitBreaker` tracking failures per endpoint (i.e. the
+            first element of the endpoint path, e.g. order or recipe), so that requests to an
+            endpoint that keeps failing raise a CircuitBreakerOpenError without being sent. If None,
+            requests are always sent.
+        validate_attributes : bool, optional
+            If True (the default), the recipe and variation are looked up before their first use,
+            so that invalid ones raise a ValueError. The lookups are cached per (kitchen, recipe,
+            variation) tuple, and shared by the copies and scoped views of the client. If False,
+            they're only checked to be set, and the API requests using invalid ones fail with an
+            HTTPError.
+        retry_non_idempotent : bool, optional
+            If True, the retry_policy also retries requests that aren't idempotent. Since requests
+            failing after the platform processed them (e.g. on a read timeout or 504 status code)
+            are then sent again, this may e.g. create duplicate orders (default: False).
+        """
+        self._rate_limiter = rate_limiter
+        self._retry_policy = retry_policy
+        self._retry_non_idempotent = retry_non_idempotent
+        self._circuit_breaker = circuit_breaker
         self._username = username
         self._password = password
         self._base_url = base_url if base_url else DEFAULT_DATAKITCHEN_URL
-        self._token = None
-        self._headers = None
+        self._auth = _AuthState()
+        self._attribute_validator = _AttributeValidator() if validate_attributes else None
         self._is_api_token = is_api_token
         self._refresh_token()
         self.kitchen = kitchen
         self.recipe = recipe
         self.variation = variation
-        self._valid_attributes = False
+
+    @property
+    def _token(self):
+        return self._auth.token
+
+    @_token.setter
+    def _token(self, token):
+        self._auth.token = token
+
+    @property
+    def _headers(self):
+        return self._auth.headers
+
+    @_headers.setter
+    def _headers(self, headers):
+        self._auth.headers = headers
+
+    @property
+    def rate_limiter(self):
+        return self._rate_limiter
+
+    @rate_limiter.setter
+    def rate_limiter(self, rate_limiter):
+        self._rate_limiter = rate_limiter
+
+    @property
+    def retry_policy(self):
+        return self._retry_policy
+
+    @retry_policy.setter
+    def retry_policy(self, retry_policy):
+        self._retry_policy = retry_policy
+
+    @property
+    def retry_non_idempotent(self):
+        return self._retry_non_idempotent
+
+    @retry_non_idempotent.setter
+    def retry_non_idempotent(self, retry_non_idempotent):
+        self._retry_non_idempotent = retry_non_idempotent
+
+    @property
+    def circuit_breaker(self):
+        return self._circuit_breaker
+
+    @circuit_breaker.setter
+    def circuit_breaker(self, circuit_breaker):
+        self._circuit_breaker = circuit_breaker
 
     @property
     def kitchen(self):
@@ -156,7 +446,6 @@ class DataKitchenClient:
     @kitchen.setter
     def kitchen(self, kitchen):
         self._kitchen = kitchen
-        self._valid_attributes = False
 
     def set_kitchen(self, kitchen):
         self.kitchen = kitchen
@@ -169,7 +458,6 @@ class DataKitchenClient:
     @recipe.setter
     def recipe(self, recipe):
         self._recipe = recipe
-        self._valid_attributes = False
 
     def set_recipe(self, recipe):
         self.recipe = recipe
@@ -182,61 +470,89 @@ class DataKitchenClient:
     @variation.setter
     def variation(self, variation):
         self._variation = variation
-        self._valid_attributes = False
 
     def set_variation(self, variation):
         self.variation = variation
         return self
 
+    def scope(self, kitchen=None, recipe=None, variation=None) -> 'ScopedDataKitchenClient':
+        """
+        Return a read-only view of this client for the provided kitchen, recipe, and variation.
+        Creating a view sends no request: it shares the token, rate limiter, retry policy, and
+        circuit breaker of this client, as well as its cache of validated recipes and variations.
+        Since its attributes cannot change, a view may be used concurrently by several threads.
+
+        Parameters
+        ----------
+        kitchen : str, optional
+            Kitchen to use in API requests. If None, the kitchen of this client is used.
+        recipe : str, optional
+            Recipe to use in API requests. If None, the recipe of this client is used.
+        variation : str, optional
+            Variation to use in API requests. If None, the variation of this client is used.
+
+        Returns
+        -------
+        ScopedDataKitchenClient
+            Client whose kitchen, recipe, variation, rate_limiter, retry_policy, and
+            circuit_breaker attributes cannot be set.
+        """
+        return ScopedDataKitchenClient(
+            self,
+            kitchen=kitchen if kitchen is not None else self.kitchen,
+            recipe=recipe if recipe is not None else self.recipe,
+            variation=variation if variation is not None else self.variation
+        )
+
     def _ensure_attributes(self, *args):
         """
-        Ensure the properties required for the API request are all defined.
+        Ensure the properties required for the API request are all defined. Unless the client was
+        created with validate_attributes=False, also ensure the recipe and variation exist, which
+        is only looked up once per (kitchen, recipe, variation) tuple.
         """
-
-        def sort_args(a, b):
-            """
-            Sort so attributes are processed in Kitchen, Recipe, Variation order
-            """
-            if KITCHEN == a:
-                return -1
-            if RECIPE == a and VARIATION == b:
-                return -1
-            if a < b:
-                return -1
-            if a == b:
-                return 0
-            return 1
-
-        if self._valid_attributes:
-            return
-        invalid_attributes = []
         attributes_to_check = set(args)
         if VARIATION in attributes_to_check:
             attributes_to_check.add(RECIPE)
         if RECIPE in attributes_to_check:
             attributes_to_check.add(KITCHEN)
-        for attr_name in sorted(attributes_to_check, key=cmp_to_key(sort_args)):
-            if getattr(self, attr_name) is None:
-                invalid_attributes.append(attr_name)
-            elif attr_name == RECIPE and KITCHEN not in invalid_attributes:
-                recipes = self.get_recipes()
-                if self.recipe not in recipes:
-                    raise ValueError(
-                        f'{self.recipe} is not one of the available recipes: {",".join(recipes)}'
-                    )
-            elif attr_name == VARIATION and RECIPE not in invalid_attributes and KITCHEN not in invalid_attributes:
-                variations = self.get_variations()
-                if self.variation not in variations:
-                    raise ValueError(
-                        f'{self.variation} is not one of the available variations: {",".join(variations)}'
-                    )
-
+        invalid_attributes = [
+            attr_name for attr_name in (KITCHEN, RECIPE, VARIATION)
+            if attr_name in attributes_to_check and getattr(self, attr_name) is None
+        ]
         if invalid_attributes:
             raise ValueError(f'Undefined attributes: {",".join(invalid_attributes)}')
-        else:
-            self._valid_attributes = True
+        if self._attribute_validator is None:
+            return
+        if RECIPE in attributes_to_check:
+            self._attribute_validator.validate((self.kitchen, self.recipe, None), self._validate_recipe)
+        if VARIATION in attributes_to_check:
+            self._attribute_validator.validate(
+                (self.kitchen, self.recipe, self.variation), self._validate_variation
+            )
+
+    def _clear_validated_attributes(self):
+        """
+        Look up the kitchens, recipes, and variations again before their next use, e.g. after some
+        were created, deleted, or updated.
+        """
+        if self._attribute_validator is not None:
+            self._attribute_validator.clear()
+
+    @traced('DataKitchenClient.validate_recipe')
+    def _validate_recipe(self):
+        recipes = self.get_recipes()
+        if self.recipe not in recipes:
+            raise ValueError(f'{self.recipe} is not one of the available recipes: {",".join(recipes)}')
+
+    @traced('DataKitchenClient.validate_variation')
+    def _validate_variation(self):
+        variations = self.get_variations()
+        if self.variation not in variations:
+            raise ValueError(
+                f'{self.variation} is not one of the available variations: {",".join(variations)}'
+            )
 
-    def _api_request(self, http_method, *args, is_json=True, **kwargs):
+    def _api_request(self, http_method, *args, is_json=True, stream=False, log_errors=True, **kwargs):
         """
         Make HTTP request to arbitrary API endpoint, with optional parameters as payload.
 
@@ -248,37 +564,95 @@ class DataKitchenClient:
             Variable length list of strings to construct endpoint path.
         is_json : bool
             Set to False if payload/response is not JSON data.
+        stream : bool
+            Set to True to read the response content incrementally (e.g. with
+            Response.iter_content) instead of downloading it immediately. The caller must close the
+            response.
+        log_errors : bool
+            Set to False to not log the response content if the request fails (e.g. when a failure
+            is expected).
         **kwargs : dict
             Arbitrary keyword arguments to construct request payload.
 
+        Raises
+        ------
+        HTTPError
+            If the request fails.
+        CircuitBreakerOpenError
+            If a circuit breaker is configured and the endpoint's circuit is open.
+
         Returns
         -------
         requests.Response
             :class:`Response <Response>` object
         """
-        if not skip_token_validation():
+        # Token validation requests are detected from the call stack, so it must be inspected here
+        # rather than in the nested functions below
+        is_token_validation = skip_token_validation()
+        if not is_token_validation:
             self._refresh_token()
         api_request = getattr(requests, http_method)
         api_path = f'{self._base_url}/v2/{"/".join(args)}'
+        request_kwargs = {'stream': True} if stream else {}
         if is_json:
             if len(kwargs) == 1 and 'json' in kwargs:
-                response = api_request(api_path, headers=self._headers, json=kwargs['json'])
+                request_kwargs['json'] = kwargs['json']
             else:
-                response = api_request(api_path, headers=self._headers, json=kwargs)
+                request_kwargs['json'] = kwargs
         else:
             if len(kwargs) == 1 and 'data' in kwargs:
-                response = api_request(api_path, headers=self._headers, data=kwargs['data'])
+                request_kwargs['data'] = kwargs['data']
             else:
-                response = api_request(api_path, headers=self._headers, data=kwargs)
-
-        try:
-            response.raise_for_status()
-        except Exception:
-            if not skip_token_validation():
-                logger.error(f'Response Content:\n{response.content}')
-            raise
+                request_kwargs['data'] = kwargs
+
+        endpoint = args[0] if args else None
+        endpoint_template = get_endpoint_template('/'.join(args), ENDPOINT_NAMES)
+        attempts = count()
+
+        def send_api_request():
+            return observe_request(
+                DATAKITCHEN_CLIENT,
+                http_method,
+                endpoint_template,
+                partial(api_request, api_path, headers=self._headers, **request_kwargs),
+                attempt=next(attempts)
+            )
 
-        return response
+        def send_request():
+            if self._rate_limiter is None:
+                response = send_api_request()
+            else:
+                retries = 0
+                while True:
+                    with self._rate_limiter.limit(endpoint):
+                        response = send_api_request()
+                    retry_after_secs = self._rate_limiter.on_response(endpoint, response)
+                    if retry_after_secs is None or retries >= self._rate_limiter.max_retries:
+                        break
+                    retries += 1
+                    logger.warning(f'Retrying {api_path} in {retry_after_secs} seconds...')
+                    response.close()
+
+            try:
+                response.raise_for_status()
+            except Exception:
+                if log_errors and not is_token_validation:
+                    logger.error(f'Response Content:\n{response.content}')
+                raise
+            return response
+
+        send = send_request
+        if self._circuit_breaker is not None:
+            send = partial(self._circuit_breaker.call, endpoint, send_request)
+        if self._retry_policy is None:
+            return send()
+        if not self._retry_non_idempotent and not is_idempotent_request(http_method, '/'.join(args)):
+            return send()
+        retry_policy = self._retry_policy
+        if self._rate_limiter is not None:
+            # Throttled requests are already retried by the rate limiter, after its Retry-After delay
+            retry_policy = retry_policy.excluding(is_throttled_error)
+        return retry_policy.call(send)
 
     def _validate_token(self):
         """
@@ -297,6 +671,7 @@ class DataKitchenClient:
         except HTTPError:
             return False
 
+    @traced('DataKitchenClient.validate_token')
     def _refresh_token(self):
         """
         Validate the existing token. If invalid, refresh the token by logging into the DataKitchen
@@ -311,13 +686,19 @@ class DataKitchenClient:
         if self._is_api_token:
             self._set_headers()
 
+        token = self._token
         if self._validate_token():
             return
 
-        self._token = self._api_request(
-            API_POST, 'login', is_json=False, username=self._username, password=self._password
-        ).text
-        self._set_headers()
+        # Copies and views of this client share its token, so only log in if another thread didn't
+        # already refresh it
+        with self._auth.lock:
+            if self._token != token:
+                return
+            self._token = self._api_request(
+                API_POST, 'login', is_json=False, username=self._username, password=self._password
+            ).text
+            self._set_headers()
 
     def _set_headers(self):
         """
@@ -352,8 +733,11 @@ class DataKitchenClient:
         Kitchen
         """
         self._ensure_attributes(KITCHEN)
-        return Kitchen.create(self, self.kitchen, name, description)
+        kitchen = Kitchen.create(self, self.kitchen, name, description)
+        self._clear_validated_attributes()
+        return kitchen
 
+    @traced('DataKitchenClient.create_order')
     def create_order(self, parameters={}):
         """
         Create a new order. Kitchen, recipe and variation attributes must be set prior to invoking
@@ -569,7 +953,7 @@ class DataKitchenClient:
         if order_run_count:
             kwargs['servingsCount'] = order_run_count
 
-        return self._api_request(API_GET, 'order', 'status', self.kitchen, **kwargs).json()
+        return response_json(self._api_request(API_GET, 'order', 'status', self.kitchen, **kwargs))
 
     def get_order_status(
         self,
@@ -685,17 +1069,32 @@ class DataKitchenClient:
                 }
 
         """
-        self._ensure_attributes(KITCHEN)
         try:
-            api_response = self._api_request(
-                API_GET, 'order', 'servings', self.kitchen, order_id, count=DEFAULT_SERVINGS_COUNT
-            ).json()
-            return api_response['servings']
+            return self._get_order_runs(order_id)
         except HTTPError:
             logger.error(
                 f'No order runs found for provided order id ({order_id}) in kitchen {self.kitchen}'
             )
 
+    def _get_order_runs(self, order_id, log_errors=True):
+        """
+        Same as :meth:`get_order_runs`, except that an HTTPError is raised rather than logged if no
+        order runs are found. Set log_errors to False to not log the response content either.
+        """
+        self._ensure_attributes(KITCHEN)
+        api_response = response_json(
+            self._api_request(
+                API_GET,
+                'order',
+                'servings',
+                self.kitchen,
+                order_id,
+                log_errors=log_errors,
+                count=DEFAULT_SERVINGS_COUNT
+            )
+        )
+        return api_response['servings']
+
     def get_order_run_details(
         self,
         order_run_id,
@@ -769,19 +1168,72 @@ class DataKitchenClient:
 
         """
         self._ensure_attributes(KITCHEN)
-        api_response = self._api_request(
+        api_response = response_json(
+            self._api_request(
+                API_POST,
+                'order',
+                'details',
+                self.kitchen,
+                logs=include_logs,
+                serving_hid=str(order_run_id),
+                servingjson=include_servingjson,
+                summary=include_summary,
+                testresults=include_testresults,
+                timingresults=include_timingresults
+            )
+        )
+        return api_response['servings'][0]
+
+    def iter_order_run_log_entries(self, order_run_id, chunk_size=DEFAULT_STREAM_CHUNK_SIZE):
+        """
+        Stream the log entries of an order run. Unlike
+        :func:`get_order_run_details` with include_logs=True, the response is parsed incrementally
+        as it's received, and log entries are yielded one at a time, so that arbitrarily large logs
+        are processed with bounded memory.
+
+        Parameters
+        ----------
+        order_run_id : str
+            Order run id for which to retrieve log entries
+        chunk_size : int, optional
+            Size in bytes of the chunks read from the response (default: 64 KiB).
+
+        Raises
+        ------
+        HTTPError
+            If the request fails. The request is made when this method is called, rather than when
+            the returned generator is first iterated.
+
+        Returns
+        -------
+        generator
+            Generator of log entry dictionaries (see
+            :func:`~dkutils.datakitchen_api.order_run_monitor.OrderRunMonitor.parse_log_entry`).
+        """
+        self._ensure_attributes(KITCHEN)
+        response = self._api_request(
             API_POST,
             'order',
             'details',
             self.kitchen,
-            logs=include_logs,
+            stream=True,
+            logs=True,
             serving_hid=str(order_run_id),
-            servingjson=include_servingjson,
-            summary=include_summary,
-            testresults=include_testresults,
-            timingresults=include_timingresults
-        ).json()
-        return api_response['servings'][0]
+            servingjson=False,
+            summary=False,
+            testresults=False,
+            timingresults=False
+        )
+        return self._iter_response_log_entries(response, chunk_size)
+
+    @staticmethod
+    def _iter_response_log_entries(response, chunk_size):
+        try:
+            yield from iter_json_array(
+                response.iter_content(chunk_size=chunk_size), ORDER_RUN_LOG_LINES_PATH
+            )
+        finally:
+            response.close()
 
     def get_order_run_status(self, order_run_id):
         """
@@ -829,7 +1281,8 @@ class DataKitchenClient:
         order_run_statuses = self.monitor_order_runs(sleep_secs, duration_secs, order_run_ids)
         return order_run_statuses[order_run_id]
 
-    def monitor_order_runs(self, sleep_secs, duration_secs, order_run_ids):
+    @traced('DataKitchenClient.monitor_order_runs')
+    def monitor_order_runs(self, sleep_secs, duration_secs, order_run_ids, duration_predictor=None):
         """
         Wait for the specified order runs to complete and return completion status when finished.
         If the order runs take > duration_secs, return None.
@@ -837,12 +1290,25 @@ class DataKitchenClient:
         Parameters
         ----------
         sleep_secs : int
-            Number of seconds to sleep in between loop executions.
-        duration_secs : int
-            Max duration in seconds after which the loop will exit.
+            Number of seconds to sleep in between loop executions. If a duration_predictor is
+            provided, only used for order runs whose duration cannot be predicted.
+        duration_secs : int or None
+            Max duration in seconds after which the loop will exit. May only be None if a
+            duration_predictor is provided, in which case it's derived from the predicted durations.
         order_run_ids : dict
             Dictionary keyed by order run id and valued by kitchen for the order runs to wait
             for completion.
+        duration_predictor : DurationPredictor, optional
+            :class:`~dkutils.datakitchen_api.duration_predictor.DurationPredictor` used to adapt the
+            time between polls to the predicted completion time of each order run. The recipe and
+            variation of each order run are taken from the details retrieved when polling it, and
+            since the start time of the order runs isn't retrieved, they are assumed to start when
+            monitoring starts.
+
+        Raises
+        ------
+        ValueError
+            If duration_secs is None and it cannot be predicted.
 
         Returns
         -------
@@ -851,25 +1317,89 @@ class DataKitchenClient:
             COMPLETED_SERVING, STOPPED_SERVING, SERVING_ERROR, SERVING_RERAN, or None if the order
             run is not found.
         """
-        wait_loop = WaitLoop(sleep_secs, duration_secs)
         completed_order_runs = {}
-        while wait_loop:
-            for order_run_id, kitchen in order_run_ids.items():
-                if order_run_id not in completed_order_runs:
-                    self.kitchen = kitchen
-                    order_run_status = self.get_order_run_status(order_run_id)
+        # (recipe, variation) of each order run, taken from the details retrieved when polling it
+        order_runs = {}
+
+        def poll_order_runs():
+            """
+            Poll the order runs that haven't completed yet and return True if all of them have.
+            """
+            with start_as_current_span('DataKitchenClient.poll_order_runs'):
+                for order_run_id, kitchen in order_run_ids.items():
+                    if order_run_id in completed_order_runs:
+                        continue
+                    client = self.scope(kitchen=kitchen)
+                    if duration_predictor is None:
+                        order_run_status = client.get_order_run_status(order_run_id)
+                    else:
+                        try:
+                            details = client.get_order_run_details(order_run_id)
+                        except HTTPError:
+                            logger.error(f'Order run retrieval failure:\n{traceback.format_exc()}')
+                            details = {}
+                        order_run_status = details.get('status')
+                        if order_run_id not in order_runs and details:
+                            order_runs[order_run_id] = (details.get('recipe_name'), details.get('variation_name'))
                     if order_run_status in STOPPED_STATUS_TYPES:
                         completed_order_runs[order_run_id] = order_run_status
-                if len(order_run_ids) == len(completed_order_runs):
-                    return completed_order_runs
+                return len(order_run_ids) == len(completed_order_runs)
+
+        if duration_predictor is not None:
+            start_time = time.time()
+            # The first poll retrieves the recipe and variation from which the durations are predicted
+            if poll_order_runs():
+                return completed_order_runs
+            duration_secs = self._predict_duration_secs(
+                duration_predictor, duration_secs,
+                [order_runs.get(order_run_id, (None, None)) for order_run_id in order_run_ids]
+            )
+            wait_loop = WaitLoop(
+                lambda: duration_predictor.get_sleep_secs([
+                    (*order_runs.get(order_run_id, (None, None)), start_time) for order_run_id in order_run_ids
+                    if order_run_id not in completed_order_runs
+                ], sleep_secs),
+                duration_secs
+            )
+            # The order runs were just polled, so sleep before polling them again
+            wait_loop.first_pass = False
+        else:
+            wait_loop = WaitLoop(sleep_secs, duration_secs)
+        while wait_loop:
+            if poll_order_runs():
+                return completed_order_runs
 
         for order_run_id in order_run_ids.keys():
             if order_run_id not in completed_order_runs:
                 completed_order_runs[order_run_id] = None
         return completed_order_runs
 
+    @staticmethod
+    def _predict_duration_secs(duration_predictor, duration_secs, orders, max_concurrent=None):
+        """
+        Return duration_secs, or if it's None, the timeout predicted for the provided (recipe,
+        variation) tuples.
+        """
+        if duration_secs is not None:
+            return duration_secs
+        duration_secs = duration_predictor.get_timeout_secs(orders, max_concurrent)
+        if duration_secs is None:
+            raise ValueError(
+                'duration_secs must be provided when the duration of every order cannot be predicted'
+            )
+        logger.info(f'Waiting at most {duration_secs:.0f} seconds based on predicted order run durations')
+        return duration_secs
+
+    @traced('DataKitchenClient.create_and_monitor_orders')
     def create_and_monitor_orders(
-        self, orders_details, sleep_secs, duration_secs, max_concurrent=None, stop_on_error=False
+        self,
+        orders_details,
+        sleep_secs,
+        duration_secs,
+        max_concurrent=None,
+        stop_on_error=False,
+        duration_predictor=None,
+        max_submit_workers=DEFAULT_MAX_SUBMIT_WORKERS
     ):
         """
         Create the specified orders and wait for them to complete (or timeout after the specified
@@ -892,15 +1422,36 @@ class DataKitchenClient:
                 }
 
         sleep_secs : int
-            Number of seconds to sleep in between loop executions.
-        duration_secs : int
-            Max duration in seconds after which the loop will exit.
+            Number of seconds to sleep in between loop executions. If a duration_predictor is
+            provided, only used for orders whose duration cannot be predicted.
+        duration_secs : int or None
+            Max duration in seconds after which the loop will exit. May only be None if a
+            duration_predictor is provided, in which case it's derived from the predicted durations
+            of the orders, taking max_concurrent into account.
         max_concurrent : integer or None
             Max number of orders to kick off concurrently. If None, all orders will be kicked off
             concurrently.
         stop_on_error : boolean
-            If True, any order run failure will prevent new order runs from being created.
-            Otherwise, if False, all orders are submitted regardless of any failures.
+            If True, any order run failure, or failure to create an order, will prevent new order
+            runs from being created. Otherwise, if False, all orders are submitted regardless of any
+            failures.
+        duration_predictor : DurationPredictor, optional
+            :class:`~dkutils.datakitchen_api.duration_predictor.DurationPredictor` used to adapt the
+            time between polls to the predicted completion time of each active order, measured from
+            its creation.
+        max_submit_workers : int, optional
+            Max number of orders created concurrently, whether initially or when active orders
+            complete. Each created order's first order run is looked up right away, rather than at
+            the next poll. To also limit the rate of order creation, create the client with a
+            rate_limiter.
+
+        Raises
+        ------
+        ValueError
+            If duration_secs is None and it cannot be predicted.
+        OrderCreationError
+            If any order could not be created. The orders that were created are still monitored
+            and the resulting lists are available on the error, along with the failed orders.
 
         Returns
         -------
@@ -936,48 +1487,112 @@ class DataKitchenClient:
         num_total_orders = len(queued_orders)
         max_concurrent = get_max_concurrency(num_total_orders, max_concurrent)
 
+        # Predict the timeout before creating any order, in case it cannot be predicted
+        if duration_predictor is not None:
+            duration_secs = self._predict_duration_secs(
+                duration_predictor,
+                duration_secs,
+                [(od[RECIPE], od[VARIATION]) for od in orders_details],
+                max_concurrent
+            )
+
+        # Creation time of each order, keyed by order id
+        start_times = {}
+
         def create_order(order_details):
-            self.kitchen = order_details[KITCHEN]
-            self.recipe = order_details[RECIPE]
-            self.variation = order_details[VARIATION]
+            client = self.scope(
+                kitchen=order_details[KITCHEN],
+                recipe=order_details[RECIPE],
+                variation=order_details[VARIATION]
+            )
             parameters = order_details[PARAMETERS] if PARAMETERS in order_details else {}
-            order_details[ORDER_ID] = self.create_order(parameters=parameters).json()[ORDER_ID]
-            order_details[ORDER_RUN_ID] = None
+            order_details[ORDER_ID] = client.create_order(parameters=parameters).json()[ORDER_ID]
+            start_times[order_details[ORDER_ID]] = time.time()
+            # The order run may not exist yet, in which case it's looked up again when polling
+            try:
+                order_runs = client._get_order_runs(order_details[ORDER_ID], log_errors=False)
+            except HTTPError:
+                order_runs = None
+            order_details[ORDER_RUN_ID] = order_runs[0]['hid'] if order_runs else None
             order_details[ORDER_RUN_STATUS] = None
             return order_details
 
-        # Create initial orders
-        active_orders = [create_order(queued_orders.pop()) for _ in range(max_concurrent)]
-        completed_orders = []
-
-        wait_loop = WaitLoop(sleep_secs, duration_secs)
-        submit_new_orders = True
-        while wait_loop:
-            cur_completed_orders = []
-            for active_order in active_orders:
-                self.kitchen = active_order[KITCHEN]
-                if active_order[ORDER_RUN_ID] is not None:
-                    order_status = self.get_order_run_status(active_order[ORDER_RUN_ID])
-                    active_order[ORDER_RUN_STATUS] = order_status
-                    submit_new_orders = not stop_on_error or order_status != SERVING_ERROR
-                    if order_status in STOPPED_STATUS_TYPES:
-                        completed_orders.append(active_order)
-                        cur_completed_orders.append(active_order)
-                else:
-                    order_runs = self.get_order_runs(active_order[ORDER_ID])
-                    if order_runs:
-                        active_order[ORDER_RUN_ID] = order_runs[0]['hid']
-
-            for completed_order in cur_completed_orders:
-                active_orders.remove(completed_order)
-                if len(queued_orders) > 0 and submit_new_orders:
-                    active_orders.append(create_order(queued_orders.pop()))
-
-            if len(active_orders) == 0:
-                break
+        # Orders that could not be created, along with the exception raised
+        failed_orders = []
 
+        def create_orders(executor, num_orders):
+            """
+            Concurrently create the next num_orders queued orders and return those that were
+            created, in queue order. The others are appended to failed_orders.
+            """
+            # Each order is created in a copy of the current context, so that its spans are
+            # children of the current span
+            futures = [(
+                order_details,
+                executor.submit(contextvars.copy_context().run, create_order, order_details)
+            ) for order_details in [queued_orders.pop() for _ in range(num_orders)]]
+            created_orders = []
+            for order_details, future in futures:
+                try:
+                    created_orders.append(future.result())
+                except Exception as e:
+                    logger.error(
+                        f'Failed to create order for recipe {order_details[RECIPE]} and variation '
+                        f'{order_details[VARIATION]} in kitchen {order_details[KITCHEN]}: {e}'
+                    )
+                    failed_orders.append((order_details, e))
+            return created_orders
+
+        with ThreadPoolExecutor(max_workers=max(min(max_submit_workers, max_concurrent), 1)) as executor:
+            active_orders = create_orders(executor, max_concurrent)
+            completed_orders = []
+            submit_new_orders = True
+
+            if duration_predictor is not None:
+                wait_loop = WaitLoop(
+                    lambda: duration_predictor.get_sleep_secs([
+                        (o[RECIPE], o[VARIATION], start_times[o[ORDER_ID]]) for o in active_orders
+                    ], sleep_secs),
+                    duration_secs
+                )
+            else:
+                wait_loop = WaitLoop(sleep_secs, duration_secs)
+            while wait_loop:
+                with start_as_current_span('DataKitchenClient.poll_orders'):
+                    cur_completed_orders = []
+                    for active_order in active_orders:
+                        client = self.scope(kitchen=active_order[KITCHEN])
+                        if active_order[ORDER_RUN_ID] is not None:
+                            order_status = client.get_order_run_status(active_order[ORDER_RUN_ID])
+                            active_order[ORDER_RUN_STATUS] = order_status
+                            submit_new_orders = not stop_on_error or order_status != SERVING_ERROR
+                            if order_status in STOPPED_STATUS_TYPES:
+                                completed_orders.append(active_order)
+                                cur_completed_orders.append(active_order)
+                        else:
+                            order_runs = client.get_order_runs(active_order[ORDER_ID])
+                            if order_runs:
+                                active_order[ORDER_RUN_ID] = order_runs[0]['hid']
+
+                for completed_order in cur_completed_orders:
+                    active_orders.remove(completed_order)
+                # A failure to create an order counts as an order run failure
+                can_submit = submit_new_orders and not (stop_on_error and failed_orders)
+                if can_submit:
+                    # Orders that could not be created free up their slot as well
+                    num_new_orders = min(max_concurrent - len(active_orders), len(queued_orders))
+                    active_orders.extend(create_orders(executor, num_new_orders))
+
+                if len(active_orders) == 0 and not (can_submit and queued_orders):
+                    break
+
+        if failed_orders:
+            raise OrderCreationError(
+                failed_orders, completed_orders, active_orders, queued_orders
+            ) from failed_orders[0][1]
         return completed_orders, active_orders, queued_orders
 
+    @traced('DataKitchenClient.resume_and_monitor_orders')
     def resume_and_monitor_orders(
         self,
         order_runs_details,
@@ -1042,9 +1657,9 @@ class DataKitchenClient:
         max_concurrent = get_max_concurrency(num_total_orders, max_concurrent)
 
         def resume_order(order_run_details):
-            self.kitchen = order_run_details[KITCHEN]
-            order_run_details[ORDER_ID] = self.resume_order_run(order_run_details[ORDER_RUN_ID]
-                                                                ).json()[ORDER_ID]
+            client = self.scope(kitchen=order_run_details[KITCHEN])
+            order_run_details[ORDER_ID] = client.resume_order_run(order_run_details[ORDER_RUN_ID]
+                                                                  ).json()[ORDER_ID]
             order_run_details[ORDER_RUN_ID] = None
             order_run_details[ORDER_RUN_STATUS] = None
             return order_run_details
@@ -1061,16 +1676,16 @@ class DataKitchenClient:
         while wait_loop:
             cur_completed_orders = []
             for active_order in active_orders:
-                self.kitchen = active_order[KITCHEN]
+                client = self.scope(kitchen=active_order[KITCHEN])
                 if active_order[ORDER_RUN_ID] is not None:
-                    order_status = self.get_order_run_status(active_order[ORDER_RUN_ID])
+                    order_status = client.get_order_run_status(active_order[ORDER_RUN_ID])
                     active_order[ORDER_RUN_STATUS] = order_status
                     submit_new_orders = not stop_on_error or order_status != SERVING_ERROR
                     if order_status in STOPPED_STATUS_TYPES:
                         completed_orders.append(active_order)
                         cur_completed_orders.append(active_order)
                 else:
-                    order_runs = self.get_order_runs(active_order[ORDER_ID])
+                    order_runs = client.get_order_runs(active_order[ORDER_ID])
 
                     # Ensure the latest order run is the resumed one and not the run from which it
                     # was resumed.
@@ -1196,7 +1811,7 @@ class DataKitchenClient:
 
         """
         kitchens = {}
-        for kitchen in self._api_request(API_GET, 'kitchen', 'list').json()['kitchens']:
+        for kitchen in response_json(self._api_request(API_GET, 'kitchen', 'list'))['kitchens']:
             name = kitchen['name']
             if name in kitchens:
                 raise ValueError(
@@ -1368,6 +1983,36 @@ class DataKitchenClient:
         kitchen_info[RECIPE_OVERRIDES] = overrides
         self._update_kitchen(kitchen_info)
 
+    def patch_overrides(self, patch):
+        """
+        Apply a JSON Patch to the overrides of the current kitchen. The patch is applied to the
+        latest overrides retrieved from the platform, so changes made to other overrides since the
+        patch was created are preserved. A patch may be created with
+        :func:`~dkutils.dictionary_comparator.DictionaryComparator.get_patch`.
+
+        Parameters
+        ----------
+        patch : list
+            List of JSON Patch operations (e.g. [{'op': 'replace', 'path': '/DT', 'value': '1'}])
+
+        Raises
+        ------
+        HTTPError
+            If the request fails.
+        ValueError
+            If the kitchen attribute is not set
+            If the patch cannot be applied to the current overrides
+
+        Returns
+        -------
+        dict
+            The patched overrides
+        """
+        kitchen_info = self._get_kitchen_info()
+        kitchen_info[RECIPE_OVERRIDES] = apply_patch(kitchen_info[RECIPE_OVERRIDES], patch)
+        self._update_kitchen(kitchen_info)
+        return kitchen_info[RECIPE_OVERRIDES]
+
     def compare_overrides(self, other=None):
         """
         Compare the overrides in the current kitchen to those of the specified kitchen. If other is None then
@@ -1496,6 +2141,8 @@ class DataKitchenClient:
         kitchen_info = self._get_kitchen_info()
         kitchen_info[KITCHEN_STAFF] = kitchen_staff
         self._update_kitchen(kitchen_info)
+        # The recipes of the kitchen may have become available to the user
+        self._clear_validated_attributes()
 
     def add_kitchen_staff(self, new_kitchen_staff):
         """
@@ -1610,11 +2257,13 @@ class DataKitchenClient:
                 raise ValueError('Argument recipe_files cannot be an empty array.')
 
             kwargs = {'include-recipe-tree': include_recipe_tree, 'recipe-files': recipe_files}
-            return self._api_request(
-                API_POST, 'recipe', 'get', self.kitchen, self.recipe, **kwargs
-            ).json()
+            return response_json(
+                self._api_request(API_POST, 'recipe', 'get', self.kitchen, self.recipe, **kwargs)
+            )
         else:
-            return self._api_request(API_POST, 'recipe', 'get', self.kitchen, self.recipe).json()
+            return response_json(
+                self._api_request(API_POST, 'recipe', 'get', self.kitchen, self.recipe)
+            )
 
     def get_recipes(self):
         """
@@ -1646,7 +2295,9 @@ class DataKitchenClient:
         if kitchens[self.kitchen]['kitchen-staff'] and self._username not in kitchens[
                 self.kitchen]['kitchen-staff']:
             raise ValueError(f'{self.kitchen} is not available to {self._username}')
-        return self._api_request(API_GET, 'kitchen', 'recipenames', self.kitchen).json()['recipes']
+        return response_json(
+            self._api_request(API_GET, 'kitchen', 'recipenames', self.kitchen)
+        )['recipes']
 
     def get_variations(self):
         """
@@ -1676,5 +2327,40 @@ class DataKitchenClient:
         response = self._api_request(
             API_GET, 'recipe', 'file', self.kitchen, self.recipe, "variations.json"
         )
-        contents = json.loads(response.json()['contents'])
+        contents = loads(response_json(response)['contents'])
         return contents['variation-list']
+
+
+def _read_only_property(name):
+    """
+    Return a property of :class:`ScopedDataKitchenClient` with the getter of the provided
+    :class:`DataKitchenClient` property and a setter raising an AttributeError.
+    """
+
+    def fset(self, value):
+        raise AttributeError(f'{name} cannot be set on a scoped client, create another one with scope')
+
+    return property(getattr(DataKitchenClient, name).fget, fset)
+
+
+class ScopedDataKitchenClient(DataKitchenClient):
+
+    def __init__(self, client, kitchen=None, recipe=None, variation=None):
+        """
+        Read-only view of a :class:`DataKitchenClient`, created with
+        :meth:`DataKitchenClient.scope`. It shares the token, rate limiter, retry policy, and
+        circuit breaker of the client, and its kitchen, recipe, and variation cannot be set.
+        """
+        # Unlike DataKitchenClient, no request is sent to log in
+        vars(self).update(vars(client))
+        self._kitchen = kitchen
+        self._recipe = recipe
+        self._variation = variation
+
+    kitchen = _read_only_property(KITCHEN)
+    recipe = _read_only_property(RECIPE)
+    variation = _read_only_property(VARIATION)
+    rate_limiter = _read_only_property('rate_limiter')
+    retry_policy = _read_only_property('retry_policy')
+    retry_non_idempotent = _read_only_property('retry_non_idempotent')
+    circuit_breaker = _read_only_property('circuit_breaker')
@@ -0,0 +1,250 @@
+import heapq
+import logging
+import time
+
+from typing import Iterable, NamedTuple, Optional
+
+from .order_run_history import RECIPE, VARIATION, OrderRunHistory
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PERCENTILE = 95
+DEFAULT_MIN_RUNS = 3
+DEFAULT_TIMEOUT_FACTOR = 1.5
+DEFAULT_MIN_SLEEP_SECS = 5
+DEFAULT_MAX_SLEEP_SECS = 300
+DEFAULT_POLL_FRACTION = 0.1
+
+
+class DurationEstimate(NamedTuple):
+    """
+    Duration distribution of the completed order runs of a recipe variation.
+    """
+    runs: int
+    median_secs: float
+    upper_secs: float
+
+
+class DurationPredictor:
+
+    def __init__(
+        self,
+        history: OrderRunHistory,
+        percentile=DEFAULT_PERCENTILE,
+        min_runs=DEFAULT_MIN_RUNS,
+        timeout_factor=DEFAULT_TIMEOUT_FACTOR,
+        min_sleep_secs=DEFAULT_MIN_SLEEP_SECS,
+        max_sleep_secs=DEFAULT_MAX_SLEEP_SECS,
+        poll_fraction=DEFAULT_POLL_FRACTION,
+    ) -> None:
+        """
+        Predict order run durations from the completed order runs of an
+        :class:`~dkutils.datakitchen_api.order_run_history.OrderRunHistory`, so that poll intervals
+        and timeouts may be derived from how long each recipe variation usually takes, rather than
+        being fixed by the caller. Predictions are recomputed whenever the history is updated.
+
+        Parameters
+        ----------
+        history : OrderRunHistory
+            Order runs from which durations are learned.
+        percentile : int, optional
+            Percentile of the durations used as the upper bound of an order run duration
+            (default: 95).
+        min_runs : int, optional
+            Minimum number of completed order runs for a recipe variation to be predicted. Recipe
+            variations with fewer order runs are predicted from all the order runs of their recipe,
+            if there are enough of them (default: 3).
+        timeout_factor : float, optional
+            Factor by which upper bound durations are multiplied to derive timeouts (default: 1.5).
+        min_sleep_secs : int, optional
+            Minimum number of seconds between polls (default: 5).
+        max_sleep_secs : int, optional
+            Maximum number of seconds between polls (default: 300).
+        poll_fraction : float, optional
+            Once an order run exceeds its median duration, it's polled every poll_fraction times
+            its median duration (default: 0.1).
+
+        Raises
+        ------
+        ValueError
+            If percentile is not between 0 and 100, or if min_sleep_secs exceeds max_sleep_secs.
+        """
+        if not 0 <= percentile <= 100:
+            raise ValueError(f'Percentile must be between 0 and 100, not {percentile}')
+        if min_sleep_secs > max_sleep_secs:
+            raise ValueError(
+                f'Min sleep ({min_sleep_secs}) must not exceed max sleep ({max_sleep_secs})'
+            )
+        self._history = history
+        self._percentile = percentile
+        self._min_runs = min_runs
+        self._timeout_factor = timeout_factor
+        self._min_sleep_secs = min_sleep_secs
+        self._max_sleep_secs = max_sleep_secs
+        self._poll_fraction = poll_fraction
+        self._estimates = None
+        self._estimates_update_time = None
+
+    @property
+    def history(self) -> OrderRunHistory:
+        return self._history
+
+    def _get_estimates(self, by) -> dict:
+        percentiles = self._history.get_duration_percentiles([50, self._percentile], by=by)
+        percentiles = percentiles[percentiles['runs'] >= self._min_runs]
+        return {
+            key: DurationEstimate(int(row[0]), float(row[1]), float(row[2]))
+            for key, row in zip(percentiles.index, percentiles.itertuples(index=False))
+        }
+
+    def _refresh(self) -> None:
+        if self._estimates is not None and self._estimates_update_time == self._history.last_update_time:
+            return
+        self._estimates = {
+            RECIPE: self._get_estimates([RECIPE]),
+            VARIATION: self._get_estimates([RECIPE, VARIATION]),
+        }
+        self._estimates_update_time = self._history.last_update_time
+
+    def get_estimate(self, recipe, variation) -> Optional[DurationEstimate]:
+        """
+        Retrieve the duration distribution of a recipe variation.
+
+        Parameters
+        ----------
+        recipe : str
+            Recipe name
+        variation : str
+            Variation name
+
+        Returns
+        -------
+        DurationEstimate or None
+            Number of order runs, median, and upper bound durations in seconds of the recipe
+            variation, or of the recipe if the variation has too few order runs. None if neither
+            has enough order runs.
+        """
+        self._refresh()
+        estimate = self._estimates[VARIATION].get((recipe, variation))
+        return estimate if estimate is not None else self._estimates[RECIPE].get(recipe)
+
+    def predict_duration(self, recipe, variation) -> Optional[float]:
+        """
+        Predict the upper bound duration of an order run (see percentile).
+
+        Parameters
+        ----------
+        recipe : str
+            Recipe name
+        variation : str
+            Variation name
+
+        Returns
+        -------
+        float or None
+            Duration in seconds, or None if there are too few order runs to predict it.
+        """
+        estimate = self.get_estimate(recipe, variation)
+        return estimate.upper_secs if estimate else None
+
+    def predict_completion_time(self, recipe, variation, start_time, upper=False) -> Optional[float]:
+        """
+        Predict when an order run will complete.
+
+        Parameters
+        ----------
+        recipe : str
+            Recipe name
+        variation : str
+            Variation name
+        start_time : float
+            Seconds since epoch when the order run started.
+        upper : bool, optional
+            If True, predict the latest expected completion time based on the upper bound duration.
+            Otherwise, predict the median completion time (default: False).
+
+        Returns
+        -------
+        float or None
+            Seconds since epoch, or None if there are too few order runs to predict it.
+        """
+        estimate = self.get_estimate(recipe, variation)
+        if estimate is None:
+            return None
+        return start_time + (estimate.upper_secs if upper else estimate.median_secs)
+
+    def get_sleep_secs(self, order_runs: Iterable, default_sleep_secs, now=None) -> float:
+        """
+        Compute the number of seconds to sleep before polling the provided order runs again. Order
+        runs are not polled before their median completion time, after which they are polled every
+        poll_fraction times their median duration, so that long order runs are polled less often
+        and short ones are detected promptly. The result is bounded by min_sleep_secs and
+        max_sleep_secs.
+
+        Parameters
+        ----------
+        order_runs : iterable
+            Iterable of (recipe, variation, start_time) tuples of the order runs being waited on,
+            where start_time is the number of seconds since epoch when the order run started.
+        default_sleep_secs : int
+            Sleep used for order runs that cannot be predicted.
+        now : float, optional
+            Current number of seconds since epoch (default: time.time()).
+
+        Returns
+        -------
+        float
+            Number of seconds to sleep, i.e. the shortest sleep required by any of the order runs,
+            or default_sleep_secs if there are none.
+        """
+        now = time.time() if now is None else now
+        sleeps = []
+        for recipe, variation, start_time in order_runs:
+            estimate = self.get_estimate(recipe, variation)
+            if estimate is None:
+                sleeps.append(default_sleep_secs)
+                continue
+            remaining_secs = start_time + estimate.median_secs - now
+            sleep_secs = remaining_secs if remaining_secs > 0 else self._poll_fraction * estimate.median_secs
+            sleeps.append(min(max(sleep_secs, self._min_sleep_secs), self._max_sleep_secs))
+        return min(sleeps) if sleeps else default_sleep_secs
+
+    def get_timeout_secs(self, orders: Iterable, max_concurrent=None, default_duration_secs=None) -> Optional[float]:
+        """
+        Compute a timeout for running the provided orders, max_concurrent at a time in the provided
+        order, each taking its upper bound duration, scaled by timeout_factor.
+
+        Parameters
+        ----------
+        orders : iterable
+            Iterable of (recipe, variation) tuples of the orders to run.
+        max_concurrent : int, optional
+            Max number of orders running concurrently. If None, all orders run concurrently.
+        default_duration_secs : int, optional
+            Duration used for orders that cannot be predicted. If None, no timeout is computed when
+            any of the orders cannot be predicted.
+
+        Returns
+        -------
+        float or None
+            Timeout in seconds, or None if any of the orders cannot be predicted and no
+            default_duration_secs is provided.
+        """
+        durations = []
+        for recipe, variation in orders:
+            duration_secs = self.predict_duration(recipe, variation)
+            if duration_secs is None:
+                if default_duration_secs is None:
+                    logger.info(f'Too few order runs to predict the duration of {recipe} {variation}')
+                    return None
+                duration_secs = default_duration_secs
+            durations.append(duration_secs)
+        if not durations:
+            return 0
+
+        # Each order starts as soon as the earliest running order completes
+        finish_times = durations[:max_concurrent or len(durations)]
+        heapq.heapify(finish_times)
+        for duration_secs in durations[len(finish_times):]:
+            heapq.heappush(finish_times, heapq.heappop(finish_times) + duration_secs)
+        return max(finish_times) * self._timeout_factor
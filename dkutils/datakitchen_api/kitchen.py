@@ -124,7 +124,9 @@ class Kitchen:
             If the request fails.
         """
         logger.debug(f'Deleting kitchen: {self._name}...')
-        return self._client._api_request(API_DELETE, 'kitchen', 'delete', self._name)
+        response = self._client._api_request(API_DELETE, 'kitchen', 'delete', self._name)
+        self._client._clear_validated_attributes()
+        return response
 
     def _get_settings(self) -> dict:
         """
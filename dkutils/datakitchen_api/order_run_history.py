@@ -0,0 +1,297 @@
+import logging
+import math
+import time
+
+import pandas as pd
+
+from dkutils.constants import COMPLETED_SERVING, SERVING_ERROR, STOPPED_STATUS_TYPES
+from .datakitchen_client import DEFAULT_SERVINGS_COUNT
+
+logger = logging.getLogger(__name__)
+
+ORDER_RUN_ID = 'order_run_id'
+ORDER_ID = 'order_id'
+RECIPE = 'recipe'
+VARIATION = 'variation'
+STATUS = 'status'
+START_TIME = 'start_time'
+END_TIME = 'end_time'
+DURATION_SECS = 'duration_secs'
+
+COLUMNS = [ORDER_RUN_ID, ORDER_ID, RECIPE, VARIATION, STATUS, START_TIME, END_TIME, DURATION_SECS]
+CATEGORICAL_COLUMNS = [RECIPE, VARIATION, STATUS]
+
+DEFAULT_GROUP_BY = [RECIPE, VARIATION]
+DEFAULT_PERCENTILES = [50, 90, 95, 99]
+
+# Margin added to the time period when only retrieving orders since the last update, to account
+# for orders that started while the previous update was in progress
+UPDATE_MARGIN_HOURS = 1
+
+
+def _to_frame(columns: dict) -> pd.DataFrame:
+    frame = pd.DataFrame(columns, columns=COLUMNS)
+    for column in [START_TIME, END_TIME]:
+        frame[column] = pd.to_datetime(frame[column], unit='ms', utc=True)
+    frame[DURATION_SECS] = frame[DURATION_SECS].astype(float) / 1000
+    for column in CATEGORICAL_COLUMNS:
+        frame[column] = frame[column].astype('category')
+    return frame
+
+
+def get_order_runs_frame(orders: dict) -> pd.DataFrame:
+    """
+    Convert the orders returned by
+    :func:`~dkutils.datakitchen_api.datakitchen_client.DataKitchenClient.get_orders` to a DataFrame
+    with one row per order run. The recipe, variation, and status columns are categorical.
+
+    Parameters
+    ----------
+    orders : dict
+        Dictionary of orders and their associated order runs
+
+    Returns
+    -------
+    DataFrame
+        DataFrame with order_run_id, order_id, recipe, variation, status, start_time, end_time
+        (UTC timestamps), and duration_secs columns. The end time and duration of active order
+        runs are missing.
+    """
+    order_variations = {
+        order['hid']: (order.get('recipe'), order.get('variation'))
+        for order in orders.get('orders') or []
+    }
+    columns = {column: [] for column in COLUMNS}
+    for order_id, order in (orders.get('servings') or {}).items():
+        recipe, variation = order_variations.get(order_id, (None, None))
+        for order_run in order['servings']:
+            timings = order_run.get('timings') or {}
+            columns[ORDER_RUN_ID].append(order_run['hid'])
+            columns[ORDER_ID].append(order_run.get('order_id', order_id))
+            columns[RECIPE].append(recipe)
+            columns[VARIATION].append(order_run.get('variation_name', variation))
+            columns[STATUS].append(order_run.get('status'))
+            columns[START_TIME].append(timings.get('start-time'))
+            columns[END_TIME].append(timings.get('end-time'))
+            columns[DURATION_SECS].append(timings.get('duration'))
+    return _to_frame(columns)
+
+
+class OrderRunHistory:
+
+    def __init__(self, runs: pd.DataFrame = None, last_update_time: float = None) -> None:
+        """
+        Columnar store of order runs, updated incrementally from the DataKitchen platform, on which
+        duration percentiles, failure rates, and throughput are computed. Order runs are keyed by
+        order run id, so updates only add new order runs and refresh those whose status changed.
+
+        Parameters
+        ----------
+        runs : DataFrame, optional
+            Previously stored order runs (see :attr:`runs`).
+        last_update_time : float, optional
+            Seconds since epoch when runs were last updated.
+        """
+        self._runs = runs if runs is not None else _to_frame({column: [] for column in COLUMNS})
+        self._last_update_time = last_update_time
+
+    @property
+    def runs(self) -> pd.DataFrame:
+        """
+        DataFrame of order runs sorted from most recent start time to oldest (see
+        :func:`get_order_runs_frame`).
+        """
+        return self._runs
+
+    @property
+    def last_update_time(self) -> float:
+        return self._last_update_time
+
+    def update(
+        self,
+        client,
+        time_period_hours=None,
+        since_last_update=False,
+        order_run_count=DEFAULT_SERVINGS_COUNT
+    ) -> int:
+        """
+        Retrieve order runs and merge them into the store. To limit the retrieved order runs to a
+        recipe and/or variation, set them on the client.
+
+        Parameters
+        ----------
+        client : DataKitchenClient
+            Client for making requests, with the kitchen set accordingly.
+        time_period_hours : int, optional
+            Limit retrieved orders to those that started less than the provided number of hours
+            ago. If None, all orders are retrieved, unless since_last_update is True.
+        since_last_update : bool, optional
+            If True and the store was previously updated, only retrieve orders that started since
+            the last update, ignoring time_period_hours (default: False). Note that orders started
+            before the last update (e.g. scheduled orders) are not retrieved, nor are their new
+            order runs.
+        order_run_count : int, optional
+            Maximum number of order runs retrieved per order (default: 100000).
+
+        Raises
+        ------
+        HTTPError
+            If the request fails.
+        ValueError
+            If the kitchen attribute is not set on the client.
+
+        Returns
+        -------
+        int
+            Number of order runs that were not previously stored.
+        """
+        update_time = time.time()
+        if since_last_update and self._last_update_time is not None:
+            elapsed_hours = (update_time - self._last_update_time) / 3600
+            time_period_hours = math.ceil(elapsed_hours) + UPDATE_MARGIN_HOURS
+
+        if time_period_hours:
+            logger.info(f'Retrieving order runs of orders started in the last {time_period_hours} hours...')
+        else:
+            logger.info('Retrieving order runs of all orders...')
+        new_runs = get_order_runs_frame(
+            client.get_orders(time_period_hours=time_period_hours, order_run_count=order_run_count)
+        )
+        num_new_runs = int((~new_runs[ORDER_RUN_ID].isin(self._runs[ORDER_RUN_ID])).sum())
+
+        runs = pd.concat([self._runs, new_runs], ignore_index=True)
+        runs = runs.drop_duplicates(ORDER_RUN_ID, keep='last')
+        for column in CATEGORICAL_COLUMNS:
+            runs[column] = runs[column].astype('category')
+        self._runs = runs.sort_values(START_TIME, ascending=False, ignore_index=True)
+        self._last_update_time = update_time
+        logger.info(f'Retrieved {len(new_runs)} order runs, {num_new_runs} of which are new')
+        return num_new_runs
+
+    @staticmethod
+    def _validate_group_by(by) -> list:
+        by = list(by or [])
+        invalid_columns = [column for column in by if column not in COLUMNS]
+        if invalid_columns:
+            raise ValueError(
+                f'Cannot group by {",".join(invalid_columns)}, valid columns are: {",".join(COLUMNS)}'
+            )
+        return by
+
+    def get_duration_percentiles(
+        self, percentiles=DEFAULT_PERCENTILES, by=DEFAULT_GROUP_BY, statuses=(COMPLETED_SERVING,)
+    ) -> pd.DataFrame:
+        """
+        Compute order run duration percentiles.
+
+        Parameters
+        ----------
+        percentiles : list, optional
+            Percentiles to compute, between 0 and 100 (default: [50, 90, 95, 99]).
+        by : list, optional
+            Columns by which order runs are grouped (default: ['recipe', 'variation']). If empty,
+            percentiles are computed over all the order runs.
+        statuses : list, optional
+            Only include order runs with these statuses (default: COMPLETED_SERVING). If None, all
+            finished order runs are included.
+
+        Raises
+        ------
+        ValueError
+            If by contains an unknown column.
+
+        Returns
+        -------
+        DataFrame
+            DataFrame indexed by the group by columns with a runs column containing the number of
+            order runs, and one column per percentile (e.g. p50) containing durations in seconds.
+        """
+        by = self._validate_group_by(by)
+        runs = self._runs[self._runs[DURATION_SECS].notna()]
+        if statuses:
+            runs = runs[runs[STATUS].isin(statuses)]
+
+        percentile_columns = [f'p{percentile:g}' for percentile in percentiles]
+        quantiles = [percentile / 100 for percentile in percentiles]
+        if not by:
+            durations = runs[DURATION_SECS]
+            values = [len(durations)] + list(durations.quantile(quantiles)) if len(durations) else []
+            return pd.DataFrame([values] if values else [], columns=['runs'] + percentile_columns)
+
+        grouped = runs.groupby(by, observed=True)[DURATION_SECS]
+        runs_per_group = grouped.size()
+        if runs_per_group.empty:
+            # Without order runs, unstack returns a DataFrame without the percentile columns
+            result = pd.DataFrame(index=runs_per_group.index, columns=percentile_columns, dtype=float)
+        else:
+            result = grouped.quantile(quantiles).unstack()
+            result.columns = percentile_columns
+        result.insert(0, 'runs', runs_per_group)
+        return result
+
+    def _get_outcomes(self, statuses) -> pd.DataFrame:
+        runs = self._runs[self._runs[STATUS].isin(statuses or STOPPED_STATUS_TYPES)]
+        return runs.assign(failed=runs[STATUS] == SERVING_ERROR)
+
+    def get_failure_rates(self, by=DEFAULT_GROUP_BY, statuses=None) -> pd.DataFrame:
+        """
+        Compute the proportion of finished order runs that failed (i.e. SERVING_ERROR).
+
+        Parameters
+        ----------
+        by : list, optional
+            Columns by which order runs are grouped (default: ['recipe', 'variation']).
+        statuses : list, optional
+            Only include order runs with these statuses. If None, all finished order runs are
+            included.
+
+        Raises
+        ------
+        ValueError
+            If by is empty or contains an unknown column.
+
+        Returns
+        -------
+        DataFrame
+            DataFrame indexed by the group by columns with runs, failures, and failure_rate columns.
+        """
+        by = self._validate_group_by(by)
+        if not by:
+            raise ValueError('At least one column must be provided to group by')
+        result = self._get_outcomes(statuses).groupby(by, observed=True)['failed'].agg(
+            runs='size', failures='sum'
+        )
+        result['failure_rate'] = result['failures'] / result['runs']
+        return result
+
+    def get_throughput(self, freq='1D', by=None, statuses=None) -> pd.DataFrame:
+        """
+        Count the order runs that finished in each time window.
+
+        Parameters
+        ----------
+        freq : str, optional
+            Length of the time windows as a pandas frequency string (default: 1D, i.e. daily).
+        by : list, optional
+            Additional columns by which order runs are grouped (default: None).
+        statuses : list, optional
+            Only include order runs with these statuses. If None, all finished order runs are
+            included.
+
+        Raises
+        ------
+        ValueError
+            If by contains an unknown column.
+
+        Returns
+        -------
+        DataFrame
+            DataFrame indexed by the start of each time window (end_time) and the group by
+            columns, with runs and failures columns. Windows without any finished order run are omitted.
+        """
+        by = self._validate_group_by(by)
+        runs = self._get_outcomes(statuses)
+        runs = runs[runs[END_TIME].notna()]
+        return runs.groupby([pd.Grouper(key=END_TIME, freq=freq)] + by, observed=True)['failed'].agg(
+            runs='size', failures='sum'
+        )
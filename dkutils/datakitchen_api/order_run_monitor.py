@@ -7,20 +7,16 @@ import time
 from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
+from typing import Iterator
 
 from dkutils.constants import API_GET
 from dkutils.datakitchen_api.datakitchen_client import DataKitchenClient
-from dkutils.decorators import retry_50X_httperror
-from events_ingestion_client import (
-    ApiClient,
-    Configuration,
-    EventsApi,
-    MessageLogEventApiSchema,
-    RunStatusApiSchema,
-    TestOutcomeItem,
-    TestOutcomesApiSchema,
-)
-from events_ingestion_client.rest import ApiException
+from dkutils.lazy_import import lazy_import
+from dkutils.retry import call_with_fallback_retry
+from dkutils.tracing import start_as_current_span, traced
+# The Events Ingestion API client is only imported when an OrderRunMonitor is created
+events_ingestion_client = lazy_import('events_ingestion_client')
+events_ingestion_client_rest = lazy_import('events_ingestion_client.rest')
 
 logger = logging.getLogger(__name__)
 
@@ -42,7 +38,6 @@ LOG_METADATA_KEYS_TO_REPORT = ['exc_desc', 'exc_type', 'traceback']
 ALLOWED_TEST_STATUS_TYPES = ['PASSED', 'FAILED', 'WARNING']
 
 
-@retry_50X_httperror()
 def get_customer_code(dk_client: DataKitchenClient) -> str:
     """
     Retrieve the customer code from the authenticated user associated with the provided
@@ -58,7 +53,7 @@ def get_customer_code(dk_client: DataKitchenClient) -> str:
     str
         Customer code - typically two or three letters.
     """
-    user_info = dk_client._api_request(API_GET, 'userinfo')
+    user_info = call_with_fallback_retry(dk_client.retry_policy, dk_client._api_request, API_GET, 'userinfo')
     return user_info.json()['customer_git_name']
 
 
@@ -86,7 +81,6 @@ def get_order_run_url(dk_client: DataKitchenClient, customer_code: str, order_ru
     return os.sep.join([base_url, '#', 'orders', customer_code, kitchen, 'runs', order_run_id])
 
 
-@retry_50X_httperror()
 def get_ingredient_owner_order_run_id(dk_client: DataKitchenClient):
     """
     If this order run is for an ingredient, then return the parent order run id. Otherwise, return
@@ -104,7 +98,9 @@ def get_ingredient_owner_order_run_id(dk_client: DataKitchenClient):
         return None.
     """
     try:
-        order_run_status = dk_client._api_request('get', 'order/status', dk_client.kitchen).json()
+        order_run_status = call_with_fallback_retry(
+            dk_client.retry_policy, dk_client._api_request, 'get', 'order/status', dk_client.kitchen
+        ).json()
 
         # If this order run is for an ingredient, then it's in an ingredient kitchen with a single
         # order and order run and the status should contain an ingredient_owner_order_run field.
@@ -154,7 +150,7 @@ class EventInfoProvider:
 
 @dataclass
 class Node:
-    events_api_client: EventsApi
+    events_api_client: events_ingestion_client.EventsApi
     event_info_provider: EventInfoProvider
     name: str
     info: dict = None
@@ -219,6 +215,7 @@ class Node:
                 self.started_event_published = True
             self._publish_run_status_event(RunStatus.FAILED, self.end_time)
 
+    @traced('Node.publish_run_status_event')
     def _publish_run_status_event(self, run_status: str, milliseconds_from_epoch: int) -> None:
         try:
             event_timestamp = datetime.utcfromtimestamp(milliseconds_from_epoch / 1000).isoformat()
@@ -226,11 +223,12 @@ class Node:
                 task_key=self.name, status=run_status.name, event_timestamp=event_timestamp
             )
             logger.info(f'Publishing event: {event_info}')
-            self.events_api_client.post_run_status(RunStatusApiSchema(**event_info))
-        except ApiException as e:
+            self.events_api_client.post_run_status(events_ingestion_client.RunStatusApiSchema(**event_info))
+        except events_ingestion_client_rest.ApiException as e:
             logger.error(f'Exception when calling EventsApi->post_run_status: {str(e)}\n')
             raise
 
+    @traced('Node.publish_tests')
     def publish_tests(self) -> None:
         test_reports = self._get_test_reports()
 
@@ -241,8 +239,8 @@ class Node:
             event_info = self.event_info_provider.get_event_info(
                 task_key=self.name, test_outcomes=test_reports
             )
-            self.events_api_client.post_test_outcomes(TestOutcomesApiSchema(**event_info))
-        except ApiException as e:
+            self.events_api_client.post_test_outcomes(events_ingestion_client.TestOutcomesApiSchema(**event_info))
+        except events_ingestion_client_rest.ApiException as e:
             logger.error(f'Exception when calling EventsApi->post_test_result:: {str(e)}\n')
 
     def _extract_tests(self, tests: dict) -> list:
@@ -251,7 +249,7 @@ class Node:
             status = test['status'].upper()
             if status in ALLOWED_TEST_STATUS_TYPES:
                 test_reports.append(
-                    TestOutcomeItem(description=test['results'], name=name, status=status)
+                    events_ingestion_client.TestOutcomeItem(description=test['results'], name=name, status=status)
                 )
         return test_reports
 
@@ -324,14 +322,13 @@ class OrderRunMonitor:
         self._sleep_time_secs = sleep_time_secs
 
         # Configure API key authorization: SAKey
-        configuration = Configuration()
+        configuration = events_ingestion_client.Configuration()
         configuration.api_key['ServiceAccountAuthenticationKey'] = events_api_key
         configuration.host = host
 
         # Create an instance of the API class
-        self._events_api_client = EventsApi(ApiClient(configuration))
+        self._events_api_client = events_ingestion_client.EventsApi(events_ingestion_client.ApiClient(configuration))
 
-    @retry_50X_httperror()
     def get_order_run_details(self, **kwargs) -> dict:
         """
         Retrieve order run details for the associated order run. The provided kwargs may be used to
@@ -348,7 +345,23 @@ class OrderRunMonitor:
         dict
             Dictionary of order run details
         """
-        return self._dk_client.get_order_run_details(self._order_run_id, **kwargs)
+        return call_with_fallback_retry(
+            self._dk_client.retry_policy, self._dk_client.get_order_run_details, self._order_run_id, **kwargs
+        )
+
+    def iter_log_entries(self) -> Iterator[dict]:
+        """
+        Stream the log entries of the associated order run, one at a time, without loading the
+        entire log in memory.
+
+        Returns
+        -------
+        generator
+            Generator of log entry dictionaries (see :func:`parse_log_entry`).
+        """
+        return call_with_fallback_retry(
+            self._dk_client.retry_policy, self._dk_client.iter_order_run_log_entries, self._order_run_id
+        )
 
     def get_conditional_nodes(self) -> list:
         """
@@ -362,6 +375,7 @@ class OrderRunMonitor:
         order_run_details = self.get_order_run_details()
         return list(set([v['node'] for v in order_run_details.get('conditions', {}).values()]))
 
+    @traced('OrderRunMonitor.get_nodes_info')
     def get_nodes_info(self) -> dict:
         """
         Extract and return the node information from the order run details, excluding the nodes that
@@ -446,27 +460,30 @@ class OrderRunMonitor:
             'task_key': log_entry['node']
         }
 
+    @traced('OrderRunMonitor.process_log_entries')
     def process_log_entries(self) -> None:
         """
-        Send MessageLog events for WARNING and ERROR log messages.
+        Send MessageLog events for WARNING and ERROR log messages. The log entries are streamed, so
+        memory usage doesn't grow with the size of the log.
         """
         try:
-            for log_entry in self.get_order_run_details(include_logs=True)['log']['lines']:
+            for log_entry in self.iter_log_entries():
                 if log_entry['record_type'] in LOG_LEVELS_TO_REPORT and log_entry[
                         'node'] not in self._nodes_to_ignore:
                     try:
                         event_info = self._event_info_provider.get_event_info(
                             **self.parse_log_entry(log_entry)
                         )
-                        body = MessageLogEventApiSchema(**event_info)
+                        body = events_ingestion_client.MessageLogEventApiSchema(**event_info)
                         self._events_api_client.post_message_log(body)
-                    except ApiException as e:
+                    except events_ingestion_client_rest.ApiException as e:
                         logger.error(
                             f'Exception when calling EventsApi->post_message_log: {str(e)}'
                         )
         except Exception as e:
             logger.error(f'Failed to process logs: {str(e)}')
 
+    @traced('OrderRunMonitor.monitor')
     def monitor(self) -> tuple:
         """
         Poll the DataKitchen platform API for the status of the associated Order Run. Report the
@@ -507,10 +524,11 @@ class OrderRunMonitor:
             self.process_log_entries()
             [node.publish_tests() for node in nodes]
             run_status = RunStatus.COMPLETED if len(failed_nodes) == 0 else RunStatus.FAILED
-            self._events_api_client.post_run_status(
-                RunStatusApiSchema(
-                    status=run_status.name, **self._event_info_provider.get_event_info()
+            with start_as_current_span('OrderRunMonitor.publish_run_status'):
+                self._events_api_client.post_run_status(
+                    events_ingestion_client.RunStatusApiSchema(
+                        status=run_status.name, **self._event_info_provider.get_event_info()
+                    )
                 )
-            )
 
         return successful_nodes, failed_nodes
@@ -0,0 +1,182 @@
+import csv
+import itertools
+import logging
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple
+
+from dkutils.constants import PARENT_KITCHEN, RECIPE_OVERRIDES
+from dkutils.dictionary_comparator import DictionaryComparator
+
+logger = logging.getLogger(__name__)
+
+# Override drift types
+ONLY_IN_KITCHEN = 'ONLY_IN_KITCHEN'
+ONLY_IN_OTHER = 'ONLY_IN_OTHER'
+DIFFERENT_VALUE = 'DIFFERENT_VALUE'
+
+
+@dataclass
+class OverrideDrift:
+    kitchen: str
+    other_kitchen: str
+    override: str
+    drift_type: str
+    kitchen_value: Any
+    other_value: Any
+
+    @classmethod
+    def keys(cls):
+        return cls.__dataclass_fields__.keys()
+
+    def get(self, field_name, default=None):
+        return getattr(self, field_name, default)
+
+
+def get_kitchen_pairs(kitchens_info, kitchens=None, other=None, pairwise=False) -> List[Tuple]:
+    """
+    Determine which kitchens should be compared to one another. By default, each kitchen is paired
+    with its parent kitchen. If other is provided, each kitchen is paired with that kitchen instead.
+    If pairwise is True, every combination of the provided kitchens is paired.
+
+    Parameters
+    ----------
+    kitchens_info : dict
+        Dictionary keyed by kitchen name and valued by a dictionary of kitchen info
+    kitchens : list, optional
+        Kitchens to compare. If None, all the kitchens in kitchens_info are compared.
+    other : str, optional
+        Kitchen against which every kitchen is compared. Ignored if pairwise is True.
+    pairwise : bool, optional
+        If True, compare every combination of the provided kitchens (default: False).
+
+    Raises
+    ------
+    ValueError
+        If any of the provided kitchens, or other, is not present in kitchens_info
+
+    Returns
+    -------
+    list
+        List of (kitchen, other kitchen) tuples.
+    """
+    kitchens = list(kitchens_info.keys()) if kitchens is None else list(kitchens)
+    missing = [k for k in kitchens + ([other] if other else []) if k not in kitchens_info]
+    if missing:
+        raise ValueError(f'The following kitchens were not found in the available kitchens: {missing}')
+
+    if pairwise:
+        return list(itertools.combinations(kitchens, 2))
+
+    pairs = []
+    for kitchen in kitchens:
+        other_kitchen = other if other else kitchens_info[kitchen].get(PARENT_KITCHEN)
+        if not other_kitchen or other_kitchen == kitchen:
+            continue
+        if other_kitchen not in kitchens_info:
+            logger.warning(
+                f'Skipping kitchen {kitchen}: parent kitchen {other_kitchen} is not available'
+            )
+            continue
+        pairs.append((kitchen, other_kitchen))
+    return pairs
+
+
+def get_override_comparisons(
+    client, kitchens=None, other=None, pairwise=False
+) -> Dict[Tuple, DictionaryComparator]:
+    """
+    Compare the overrides of many kitchens using a single retrieval of the kitchens list. By
+    default, each kitchen is compared to its parent kitchen.
+
+    Parameters
+    ----------
+    client : DataKitchenClient
+        Client for making requests.
+    kitchens : list, optional
+        Kitchens to compare. If None, all the kitchens available to the client are compared.
+    other : str, optional
+        Kitchen against which every kitchen is compared. Ignored if pairwise is True.
+    pairwise : bool, optional
+        If True, compare every combination of the provided kitchens (default: False).
+
+    Raises
+    ------
+    HTTPError
+        If the request fails.
+    ValueError
+        If any of the provided kitchens, or other, is not available
+
+    Returns
+    -------
+    dict
+        Dictionary keyed by (kitchen, other kitchen) tuples and valued by the DictionaryComparator
+        of their overrides.
+    """
+    kitchens_info = client._get_kitchens_info()
+
+    def get_overrides(kitchen):
+        return kitchens_info[kitchen].get(RECIPE_OVERRIDES) or {}
+
+    comparisons = {}
+    for kitchen, other_kitchen in get_kitchen_pairs(kitchens_info, kitchens, other, pairwise):
+        comparisons[(kitchen, other_kitchen)] = DictionaryComparator(
+            get_overrides(kitchen), get_overrides(other_kitchen)
+        )
+    return comparisons
+
+
+def get_override_drift(client, kitchens=None, other=None, pairwise=False) -> List[OverrideDrift]:
+    """
+    Produce a drift report of the overrides that differ between kitchens. See
+    :func:`get_override_comparisons` for a description of which kitchens are compared.
+
+    Parameters
+    ----------
+    client : DataKitchenClient
+        Client for making requests.
+    kitchens : list, optional
+        Kitchens to compare. If None, all the kitchens available to the client are compared.
+    other : str, optional
+        Kitchen against which every kitchen is compared. Ignored if pairwise is True.
+    pairwise : bool, optional
+        If True, compare every combination of the provided kitchens (default: False).
+
+    Returns
+    -------
+    list
+        List of OverrideDrift objects, one per override that differs between a pair of kitchens.
+    """
+    drift = []
+    comparisons = get_override_comparisons(client, kitchens, other, pairwise)
+    for (kitchen, other_kitchen), comparator in comparisons.items():
+        left, right = comparator.left, comparator.right
+        for override in sorted(comparator.get_keys_only_in_left()):
+            drift.append(
+                OverrideDrift(kitchen, other_kitchen, override, ONLY_IN_KITCHEN, left[override], None)
+            )
+        for override in sorted(comparator.get_keys_only_in_right()):
+            drift.append(
+                OverrideDrift(kitchen, other_kitchen, override, ONLY_IN_OTHER, None, right[override])
+            )
+        for override, values in sorted(comparator.get_same_keys_different_values().items()):
+            drift.append(OverrideDrift(kitchen, other_kitchen, override, DIFFERENT_VALUE, *values))
+    logger.info(f'Found {len(drift)} override differences across {len(comparisons)} comparisons')
+    return drift
+
+
+def write_override_drift_csv(drift, output_csv_path) -> None:
+    """
+    Write a list of OverrideDrift objects to a CSV file.
+
+    Parameters
+    ----------
+    drift : list
+        List of OverrideDrift objects
+    output_csv_path : str
+        Output CSV file path
+    """
+    with open(output_csv_path, 'w') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=OverrideDrift.keys())
+        writer.writeheader()
+        writer.writerows(drift)
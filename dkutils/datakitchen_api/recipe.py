@@ -1,7 +1,8 @@
 from __future__ import annotations
 
+import hashlib
+import json
 import logging
-import os
 
 from requests import Response
 from typing import TYPE_CHECKING
@@ -13,12 +14,37 @@ from dkutils.constants import (
     API_POST,
     KITCHEN,
 )
+from dkutils.dictionary_comparator import apply_patch
+from dkutils.json_codec import loads, response_json
 
 if TYPE_CHECKING:
     from .datakitchen_client import DataKitchenClient
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on the size of the file contents sent in a single recipe update request when syncing
+DEFAULT_MAX_BATCH_BYTES = 4 * 1024 * 1024
+
+
+def get_git_blob_sha(contents: str) -> str:
+    """
+    Compute the git blob SHA-1 of the provided file contents. This matches the sha field of the
+    files listed in a recipe tree, so it may be used to determine if a file has changed without
+    retrieving its contents.
+
+    Parameters
+    ----------
+    contents : str
+        File contents
+
+    Returns
+    -------
+    str
+        Hex digest of the git blob SHA-1
+    """
+    data = contents.encode('utf-8')
+    return hashlib.sha1(b'blob %d\0' % len(data) + data).hexdigest()
+
 
 class NodeNotFoundError(FileNotFoundError):
     pass
@@ -39,6 +65,7 @@ class Recipe:
         """
         self._client = client
         self._name = name
+        self._node_indexes = {}
 
     @property
     def name(self):
@@ -85,6 +112,7 @@ class Recipe:
         client._api_request(
             API_POST, 'recipe', 'create', client.kitchen, recipe_name, description=description
         )
+        client._clear_validated_attributes()
         return Recipe(client, recipe_name)
 
     def delete(self, kitchen_name: str) -> Response:
@@ -107,16 +135,22 @@ class Recipe:
             If the request fails.
        """
         logger.debug(f'Deleting recipe named {self.name} in kitchen {kitchen_name}...')
-        return self._client._api_request(API_DELETE, 'recipe', kitchen_name, self.name)
+        response = self._client._api_request(API_DELETE, 'recipe', kitchen_name, self.name)
+        self._client._clear_validated_attributes()
+        return response
 
-    def get_recipe_files(self, kitchen_name: str) -> dict:
+    def get_recipe_files(self, kitchen_name: str, filepaths: list = None) -> dict:
         """
-        Retrieve all the files for this recipe in the provided kitchen.
+        Retrieve the files for this recipe in the provided kitchen. By default, all the files are
+        retrieved. To retrieve only specific files, provide their paths in filepaths.
 
         Parameters
         ----------
         kitchen_name : str
             Kitchen from which the recipe files will be retrieved.
+        filepaths : list, optional
+            List of file paths (relative to the root of the recipe) to retrieve. If None, all the
+            files are retrieved (default: None).
 
         Returns
         -------
@@ -131,30 +165,132 @@ class Recipe:
             If a filetype is unrecognized.
         """
         logger.debug(f'Retrieving files for recipe {self.name} in kitchen {kitchen_name}...')
-        response = self._client._api_request(API_GET, 'recipe', 'get', kitchen_name, self.name)
+        if filepaths is None:
+            response = self._client._api_request(API_GET, 'recipe', 'get', kitchen_name, self.name)
+        elif len(filepaths) == 0:
+            # API does not handle an empty recipe-files list graciously
+            return {}
+        else:
+            kwargs = {'include-recipe-tree': False, 'recipe-files': list(filepaths)}
+            response = self._client._api_request(
+                API_POST, 'recipe', 'get', kitchen_name, self.name, **kwargs
+            )
+        return self._get_files_dict(response_json(response))
 
-        recipe_files_dict = {}
-        for path, file_details_array in response.json()['recipes'][self.name].items():
+    def _iter_file_details(self, recipe_contents: dict):
+        """
+        Iterate over the files in the recipes or recipe-tree field of a recipe get response.
+
+        Parameters
+        ----------
+        recipe_contents : dict
+            Dictionary keyed by directory (starting with the recipe name) and valued by a list of
+            file details.
+
+        Returns
+        -------
+        generator
+            Generator of (file path relative to the root of the recipe, file details) tuples.
+        """
+        for path, file_details_array in recipe_contents.items():
 
             # Strip recipe name from filepath
             root_path = Path(*Path(path).parts[1:])
 
             for file_details in file_details_array:
-                filepath = str(root_path / file_details['filename'])
-                if 'text' in file_details:
-                    recipe_files_dict[filepath] = file_details['text']
-                elif 'json' in file_details:
-                    recipe_files_dict[filepath] = file_details['json']
-                else:
-                    raise Exception(
-                        f'Unrecognized file type for {filepath}: accepted types are TEXT or JSON'
-                    )
+                yield str(root_path / file_details['filename']), file_details
+
+    def _get_files_dict(self, response_json: dict) -> dict:
+        """
+        Convert the recipes field of a recipe get response into a dictionary keyed by file path
+        (relative to the root of the recipe) and valued by file contents string.
+
+        Raises
+        ------
+        Exception
+            If a filetype is unrecognized.
+        """
+        recipe_files_dict = {}
+        for filepath, file_details in self._iter_file_details(response_json['recipes'][self.name]):
+            if 'text' in file_details:
+                recipe_files_dict[filepath] = file_details['text']
+            elif 'json' in file_details:
+                recipe_files_dict[filepath] = file_details['json']
+            else:
+                raise Exception(
+                    f'Unrecognized file type for {filepath}: accepted types are TEXT or JSON'
+                )
 
         return recipe_files_dict
 
+    def get_recipe_tree(self, kitchen_name: str) -> dict:
+        """
+        Retrieve the file hierarchy of this recipe in the provided kitchen without retrieving the
+        contents of every file.
+
+        Parameters
+        ----------
+        kitchen_name : str
+            Kitchen from which the recipe tree will be retrieved.
+
+        Returns
+        -------
+        dict
+            Dictionary keyed by file path and valued by the file's git blob SHA-1.
+
+        Raises
+        ------
+        HTTPError
+            If the request fails.
+        """
+        logger.debug(f'Retrieving tree for recipe {self.name} in kitchen {kitchen_name}...')
+        kwargs = {'include-recipe-tree': True, 'recipe-files': ['description.json']}
+        response = self._client._api_request(
+            API_POST, 'recipe', 'get', kitchen_name, self.name, **kwargs
+        )
+        recipe_tree = response_json(response)['recipe-tree'][self.name]
+        return {
+            filepath: file_details.get('sha')
+            for filepath, file_details in self._iter_file_details(recipe_tree)
+        }
+
+    def get_node_index(self, kitchen_name: str, refresh: bool = False) -> dict:
+        """
+        Retrieve an index of the files belonging to each node of this recipe in the provided kitchen.
+        The index is derived from the recipe tree and cached per kitchen, so subsequent calls don't
+        make any requests. The cached index is discarded whenever files are updated or deleted
+        through this object, and refreshed by :func:`get_node_files` when it lacks a requested node.
+
+        Parameters
+        ----------
+        kitchen_name : str
+            Kitchen from which the recipe tree will be retrieved.
+        refresh : bool, optional
+            If True, discard the cached index and retrieve the recipe tree again (default: False).
+
+        Raises
+        ------
+        HTTPError
+            If the request fails.
+
+        Returns
+        -------
+        dict
+            Dictionary keyed by node name and valued by a list of file paths.
+        """
+        if refresh or kitchen_name not in self._node_indexes:
+            node_index = {}
+            for path in self.get_recipe_tree(kitchen_name).keys():
+                parts = Path(path).parts
+                if len(parts) > 1:
+                    node_index.setdefault(parts[0], []).append(path)
+            self._node_indexes[kitchen_name] = node_index
+        return self._node_indexes[kitchen_name]
+
     def get_node_files(self, kitchen_name: str, nodes: list) -> dict:
         """
-        Retrieve all the files associated with the provided list of nodes.
+        Retrieve all the files associated with the provided list of nodes. Only the files of the
+        provided nodes are retrieved.
 
         Parameters
         ----------
@@ -175,21 +311,23 @@ class Recipe:
         dict
             Dictionary keyed by file path and valued by file contents.
         """
-        recipe_files = self.get_recipe_files(kitchen_name)
-
-        # Ensure the nodes being retrieved actually exist in this recipe
-        available_nodes = {f.split(os.sep)[0] for f in recipe_files.keys() if os.sep in f}
-        missing_nodes = set(nodes) - available_nodes
+        is_cached = kitchen_name in self._node_indexes
+        node_index = self.get_node_index(kitchen_name)
+
+        # Ensure the nodes being retrieved actually exist in this recipe. The cached index may
+        # predate nodes added by others, so it's refreshed once before giving up.
+        missing_nodes = set(nodes) - node_index.keys()
+        if len(missing_nodes) > 0 and is_cached:
+            node_index = self.get_node_index(kitchen_name, refresh=True)
+            missing_nodes = set(nodes) - node_index.keys()
         if len(missing_nodes) > 0:
             raise NodeNotFoundError(
                 f'The following nodes do not exist in kitchen {kitchen_name} and recipe {self.name}: {list(missing_nodes)}'  # noqa: E501
             )
 
-        return {
-            path: recipe_files[path]
-            for path in recipe_files.keys()
-            if os.sep in path and path.split(os.sep)[0] in nodes
-        }
+        return self.get_recipe_files(
+            kitchen_name, [path for node in dict.fromkeys(nodes) for path in node_index[node]]
+        )
 
     def update_recipe_files(self, kitchen_name: str, filepaths: dict) -> Response:
         """
@@ -216,14 +354,101 @@ class Recipe:
             f'Updating files ({list(filepaths.keys())}) for recipe {self.name} in kitchen {kitchen_name}...'
         )
 
-        # Retrieve all the existing files in the recipe
-        recipe_files = self.get_recipe_files(kitchen_name)
+        # Retrieve the paths of all the existing files in the recipe
+        recipe_tree = self.get_recipe_tree(kitchen_name)
 
         files = {}
         for p, c in filepaths.items():
-            files[p] = {'contents': c, 'isNew': False if p in recipe_files else True}
+            files[p] = {'contents': c, 'isNew': False if p in recipe_tree else True}
 
-        return self._client._api_request(
+        return self._update_files(kitchen_name, files, f'Creating recipe files {files.keys()}')
+
+    def sync_recipe_files(
+        self,
+        kitchen_name: str,
+        filepaths: dict,
+        max_batch_bytes: int = DEFAULT_MAX_BATCH_BYTES,
+        recipe_tree: dict = None
+    ) -> list:
+        """
+        Update only the files for this recipe in the provided kitchen whose contents differ from
+        those in the kitchen. Changes are detected by comparing the git blob SHA-1 of the provided
+        contents with the sha listed in the recipe tree, so existing file contents are never
+        retrieved. Changed files are uploaded in batches whose combined contents do not exceed
+        max_batch_bytes (a single file larger than max_batch_bytes is sent in its own batch).
+
+        Parameters
+        ----------
+        kitchen_name : str
+            Kitchen for which the recipe files will be synced.
+        filepaths : dict
+            Dictionary keyed by file path and valued by new/updated file contents.
+        max_batch_bytes : int, optional
+            Maximum combined size in bytes of the file contents sent per request
+            (default: 4 MiB).
+        recipe_tree : dict, optional
+            Recipe tree as returned by :func:`get_recipe_tree`, if the caller just retrieved it. If
+            None, the recipe tree is retrieved.
+
+        Returns
+        -------
+        list
+            List of :class:`Response <Response>` objects, one per batch. Empty if no files changed.
+
+        Raises
+        ------
+        HTTPError
+            If a request fails.
+        """
+        if recipe_tree is None:
+            recipe_tree = self.get_recipe_tree(kitchen_name)
+
+        batches = []
+        batch = {}
+        batch_bytes = 0
+        for path, contents in filepaths.items():
+            if recipe_tree.get(path) == get_git_blob_sha(contents):
+                continue
+            num_bytes = len(contents.encode('utf-8'))
+            if batch and batch_bytes + num_bytes > max_batch_bytes:
+                batches.append(batch)
+                batch = {}
+                batch_bytes = 0
+            batch[path] = {'contents': contents, 'isNew': path not in recipe_tree}
+            batch_bytes += num_bytes
+        if batch:
+            batches.append(batch)
+
+        num_changed = sum(len(b) for b in batches)
+        logger.debug(
+            f'Syncing {num_changed} of {len(filepaths)} files in {len(batches)} batches for recipe {self.name} in kitchen {kitchen_name}...'  # noqa: E501
+        )
+        return [
+            self._update_files(kitchen_name, files, f'Syncing recipe files {files.keys()}')
+            for files in batches
+        ]
+
+    def _update_files(self, kitchen_name: str, files: dict, message: str) -> Response:
+        """
+        Send the provided files payload to the recipe update API.
+
+        Parameters
+        ----------
+        kitchen_name : str
+            Kitchen for which the recipe files will be updated.
+        files : dict
+            Dictionary keyed by file path and valued by a dictionary with contents and isNew fields,
+            or by an empty dictionary to delete the file.
+        message : str
+            Commit message
+
+        Returns
+        -------
+        requests.Response
+            :class:`Response <Response>` object
+        """
+        self._node_indexes.pop(kitchen_name, None)
+        response = self._client._api_request(
             API_POST,
             'recipe',
             'update',
@@ -232,8 +457,54 @@ class Recipe:
             skipFormat=True,
             skipCompile=True,
             files=files,
-            message=f'Creating recipe files {files.keys()}'
+            message=message
         )
+        # The variations of the recipe may have changed
+        self._client._clear_validated_attributes()
+        return response
+
+    def patch_recipe_files(self, kitchen_name: str, patches: dict) -> Response:
+        """
+        Apply JSON Patches to JSON files in this recipe in the provided kitchen. Only the patched
+        files are retrieved and updated. A patch may be created with
+        :func:`~dkutils.dictionary_comparator.DictionaryComparator.get_patch`.
+
+        Parameters
+        ----------
+        kitchen_name : str
+            Kitchen for which the recipe files will be patched.
+        patches : dict
+            Dictionary keyed by file path and valued by a list of JSON Patch operations.
+
+        Returns
+        -------
+        requests.Response
+            :class:`Response <Response>` object
+
+        Raises
+        ------
+        HTTPError
+            If the request fails.
+        FileNotFoundError
+            If any of the files do not exist in this recipe.
+        ValueError
+            If a patch cannot be applied to its file.
+        """
+        logger.debug(
+            f'Patching files ({list(patches.keys())}) for recipe {self.name} in kitchen {kitchen_name}...'
+        )
+        recipe_files = self.get_recipe_files(kitchen_name, list(patches.keys()))
+        missing_files = patches.keys() - recipe_files.keys()
+        if missing_files:
+            raise FileNotFoundError(
+                f'The following files do not exist in kitchen {kitchen_name} and recipe {self.name}: {list(missing_files)}'  # noqa: E501
+            )
+
+        files = {}
+        for path, patch in patches.items():
+            contents = apply_patch(loads(recipe_files[path]), patch)
+            files[path] = {'contents': json.dumps(contents, indent=4), 'isNew': False}
+        return self._update_files(kitchen_name, files, f'Patching recipe files {files.keys()}')
 
     def delete_recipe_files(self, kitchen_name: str, filepaths: list) -> Response:
         """
@@ -263,14 +534,4 @@ class Recipe:
         # Including an empty dictionary for a file path implies file deletion
         files = {p: {} for p in filepaths}
 
-        return self._client._api_request(
-            API_POST,
-            'recipe',
-            'update',
-            kitchen_name,
-            self.name,
-            skipFormat=True,
-            skipCompile=True,
-            files=files,
-            message=f'Deleting recipe files {filepaths}'
-        )
+        return self._update_files(kitchen_name, files, f'Deleting recipe files {filepaths}')
@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+import json
+import logging
+
+from dataclasses import dataclass, field
+from typing import List
+
+from dkutils.validation import ensure_pathlib
+from .recipe import Recipe, get_git_blob_sha
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILENAME = '.recipe_manifest.json'
+
+
+@dataclass
+class MirrorChanges:
+    updated: List[str] = field(default_factory=list)
+    deleted: List[str] = field(default_factory=list)
+    conflicts: List[str] = field(default_factory=list)
+
+
+class RecipeMirror:
+
+    def __init__(self, recipe: Recipe, kitchen_name: str, local_path) -> None:
+        """
+        Local working copy of a recipe in a kitchen. A manifest of the git blob SHA-1 of each file,
+        as of the last pull or push, is kept alongside the working copy so that only the files that
+        changed remotely are retrieved on pull and only the files that changed locally are sent on
+        push.
+
+        Parameters
+        ----------
+        recipe : Recipe
+            Recipe to mirror.
+        kitchen_name : str
+            Kitchen containing the recipe.
+        local_path : str or pathlib.PurePath
+            Directory in which the working copy is kept. It is created if it doesn't exist.
+        """
+        self._recipe = recipe
+        self._kitchen_name = kitchen_name
+        self._local_path = ensure_pathlib(local_path)
+        self._manifest_path = self._local_path / MANIFEST_FILENAME
+        self._manifest = self._load_manifest()
+
+    @property
+    def local_path(self):
+        return self._local_path
+
+    @property
+    def manifest(self) -> dict:
+        """
+        Dictionary keyed by file path and valued by the file's SHA-1 as of the last pull or push.
+        """
+        return dict(self._manifest)
+
+    def _load_manifest(self) -> dict:
+        if not self._manifest_path.is_file():
+            return {}
+        with self._manifest_path.open() as manifest_file:
+            manifest = json.load(manifest_file)
+        if manifest['kitchen'] != self._kitchen_name or manifest['recipe'] != self._recipe.name:
+            raise ValueError(
+                f'{self._local_path} already mirrors recipe {manifest["recipe"]} in kitchen '
+                f'{manifest["kitchen"]}'
+            )
+        return manifest['files']
+
+    def _save_manifest(self) -> None:
+        self._local_path.mkdir(parents=True, exist_ok=True)
+        manifest = {
+            'kitchen': self._kitchen_name,
+            'recipe': self._recipe.name,
+            'files': self._manifest,
+        }
+        with self._manifest_path.open('w') as manifest_file:
+            json.dump(manifest, manifest_file, indent=4, sort_keys=True)
+
+    def _read_file(self, path: str) -> str:
+        # Disable newline translation so the SHA-1 matches the contents stored in the recipe
+        with (self._local_path / path).open(encoding='utf-8', newline='') as local_file:
+            return local_file.read()
+
+    def _write_file(self, path: str, contents: str) -> None:
+        local_file_path = self._local_path / path
+        local_file_path.parent.mkdir(parents=True, exist_ok=True)
+        with local_file_path.open('w', encoding='utf-8', newline='') as local_file:
+            local_file.write(contents)
+
+    def _set_manifest_sha(self, path: str, sha) -> None:
+        if sha is None:
+            self._manifest.pop(path, None)
+        else:
+            self._manifest[path] = sha
+
+    def get_local_files(self) -> dict:
+        """
+        Compute the SHA-1 of every file in the working copy.
+
+        Returns
+        -------
+        dict
+            Dictionary keyed by file path (relative to the root of the recipe) and valued by the
+            file's SHA-1.
+        """
+        local_files = {}
+        if not self._local_path.is_dir():
+            return local_files
+        for local_file_path in self._local_path.rglob('*'):
+            if local_file_path.is_file() and local_file_path != self._manifest_path:
+                path = str(local_file_path.relative_to(self._local_path))
+                local_files[path] = get_git_blob_sha(self._read_file(path))
+        return local_files
+
+    def get_local_changes(self) -> MirrorChanges:
+        """
+        Determine which files in the working copy were modified, added, or deleted since the last
+        pull or push.
+
+        Returns
+        -------
+        MirrorChanges
+            The updated list contains the modified and added files, whereas the deleted list
+            contains the deleted files.
+        """
+        local_files = self.get_local_files()
+        return MirrorChanges(
+            updated=sorted(p for p, sha in local_files.items() if self._manifest.get(p) != sha),
+            deleted=sorted(p for p in self._manifest if p not in local_files),
+        )
+
+    def pull(self, force: bool = False) -> MirrorChanges:
+        """
+        Update the working copy with the files that changed in the kitchen since the last pull. The
+        recipe tree is listed to detect changes and only the contents of the changed files are
+        retrieved. Unless force is set, files modified or deleted locally that were also changed in
+        the kitchen are left untouched and reported as conflicts.
+
+        Parameters
+        ----------
+        force : bool, optional
+            If True, overwrite the local changes to files that were also changed in the kitchen
+            (default: False).
+
+        Raises
+        ------
+        HTTPError
+            If a request fails.
+
+        Returns
+        -------
+        MirrorChanges
+            The files that were updated in, deleted from, or conflicted with the working copy.
+        """
+        recipe_tree = self._recipe.get_recipe_tree(self._kitchen_name)
+        local_files = self.get_local_files()
+        changes = MirrorChanges()
+
+        def is_modified_locally(path):
+            return path in local_files and local_files[path] != self._manifest.get(path)
+
+        def is_deleted_locally(path):
+            return path in self._manifest and path not in local_files
+
+        to_retrieve = []
+        for path, sha in recipe_tree.items():
+            if self._manifest.get(path) == sha or local_files.get(path) == sha:
+                self._manifest[path] = sha
+            elif not force and (is_modified_locally(path) or is_deleted_locally(path)):
+                changes.conflicts.append(path)
+            else:
+                to_retrieve.append(path)
+
+        for path in [p for p in self._manifest if p not in recipe_tree]:
+            if not force and is_modified_locally(path):
+                changes.conflicts.append(path)
+                continue
+            if path in local_files:
+                (self._local_path / path).unlink()
+            del self._manifest[path]
+            changes.deleted.append(path)
+
+        logger.debug(
+            f'Retrieving {len(to_retrieve)} of {len(recipe_tree)} files for recipe {self._recipe.name} in kitchen {self._kitchen_name}...'  # noqa: E501
+        )
+        for path, contents in self._recipe.get_recipe_files(self._kitchen_name, to_retrieve).items():
+            self._write_file(path, contents)
+            self._manifest[path] = get_git_blob_sha(contents)
+            changes.updated.append(path)
+
+        if changes.conflicts:
+            logger.warning(f'Local changes conflict with changes in the kitchen: {changes.conflicts}')
+        self._save_manifest()
+        return changes
+
+    def push(self, force: bool = False) -> MirrorChanges:
+        """
+        Send the files modified, added, or deleted in the working copy since the last pull or push
+        to the kitchen. Only the locally changed files are sent. Unless force is set, the recipe
+        tree is listed first and locally changed files that were also changed in the kitchen since
+        the last pull are left untouched and reported as conflicts.
+
+        Parameters
+        ----------
+        force : bool, optional
+            If True, overwrite the files in the kitchen without checking them for conflicting
+            changes (default: False).
+
+        Raises
+        ------
+        HTTPError
+            If a request fails.
+
+        Returns
+        -------
+        MirrorChanges
+            The files that were updated in, deleted from, or conflicted with the kitchen.
+        """
+        local_changes = self.get_local_changes()
+        changes = MirrorChanges()
+        recipe_tree = None
+        if force or not (local_changes.updated or local_changes.deleted):
+            changes.updated = local_changes.updated
+            changes.deleted = local_changes.deleted
+        else:
+            recipe_tree = self._recipe.get_recipe_tree(self._kitchen_name)
+            local_files = self.get_local_files()
+            for paths, changed_paths in ((local_changes.updated, changes.updated),
+                                         (local_changes.deleted, changes.deleted)):
+                for path in paths:
+                    remote_sha = recipe_tree.get(path)
+                    if remote_sha == local_files.get(path):
+                        # The kitchen already has the local change
+                        self._set_manifest_sha(path, remote_sha)
+                    elif remote_sha != self._manifest.get(path):
+                        changes.conflicts.append(path)
+                    else:
+                        changed_paths.append(path)
+
+        if changes.updated:
+            filepaths = {path: self._read_file(path) for path in changes.updated}
+            self._recipe.sync_recipe_files(self._kitchen_name, filepaths, recipe_tree=recipe_tree)
+            for path, contents in filepaths.items():
+                self._manifest[path] = get_git_blob_sha(contents)
+        if changes.deleted:
+            self._recipe.delete_recipe_files(self._kitchen_name, changes.deleted)
+            for path in changes.deleted:
+                del self._manifest[path]
+
+        if changes.conflicts:
+            logger.warning(f'Local changes conflict with changes in the kitchen: {changes.conflicts}')
+        self._save_manifest()
+        return changes
@@ -1,18 +1,65 @@
 import csv
+import itertools
 import json
 import logging
+import threading
+import time
 
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
+from operator import attrgetter
 from pathlib import Path
-from typing import List
+from typing import Dict, Iterator, List, Optional, Tuple
 
+from requests.exceptions import HTTPError, Timeout
+
+from dkutils.circuit_breaker import CLOSED
 from dkutils.constants import VALID_TEST_DIRECTORIES
+from dkutils.retry import call_with_fallback_retry
+from dkutils.json_codec import loads
+from dkutils.lazy_import import lazy_import
+from dkutils.validation import ensure_pathlib
+
+# Only used to convert tests to a DataFrame
+pd = lazy_import('pandas')
 
 logger = logging.getLogger(__name__)
 
+# Default number of recipes from which tests are extracted concurrently
+DEFAULT_MAX_WORKERS = 8
+
+# Default maximum number of recipe files retrieved per request when extracting tests
+DEFAULT_CHUNK_SIZE = 50
+
+# Default number of chunks of recipe files retrieved concurrently when extracting tests
+DEFAULT_MAX_CHUNK_WORKERS = 4
+
+# Status code of requests that timed out in a gateway, e.g. because too many files were requested
+GATEWAY_TIMEOUT = 504
+
+# Endpoint of the requests retrieving recipe files, i.e. the first element of their path
+RECIPE_ENDPOINT = 'recipe'
+
+# Default number of tests per row group when exporting tests in columnar formats
+DEFAULT_ROW_GROUP_SIZE = 100000
+
 
 @dataclass
 class TestInfo:
+    __slots__ = (
+        'test',
+        'datestamp',
+        'description',
+        'kitchen',
+        'recipe',
+        'node',
+        'failure_action',
+        'variable',
+        'metric',
+        'comparison',
+        'expression',
+    )
+
     test: str
     datestamp: str
     description: str
@@ -90,9 +137,9 @@ def is_valid_test_file(file_path, file_depth) -> bool:
     return file_depth == 3 and file_path.suffix == '.json'
 
 
-def get_recipe_test_paths(client, kitchen=None, recipe=None) -> List[str]:
+def get_recipe_test_files(client, kitchen=None, recipe=None) -> Dict[str, str]:
     """
-    Return a list of paths to all recipe files that potentially contain tests. The kitchen and
+    Return the paths and git blob SHA-1s of all recipe files that potentially contain tests. The kitchen and
     and recipe that are interrogated for tests are derived from the client, unless otherwise
     specified as optional input arguments. If kitchen and/or recipe arguments are provided, they
     are set accordingly on the provided client.
@@ -109,8 +156,9 @@ def get_recipe_test_paths(client, kitchen=None, recipe=None) -> List[str]:
 
     Returns
     -------
-    list
-        List of paths to all recipe files that potentially contain tests.
+    dict
+        Dictionary keyed by the path of each recipe file that potentially contains tests and
+        valued by the file's SHA-1.
     """
     if kitchen:
         client.kitchen = kitchen
@@ -121,7 +169,7 @@ def get_recipe_test_paths(client, kitchen=None, recipe=None) -> List[str]:
     logger.info(f'Finding test files in recipe: {client.recipe}')
     json_response = client.get_recipe(recipe_files=['description.json'], include_recipe_tree=True)
 
-    test_paths = []
+    test_files = {}
     for recipe_contents in json_response['recipe-tree'].values():
         for file_dir, files in recipe_contents.items():
             base_path = Path(file_dir)
@@ -132,30 +180,24 @@ def get_recipe_test_paths(client, kitchen=None, recipe=None) -> List[str]:
                     file_path = base_path / file_info["filename"]
                     if is_valid_test_file(file_path, file_depth):
                         # Remove recipe name from start of file path and path separator
-                        test_paths.append(str(file_path)[len(client.recipe) + 1:])
+                        test_path = str(file_path)[len(client.recipe) + 1:]
+                        test_files[test_path] = file_info.get('sha')
     logger.info(f'Finished finding test files in recipe: {client.recipe}')
-    return test_paths
+    return test_files
 
 
-def extract_tests_from_files(client,
-                             datestamp,
-                             test_paths,
-                             kitchen=None,
-                             recipe=None) -> List[TestInfo]:
+def get_recipe_test_paths(client, kitchen=None, recipe=None) -> List[str]:
     """
-    Extract tests from the provided test_paths. The kitchen and recipe are derived from the client,
-    unless otherwise specified as optional input arguments. If kitchen and/or recipe arguments are
-    provided, they are set accordingly on the provided client.
+    Return a list of paths to all recipe files that potentially contain tests. The kitchen and
+    and recipe that are interrogated for tests are derived from the client, unless otherwise
+    specified as optional input arguments. If kitchen and/or recipe arguments are provided, they
+    are set accordingly on the provided client.
 
     Parameters
     ----------
     client : DataKitchenClient
         DataKitchenClient instance with kitchen and/or recipe set accordingly, unless optional
         kitchen and/or recipe arguments are provided
-    datestamp : datetime
-        Datestamp indicating approximate time when tests were extracted.
-    test_paths : list
-        List of paths to all recipe files that potentially contain tests.
     kitchen : str, optional
         If None, use the kitchen currently set on the client, otherwise set the kitchen accordingly.
     recipe : str, optional
@@ -164,22 +206,17 @@ def extract_tests_from_files(client,
     Returns
     -------
     list
-        List of TestInfo objects, one per test found in the provided test_paths.
+        List of paths to all recipe files that potentially contain tests.
     """
-    if kitchen:
-        client.kitchen = kitchen
+    return list(get_recipe_test_files(client, kitchen=kitchen, recipe=recipe).keys())
 
-    if recipe:
-        client.recipe = recipe
-
-    logger.info(f'Extracting tests from files in recipe: {client.recipe}')
-    try:
-        json_response = client.get_recipe(recipe_files=test_paths, include_recipe_tree=False)
-    except Exception:
-        logger.error(f'Failed to retrieve recipe files containing tests: {test_paths}')
-        raise
 
-    test_infos = []
+def _parse_tests(json_response, datestamp, kitchen, recipe) -> Dict[str, List[TestInfo]]:
+    """
+    Parse the tests contained in the recipe files of a get_recipe response. Return a dictionary
+    keyed by recipe file path and valued by the list of tests found in the file.
+    """
+    tests_by_path = {}
     for recipe_contents in json_response['recipes'].values():
         for file_dir, files in recipe_contents.items():
             base_path = Path(file_dir)
@@ -193,7 +230,10 @@ def extract_tests_from_files(client,
                     )
                     continue
 
-                json_contents = json.loads(file_info['json'])
+                test_infos = tests_by_path.setdefault(
+                    str(base_path / file_info['filename'])[len(recipe) + 1:], []
+                )
+                json_contents = loads(file_info['json'])
                 try:
                     if 'tests' in json_contents:
                         for test, fields in json_contents['tests'].items():
@@ -214,8 +254,8 @@ def extract_tests_from_files(client,
                                         'test': test,
                                         'datestamp': datestamp,
                                         'description': description,
-                                        'kitchen': client.kitchen,
-                                        'recipe': client.recipe,
+                                        'kitchen': kitchen,
+                                        'recipe': recipe,
                                         'node': node_name,
                                         'failure_action': fields['action'],
                                         'variable': fields['test-variable'],
@@ -231,11 +271,444 @@ def extract_tests_from_files(client,
                     )
 
             logger.info(f'Finished processing node: {node_name}')
+    return tests_by_path
+
+
+def _should_split(client, chunk, e) -> bool:
+    """
+    Return True if a chunk of recipe files that couldn't be retrieved should be split in half. Only
+    chunks whose requests timed out, which may be too large to retrieve in time, are split, and not
+    while the retry budget of the client is spent or the recipe endpoint's circuit is not closed, so
+    that smaller requests don't add load to a failing platform.
+    """
+    if len(chunk) < 2:
+        return False
+    is_timeout = isinstance(e, Timeout) or (
+        isinstance(e, HTTPError) and e.response is not None and e.response.status_code == GATEWAY_TIMEOUT
+    )
+    if not is_timeout:
+        return False
+    retry_policy = client.retry_policy
+    if retry_policy is not None and retry_policy.budget is not None and retry_policy.budget.balance < 1:
+        return False
+    circuit_breaker = client.circuit_breaker
+    return circuit_breaker is None or circuit_breaker.get_state(RECIPE_ENDPOINT) == CLOSED
+
+
+def _get_recipe_files_with_retry(client, recipe_files) -> dict:
+    return call_with_fallback_retry(
+        client.retry_policy, client.get_recipe, recipe_files=recipe_files, include_recipe_tree=False
+    )
+
+
+def _extract_tests_from_chunk(client, datestamp, chunk, split=True) -> Dict[str, List[TestInfo]]:
+    """
+    Retrieve a chunk of test files and extract their tests. Requests failing with a server error
+    are retried and, if the chunk still can't be retrieved because its requests timed out, it is
+    split in half once (see :func:`_should_split`) so that smaller requests are attempted before
+    giving up.
+    """
+    try:
+        json_response = _get_recipe_files_with_retry(client, chunk)
+    except Exception as e:
+        if split and _should_split(client, chunk, e):
+            middle = len(chunk) // 2
+            logger.warning(
+                f'Failed to retrieve {len(chunk)} recipe files containing tests, splitting into smaller chunks: {str(e)}'  # noqa: E501
+            )
+            return {
+                **_extract_tests_from_chunk(client, datestamp, chunk[:middle], split=False),
+                **_extract_tests_from_chunk(client, datestamp, chunk[middle:], split=False),
+            }
+        logger.error(f'Failed to retrieve recipe files containing tests: {chunk}')
+        raise
+    return _parse_tests(json_response, datestamp, client.kitchen, client.recipe)
+
+
+def _extract_tests_by_path(client, datestamp, test_paths, chunk_size,
+                           max_workers) -> Dict[str, List[TestInfo]]:
+    """
+    Retrieve the provided test files in chunks and return a dictionary keyed by file path and
+    valued by the list of tests found in the file.
+    """
+    logger.info(f'Extracting tests from files in recipe: {client.recipe}')
+    chunks = [test_paths[i:i + chunk_size] for i in range(0, len(test_paths), chunk_size)]
+    chunk_test_infos = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(_extract_tests_from_chunk, client, datestamp, chunk): index
+            for index, chunk in enumerate(chunks)
+        }
+        try:
+            for future in as_completed(futures):
+                chunk_test_infos[futures[future]] = future.result()
+                logger.debug(
+                    f'Extracted tests from {len(chunk_test_infos)}/{len(chunks)} chunks of recipe files'
+                )
+        finally:
+            for future in futures:
+                future.cancel()
+
     logger.info(f'Finished extracting tests from files in recipe: {client.recipe}')
-    return test_infos
+    tests_by_path = {}
+    for index in range(len(chunks)):
+        tests_by_path.update(chunk_test_infos[index])
+    return tests_by_path
+
+
+def extract_tests_from_files(
+    client,
+    datestamp,
+    test_paths,
+    kitchen=None,
+    recipe=None,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    max_workers=DEFAULT_MAX_CHUNK_WORKERS
+) -> List[TestInfo]:
+    """
+    Extract tests from the provided test_paths. The kitchen and recipe are derived from the client,
+    unless otherwise specified as optional input arguments. If kitchen and/or recipe arguments are
+    provided, they are set accordingly on the provided client.
+
+    The test files are retrieved in chunks of at most chunk_size files, several chunks at a time,
+    and the tests of each chunk are extracted as soon as it is retrieved. A chunk that fails with a
+    server error or timeout is retried, then split into smaller chunks.
+
+    Parameters
+    ----------
+    client : DataKitchenClient
+        DataKitchenClient instance with kitchen and/or recipe set accordingly, unless optional
+        kitchen and/or recipe arguments are provided
+    datestamp : datetime
+        Datestamp indicating approximate time when tests were extracted.
+    test_paths : list
+        List of paths to all recipe files that potentially contain tests.
+    kitchen : str, optional
+        If None, use the kitchen currently set on the client, otherwise set the kitchen accordingly.
+    recipe : str, optional
+        If None, use the recipe currently set on the client, otherwise, set the recipe accordingly.
+    chunk_size : int, optional
+        Maximum number of files retrieved per request (default: 50).
+    max_workers : int, optional
+        Maximum number of chunks retrieved concurrently (default: 4).
 
+    Raises
+    ------
+    ValueError
+        If chunk_size is less than 1.
 
-def get_test_infos(client, datestamp, recipes, kitchen=None) -> List[TestInfo]:
+    Returns
+    -------
+    list
+        List of TestInfo objects, one per test found in the provided test_paths.
+    """
+    if chunk_size < 1:
+        raise ValueError(f'chunk_size must be at least 1, but was {chunk_size}')
+
+    if kitchen:
+        client.kitchen = kitchen
+
+    if recipe:
+        client.recipe = recipe
+
+    tests_by_path = _extract_tests_by_path(client, datestamp, test_paths, chunk_size, max_workers)
+    return [test_info for test_infos in tests_by_path.values() for test_info in test_infos]
+
+
+class TestInventoryCache:
+
+    # Fields that are stored per test, the others are derived from the scan and the cache key
+    _TEST_FIELDS = ('test', 'description', 'node', 'failure_action', 'variable', 'metric',
+                    'comparison', 'expression')
+
+    def __init__(self, path=None) -> None:
+        """
+        Cache of the tests found in recipe files, keyed by kitchen, recipe, file path, and the
+        file's git blob SHA-1. When a recipe is scanned using the cache, only the files whose SHA-1
+        changed since the previous scan are retrieved and parsed. The cached tests of unchanged
+        files are reused with the datestamp of the current scan.
+
+        Parameters
+        ----------
+        path : str or pathlib.PurePath, optional
+            JSON file from which the cache is loaded, if it exists, and to which it is saved. If
+            None, the cache is only kept in memory.
+        """
+        self._path = ensure_pathlib(path) if path is not None else None
+        self._lock = threading.Lock()
+        self._recipes = self._load()
+
+    def _load(self) -> dict:
+        if self._path is None or not self._path.is_file():
+            return {}
+        with self._path.open() as cache_file:
+            return json.load(cache_file)
+
+    def save(self) -> None:
+        """
+        Save the cache to the JSON file provided on construction.
+
+        Raises
+        ------
+        ValueError
+            If the cache was constructed without a path.
+        """
+        if self._path is None:
+            raise ValueError('Cannot save a test inventory cache that was constructed without a path')
+        temp_path = self._path.with_name(f'{self._path.name}.tmp')
+        with self._lock, temp_path.open('w') as cache_file:
+            json.dump(self._recipes, cache_file)
+        # Replace the previous cache only once the new one is completely written
+        temp_path.replace(self._path)
+
+    def get_tests(self, kitchen, recipe, path, sha, datestamp) -> Optional[List[TestInfo]]:
+        """
+        Retrieve the cached tests of a recipe file.
+
+        Parameters
+        ----------
+        kitchen : str
+            Kitchen containing the recipe
+        recipe : str
+            Recipe containing the file
+        path : str
+            Path of the file, relative to the root of the recipe
+        sha : str
+            Current SHA-1 of the file
+        datestamp : datetime
+            Datestamp assigned to the returned tests
+
+        Returns
+        -------
+        list or None
+            List of TestInfo objects, or None if the file is not cached with the provided SHA-1.
+        """
+        with self._lock:
+            entry = self._recipes.get(kitchen, {}).get(recipe, {}).get(path)
+        if sha is None or entry is None or entry['sha'] != sha:
+            return None
+        return [
+            TestInfo(datestamp=datestamp, kitchen=kitchen, recipe=recipe, **fields)
+            for fields in entry['tests']
+        ]
+
+    def update_recipe(self, kitchen, recipe, test_files) -> None:
+        """
+        Replace the cached files of a recipe. Files that are no longer present in the recipe are
+        removed from the cache.
+
+        Parameters
+        ----------
+        kitchen : str
+            Kitchen containing the recipe
+        recipe : str
+            Recipe containing the files
+        test_files : dict
+            Dictionary keyed by file path and valued by a (SHA-1, list of TestInfo objects) tuple.
+        """
+        entries = {}
+        for path, (sha, test_infos) in test_files.items():
+            if sha is None:
+                continue
+            entries[path] = {
+                'sha': sha,
+                'tests': [{f: getattr(t, f) for f in self._TEST_FIELDS} for t in test_infos],
+            }
+        with self._lock:
+            self._recipes.setdefault(kitchen, {})[recipe] = entries
+
+
+def get_recipe_test_infos(
+    client,
+    datestamp,
+    kitchen,
+    recipe,
+    cache=None,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    max_chunk_workers=DEFAULT_MAX_CHUNK_WORKERS
+) -> List[TestInfo]:
+    """
+    Retrieve all the tests defined in a recipe. Unlike :func:`get_recipe_test_paths` and
+    :func:`extract_tests_from_files`, the provided client is not modified, so this function may be
+    called concurrently with the same client. If a cache is provided, only the test files that
+    changed since they were cached are retrieved, and the cache is updated accordingly.
+
+    Parameters
+    ----------
+    client : DataKitchenClient
+        DataKitchenClient instance used to make requests
+    datestamp : datetime
+        Datestamp indicating approximate time when tests were extracted.
+    kitchen : str
+        Kitchen containing the recipe
+    recipe : str
+        Recipe from which tests are extracted
+    cache : TestInventoryCache, optional
+        Cache of previously extracted tests.
+    chunk_size : int, optional
+        Maximum number of test files retrieved per request (default: 50).
+    max_chunk_workers : int, optional
+        Maximum number of chunks of test files retrieved concurrently (default: 4).
+
+    Raises
+    ------
+    ValueError
+        If chunk_size is less than 1.
+
+    Returns
+    -------
+    list
+        List of TestInfo objects, one per test found in the recipe.
+    """
+    if chunk_size < 1:
+        raise ValueError(f'chunk_size must be at least 1, but was {chunk_size}')
+
+    recipe_client = client.scope(kitchen=kitchen, recipe=recipe)
+    test_files = get_recipe_test_files(recipe_client)
+
+    tests_by_path = {}
+    if cache is not None:
+        for path, sha in test_files.items():
+            cached_test_infos = cache.get_tests(kitchen, recipe, path, sha, datestamp)
+            if cached_test_infos is not None:
+                tests_by_path[path] = cached_test_infos
+        logger.info(
+            f'Reusing cached tests of {len(tests_by_path)}/{len(test_files)} test files in recipe: {recipe}'
+        )
+
+    changed_paths = [path for path in test_files if path not in tests_by_path]
+    if changed_paths:
+        tests_by_path.update(
+            _extract_tests_by_path(
+                recipe_client,
+                datestamp,
+                changed_paths,
+                chunk_size,
+                max_chunk_workers,
+            )
+        )
+
+    if cache is not None:
+        cache.update_recipe(
+            kitchen,
+            recipe,
+            {path: (sha, tests_by_path[path]) for path, sha in test_files.items() if path in tests_by_path},
+        )
+    return [test_info for path in test_files for test_info in tests_by_path.get(path, [])]
+
+
+def _iter_recipe_test_infos(client, datestamp, recipes, kitchen, max_workers, progress_callback,
+                            cache, chunk_size,
+                            max_chunk_workers) -> Iterator[Tuple[int, List[TestInfo]]]:
+    """
+    Extract tests from the provided recipes with a pool of at most max_workers threads, yielding
+    the index of each recipe in recipes along with its tests as soon as the recipe is processed.
+    """
+    num_recipes = len(recipes)
+    start_time = time.monotonic()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(
+                get_recipe_test_infos,
+                client,
+                datestamp,
+                kitchen,
+                recipe,
+                cache,
+                chunk_size,
+                max_chunk_workers,
+            ): index
+            for index, recipe in enumerate(recipes)
+        }
+        try:
+            for num_completed, future in enumerate(as_completed(futures), start=1):
+                index = futures[future]
+                test_infos = future.result()
+                elapsed_secs = time.monotonic() - start_time
+                logger.info(
+                    f'Extracted {len(test_infos)} tests from recipe {recipes[index]} '
+                    f'({num_completed}/{num_recipes} recipes, '
+                    f'{num_completed / max(elapsed_secs, 1e-6):.2f} recipes/sec)'
+                )
+                if progress_callback:
+                    progress_callback(num_completed, num_recipes, elapsed_secs)
+                yield index, test_infos
+        finally:
+            # Don't start processing the remaining recipes if iteration stopped or failed early
+            for future in futures:
+                future.cancel()
+
+
+def iter_test_infos(
+    client,
+    datestamp,
+    recipes,
+    kitchen=None,
+    max_workers=DEFAULT_MAX_WORKERS,
+    progress_callback=None,
+    cache=None,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    max_chunk_workers=DEFAULT_MAX_CHUNK_WORKERS
+) -> Iterator[TestInfo]:
+    """
+    For a set of recipes in a kitchen, concurrently retrieve all the defined tests and their
+    associated metadata. TestInfo objects are yielded as soon as each recipe is processed, so
+    results for recipes that finish first are available before the others complete. The provided
+    client is not modified.
+
+    Parameters
+    ----------
+    client : DataKitchenClient
+        DataKitchenClient instance with kitchen set accordingly, unless optional
+        kitchen argument is provided
+    datestamp : datetime
+        Datestamp indicating approximate time when tests were extracted.
+    recipes : list
+        List of recipe names from which tests are extracted.
+    kitchen : str, optional
+        If None, use the kitchen currently set on the client.
+    max_workers : int, optional
+        Maximum number of recipes processed concurrently (default: 8).
+    progress_callback : callable, optional
+        Called after each recipe is processed with the number of processed recipes, the total
+        number of recipes, and the elapsed time in seconds.
+    cache : TestInventoryCache, optional
+        Cache of previously extracted tests, updated with the tests of every processed recipe. Call
+        TestInventoryCache.save to persist it.
+    chunk_size : int, optional
+        Maximum number of test files retrieved per request (default: 50).
+    max_chunk_workers : int, optional
+        Maximum number of chunks of test files retrieved concurrently per recipe (default: 4).
+
+    Raises
+    ------
+    ValueError
+        If chunk_size is less than 1.
+
+    Returns
+    -------
+    generator
+        Generator of TestInfo objects, one per test found in the provided kitchen recipes.
+    """
+    kitchen = kitchen if kitchen else client.kitchen
+    logger.info(f'Finding tests in kitchen: {kitchen}')
+    for _, test_infos in _iter_recipe_test_infos(
+        client, datestamp, recipes, kitchen, max_workers, progress_callback, cache, chunk_size,
+        max_chunk_workers
+    ):
+        yield from test_infos
+
+
+def get_test_infos(
+    client,
+    datestamp,
+    recipes,
+    kitchen=None,
+    max_workers=1,
+    cache=None,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    max_chunk_workers=DEFAULT_MAX_CHUNK_WORKERS
+) -> List[TestInfo]:
     """
     For a set of recipes in a kitchen, retrieve all the defined tests and their associated metadata.
     Return a list of test_info dictionaries, one per test.
@@ -248,24 +721,44 @@ def get_test_infos(client, datestamp, recipes, kitchen=None) -> List[TestInfo]:
     datestamp : datetime
         Datestamp indicating approximate time when tests were extracted.
     recipes : list
-        List of paths to all recipe files that potentially contain tests.
+        List of recipe names from which tests are extracted.
     kitchen : str, optional
         If None, use the kitchen currently set on the client, otherwise set the kitchen accordingly.
+    max_workers : int, optional
+        Maximum number of recipes processed concurrently (default: 1). See
+        :func:`iter_test_infos` to process results as soon as each recipe is processed.
+    cache : TestInventoryCache, optional
+        Cache of previously extracted tests, updated with the tests of every processed recipe. Call
+        TestInventoryCache.save to persist it.
+    chunk_size : int, optional
+        Maximum number of test files retrieved per request (default: 50).
+    max_chunk_workers : int, optional
+        Maximum number of chunks of test files retrieved concurrently per recipe (default: 4).
+
+    Raises
+    ------
+    ValueError
+        If chunk_size is less than 1.
 
     Returns
     -------
     list
-        List of TestInfo objects, one per test found in the provided kitchen recipes.
+        List of TestInfo objects, one per test found in the provided kitchen recipes, in the order
+        of the provided recipes.
     """
     if kitchen:
         client.kitchen = kitchen
 
-    logger.info(f'Finding tests in kitchen: {kitchen}')
-    test_infos = []
-    for recipe in recipes:
-        test_paths = get_recipe_test_paths(client, recipe=recipe)
-        test_infos.extend(extract_tests_from_files(client, datestamp, test_paths))
-    return test_infos
+    logger.info(f'Finding tests in kitchen: {client.kitchen}')
+    recipe_test_infos = dict(
+        _iter_recipe_test_infos(
+            client, datestamp, recipes, client.kitchen, max_workers, None, cache, chunk_size,
+            max_chunk_workers
+        )
+    )
+    return [
+        test_info for index in range(len(recipes)) for test_info in recipe_test_infos[index]
+    ]
 
 
 def write_test_infos_csv(test_infos, output_csv_path) -> None:
@@ -283,3 +776,104 @@ def write_test_infos_csv(test_infos, output_csv_path) -> None:
         writer = csv.DictWriter(csvfile, fieldnames=TestInfo.keys())
         writer.writeheader()
         writer.writerows(test_infos)
+
+
+def iter_test_info_columns(test_infos, row_group_size=DEFAULT_ROW_GROUP_SIZE) -> Iterator[Dict[str, list]]:
+    """
+    Convert TestInfo objects to columns, one row group at a time, so that at most row_group_size
+    tests are held in memory by this function, even if test_infos is a generator (e.g.
+    :func:`iter_test_infos`).
+
+    Parameters
+    ----------
+    test_infos : iterable
+        Iterable of TestInfo objects
+    row_group_size : int, optional
+        Maximum number of tests per row group (default: 100000).
+
+    Raises
+    ------
+    ValueError
+        If row_group_size is less than 1.
+
+    Returns
+    -------
+    generator
+        Generator of dictionaries keyed by TestInfo field name and valued by a list of the field's
+        values, one per test in the row group.
+    """
+    if row_group_size < 1:
+        raise ValueError(f'row_group_size must be at least 1, but was {row_group_size}')
+
+    field_names = list(TestInfo.keys())
+    get_fields = attrgetter(*field_names)
+    test_infos = iter(test_infos)
+    while True:
+        rows = [get_fields(test_info) for test_info in itertools.islice(test_infos, row_group_size)]
+        if not rows:
+            return
+        yield dict(zip(field_names, map(list, zip(*rows))))
+
+
+def test_infos_to_dataframe(test_infos, row_group_size=DEFAULT_ROW_GROUP_SIZE) -> 'pd.DataFrame':
+    """
+    Convert TestInfo objects to a DataFrame with one column per TestInfo field.
+
+    Parameters
+    ----------
+    test_infos : iterable
+        Iterable of TestInfo objects
+    row_group_size : int, optional
+        Maximum number of tests converted at a time (default: 100000).
+
+    Returns
+    -------
+    DataFrame
+        DataFrame with one row per test.
+    """
+    data_frames = [pd.DataFrame(columns) for columns in iter_test_info_columns(test_infos, row_group_size)]
+    if not data_frames:
+        return pd.DataFrame(columns=list(TestInfo.keys()))
+    return pd.concat(data_frames, ignore_index=True)
+
+
+def write_test_infos_parquet(test_infos, output_parquet_path, row_group_size=DEFAULT_ROW_GROUP_SIZE) -> int:
+    """
+    Write TestInfo objects to a Parquet file, one row group at a time, so that memory usage is
+    bounded by row_group_size rather than by the number of tests. Requires pyarrow, which is
+    installed with the parquet extra (i.e. pip install DKUtils[parquet]).
+
+    Parameters
+    ----------
+    test_infos : iterable
+        Iterable of TestInfo objects
+    output_parquet_path : str
+        Output Parquet file path
+    row_group_size : int, optional
+        Maximum number of tests per row group (default: 100000).
+
+    Returns
+    -------
+    int
+        Number of tests written.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    # Values are written as strings, like in write_test_infos_csv, so that every row group has the
+    # same schema regardless of the types found in the recipe files
+    schema = pa.schema([(field_name, pa.string()) for field_name in TestInfo.keys()])
+    num_tests = 0
+    with pq.ParquetWriter(str(output_parquet_path), schema) as writer:
+        for columns in iter_test_info_columns(test_infos, row_group_size):
+            table = pa.Table.from_pydict(
+                {
+                    field_name: [None if value is None else str(value) for value in values]
+                    for field_name, values in columns.items()
+                },
+                schema=schema
+            )
+            writer.write_table(table)
+            num_tests += table.num_rows
+    logger.info(f'Wrote {num_tests} tests to {output_parquet_path}')
+    return num_tests
@@ -5,9 +5,7 @@ import logging
 from requests import Response
 from typing import TYPE_CHECKING
 
-from dkutils.constants import (API_DELETE, API_GET, API_POST, GLOBAL)
-
-from dkutils.datakitchen_api.datakitchen_client import DEFAULT_VAULT_URL
+from dkutils.constants import (API_DELETE, API_GET, API_POST, DEFAULT_VAULT_URL, GLOBAL)
 
 if TYPE_CHECKING:
     from dkutils.datakitchen_api.datakitchen_client import DataKitchenClient
@@ -1,15 +1,12 @@
-import logging
-import time
+from dkutils.retry import RetryPolicy, is_server_error
 
-from functools import wraps
-from requests.exceptions import HTTPError
 
-logger = logging.getLogger(__name__)
-
-
-def retry_50X_httperror(tries=3, delay=2, backoff=2):
+def retry_50X_httperror(tries=3, delay=2, backoff=2, jitter=False, budget=None, metrics=None):
     """
-    Retry calling the decorated function using an exponential backoff.
+    Retry calling the decorated function using an exponential backoff, when it raises an HTTPError
+    with a 5xx status code. Decorated coroutine functions are awaited and retried without blocking
+    the event loop. For retrying other transient errors (e.g. 429 status codes, connection errors,
+    and timeouts), see :class:`~dkutils.retry.RetryPolicy`.
 
     Based on:
     http://www.saltycrane.com/blog/2009/11/trying-out-retry-decorator-python/
@@ -23,28 +20,20 @@ def retry_50X_httperror(tries=3, delay=2, backoff=2):
         Initial delay between retries in seconds
     backoff: int
         Backoff multiplier e.g. value of 2 will double the delay each retry
+    jitter: bool, optional
+        If True, randomize delays with full jitter (default: False)
+    budget: RetryBudget, optional
+        Budget limiting the proportion of calls that are retried
+    metrics: RetryMetrics, optional
+        Counters of calls, retries, and time lost waiting to retry
     """
-
-    def deco_retry(f):
-
-        @wraps(f)
-        def f_retry(*args, **kwargs):
-            mtries, mdelay = tries, delay
-            while mtries > 1:
-                try:
-                    return f(*args, **kwargs)
-                except HTTPError as e:
-                    status_code = e.response.status_code
-                    if 500 <= status_code < 600:
-                        logger.warning(f'{str(e)}, Retrying in {mdelay} seconds...')
-                        time.sleep(mdelay)
-                        mtries -= 1
-                        mdelay *= backoff
-                    else:
-                        raise
-
-            return f(*args, **kwargs)
-
-        return f_retry  # true decorator
-
-    return deco_retry
+    return RetryPolicy(
+        tries=max(tries, 1),
+        delay=delay,
+        backoff=backoff,
+        max_delay=float('inf'),
+        jitter=jitter,
+        is_retryable=is_server_error,
+        budget=budget,
+        metrics=metrics
+    )
@@ -1,12 +1,251 @@
+import copy
+import json
+
+from dataclasses import dataclass
+from itertools import chain
 from pprint import pformat
 from textwrap import indent
+from typing import Any, Iterator, List, Tuple
+
+
+class _Missing:
+    """
+    Sentinel type used to indicate a value is absent from one side of a comparison.
+    """
+
+    def __repr__(self):
+        return 'MISSING'
+
+
+MISSING = _Missing()
+
+
+@dataclass(frozen=True)
+class Difference:
+    path: str
+    left: Any
+    right: Any
+
+
+@dataclass(frozen=True)
+class Conflict:
+    path: str
+    base: Any
+    left: Any
+    right: Any
+
+
+def escape_json_pointer_token(token):
+    """
+    Escape a dictionary key or list index for use as a JSON pointer (RFC 6901) reference token.
+
+    Parameters
+    ----------
+    token : str or int
+        Dictionary key or list index
+
+    Returns
+    -------
+    str
+        Escaped reference token
+    """
+    return str(token).replace('~', '~0').replace('/', '~1')
+
+
+def unescape_json_pointer_token(token):
+    """
+    Reverse :func:`escape_json_pointer_token`.
+
+    Parameters
+    ----------
+    token : str
+        Escaped reference token
+
+    Returns
+    -------
+    str
+        Unescaped reference token
+    """
+    return token.replace('~1', '/').replace('~0', '~')
+
+
+def _is_equal(left, right) -> bool:
+    """
+    Return True if left and right are equal and so are the types of all their leaves, unlike ==
+    for which e.g. 1, 1.0, and True are equal. Equal dictionaries and lists are compared via their
+    canonical JSON encoding, which distinguishes these types, so that equal subtrees are compared
+    without being walked in Python.
+    """
+    if left is right:
+        return True
+    if type(left) is not type(right) or left != right:
+        return False
+    if not isinstance(left, (dict, list)):
+        return True
+    try:
+        return _canonical_json(left) == _canonical_json(right)
+    except (TypeError, ValueError):
+        # Not JSON serializable (e.g. keys of different types), so compare the children
+        if isinstance(left, dict):
+            return all(_is_equal(value, right[key]) for key, value in left.items())
+        return all(_is_equal(left_value, right_value) for left_value, right_value in zip(left, right))
+
+
+def _canonical_json(value) -> str:
+    return json.dumps(value, sort_keys=True, default=repr)
+
+
+def _split_json_pointer(path):
+    """
+    Split a JSON pointer into its unescaped reference tokens.
+    """
+    if path == '':
+        return []
+    if not path.startswith('/'):
+        raise ValueError(f'Invalid JSON pointer: {path}')
+    return [unescape_json_pointer_token(token) for token in path.split('/')[1:]]
+
+
+def _resolve_container(document, tokens):
+    """
+    Return the container (dict or list) referenced by the provided reference tokens.
+    """
+    container = document
+    for token in tokens:
+        container = container[int(token)] if isinstance(container, list) else container[token]
+    return container
+
+
+def apply_patch(document, patch):
+    """
+    Apply a JSON Patch (RFC 6902) to a copy of the provided document. The add, remove, and replace
+    operations are supported, which are the operations produced by
+    :func:`DictionaryComparator.get_patch`.
+
+    Parameters
+    ----------
+    document : dict
+        Document to patch. It is not modified.
+    patch : list
+        List of JSON Patch operations of the form::
+
+            [
+                {'op': 'replace', 'path': '/variables/DT', 'value': '20200529'},
+                {'op': 'remove', 'path': '/variables/DH'}
+            ]
+
+    Raises
+    ------
+    ValueError
+        If an operation is unsupported or its path cannot be applied to the document.
+
+    Returns
+    -------
+    dict
+        Patched copy of the document
+    """
+    document = copy.deepcopy(document)
+    for operation in patch:
+        op = operation['op']
+        tokens = _split_json_pointer(operation['path'])
+        if not tokens:
+            if op not in ('add', 'replace'):
+                raise ValueError(f'Unsupported operation on the document root: {op}')
+            document = copy.deepcopy(operation['value'])
+            continue
+
+        try:
+            parent = _resolve_container(document, tokens[:-1])
+            key = tokens[-1]
+            if isinstance(parent, list):
+                key = len(parent) if key == '-' else int(key)
+            if op == 'add':
+                if isinstance(parent, list):
+                    parent.insert(key, copy.deepcopy(operation['value']))
+                else:
+                    parent[key] = copy.deepcopy(operation['value'])
+            elif op == 'replace':
+                if isinstance(parent, dict) and key not in parent:
+                    raise KeyError(key)
+                parent[key] = copy.deepcopy(operation['value'])
+            elif op == 'remove':
+                del parent[key]
+            else:
+                raise ValueError(f'Unsupported JSON Patch operation: {op}')
+        except (IndexError, KeyError, TypeError) as e:
+            raise ValueError(f'Failed to apply {op} operation to {operation["path"]}: {str(e)}')
+    return document
+
+
+def _merge_three_way(base, left, right, path, conflicts):
+    """
+    Recursively merge left and right relative to base, recording any conflicts. Dictionaries are
+    merged key by key, whereas any other values (including lists) are treated as a whole. Values
+    are compared like in :meth:`DictionaryComparator.iter_differences`, so e.g. changing 1 to True
+    is a change.
+    """
+    if _is_equal(left, right):
+        return left
+    if _is_equal(left, base):
+        return right
+    if _is_equal(right, base):
+        return left
+
+    if isinstance(left, dict) and isinstance(right, dict):
+        base = base if isinstance(base, dict) else {}
+        merged = {}
+        for key in dict.fromkeys(chain(base, left, right)):
+            value = _merge_three_way(
+                base.get(key, MISSING),
+                left.get(key, MISSING),
+                right.get(key, MISSING),
+                f'{path}/{escape_json_pointer_token(key)}',
+                conflicts,
+            )
+            if value is not MISSING:
+                merged[key] = value
+        return merged
+
+    # Both sides changed the same value differently, so prefer left and report the conflict
+    conflicts.append(Conflict(path, base, left, right))
+    return left
+
+
+def three_way_merge(base, left, right) -> Tuple[dict, List[Conflict]]:
+    """
+    Merge the changes made in left and right relative to their common ancestor, base. A change made
+    on only one side is taken from that side. A value changed differently on both sides (including
+    a value deleted on one side and modified on the other) is a conflict, in which case the left
+    value is kept and the conflict is reported. Dictionaries are merged key by key, whereas lists
+    are treated as single values.
+
+    Parameters
+    ----------
+    base : dict
+        Common ancestor of left and right (e.g. the overrides of a parent kitchen at the time the
+        child kitchens were created).
+    left : dict
+        Left dictionary
+    right : dict
+        Right dictionary
+
+    Returns
+    -------
+    tuple
+        The merged dictionary and a list of Conflict objects, one per conflicting path. The list is
+        empty if the merge is clean.
+    """
+    conflicts = []
+    merged = _merge_three_way(base, left, right, '', conflicts)
+    return merged, conflicts
 
 
 class DictionaryComparator:
 
     def __init__(self, left, right):
         """
-        Utility that can be used to perform a shallow comparison on two dictionaries.
+        Utility that can be used to perform a shallow comparison on two dictionaries. Use
+        iter_differences or get_differences for a deep comparison.
 
         Parameters
         ----------
@@ -138,3 +377,135 @@ class DictionaryComparator:
             will be returned if a key exists in both dictionaries
         """
         return {**self._right, **self._left}
+
+    def iter_differences(self) -> Iterator[Difference]:
+        """
+        Recursively compare left and right, yielding a Difference for each leaf that differs.
+        Nested dictionaries and lists are descended into, so only the differing leaves are
+        reported, each addressed by a JSON pointer (e.g. /variables/DT). Subtrees that are equal,
+        including the types of their leaves, are skipped without being descended into. Leaves of
+        different types are reported even if they compare equal (e.g. 1, 1.0, and True). A value
+        that is absent from one side is reported as MISSING on that side. For example given::
+
+            left = {'one': 1, 'two': {'a': 1, 'b': 2}}
+            right = {'two': {'a': 1, 'b': 'II'}, 'three': [3]}
+
+        iter_differences will yield the following::
+
+            Difference(path='/one', left=1, right=MISSING)
+            Difference(path='/two/b', left=2, right='II')
+            Difference(path='/three', left=MISSING, right=[3])
+
+        Differences are produced lazily, so large documents may be compared without building
+        the full set of differences in memory.
+
+        Returns
+        -------
+        generator
+            Generator of Difference objects in document order
+        """
+        stack = [('', self._left, self._right)]
+        while stack:
+            path, left, right = stack.pop()
+            if _is_equal(left, right):
+                continue
+
+            if isinstance(left, dict) and isinstance(right, dict):
+                children = []
+                for key, value in left.items():
+                    child_path = f'{path}/{escape_json_pointer_token(key)}'
+                    if key in right:
+                        children.append((child_path, value, right[key]))
+                    else:
+                        children.append((child_path, value, MISSING))
+                for key, value in right.items():
+                    if key not in left:
+                        children.append((f'{path}/{escape_json_pointer_token(key)}', MISSING, value))
+            elif isinstance(left, list) and isinstance(right, list):
+                children = []
+                for index in range(max(len(left), len(right))):
+                    children.append((
+                        f'{path}/{index}',
+                        left[index] if index < len(left) else MISSING,
+                        right[index] if index < len(right) else MISSING,
+                    ))
+            else:
+                yield Difference(path, left, right)
+                continue
+
+            # Reverse so differences are yielded in document order
+            stack.extend(reversed(children))
+
+    def get_differences(self):
+        """
+        Recursively compare left and right. See :func:`iter_differences` for details.
+
+        Returns
+        -------
+        dict
+            A dictionary keyed by the JSON pointer of each differing leaf and valued by a tuple made
+            up of the value from the left and the value from the right
+        """
+        return {d.path: (d.left, d.right) for d in self.iter_differences()}
+
+    def get_patch(self):
+        """
+        Create the minimal JSON Patch (RFC 6902) that transforms left into right, consisting of one
+        operation per difference reported by :func:`iter_differences`. For example given::
+
+            left = {'one': 1, 'two': {'a': 1, 'b': 2}}
+            right = {'two': {'a': 1, 'b': 'II'}, 'three': 3}
+
+        get_patch will result in the following::
+
+            [
+                {'op': 'remove', 'path': '/one'},
+                {'op': 'replace', 'path': '/two/b', 'value': 'II'},
+                {'op': 'add', 'path': '/three', 'value': 3}
+            ]
+
+        Returns
+        -------
+        list
+            List of JSON Patch operations that may be applied to left with :func:`apply_patch`
+        """
+        patch = []
+        list_removals = []
+
+        def flush_list_removals():
+            # Removing list items shifts subsequent indices, so remove from the end of the list
+            patch.extend(reversed(list_removals))
+            list_removals.clear()
+
+        for difference in self.iter_differences():
+            if difference.right is MISSING:
+                tokens = _split_json_pointer(difference.path)
+                operation = {'op': 'remove', 'path': difference.path}
+                if isinstance(_resolve_container(self._left, tokens[:-1]), list):
+                    list_removals.append(operation)
+                    continue
+            elif difference.left is MISSING:
+                operation = {'op': 'add', 'path': difference.path, 'value': difference.right}
+            else:
+                operation = {'op': 'replace', 'path': difference.path, 'value': difference.right}
+            flush_list_removals()
+            patch.append(operation)
+        flush_list_removals()
+        return patch
+
+    def merge_three_way(self, base):
+        """
+        Merge left and right relative to their common ancestor. See :func:`three_way_merge` for
+        details.
+
+        Parameters
+        ----------
+        base : dict
+            Common ancestor of left and right
+
+        Returns
+        -------
+        tuple
+            The merged dictionary and a list of Conflict objects, one per conflicting path.
+        """
+        return three_way_merge(base, self._left, self._right)
@@ -11,15 +11,20 @@ from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from enum import Enum
 from pathlib import Path
-from typing import List
-
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+from typing import TYPE_CHECKING, List
 
 from dkutils.constants import GMAIL_APPROVAL_STRING, GMAIL_SLEEP_SECONDS, GMAIL_MAX_WAIT_SECONDS
+from dkutils.instrumentation import GMAIL_CLIENT, observe_request
+from dkutils.lazy_import import lazy_import
 from dkutils.wait_loop import WaitLoop
 
+if TYPE_CHECKING:
+    from google.oauth2.credentials import Credentials
+
+# The Google client libraries take hundreds of milliseconds to import
+discovery = lazy_import('googleapiclient.discovery')
+google_auth_oauthlib_flow = lazy_import('google_auth_oauthlib.flow')
+
 logger = logging.getLogger(__name__)
 
 
@@ -113,7 +118,7 @@ def create_base64_encoded_token(
     """
     if not credentials_path.exists():
         raise GmailClientException("Credentials file must exist")
-    flow = InstalledAppFlow.from_client_secrets_file(
+    flow = google_auth_oauthlib_flow.InstalledAppFlow.from_client_secrets_file(
         credentials_path, [scope.value for scope in scopes]
     )
     credentials = flow.run_local_server(port=0)
@@ -234,7 +239,7 @@ def create_message_with_attachment(sender, to, subject, message_text, file):
 
 class GMailClient:
 
-    def __init__(self, credentials: Credentials):
+    def __init__(self, credentials: 'Credentials'):
         """
         Client object for access the GMail API. The create_base64_encoded_token function can be
         used to initially create a set of credentials which are base64 encoded in a file that can
@@ -247,7 +252,22 @@ class GMailClient:
         credentials : Credentials
             the credentials needed to access the API
         """
-        self.service = build('gmail', 'v1', credentials=credentials)
+        self.service = discovery.build('gmail', 'v1', credentials=credentials)
+
+    @staticmethod
+    def _execute(request, http_method, endpoint):
+        """
+        Execute a request built by the GMail API service, reporting it to the instrumentation hook
+        (see :func:`~dkutils.instrumentation.set_instrumentation`).
+        """
+        body = getattr(request, 'body', None)
+        return observe_request(
+            GMAIL_CLIENT,
+            http_method,
+            endpoint,
+            request.execute,
+            request_bytes=len(body) if isinstance(body, (str, bytes)) else 0
+        )
 
     def send_message(self, message, user_id='me'):
         """
@@ -267,7 +287,11 @@ class GMailClient:
             The sent message
         """
 
-        message = (self.service.users().messages().send(userId=user_id, body=message).execute())
+        message = self._execute(
+            self.service.users().messages().send(userId=user_id, body=message),
+            'post',
+            'users/messages/send'
+        )
         logger.debug(f'Message Id: {message["id"]}')
         return message
 
@@ -305,15 +329,21 @@ class GMailClient:
         """
         wait_loop = WaitLoop(sleep_seconds, max_wait)
         while wait_loop:
-            results = self.service.users().messages().list(
-                userId='me', labelIds=['INBOX'], q=f'subject: {subject}'
-            ).execute()
+            results = self._execute(
+                self.service.users().messages().list(
+                    userId='me', labelIds=['INBOX'], q=f'subject: {subject}'
+                ),
+                'get',
+                'users/messages/list'
+            )
             messages = results.get('messages', [])
             if messages:
                 for message in messages:
-                    msg = self.service.users().messages().get(
-                        userId='me', id=message['id']
-                    ).execute()
+                    msg = self._execute(
+                        self.service.users().messages().get(userId='me', id=message['id']),
+                        'get',
+                        'users/messages/get'
+                    )
                     logger.info(f'Email reply received: {msg["snippet"]}')
                     return msg['snippet'].lower().startswith(approval_string.lower())
         logger.warn("No reply was found")
@@ -0,0 +1,389 @@
+import logging
+import re
+import threading
+import time
+
+from bisect import bisect_left
+from typing import NamedTuple, Optional
+from urllib.parse import urlsplit
+
+from dkutils.tracing import is_tracing, start_as_current_span
+
+logger = logging.getLogger(__name__)
+
+# Client names
+DATAKITCHEN_CLIENT = 'datakitchen'
+DATACOLLECTOR_CLIENT = 'datacollector'
+GALLERY_CLIENT = 'gallery'
+GMAIL_CLIENT = 'gmail'
+JIRA_CLIENT = 'jira'
+VEEVA_NETWORK_CLIENT = 'veeva_network'
+
+# Upper bounds of the latency histogram buckets in seconds
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# Status label of requests that failed without a response, or succeeded without a status code
+ERROR = 'error'
+OK = 'ok'
+
+_instrumentation = None
+
+
+class RequestEvent(NamedTuple):
+    client: str
+    method: str
+    endpoint: str
+    status: Optional[int]
+    latency_secs: float
+    request_bytes: int
+    response_bytes: int
+    attempt: int
+    error: Optional[str]
+
+
+def set_instrumentation(instrumentation) -> None:
+    """
+    Set the hook called after every request sent by the API clients (i.e. DataKitchenClient,
+    DataCollectorClient, GalleryClient, the Veeva Network clients, JiraClient, and GMailClient).
+    Requests are not instrumented by default.
+
+    Parameters
+    ----------
+    instrumentation : object
+        Object with an on_request method accepting a :class:`RequestEvent` (e.g.
+        :class:`MetricsRegistry`), or None to stop instrumenting requests. The method is called by
+        the thread sending the request, and must not raise exceptions.
+    """
+    global _instrumentation
+    _instrumentation = instrumentation
+
+
+def get_instrumentation():
+    """
+    Return the hook set with :func:`set_instrumentation`, or None if requests are not instrumented.
+    """
+    return _instrumentation
+
+
+def get_endpoint_template(path, names=None) -> str:
+    """
+    Return the template of the provided API path, i.e. the path with the identifiers replaced by {}
+    and without the query string, so that requests to the same endpoint share metrics.
+
+    Parameters
+    ----------
+    path : str
+        API path or URL (e.g. /v1/workflows/5f3e1a/jobs/?limit=10)
+    names : set, optional
+        Segments that are endpoint names. If provided, the other segments are identifiers. Otherwise
+        segments containing digits are identifiers, except version segments (e.g. v1 or v16.0).
+
+    Returns
+    -------
+    str
+        Endpoint template (e.g. v1/workflows/{}/jobs)
+    """
+    path = urlsplit(path).path if '://' in path else path.split('?', 1)[0]
+    segments = [segment for segment in path.split('/') if segment]
+    if names is None:
+        return '/'.join(
+            '{}' if re.search(r'\d', segment) and not re.fullmatch(r'v\d+(\.\d+)*', segment) else segment
+            for segment in segments
+        )
+    return '/'.join(segment if segment in names else '{}' for segment in segments)
+
+
+def _get_size(body) -> int:
+    if isinstance(body, bytes):
+        return len(body)
+    if isinstance(body, str):
+        return len(body.encode('utf-8'))
+    return 0
+
+
+def _get_request_bytes(response_or_error) -> int:
+    """
+    Return the size of the body of the requests.PreparedRequest of the provided response or
+    exception.
+    """
+    return _get_size(getattr(getattr(response_or_error, 'request', None), 'body', None))
+
+
+def _get_response_bytes(response) -> int:
+    """
+    Return the size of the response body without reading it, so that streamed responses aren't
+    consumed.
+    """
+    headers = getattr(response, 'headers', None)
+    content_length = headers.get('Content-Length') if headers is not None else None
+    if isinstance(content_length, str) and content_length.isdigit():
+        return int(content_length)
+    return _get_size(getattr(response, '_content', None))
+
+
+def _get_error_status(e) -> Optional[int]:
+    response = getattr(e, 'response', None)
+    status = getattr(response, 'status_code', None)
+    if status is None:
+        # googleapiclient.errors.HttpError
+        status = getattr(getattr(e, 'resp', None), 'status', None)
+    return status if isinstance(status, int) else None
+
+
+def observe_request(client, method, endpoint, send, attempt=0, request_bytes=None):
+    """
+    Send a request, report it to the hook set with :func:`set_instrumentation`, and trace it with a
+    span named after its method and endpoint (see :func:`~dkutils.tracing.set_tracer`). The request
+    is sent without overhead if requests are neither instrumented nor traced.
+
+    Parameters
+    ----------
+    client : str
+        Name of the API client (e.g. datakitchen)
+    method : str
+        HTTP method of the request
+    endpoint : str
+        Endpoint template (see :func:`get_endpoint_template`)
+    send : callable
+        Function without arguments sending the request and returning its response
+    attempt : int, optional
+        Number of times the request was previously sent, i.e. 0 unless it's retried
+    request_bytes : int, optional
+        Size of the request body. If None, the size of the body of the response's request (i.e.
+        requests.Response.request.body) is used.
+
+    Returns
+    -------
+    object
+        Value returned by send.
+    """
+    instrumentation = _instrumentation
+    if instrumentation is None and not is_tracing():
+        return send()
+    method = method.upper()
+    span_attributes = {
+        'http.request.method': method,
+        'http.route': endpoint,
+        'dkutils.client': client,
+        'dkutils.attempt': attempt,
+    }
+    with start_as_current_span(f'{method} {endpoint}', attributes=span_attributes) as span:
+        start = time.perf_counter()
+        try:
+            response = send()
+        except Exception as e:
+            latency_secs = time.perf_counter() - start
+            status = _get_error_status(e)
+            if status is not None:
+                span.set_attribute('http.response.status_code', status)
+            if instrumentation is not None:
+                error_response = getattr(e, 'response', None)
+                instrumentation.on_request(
+                    RequestEvent(
+                        client=client,
+                        method=method,
+                        endpoint=endpoint,
+                        status=status,
+                        latency_secs=latency_secs,
+                        request_bytes=request_bytes if request_bytes is not None else _get_request_bytes(e),
+                        response_bytes=_get_response_bytes(error_response) if error_response is not None else 0,
+                        attempt=attempt,
+                        error=type(e).__name__
+                    )
+                )
+            raise
+        latency_secs = time.perf_counter() - start
+        status = getattr(response, 'status_code', None)
+        status = status if isinstance(status, int) else None
+        if status is not None:
+            span.set_attribute('http.response.status_code', status)
+        if instrumentation is not None:
+            instrumentation.on_request(
+                RequestEvent(
+                    client=client,
+                    method=method,
+                    endpoint=endpoint,
+                    status=status,
+                    latency_secs=latency_secs,
+                    request_bytes=request_bytes if request_bytes is not None else _get_request_bytes(response),
+                    response_bytes=_get_response_bytes(response),
+                    attempt=attempt,
+                    error=None
+                )
+            )
+    return response
+
+
+def observe_response(client, response, endpoint=None) -> None:
+    """
+    Report a request sent by a third party library to the hook set with :func:`set_instrumentation`,
+    using the elapsed time of its response (i.e. the time until its headers were received). Register
+    it as a response hook of the library's requests.Session.
+
+    Parameters
+    ----------
+    client : str
+        Name of the API client (e.g. jira)
+    response : requests.Response
+        Response of the request
+    endpoint : str, optional
+        Endpoint template. If None, the template of the response's URL is used (see
+        :func:`get_endpoint_template`).
+    """
+    instrumentation = _instrumentation
+    if instrumentation is None:
+        return
+    request = response.request
+    instrumentation.on_request(
+        RequestEvent(
+            client=client,
+            method=request.method.upper(),
+            endpoint=endpoint if endpoint is not None else get_endpoint_template(response.url),
+            status=response.status_code,
+            latency_secs=response.elapsed.total_seconds(),
+            request_bytes=_get_request_bytes(response),
+            response_bytes=_get_response_bytes(response),
+            attempt=0,
+            error=None
+        )
+    )
+
+
+class _RequestStats:
+
+    def __init__(self, bucket_count):
+        self.statuses = {}
+        self.retries = 0
+        self.errors = 0
+        self.latency_buckets = [0] * (bucket_count + 1)
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        self.request_bytes = 0
+        self.response_bytes = 0
+
+    @property
+    def count(self):
+        return sum(self.statuses.values())
+
+
+def _escape_label_value(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels) -> str:
+    return ','.join(f'{name}="{_escape_label_value(value)}"' for name, value in labels)
+
+
+class MetricsRegistry:
+
+    def __init__(self, latency_buckets=DEFAULT_LATENCY_BUCKETS):
+        """
+        Thread-safe, in-process registry of request metrics, aggregated per client, HTTP method, and
+        endpoint template. Install it with :func:`set_instrumentation`, then export the metrics with
+        :meth:`to_prometheus` or find the endpoints costing the most time with :meth:`summary`.
+
+        Parameters
+        ----------
+        latency_buckets : sequence of float, optional
+            Increasing upper bounds in seconds of the latency histogram buckets (default:
+            DEFAULT_LATENCY_BUCKETS). A +Inf bucket is always added.
+
+        Raises
+        ------
+        ValueError
+            If the latency buckets are not increasing.
+        """
+        latency_buckets = tuple(latency_buckets)
+        if any(lower >= upper for lower, upper in zip(latency_buckets, latency_buckets[1:])):
+            raise ValueError(f'Latency buckets must be increasing: {latency_buckets}')
+        self._latency_buckets = latency_buckets
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats = {}
+
+    def on_request(self, event: RequestEvent) -> None:
+        key = (event.client, event.method, event.endpoint)
+        if event.status is not None:
+            status = str(event.status)
+        else:
+            status = ERROR if event.error else OK
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = _RequestStats(len(self._latency_buckets))
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+            if event.attempt > 0:
+                stats.retries += 1
+            if event.error or (event.status is not None and event.status >= 400):
+                stats.errors += 1
+            stats.latency_buckets[bisect_left(self._latency_buckets, event.latency_secs)] += 1
+            stats.latency_sum += event.latency_secs
+            stats.latency_max = max(stats.latency_max, event.latency_secs)
+            stats.request_bytes += event.request_bytes
+            stats.response_bytes += event.response_bytes
+
+    def summary(self) -> list:
+        """
+        Returns
+        -------
+        list
+            A dictionary per client, method, and endpoint with the number of requests, retries (i.e.
+            requests sent again after a failure), errors (requests that raised an exception or
+            returned a 4xx or 5xx status code), and
+            bytes sent and received, along with the total, mean, and max latency in seconds. The
+            endpoints costing the most time come first.
+        """
+        with self._lock:
+            rows = [{
+                'client': client,
+                'method': method,
+                'endpoint': endpoint,
+                'requests': stats.count,
+                'retries': stats.retries,
+                'errors': stats.errors,
+                'total_secs': stats.latency_sum,
+                'mean_secs': stats.latency_sum / stats.count,
+                'max_secs': stats.latency_max,
+                'request_bytes': stats.request_bytes,
+                'response_bytes': stats.response_bytes,
+            } for (client, method, endpoint), stats in self._stats.items()]
+        return sorted(rows, key=lambda row: row['total_secs'], reverse=True)
+
+    def to_prometheus(self) -> str:
+        """
+        Returns
+        -------
+        str
+            The metrics in the Prometheus text exposition format, e.g. to be served by an HTTP
+            endpoint or written to a node exporter textfile.
+        """
+        labels = ('client', 'method', 'endpoint')
+        counters = (
+            ('dkutils_request_retries_total', 'Number of requests sent again after a failure.', 'retries'),
+            ('dkutils_request_sent_bytes_total', 'Number of request body bytes sent.', 'request_bytes'),
+            ('dkutils_request_received_bytes_total', 'Number of response body bytes received.', 'response_bytes'),
+        )
+        with self._lock:
+            stats_items = [(_format_labels(zip(labels, key)), stats) for key, stats in sorted(self._stats.items())]
+            metric = 'dkutils_requests_total'
+            lines = [f'# HELP {metric} Number of requests sent by the API clients.', f'# TYPE {metric} counter']
+            for key_labels, stats in stats_items:
+                for status, count in sorted(stats.statuses.items()):
+                    lines.append(f'{metric}{{{key_labels},status="{_escape_label_value(status)}"}} {count}')
+            for metric, help_text, attr in counters:
+                lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} counter']
+                for key_labels, stats in stats_items:
+                    lines.append(f'{metric}{{{key_labels}}} {getattr(stats, attr)}')
+            metric = 'dkutils_request_duration_seconds'
+            lines += [f'# HELP {metric} Request latency in seconds.', f'# TYPE {metric} histogram']
+            for key_labels, stats in stats_items:
+                cumulative_count = 0
+                for upper, count in zip(self._latency_buckets + ('+Inf', ), stats.latency_buckets):
+                    cumulative_count += count
+                    lines.append(f'{metric}_bucket{{{key_labels},le="{upper}"}} {cumulative_count}')
+                lines.append(f'{metric}_sum{{{key_labels}}} {stats.latency_sum!r}')
+                lines.append(f'{metric}_count{{{key_labels}}} {cumulative_count}')
+        return '\n'.join(lines) + '\n'
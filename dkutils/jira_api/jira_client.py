@@ -1,9 +1,13 @@
 import logging
-import pandas as pd
 
 from jira import JIRA
 from jira.exceptions import JIRAError
 
+from dkutils.instrumentation import JIRA_CLIENT, observe_response
+from dkutils.lazy_import import lazy_import
+
+pd = lazy_import('pandas')
+
 DEFAULT_FIELDS = [
     'created', 'creator', 'assignee', 'status', 'issuetype', 'priority', 'summary', 'description',
     'resolution', 'resolutiondate'
@@ -12,6 +16,14 @@ DEFAULT_FIELDS = [
 logger = logging.getLogger(__name__)
 
 
+def _observe_response(response, *args, **kwargs):
+    """
+    Response hook reporting the requests sent by the JIRA client (see
+    :func:`~dkutils.instrumentation.set_instrumentation`).
+    """
+    observe_response(JIRA_CLIENT, response)
+
+
 class JiraClient:
 
     def __init__(self, server, username, api_key):
@@ -29,6 +41,7 @@ class JiraClient:
         """
         options = {'server': server}
         self._client = JIRA(options, basic_auth=(username, api_key))
+        self._client._session.hooks['response'].append(_observe_response)
 
     def transition_issue(self, issue_key, status):
         """
@@ -0,0 +1,274 @@
+import codecs
+import json
+import logging
+
+from typing import Iterable, Iterator, Sequence
+
+logger = logging.getLogger(__name__)
+
+# JSON backend names
+JSON = 'json'
+ORJSON = 'orjson'
+
+_decoders = {JSON: json.loads}
+
+try:
+    import orjson
+    _decoders[ORJSON] = orjson.loads
+    _backend = ORJSON
+except ImportError:
+    _backend = JSON
+
+
+def register_json_backend(name, loads) -> None:
+    """
+    Register a JSON decoding function so that it may be selected with :func:`set_json_backend`.
+
+    Parameters
+    ----------
+    name : str
+        Name of the backend
+    loads : callable
+        Function accepting a str or bytes JSON document and returning the decoded object. It must
+        raise a ValueError (e.g. json.JSONDecodeError) if it fails to decode the document.
+    """
+    _decoders[name] = loads
+
+
+def set_json_backend(name) -> None:
+    """
+    Select the backend used by :func:`loads` and :func:`response_json`. By default, orjson is used
+    if it's installed (i.e. pip install DKUtils[orjson]), otherwise the standard library json module
+    is used.
+
+    Parameters
+    ----------
+    name : str
+        Name of a registered backend (e.g. json or orjson)
+
+    Raises
+    ------
+    ValueError
+        If the backend is not registered.
+    """
+    global _backend
+    if name not in _decoders:
+        raise ValueError(f'{name} is not one of the available JSON backends: {",".join(_decoders)}')
+    _backend = name
+
+
+def get_json_backend() -> str:
+    """
+    Return the name of the backend used by :func:`loads` and :func:`response_json`.
+    """
+    return _backend
+
+
+def get_json_backends() -> list:
+    """
+    Return the names of the registered backends.
+    """
+    return list(_decoders)
+
+
+def loads(data):
+    """
+    Decode a JSON document with the selected backend. Documents the selected backend rejects are
+    decoded with the standard library json module, so that values it tolerates (e.g. NaN, or
+    integers exceeding 64 bits) are still supported.
+
+    Parameters
+    ----------
+    data : str or bytes
+        JSON document
+
+    Raises
+    ------
+    json.JSONDecodeError
+        If the document is not valid JSON.
+
+    Returns
+    -------
+    object
+        Decoded document
+    """
+    if _backend != JSON:
+        try:
+            return _decoders[_backend](data)
+        except ValueError:
+            logger.debug(f'Failed to decode JSON with {_backend}, falling back to {JSON}')
+    return json.loads(data)
+
+
+def response_json(response):
+    """
+    Decode the JSON body of an HTTP response with the selected backend. Equivalent to
+    response.json(), but the raw response bytes are decoded directly, without first being converted
+    to a str.
+
+    Parameters
+    ----------
+    response : requests.Response
+        :class:`Response <Response>` object
+
+    Returns
+    -------
+    object
+        Decoded response body
+    """
+    content = getattr(response, 'content', None)
+    if not isinstance(content, bytes):
+        return response.json()
+    return loads(content)
+
+
+class _StreamingJSONReader:
+    """
+    Reader of a JSON document provided as a sequence of chunks. Only the unconsumed portion of the
+    document is buffered, so memory usage is bounded by the largest value decoded at once rather
+    than by the size of the document.
+    """
+
+    def __init__(self, chunks: Iterable) -> None:
+        self._chunks = iter(chunks)
+        self._text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self._json_decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+
+    def _read(self, min_chars: int = 1) -> bool:
+        """
+        Append at least min_chars characters to the buffer, unless the end of the document is
+        reached first. Return False if no characters could be appended.
+        """
+        if self._eof:
+            return False
+        self._buffer = self._buffer[self._pos:]
+        self._pos = 0
+        buffer_length = len(self._buffer)
+        for chunk in self._chunks:
+            self._buffer += self._text_decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+            if len(self._buffer) - buffer_length >= min_chars:
+                return True
+        self._buffer += self._text_decoder.decode(b'', final=True)
+        self._eof = True
+        return len(self._buffer) > buffer_length
+
+    def peek(self):
+        """
+        Return the next non-whitespace character without consuming it, or None at the end of the
+        document.
+        """
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in ' \t\n\r':
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._read():
+                return None
+
+    def next_char(self):
+        char = self.peek()
+        if char is None:
+            raise json.JSONDecodeError('Unexpected end of document', self._buffer, self._pos)
+        self._pos += 1
+        return char
+
+    def expect(self, expected_char) -> None:
+        char = self.next_char()
+        if char != expected_char:
+            raise json.JSONDecodeError(
+                f'Expecting {expected_char!r}, found {char!r}', self._buffer, self._pos - 1
+            )
+
+    def decode_value(self):
+        """
+        Decode and consume the next value.
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = self._json_decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                # The value may be incomplete, read at least as much again before retrying
+                if not self._read(max(len(self._buffer) - self._pos, 1)):
+                    raise
+                continue
+            # A number at the end of the buffer may continue in the next chunk
+            if end == len(self._buffer) and self._read():
+                continue
+            self._pos = end
+            return value
+
+
+def _iter_json_array(reader: _StreamingJSONReader, path: Sequence) -> Iterator:
+    if reader.peek() == 'n':
+        reader.decode_value()
+        return
+
+    if not path:
+        reader.expect('[')
+        if reader.peek() == ']':
+            return
+        while True:
+            yield reader.decode_value()
+            if reader.next_char() == ']':
+                return
+
+    key, path = path[0], path[1:]
+    if isinstance(key, int):
+        reader.expect('[')
+        if reader.peek() == ']':
+            return
+        index = 0
+        while True:
+            if index == key:
+                yield from _iter_json_array(reader, path)
+                return
+            reader.decode_value()
+            if reader.next_char() == ']':
+                return
+            index += 1
+    else:
+        reader.expect('{')
+        if reader.peek() == '}':
+            return
+        while True:
+            name = reader.decode_value()
+            reader.expect(':')
+            if name == key:
+                yield from _iter_json_array(reader, path)
+                return
+            reader.decode_value()
+            if reader.next_char() == '}':
+                return
+
+
+def iter_json_array(chunks: Iterable, path: Sequence = ()) -> Iterator:
+    """
+    Incrementally parse a JSON document and yield the items of the array found at the provided
+    path, one at a time. Values preceding the array are skipped and the remainder of the document
+    is not read, so arbitrarily large arrays are processed with bounded memory. Nothing is yielded
+    if the path doesn't exist in the document or leads to null.
+
+    Parameters
+    ----------
+    chunks : iterable
+        Iterable of bytes (UTF-8) or str chunks of the JSON document (e.g.
+        requests.Response.iter_content())
+    path : sequence, optional
+        Sequence of object keys and array indexes leading to the array (e.g.
+        ('servings', 0, 'log', 'lines')). If empty, the document itself must be an array.
+
+    Raises
+    ------
+    json.JSONDecodeError
+        If the document is not valid JSON, or if the value at path isn't an array.
+
+    Returns
+    -------
+    generator
+        Generator of the array's decoded items.
+    """
+    yield from _iter_json_array(_StreamingJSONReader(chunks), path)
@@ -0,0 +1,86 @@
+import importlib
+import sys
+import types
+
+from typing import Iterable
+
+
+class LazyModule(types.ModuleType):
+
+    def __init__(self, name):
+        """
+        Stand-in for a module that is only imported when one of its attributes is first accessed.
+        Use :func:`lazy_import` to create it.
+
+        Parameters
+        ----------
+        name : str
+            Absolute name of the module (e.g. pandas or googleapiclient.discovery)
+        """
+        super().__init__(name)
+
+    def __getattr__(self, name):
+        # Only called for attributes not set on the stand-in (e.g. by unittest.mock.patch), and
+        # importing an imported module is a lookup in sys.modules
+        return getattr(importlib.import_module(self.__name__), name)
+
+    def __dir__(self):
+        return dir(importlib.import_module(self.__name__))
+
+    def __repr__(self):
+        return f'<lazy module {self.__name__!r}>'
+
+
+def lazy_import(name):
+    """
+    Defer importing a module with a high import time (e.g. pandas or sqlalchemy) until it's used, so
+    that importing a dkutils module that only needs it in some functions stays fast.
+
+    Parameters
+    ----------
+    name : str
+        Absolute name of the module
+
+    Returns
+    -------
+    module
+        The module if it's already imported, otherwise a :class:`LazyModule` importing it on first
+        attribute access. Since the module is only imported then, an ImportError for a missing
+        optional dependency is raised by the first function using it.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return LazyModule(name)
+
+
+def lazy_submodules(package, submodules: Iterable[str]):
+    """
+    Return the module __getattr__ and __dir__ functions (see PEP 562) of a package, so that its
+    submodules are imported when first accessed as attributes of the package (e.g.
+    dkutils.datakitchen_api.tests_utils after import dkutils) rather than when it's imported.
+
+    Parameters
+    ----------
+    package : str
+        Name of the package, i.e. __name__ in its __init__ module
+    submodules : iterable of str
+        Names of the submodules of the package
+
+    Returns
+    -------
+    tuple
+        The __getattr__ and __dir__ functions of the package.
+    """
+    submodules = frozenset(submodules)
+    package_module = sys.modules[package]
+
+    def __getattr__(name):
+        if name in submodules:
+            return importlib.import_module(f'{package}.{name}')
+        raise AttributeError(f'module {package!r} has no attribute {name!r}')
+
+    def __dir__():
+        return sorted(set(vars(package_module)) | submodules)
+
+    return __getattr__, __dir__
@@ -0,0 +1,267 @@
+import logging
+import threading
+import time
+
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RATE = 10
+DEFAULT_MAX_CONCURRENT = 8
+DEFAULT_MIN_RATE = 0.5
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_RETRY_AFTER_SECS = 1
+DEFAULT_MAX_RETRY_AFTER_SECS = 300
+DEFAULT_DECREASE_FACTOR = 0.5
+DEFAULT_INCREASE_FRACTION = 0.05
+
+TOO_MANY_REQUESTS = 429
+SERVICE_UNAVAILABLE = 503
+
+
+def get_retry_after_secs(response):
+    """
+    Parse the Retry-After header of an HTTP response.
+
+    Parameters
+    ----------
+    response : requests.Response
+        :class:`Response <Response>` object
+
+    Returns
+    -------
+    float or None
+        Number of seconds to wait before retrying, or None if the header is missing or invalid.
+    """
+    headers = getattr(response, 'headers', None) or {}
+    retry_after = headers.get('Retry-After')
+    if not isinstance(retry_after, str):
+        return None
+    try:
+        return max(float(retry_after), 0)
+    except ValueError:
+        pass
+    try:
+        retry_time = parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        logger.debug(f'Ignoring invalid Retry-After header: {retry_after}')
+        return None
+    if retry_time.tzinfo is None:
+        retry_time = retry_time.replace(tzinfo=timezone.utc)
+    return max((retry_time - datetime.now(timezone.utc)).total_seconds(), 0)
+
+
+def is_throttled_response(response) -> bool:
+    """
+    Return True if the provided response throttled its request, i.e. if its status code is 429 Too
+    Many Requests, or 503 Service Unavailable with a Retry-After header.
+    """
+    status_code = getattr(response, 'status_code', None)
+    return status_code == TOO_MANY_REQUESTS or (
+        status_code == SERVICE_UNAVAILABLE and get_retry_after_secs(response) is not None
+    )
+
+
+class TokenBucket:
+
+    def __init__(self, rate, capacity=None):
+        """
+        Thread-safe token bucket, refilled continuously at the provided rate up to its capacity.
+
+        Parameters
+        ----------
+        rate : float
+            Number of tokens added per second.
+        capacity : float, optional
+            Max number of tokens, i.e. the largest burst allowed after a period of inactivity
+            (default: max(rate, 1)).
+        """
+        self._rate = rate
+        self._capacity = capacity if capacity is not None else max(rate, 1)
+        self._tokens = self._capacity
+        self._last_refill_time = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self._tokens + (now - self._last_refill_time) * self._rate, self._capacity)
+        self._last_refill_time = now
+
+    @property
+    def rate(self):
+        return self._rate
+
+    @rate.setter
+    def rate(self, rate):
+        with self._lock:
+            self._refill()
+            self._rate = rate
+
+    def reserve(self, tokens=1):
+        """
+        Take tokens from the bucket, going into debt if there aren't enough of them.
+
+        Parameters
+        ----------
+        tokens : float, optional
+            Number of tokens to take (default: 1).
+
+        Returns
+        -------
+        float
+            Number of seconds to wait before the tokens may be used.
+        """
+        with self._lock:
+            self._refill()
+            self._tokens -= tokens
+            return -self._tokens / self._rate if self._tokens < 0 else 0
+
+    def acquire(self, tokens=1):
+        """
+        Take tokens from the bucket, sleeping until they are available.
+        """
+        wait_secs = self.reserve(tokens)
+        if wait_secs:
+            time.sleep(wait_secs)
+
+
+class RateLimiter:
+
+    def __init__(
+        self,
+        rate=DEFAULT_RATE,
+        max_concurrent=DEFAULT_MAX_CONCURRENT,
+        endpoint_rates=None,
+        min_rate=DEFAULT_MIN_RATE,
+        max_retries=DEFAULT_MAX_RETRIES,
+        decrease_factor=DEFAULT_DECREASE_FACTOR,
+        increase_fraction=DEFAULT_INCREASE_FRACTION,
+        max_retry_after_secs=DEFAULT_MAX_RETRY_AFTER_SECS,
+    ):
+        """
+        Limit the rate and concurrency of the requests sent to an API, adapting to server feedback.
+        When the server throttles a request (i.e. 429 Too Many Requests, or 503 Service Unavailable
+        with a Retry-After header), the request rates are multiplied by decrease_factor and no
+        request is sent until the Retry-After delay elapses. Each successful request then increases
+        the rates by increase_fraction of their configured value, until they are restored. Share
+        an instance between clients (e.g. across threads) to share the limits.
+
+        Parameters
+        ----------
+        rate : float, optional
+            Max number of requests per second across all endpoints (default: 10).
+        max_concurrent : int, optional
+            Max number of requests in flight at once (default: 8).
+        endpoint_rates : dict, optional
+            Dictionary keyed by endpoint (e.g. order or recipe) and valued by the max number of
+            requests per second to that endpoint, in addition to the overall rate.
+        min_rate : float, optional
+            Rates are never decreased below this number of requests per second (default: 0.5).
+        max_retries : int, optional
+            Number of times a throttled request is retried (default: 3).
+        decrease_factor : float, optional
+            Factor by which rates are multiplied when a request is throttled (default: 0.5).
+        increase_fraction : float, optional
+            Fraction of the configured rate added to a decreased rate after each successful request
+            (default: 0.05).
+        max_retry_after_secs : float, optional
+            Max number of seconds requests are paused for, whatever the Retry-After delay
+            (default: 300).
+
+        Raises
+        ------
+        ValueError
+            If a rate is not positive or max_concurrent is less than 1.
+        """
+        endpoint_rates = dict(endpoint_rates or {})
+        for rate_value in [rate, min_rate, *endpoint_rates.values()]:
+            if rate_value <= 0:
+                raise ValueError(f'Rates must be positive, not {rate_value}')
+        if max_concurrent < 1:
+            raise ValueError(f'Max concurrent must be at least 1, not {max_concurrent}')
+        self._max_rates = {None: rate, **endpoint_rates}
+        self._buckets = {key: TokenBucket(key_rate) for key, key_rate in self._max_rates.items()}
+        self._semaphore = threading.BoundedSemaphore(max_concurrent)
+        self._min_rate = min_rate
+        self._max_retries = max_retries
+        self._decrease_factor = decrease_factor
+        self._increase_fraction = increase_fraction
+        self._max_retry_after_secs = max_retry_after_secs
+        self._pause_until = 0
+        self._lock = threading.Lock()
+
+    @property
+    def max_retries(self):
+        return self._max_retries
+
+    def get_rate(self, endpoint=None):
+        """
+        Return the current rate in requests per second of the provided endpoint, or the overall rate
+        if endpoint is None or has no rate of its own.
+        """
+        bucket = self._buckets.get(endpoint, self._buckets[None])
+        return bucket.rate
+
+    def _get_keys(self, endpoint):
+        return [None, endpoint] if endpoint is not None and endpoint in self._buckets else [None]
+
+    @contextmanager
+    def limit(self, endpoint=None):
+        """
+        Context manager wrapping a request to the provided endpoint. Waits until the request may be
+        sent without exceeding the rates, the concurrency, or a Retry-After delay.
+
+        Parameters
+        ----------
+        endpoint : str, optional
+            Endpoint of the request (e.g. order or recipe).
+        """
+        wait_secs = max(self._buckets[key].reserve() for key in self._get_keys(endpoint))
+        wait_secs = max(wait_secs, self._pause_until - time.monotonic())
+        if wait_secs > 0:
+            time.sleep(wait_secs)
+        with self._semaphore:
+            yield
+
+    def on_response(self, endpoint, response):
+        """
+        Adapt the rates to the response of a request sent within :meth:`limit`.
+
+        Parameters
+        ----------
+        endpoint : str
+            Endpoint of the request.
+        response : requests.Response
+            :class:`Response <Response>` object
+
+        Returns
+        -------
+        float or None
+            Number of seconds after which a throttled request may be retried, or None if the
+            request wasn't throttled.
+        """
+        status_code = getattr(response, 'status_code', None)
+        throttled = is_throttled_response(response)
+        with self._lock:
+            for key in self._get_keys(endpoint):
+                bucket, max_rate = self._buckets[key], self._max_rates[key]
+                if throttled:
+                    bucket.rate = max(bucket.rate * self._decrease_factor, min(self._min_rate, max_rate))
+                elif status_code is None or status_code < 400:
+                    if bucket.rate < max_rate:
+                        bucket.rate = min(bucket.rate + max_rate * self._increase_fraction, max_rate)
+            if not throttled:
+                return None
+
+            retry_after_secs = get_retry_after_secs(response)
+            if retry_after_secs is None:
+                retry_after_secs = DEFAULT_RETRY_AFTER_SECS
+            retry_after_secs = min(retry_after_secs, self._max_retry_after_secs)
+            self._pause_until = max(self._pause_until, time.monotonic() + retry_after_secs)
+        logger.warning(
+            f'Request to {endpoint} throttled with status {status_code}, decreased rate to '
+            f'{self.get_rate(endpoint):.2f} requests per second'
+        )
+        return retry_after_secs
@@ -1,8 +1,9 @@
-import pandas as pd
-from sqlalchemy import create_engine
-
+from dkutils.lazy_import import lazy_import
 from dkutils.util import FileNameGenerator
 
+pd = lazy_import('pandas')
+sqlalchemy = lazy_import('sqlalchemy')
+
 
 class DataFrameWrapper:
     """
@@ -11,7 +12,7 @@ class DataFrameWrapper:
     """
 
     def __init__(self, connection_string: str):
-        self.engine = create_engine(connection_string)
+        self.engine = sqlalchemy.create_engine(connection_string)
         self.file_name_generator = FileNameGenerator()
 
     @classmethod
@@ -0,0 +1,357 @@
+import copy
+import inspect
+import logging
+import random
+import threading
+import time
+
+from functools import wraps
+
+from requests.exceptions import ChunkedEncodingError, ConnectionError, HTTPError, Timeout
+
+from dkutils.lazy_import import lazy_import
+from dkutils.rate_limiter import (
+    DEFAULT_MAX_RETRY_AFTER_SECS,
+    TOO_MANY_REQUESTS,
+    get_retry_after_secs,
+    is_throttled_response,
+)
+
+# Only used to retry coroutine functions
+asyncio = lazy_import('asyncio')
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TRIES = 3
+DEFAULT_DELAY = 2
+DEFAULT_BACKOFF = 2
+DEFAULT_MAX_DELAY = 60
+DEFAULT_BUDGET_RATIO = 0.2
+DEFAULT_BUDGET_MIN_RETRIES = 10
+DEFAULT_BUDGET_MAX_RETRIES = 20
+
+
+def _get_status_code(e):
+    response = getattr(e, 'response', None)
+    return getattr(response, 'status_code', None)
+
+
+def is_server_error(e) -> bool:
+    """
+    Return True if the provided exception is an HTTPError with a 5xx status code.
+    """
+    status_code = _get_status_code(e)
+    return isinstance(e, HTTPError) and status_code is not None and 500 <= status_code < 600
+
+
+def is_retryable_error(e) -> bool:
+    """
+    Return True if the request that raised the provided exception may succeed if retried, i.e. if it
+    failed with a 5xx or 429 status code, a connection error (e.g. connection reset), or a timeout.
+    """
+    if isinstance(e, HTTPError):
+        return is_server_error(e) or _get_status_code(e) == TOO_MANY_REQUESTS
+    return isinstance(e, (ConnectionError, Timeout, ChunkedEncodingError))
+
+
+def is_throttled_error(e) -> bool:
+    """
+    Return True if the provided exception is an HTTPError of a throttled request (see
+    :func:`~dkutils.rate_limiter.is_throttled_response`).
+    """
+    return isinstance(e, HTTPError) and is_throttled_response(getattr(e, 'response', None))
+
+
+class RetryBudget:
+
+    def __init__(
+        self,
+        ratio=DEFAULT_BUDGET_RATIO,
+        min_retries=DEFAULT_BUDGET_MIN_RETRIES,
+        max_retries=DEFAULT_BUDGET_MAX_RETRIES
+    ):
+        """
+        Limit retries to a proportion of calls, so that retries cannot multiply the load on a
+        failing service. Each call deposits ratio retries in the budget and each retry withdraws
+        one. The balance is capped at max_retries, so that the calls made while a service is
+        healthy don't allow a burst of retries when it starts failing.
+
+        Parameters
+        ----------
+        ratio : float, optional
+            Number of retries allowed per call (default: 0.2).
+        min_retries : int, optional
+            Number of retries allowed before any call, e.g. at startup (default: 10).
+        max_retries : int, optional
+            Max number of retries allowed in a row, regardless of the number of calls
+            (default: 20). If less than min_retries, min_retries is used.
+        """
+        self._ratio = ratio
+        self._balance = float(min_retries)
+        self._max_balance = float(max(min_retries, max_retries))
+        self._lock = threading.Lock()
+
+    @property
+    def balance(self):
+        return self._balance
+
+    def deposit(self):
+        """
+        Record a call.
+        """
+        with self._lock:
+            self._balance = min(self._balance + self._ratio, self._max_balance)
+
+    def withdraw(self) -> bool:
+        """
+        Record a retry, if the budget allows it.
+
+        Returns
+        -------
+        bool
+            True if the retry is allowed, False if the budget is exhausted.
+        """
+        with self._lock:
+            if self._balance < 1:
+                return False
+            self._balance -= 1
+            return True
+
+
+class RetryMetrics:
+
+    def __init__(self):
+        """
+        Thread-safe counters of the calls made through a :class:`RetryPolicy`.
+        """
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._counts = {
+                'calls': 0,
+                'retries': 0,
+                'failures': 0,
+                'budget_exhausted': 0,
+                'time_lost_secs': 0.0,
+            }
+
+    def increment(self, name, value=1):
+        with self._lock:
+            self._counts[name] += value
+
+    def snapshot(self) -> dict:
+        """
+        Returns
+        -------
+        dict
+            Dictionary with the number of calls, retries, failures (calls that raised an error after
+            all their tries), budget_exhausted (retries denied by the budget), and time_lost_secs
+            (total time spent waiting before retries).
+        """
+        with self._lock:
+            return dict(self._counts)
+
+
+class RetryPolicy:
+
+    def __init__(
+        self,
+        tries=DEFAULT_TRIES,
+        delay=DEFAULT_DELAY,
+        backoff=DEFAULT_BACKOFF,
+        max_delay=DEFAULT_MAX_DELAY,
+        jitter=True,
+        is_retryable=is_retryable_error,
+        budget=None,
+        metrics=None,
+        max_retry_after=DEFAULT_MAX_RETRY_AFTER_SECS,
+    ):
+        """
+        Retry failed calls with an exponential backoff. With jitter, the delay before each retry is
+        drawn uniformly between 0 and the exponential backoff delay ("full jitter"), so that clients
+        failing at the same time don't retry in lockstep. The delay before retrying a request
+        throttled with a Retry-After header is at least the Retry-After delay, up to max_delay and
+        max_retry_after.
+
+        A policy may be used as a decorator of functions or coroutine functions, or via
+        :meth:`call` and :meth:`call_async`. Share a policy between calls to share its budget and
+        metrics.
+
+        Parameters
+        ----------
+        tries : int, optional
+            Number of times to try (not retry) before giving up (default: 3).
+        delay : float, optional
+            Initial delay between retries in seconds (default: 2).
+        backoff : float, optional
+            Backoff multiplier e.g. value of 2 will double the delay each retry (default: 2).
+        max_delay : float, optional
+            Max delay between retries in seconds (default: 60).
+        jitter : bool, optional
+            If True, randomize delays with full jitter (default: True).
+        is_retryable : callable, optional
+            Function accepting an exception and returning True if the call should be retried
+            (default: :func:`is_retryable_error`).
+        budget : RetryBudget, optional
+            Budget limiting the proportion of calls that are retried. If None, retries are only
+            limited by tries.
+        metrics : RetryMetrics, optional
+            Counters updated by the policy (default: new :class:`RetryMetrics`).
+        max_retry_after : float, optional
+            Max delay in seconds honored from a Retry-After header, so that a large value cannot
+            block the caller indefinitely (default: 300).
+
+        Raises
+        ------
+        ValueError
+            If tries is less than 1.
+        """
+        if tries < 1:
+            raise ValueError(f'Tries must be at least 1, not {tries}')
+        self._tries = tries
+        self._delay = delay
+        self._backoff = backoff
+        self._max_delay = max_delay
+        self._jitter = jitter
+        self._is_retryable = is_retryable
+        self._budget = budget
+        self._metrics = metrics if metrics is not None else RetryMetrics()
+        self._max_retry_after = max_retry_after
+
+    @property
+    def metrics(self) -> RetryMetrics:
+        return self._metrics
+
+    @property
+    def budget(self) -> RetryBudget:
+        return self._budget
+
+    def get_delay(self, retry, error=None) -> float:
+        """
+        Compute the delay in seconds before the provided retry (starting at 0) of a call that
+        failed with the provided error.
+        """
+        delay = min(self._delay * self._backoff**retry, self._max_delay)
+        if self._jitter:
+            delay = random.uniform(0, delay)
+        retry_after_secs = get_retry_after_secs(getattr(error, 'response', None))
+        if retry_after_secs is not None:
+            delay = max(delay, min(retry_after_secs, self._max_delay, self._max_retry_after))
+        return delay
+
+    def excluding(self, is_excluded) -> 'RetryPolicy':
+        """
+        Return a copy of this policy that doesn't retry the errors for which is_excluded returns
+        True, e.g. :func:`is_throttled_error` when throttled requests are already retried by a
+        :class:`~dkutils.rate_limiter.RateLimiter`. The copy shares the budget and metrics of this
+        policy.
+        """
+        policy = copy.copy(self)
+        is_retryable = self._is_retryable
+        policy._is_retryable = lambda e: not is_excluded(e) and is_retryable(e)
+        return policy
+
+    def _get_retry_delay(self, retry, error, name):
+        """
+        Return the delay before retrying a call that failed with the provided error, or None if it
+        should not be retried.
+        """
+        if retry + 1 >= self._tries or not self._is_retryable(error):
+            self._metrics.increment('failures')
+            return None
+        if self._budget is not None and not self._budget.withdraw():
+            logger.warning(f'{error}, Retry budget exhausted, not retrying {name}')
+            self._metrics.increment('budget_exhausted')
+            self._metrics.increment('failures')
+            return None
+        delay = self.get_delay(retry, error)
+        logger.warning(f'{error}, Retrying {name} in {delay:.2f} seconds...')
+        self._metrics.increment('retries')
+        self._metrics.increment('time_lost_secs', delay)
+        return delay
+
+    def _start_call(self):
+        self._metrics.increment('calls')
+        if self._budget is not None:
+            self._budget.deposit()
+
+    def call(self, f, *args, **kwargs):
+        """
+        Call the provided function, retrying it according to the policy.
+
+        Returns
+        -------
+        object
+            Value returned by the function.
+        """
+        self._start_call()
+        retry = 0
+        while True:
+            try:
+                return f(*args, **kwargs)
+            except Exception as e:
+                delay = self._get_retry_delay(retry, e, getattr(f, '__name__', f))
+                if delay is None:
+                    raise
+            time.sleep(delay)
+            retry += 1
+
+    async def call_async(self, f, *args, **kwargs):
+        """
+        Await the provided coroutine function, retrying it according to the policy. Delays are
+        awaited with asyncio.sleep, so the event loop isn't blocked.
+
+        Returns
+        -------
+        object
+            Value returned by the coroutine.
+        """
+        self._start_call()
+        retry = 0
+        while True:
+            try:
+                return await f(*args, **kwargs)
+            except Exception as e:
+                delay = self._get_retry_delay(retry, e, getattr(f, '__name__', f))
+                if delay is None:
+                    raise
+            await asyncio.sleep(delay)
+            retry += 1
+
+    def __call__(self, f):
+        if inspect.iscoroutinefunction(f):
+
+            @wraps(f)
+            async def f_retry_async(*args, **kwargs):
+                return await self.call_async(f, *args, **kwargs)
+
+            return f_retry_async
+
+        @wraps(f)
+        def f_retry(*args, **kwargs):
+            return self.call(f, *args, **kwargs)
+
+        return f_retry
+
+
+# Retries the requests of clients without a retry policy, without a budget, as
+# dkutils.decorators.retry_50X_httperror did before clients could retry their own requests
+FALLBACK_RETRY_POLICY = RetryPolicy()
+
+
+def call_with_fallback_retry(retry_policy, f, *args, **kwargs):
+    """
+    Call the provided function, retrying it with :data:`FALLBACK_RETRY_POLICY` only if
+    retry_policy is None. Pass the retry_policy of the client making the requests in f, so that
+    requests already retried by their client aren't retried again.
+
+    Returns
+    -------
+    object
+        Value returned by the function.
+    """
+    if retry_policy is not None:
+        return f(*args, **kwargs)
+    return FALLBACK_RETRY_POLICY.call(f, *args, **kwargs)
@@ -1,8 +1,15 @@
 from enum import Enum
+from functools import partial
+from itertools import count
 
 import requests
 
 from dkutils.constants import (API_GET, API_POST)
+from dkutils.instrumentation import DATACOLLECTOR_CLIENT, get_endpoint_template, observe_request
+
+# API path segments that are endpoint names rather than identifiers (i.e. pipeline ids), used to
+# aggregate request metrics per endpoint
+ENDPOINT_NAMES = {'pipeline', 'resetOffset', 'start', 'status', 'stop'}
 
 
 class PipelineStatus(Enum):
@@ -27,7 +34,7 @@ class PipelineStatus(Enum):
 
 class DataCollectorClient:
 
-    def __init__(self, host, port, username, password):
+    def __init__(self, host, port, username, password, retry_policy=None, circuit_breaker=None):
         """
         Client object for invoking `StreamSets Data Collector
         REST API <https://streamsets.com/blog/retrieving-metrics-via-streamsets-data-collector-rest-api/>`_
@@ -42,10 +49,19 @@ class DataCollectorClient:
           Username to authenticate when making REST API calls.
         password : str
           Password to authenticate when making REST API calls.
+        retry_policy : RetryPolicy, optional
+          :class:`~dkutils.retry.RetryPolicy` for retrying REST API calls that fail with a
+          retryable error. If None, failed calls are not retried.
+        circuit_breaker : CircuitBreaker, optional
+          :class:`~dkutils.circuit_breaker.CircuitBreaker` tracking failures per endpoint (i.e. the
+          first element of the endpoint path, e.g. pipeline), so that calls to an endpoint that keeps
+          failing raise a CircuitBreakerOpenError without being made. If None, calls are always made.
 
         """
         self._base_url = f'http://{host}:{port}/rest/v1/'
         self._auth = (username, password)
+        self._retry_policy = retry_policy
+        self._circuit_breaker = circuit_breaker
 
     def _validate_pipline_id(self, pipeline_id):
         """Ensure that the pipeline_id is given"""
@@ -69,6 +85,8 @@ class DataCollectorClient:
         ------
         HTTPError
             If the request fails.
+        CircuitBreakerOpenError
+            If a circuit breaker is configured and the endpoint's circuit is open.
 
         Returns
         -------
@@ -77,11 +95,29 @@ class DataCollectorClient:
         """
         api_request = getattr(requests, http_method)
         api_path = f'{self._base_url}{"/".join(args)}'
-        response = api_request(
-            api_path, auth=self._auth, headers={'X-Requested-By': 'DataKitchen'}, json=kwargs
-        )
-        response.raise_for_status()
-        return response
+
+        endpoint_template = get_endpoint_template('/'.join(args), ENDPOINT_NAMES)
+        attempts = count()
+
+        def send_request():
+            response = observe_request(
+                DATACOLLECTOR_CLIENT,
+                http_method,
+                endpoint_template,
+                partial(
+                    api_request, api_path, auth=self._auth, headers={'X-Requested-By': 'DataKitchen'}, json=kwargs
+                ),
+                attempt=next(attempts)
+            )
+            response.raise_for_status()
+            return response
+
+        send = send_request
+        if self._circuit_breaker is not None:
+            send = partial(self._circuit_breaker.call, args[0] if args else None, send_request)
+        if self._retry_policy is None:
+            return send()
+        return self._retry_policy.call(send)
 
     def _pipeline_operation(self, http_method, pipeline_id, operation, **kwargs):
         """
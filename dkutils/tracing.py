@@ -0,0 +1,347 @@
+import contextvars
+import json
+import logging
+import os
+import sys
+import threading
+import time
+
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+from typing import Iterable
+
+logger = logging.getLogger(__name__)
+
+# Span statuses
+UNSET = 'UNSET'
+ERROR = 'ERROR'
+
+_tracer = None
+
+_current_span = contextvars.ContextVar('dkutils_current_span', default=None)
+
+
+class _NoOpSpan:
+
+    def set_attribute(self, key, value) -> None:
+        pass
+
+    def set_attributes(self, attributes) -> None:
+        pass
+
+    def is_recording(self) -> bool:
+        return False
+
+
+_NO_OP_SPAN_CONTEXT = nullcontext(_NoOpSpan())
+
+
+def set_tracer(tracer) -> None:
+    """
+    Set the tracer creating spans around the high level operations of dkutils (e.g.
+    DataKitchenClient.create_and_monitor_orders, OrderRunMonitor.monitor, token and attribute
+    validation, and event publishing) and the requests sent by the API clients. Operations are not
+    traced by default.
+
+    Parameters
+    ----------
+    tracer : object
+        Object with a start_as_current_span method accepting a span name and an optional attributes
+        dictionary, and returning a context manager yielding a span with a set_attribute method.
+        Either a :class:`Tracer` or an OpenTelemetry tracer (e.g.
+        opentelemetry.trace.get_tracer('dkutils')). None stops tracing.
+    """
+    global _tracer
+    _tracer = tracer
+
+
+def get_tracer():
+    """
+    Return the tracer set with :func:`set_tracer`, or None if operations are not traced.
+    """
+    return _tracer
+
+
+def is_tracing() -> bool:
+    return _tracer is not None
+
+
+def start_as_current_span(name, attributes=None):
+    """
+    Start a span with the tracer set with :func:`set_tracer`, as a child of the current span.
+
+    Parameters
+    ----------
+    name : str
+        Name of the span (e.g. DataKitchenClient.create_and_monitor_orders)
+    attributes : dict, optional
+        Span attributes, valued by str, bool, int, or float
+
+    Returns
+    -------
+    context manager
+        Context manager yielding the span, ended on exit. If operations are not traced, the span
+        ignores its attributes.
+    """
+    tracer = _tracer
+    if tracer is None:
+        return _NO_OP_SPAN_CONTEXT
+    return tracer.start_as_current_span(name, attributes=attributes)
+
+
+def traced(name=None):
+    """
+    Trace each call of the decorated function with a span (see :func:`start_as_current_span`).
+
+    Parameters
+    ----------
+    name : str, optional
+        Name of the span (default: qualified name of the function)
+    """
+
+    def decorator(f):
+        span_name = name or f.__qualname__
+
+        @wraps(f)
+        def f_traced(*args, **kwargs):
+            tracer = _tracer
+            if tracer is None:
+                return f(*args, **kwargs)
+            with tracer.start_as_current_span(span_name):
+                return f(*args, **kwargs)
+
+        return f_traced
+
+    return decorator
+
+
+class Span:
+
+    def __init__(self, name, trace_id, span_id, parent_id=None, attributes=None):
+        """
+        Timed operation recorded by a :class:`Tracer`. Its fields follow the OpenTelemetry data
+        model: ids are hex strings and times are nanoseconds since the epoch.
+        """
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.attributes = dict(attributes) if attributes else {}
+        self.events = []
+        self.status = UNSET
+        self.start_time = time.time_ns()
+        self.end_time = None
+        self.thread_name = threading.current_thread().name
+
+    def set_attribute(self, key, value) -> None:
+        self.attributes[key] = value
+
+    def set_attributes(self, attributes) -> None:
+        self.attributes.update(attributes)
+
+    def is_recording(self) -> bool:
+        return self.end_time is None
+
+    def record_exception(self, exception) -> None:
+        self.status = ERROR
+        self.events.append({
+            'name': 'exception',
+            'timestamp': time.time_ns(),
+            'attributes': {
+                'exception.type': type(exception).__name__,
+                'exception.message': str(exception),
+            },
+        })
+
+    def end(self) -> None:
+        if self.end_time is None:
+            self.end_time = time.time_ns()
+
+    @property
+    def duration_secs(self) -> float:
+        return ((self.end_time or time.time_ns()) - self.start_time) / 1e9
+
+    def to_dict(self) -> dict:
+        return {
+            'name': self.name,
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'start_time': self.start_time,
+            'end_time': self.end_time,
+            'duration_secs': self.duration_secs,
+            'thread_name': self.thread_name,
+            'status': self.status,
+            'attributes': self.attributes,
+            'events': self.events,
+        }
+
+
+class Tracer:
+
+    def __init__(self, exporter):
+        """
+        Lightweight tracer recording spans in process, for use when the OpenTelemetry SDK isn't
+        available. Spans are nested in the current span of the calling thread or task, and exported
+        when they end.
+
+        Parameters
+        ----------
+        exporter : object
+            Object with an export method accepting a list of ended :class:`Span` objects (e.g.
+            :class:`ConsoleSpanExporter` or :class:`FileSpanExporter`).
+        """
+        self._exporter = exporter
+
+    @contextmanager
+    def start_as_current_span(self, name, attributes=None):
+        parent = _current_span.get()
+        span = Span(
+            name,
+            trace_id=parent.trace_id if parent is not None else os.urandom(16).hex(),
+            span_id=os.urandom(8).hex(),
+            parent_id=parent.span_id if parent is not None else None,
+            attributes=attributes
+        )
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_exception(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+            try:
+                self._exporter.export([span])
+            except Exception as e:
+                logger.warning(f'Failed to export span {name}: {e}')
+
+
+def get_current_span():
+    """
+    Return the current :class:`Span` recorded by a :class:`Tracer`, or None.
+    """
+    return _current_span.get()
+
+
+class InMemorySpanExporter:
+
+    def __init__(self):
+        """
+        Keep the spans in memory, e.g. to analyze them in process with :func:`to_folded_stacks`.
+        """
+        self._spans = []
+        self._lock = threading.Lock()
+
+    def export(self, spans) -> None:
+        with self._lock:
+            self._spans.extend(spans)
+
+    def get_finished_spans(self) -> list:
+        with self._lock:
+            return list(self._spans)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._spans = []
+
+    def shutdown(self) -> None:
+        pass
+
+
+class ConsoleSpanExporter:
+
+    def __init__(self, out=None):
+        """
+        Write each span as a line of JSON.
+
+        Parameters
+        ----------
+        out : file, optional
+            Text stream the spans are written to (default: sys.stdout)
+        """
+        self._out = out
+        self._lock = threading.Lock()
+
+    def export(self, spans) -> None:
+        out = self._out if self._out is not None else sys.stdout
+        lines = ''.join(json.dumps(span.to_dict(), default=str) + '\n' for span in spans)
+        with self._lock:
+            out.write(lines)
+            out.flush()
+
+    def shutdown(self) -> None:
+        pass
+
+
+class FileSpanExporter(ConsoleSpanExporter):
+
+    def __init__(self, path):
+        """
+        Append each span as a line of JSON to a file, e.g. to be read with :func:`read_spans`.
+
+        Parameters
+        ----------
+        path : str or Path
+            Path of the file
+        """
+        super().__init__(open(path, 'a', encoding='utf-8'))
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._out.close()
+
+
+def read_spans(path) -> list:
+    """
+    Read the spans written by a :class:`FileSpanExporter`.
+
+    Returns
+    -------
+    list
+        A dictionary per span (see :meth:`Span.to_dict`).
+    """
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def to_folded_stacks(spans: Iterable) -> list:
+    """
+    Aggregate the self time (i.e. duration minus the duration of child spans) of spans by stack, in
+    the folded stack format read by flame graph tools (e.g. flamegraph.pl or speedscope).
+
+    Parameters
+    ----------
+    spans : iterable of dict or Span
+        Ended spans (e.g. returned by :func:`read_spans` or
+        :meth:`InMemorySpanExporter.get_finished_spans`)
+
+    Returns
+    -------
+    list
+        A line per stack, e.g. OrderRunMonitor.monitor;GET order/details 1500, with span names
+        separated by semicolons followed by the self time in microseconds.
+    """
+    spans = {
+        span['span_id']: span
+        for span in (span.to_dict() if isinstance(span, Span) else span for span in spans)
+    }
+    child_secs = {}
+    for span in spans.values():
+        if span['parent_id'] in spans:
+            child_secs[span['parent_id']] = child_secs.get(span['parent_id'], 0) + span['duration_secs']
+
+    def get_stack(span):
+        names = [span['name']]
+        while span['parent_id'] in spans:
+            span = spans[span['parent_id']]
+            names.append(span['name'])
+        return ';'.join(reversed(names))
+
+    stack_micros = {}
+    for span_id, span in spans.items():
+        self_secs = max(span['duration_secs'] - child_secs.get(span_id, 0), 0)
+        stack = get_stack(span)
+        stack_micros[stack] = stack_micros.get(stack, 0) + self_secs * 1e6
+    return [f'{stack} {round(micros)}' for stack, micros in sorted(stack_micros.items())]
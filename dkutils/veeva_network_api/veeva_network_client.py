@@ -2,9 +2,13 @@ import logging
 import time
 import os
 from enum import Enum
+from functools import partial
+from itertools import count
 
 import requests
 
+from dkutils.instrumentation import VEEVA_NETWORK_CLIENT, observe_request
+
 logger = logging.getLogger(__name__)
 
 TERMINAL_STATES = {
@@ -26,7 +30,9 @@ def create_veeva_network_subscription_client(
     subscription_name=None,
     subscription_type=None,
     system_name=None,
-    version=None
+    version=None,
+    retry_policy=None,
+    circuit_breaker=None
 ):
     """
     Create a client that enables you to manage subscriptions that import and export data to
@@ -55,6 +61,11 @@ def create_veeva_network_subscription_client(
     version : str, opt
         The API version if this variable is absent the the value will be obtained from the
         environment variable
+    retry_policy : RetryPolicy, opt
+        Policy for retrying failed requests (see :class:`~dkutils.retry.RetryPolicy`)
+    circuit_breaker : CircuitBreaker, opt
+        Circuit breaker failing requests fast during outages (see
+        :class:`~dkutils.circuit_breaker.CircuitBreaker`)
 
     Raises
     ------
@@ -87,7 +98,9 @@ def create_veeva_network_subscription_client(
             password=password,
             subscription_name=subscription_name,
             system_name=system_name,
-            version=version
+            version=version,
+            retry_policy=retry_policy,
+            circuit_breaker=circuit_breaker
         )
     elif subscription_type == VeevaNetworkSubscriptionType.TARGET:
         return VeevaTargetSubscriptionClient(
@@ -96,7 +109,9 @@ def create_veeva_network_subscription_client(
             password=password,
             subscription_name=subscription_name,
             system_name=system_name,
-            version=version
+            version=version,
+            retry_policy=retry_policy,
+            circuit_breaker=circuit_breaker
         )
     _raise_exception(
         f"Subscription type must be either VeevaNetworkSubscriptionType.SOURCE or "
@@ -285,7 +300,7 @@ class VeevaNetworkSubscriptionType(str, Enum):
 
 class VeevaNetworkClient:
 
-    def __init__(self, dns, username, password, version):
+    def __init__(self, dns, username, password, version, retry_policy=None, circuit_breaker=None):
         """
         Create a client for accessing Veeva Network. This class should not be instantiated directly. You should use
         either VeevaSourceSubscriptionClient or VeevaTargetSubscriptionClient
@@ -300,6 +315,13 @@ class VeevaNetworkClient:
             the password for the user ID.
         version : str
             is the API version
+        retry_policy : RetryPolicy, optional
+            :class:`~dkutils.retry.RetryPolicy` for retrying requests that fail with a retryable
+            error. If None, failed requests are not retried.
+        circuit_breaker : CircuitBreaker, optional
+            :class:`~dkutils.circuit_breaker.CircuitBreaker` tracking failures of the auth and job
+            requests, so that requests that keep failing raise a CircuitBreakerOpenError without
+            being sent. If None, requests are always sent.
 
         Raises
         ------
@@ -310,15 +332,16 @@ class VeevaNetworkClient:
 
         """
         self.base_url = f'https://{dns}/api/{version if version else "v16.0"}/'
+        self._retry_policy = retry_policy
+        self._circuit_breaker = circuit_breaker
 
         logger.info('VEEVA NETWORK: Attempting Authenticating')
-        response = requests.post(
-            self.base_url + 'auth', data={
+        response = self._request(
+            'post', 'auth', self.base_url + 'auth', data={
                 'username': username,
                 'password': password
             }
         )
-        response.raise_for_status()
 
         # The headers are then passed through as a request authorization header
         self.admin_header = {
@@ -332,11 +355,57 @@ class VeevaNetworkClient:
         else:
             logger.info('VEEVA NETWORK: Authentication Successful!')
 
+    def _request(self, http_method, endpoint, url, **kwargs):
+        """
+        Send a request, retrying it according to the retry policy. Failures are tracked by the
+        circuit breaker, and request metrics aggregated, per endpoint (e.g. auth or job).
+
+        Raises
+        ------
+        HTTPError
+            If the request fails
+        CircuitBreakerOpenError
+            If a circuit breaker is configured and the endpoint's circuit is open
+
+        Returns
+        -------
+        requests.Response
+            :class:`Response <Response>` object
+        """
+        api_request = getattr(requests, http_method)
+        attempts = count()
+
+        def send_request():
+            response = observe_request(
+                VEEVA_NETWORK_CLIENT,
+                http_method,
+                endpoint,
+                partial(api_request, url, **kwargs),
+                attempt=next(attempts)
+            )
+            response.raise_for_status()
+            return response
+
+        send = send_request
+        if self._circuit_breaker is not None:
+            send = partial(self._circuit_breaker.call, endpoint, send_request)
+        if self._retry_policy is None:
+            return send()
+        return self._retry_policy.call(send)
+
 
 class VeevaSourceSubscriptionClient(VeevaNetworkClient):
 
     def __init__(
-        self, dns, username, password, subscription_name, system_name, version=DEFAULT_VERSION
+        self,
+        dns,
+        username,
+        password,
+        subscription_name,
+        system_name,
+        version=DEFAULT_VERSION,
+        retry_policy=None,
+        circuit_breaker=None
     ):
         """
         Create a client that enables you to manage source subscriptions that import and export data to
@@ -356,6 +425,13 @@ class VeevaSourceSubscriptionClient(VeevaNetworkClient):
             is the unique name of the subscription
         version : str
             is the API version
+        retry_policy : RetryPolicy, optional
+            :class:`~dkutils.retry.RetryPolicy` for retrying requests that fail with a retryable
+            error. If None, failed requests are not retried.
+        circuit_breaker : CircuitBreaker, optional
+            :class:`~dkutils.circuit_breaker.CircuitBreaker` tracking failures of the auth and job
+            requests, so that requests that keep failing raise a CircuitBreakerOpenError without
+            being sent. If None, requests are always sent.
 
         Raises
         ------
@@ -369,7 +445,7 @@ class VeevaSourceSubscriptionClient(VeevaNetworkClient):
         self.subscription_name = subscription_name
         self.system_name = system_name
         self.subscription_type = VeevaNetworkSubscriptionType.SOURCE.value
-        super().__init__(dns, username, password, version)
+        super().__init__(dns, username, password, version, retry_policy, circuit_breaker)
 
     def run_subscription_process(self):
         """
@@ -387,12 +463,13 @@ class VeevaSourceSubscriptionClient(VeevaNetworkClient):
             the unique ID of the job generated for the source subscription you specified.
 
         """
-        response = requests.post(
+        response = self._request(
+            'post',
+            'job',
             f'{self.base_url}systems/{self.system_name}/{self.subscription_type}_subscriptions/'
             f'{self.subscription_name}/job',
             headers=self.admin_header
         )
-        response.raise_for_status()
         json = response.json()
         status = json['responseStatus']
         if status != 'SUCCESS':
@@ -428,12 +505,13 @@ class VeevaSourceSubscriptionClient(VeevaNetworkClient):
 
         """
         while True:
-            response = requests.get(
+            response = self._request(
+                'get',
+                'job',
                 f'{self.base_url}systems/{self.system_name}/{self.subscription_type}_subscriptions/'
                 f'{self.subscription_name}/job/{job_resp_id}',
                 headers=self.admin_header
             )
-            response.raise_for_status()
             json = response.json()
             status = json['responseStatus']
             if status != 'SUCCESS':
@@ -552,7 +630,15 @@ class VeevaSourceSubscriptionClient(VeevaNetworkClient):
 class VeevaTargetSubscriptionClient(VeevaSourceSubscriptionClient):
 
     def __init__(
-        self, dns, username, password, subscription_name, system_name, version=DEFAULT_VERSION
+        self,
+        dns,
+        username,
+        password,
+        subscription_name,
+        system_name,
+        version=DEFAULT_VERSION,
+        retry_policy=None,
+        circuit_breaker=None
     ):
         """
         Create a client that enables you to manage target subscriptions that import and export data
@@ -572,6 +658,13 @@ class VeevaTargetSubscriptionClient(VeevaSourceSubscriptionClient):
             is the unique name of the subscription
         version : str
             is the API version
+        retry_policy : RetryPolicy, optional
+            :class:`~dkutils.retry.RetryPolicy` for retrying requests that fail with a retryable
+            error. If None, failed requests are not retried.
+        circuit_breaker : CircuitBreaker, optional
+            :class:`~dkutils.circuit_breaker.CircuitBreaker` tracking failures of the auth and job
+            requests, so that requests that keep failing raise a CircuitBreakerOpenError without
+            being sent. If None, requests are always sent.
 
         Raises
         ------
@@ -581,7 +674,9 @@ class VeevaTargetSubscriptionClient(VeevaSourceSubscriptionClient):
             If the authorization header is not available
 
         """
-        super().__init__(dns, username, password, subscription_name, system_name, version)
+        super().__init__(
+            dns, username, password, subscription_name, system_name, version, retry_policy, circuit_breaker
+        )
         self.subscription_type = VeevaNetworkSubscriptionType.TARGET.value
 
     def retrieve_network_process_job(self, job_resp_id):
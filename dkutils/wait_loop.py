@@ -2,6 +2,8 @@ import time
 
 from datetime import datetime, timedelta
 
+from dkutils.tracing import start_as_current_span
+
 
 class WaitLoop:
 
@@ -12,8 +14,11 @@ class WaitLoop:
 
         Parameters
         ----------
-        sleep_secs : int
-            Number of seconds to sleep in between loop executions.
+        sleep_secs : int or callable
+            Number of seconds to sleep in between loop executions, or a function without arguments
+            returning it, which is invoked before each sleep so that the poll interval may adapt
+            (e.g. to the predicted completion time of what is being waited on). The sleep never
+            extends past the loop timeout.
         duration_secs : int
             Max duration in seconds after which the loop will exit.
         """
@@ -22,6 +27,17 @@ class WaitLoop:
         self._sleep_secs = sleep_secs
         self._timeout_time = datetime.now() + timedelta(seconds=duration_secs)
 
+    def get_sleep_secs(self):
+        """
+        Returns
+        -------
+        float
+            Number of seconds to sleep before the next loop execution.
+        """
+        sleep_secs = self._sleep_secs() if callable(self._sleep_secs) else self._sleep_secs
+        remaining_secs = (self._timeout_time - datetime.now()).total_seconds()
+        return max(min(sleep_secs, remaining_secs), 0)
+
     def __bool__(self):
         """
         Determines if the loop should exit.
@@ -34,6 +50,8 @@ class WaitLoop:
         if self.first_pass:
             self.first_pass = False
         else:
-            time.sleep(self._sleep_secs)
+            sleep_secs = self.get_sleep_secs()
+            with start_as_current_span('WaitLoop.sleep', attributes={'sleep_secs': sleep_secs}):
+                time.sleep(sleep_secs)
         self.resume = datetime.now() < self._timeout_time
         return self.resume
@@ -36,12 +36,18 @@ setuptools.setup(
         "google-auth-oauthlib>=0.4.2",
         "sqlalchemy>=1.4.27",
     ],
+    extras_require={
+        'orjson': ['orjson>=3.0.0'],
+        'parquet': ['pyarrow>=1.0.0'],
+    },
     tests_require=[
         'bumpversion>=0.5.3',
         'coverage>=5.1',
         'flake8>=3.7.9',
         'nose>=1.3.7',
+        'orjson>=3.0.0',
         'pre-commit>=2.2.0',
+        'pyarrow>=1.0.0',
         'tox>=3.14.6',
         'yapf>=0.29.0',
     ],
@@ -2,8 +2,11 @@ import copy
 from unittest import TestCase
 from unittest.mock import patch
 
+from requests.exceptions import ConnectionError
+
 from dkutils.alteryx_api.gallery_client import GalleryException, GalleryClient, JobInfo, Workflow, JobInfoMessage, \
     MetaInfo
+from dkutils.circuit_breaker import CLOSED, OPEN, CircuitBreaker, CircuitBreakerOpenError
 
 META_INFO_DICT = {
     'name': 'FL-Asset-Model',
@@ -120,6 +123,20 @@ class GalleryClientTest(TestCase):
         )
         mock_requests.post.return_value.raise_for_status.assert_called_once()
 
+    @patch('dkutils.alteryx_api.gallery_client.requests.get')
+    @patch('dkutils.alteryx_api.gallery_client.GalleryClient._get_authentication')
+    def test_get_with_circuit_breaker(self, _, mock_get):
+        circuit_breaker = CircuitBreaker(failure_threshold=1)
+        client = GalleryClient(API_LOCATION, API_KEY, API_SECRET, circuit_breaker=circuit_breaker)
+        mock_get.side_effect = ConnectionError('Connection refused')
+        with self.assertRaises(ConnectionError):
+            client._get('/v1/jobs/1/')
+        with self.assertRaises(CircuitBreakerOpenError):
+            client._get('/v1/jobs/2/')
+        self.assertEqual(OPEN, circuit_breaker.get_state('jobs'))
+        self.assertEqual(CLOSED, circuit_breaker.get_state('workflows'))
+        mock_get.assert_called_once()
+
     @patch('dkutils.alteryx_api.gallery_client.GalleryClient._get')
     def test_get_subscription_workflows(self, mock_get):
         mock_get.return_value = [WORKFLOW_DICT]
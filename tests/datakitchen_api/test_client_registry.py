@@ -0,0 +1,110 @@
+import hashlib
+import json
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+from unittest.mock import patch, mock_open
+
+from requests.exceptions import HTTPError
+
+from dkutils.constants import DEFAULT_DATAKITCHEN_URL
+from dkutils.datakitchen_api.client_registry import ClientRegistry, get_client_key, get_default_registry
+from dkutils.retry import RetryPolicy
+
+DUMMY_URL = 'https://dummy/url'
+DUMMY_USERNAME = 'dummy_username'
+DUMMY_PASSWORD = 'dummy_password'
+DUMMY_KITCHEN = 'dummy_kitchen'
+DUMMY_RECIPE = 'dummy_recipe'
+JSON_PROFILE = {
+    "dk-cloud-ip": DUMMY_URL,
+    "dk-cloud-port": "443",
+    "dk-cloud-username": DUMMY_USERNAME,
+    "dk-cloud-password": DUMMY_PASSWORD
+}
+
+
+@patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient._refresh_token')
+class TestClientRegistry(TestCase):
+
+    def setUp(self):
+        self.registry = ClientRegistry()
+
+    def test_get_client_logs_in_once(self, mock_refresh_token):
+        retry_policy = RetryPolicy()
+        client = self.registry.get_client(DUMMY_USERNAME, DUMMY_PASSWORD, kitchen=DUMMY_KITCHEN)
+        recipe_client = self.registry.get_client(
+            DUMMY_USERNAME, DUMMY_PASSWORD, kitchen=DUMMY_KITCHEN, recipe=DUMMY_RECIPE, retry_policy=retry_policy
+        )
+        mock_refresh_token.assert_called_once()
+        self.assertEqual(1, len(self.registry))
+        self.assertIsNot(client, recipe_client)
+        self.assertEqual(DUMMY_KITCHEN, client.kitchen)
+        self.assertIsNone(client.recipe)
+        self.assertIsNone(client.retry_policy)
+        self.assertEqual(DUMMY_RECIPE, recipe_client.recipe)
+        self.assertIs(retry_policy, recipe_client.retry_policy)
+
+        client.kitchen = 'other_kitchen'
+        self.assertEqual(DUMMY_KITCHEN, recipe_client.kitchen)
+
+    def test_get_client_per_credentials(self, mock_refresh_token):
+        self.registry.get_client(DUMMY_USERNAME, DUMMY_PASSWORD)
+        self.registry.get_client(DUMMY_USERNAME, 'other_password')
+        self.registry.get_client(DUMMY_USERNAME, DUMMY_PASSWORD, base_url=DUMMY_URL)
+        self.registry.get_client(DUMMY_USERNAME, DUMMY_PASSWORD, base_url=DEFAULT_DATAKITCHEN_URL)
+        self.assertEqual(3, mock_refresh_token.call_count)
+        self.assertEqual(3, len(self.registry))
+
+    def test_failed_login_is_not_cached(self, mock_refresh_token):
+        mock_refresh_token.side_effect = [HTTPError('401 Client Error'), None]
+        with self.assertRaises(HTTPError):
+            self.registry.get_client(DUMMY_USERNAME, DUMMY_PASSWORD)
+        self.assertEqual(0, len(self.registry))
+        self.registry.get_client(DUMMY_USERNAME, DUMMY_PASSWORD)
+        self.assertEqual(1, len(self.registry))
+
+    def test_concurrent_get_client_logs_in_once(self, mock_refresh_token):
+        mock_refresh_token.side_effect = lambda: time.sleep(0.05)
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            clients = list(
+                executor.map(
+                    lambda index: self.registry.get_client(
+                        DUMMY_USERNAME, DUMMY_PASSWORD, kitchen=f'kitchen_{index}'
+                    ), range(8)
+                )
+            )
+        mock_refresh_token.assert_called_once()
+        self.assertEqual([f'kitchen_{index}' for index in range(8)], [client.kitchen for client in clients])
+
+    def test_get_context_client(self, mock_refresh_token):
+        with patch('builtins.open', mock_open(read_data=json.dumps(JSON_PROFILE))):
+            client = self.registry.get_context_client('test', kitchen=DUMMY_KITCHEN)
+            self.registry.get_context_client('test')
+            self.registry.get_client(DUMMY_USERNAME, DUMMY_PASSWORD, base_url=f'{DUMMY_URL}:443')
+        mock_refresh_token.assert_called_once()
+        self.assertEqual(DUMMY_KITCHEN, client.kitchen)
+
+    def test_remove_and_clear(self, mock_refresh_token):
+        self.registry.get_client(DUMMY_USERNAME, DUMMY_PASSWORD)
+        self.registry.get_client(DUMMY_USERNAME, 'other_password')
+        self.assertTrue(self.registry.remove(DUMMY_USERNAME, DUMMY_PASSWORD))
+        self.assertFalse(self.registry.remove(DUMMY_USERNAME, DUMMY_PASSWORD))
+        self.assertEqual(1, len(self.registry))
+        self.registry.clear()
+        self.assertEqual(0, len(self.registry))
+
+    def test_get_client_key_hashes_password(self, _):
+        key = get_client_key(DUMMY_USERNAME, DUMMY_PASSWORD, b'secret')
+        self.assertEqual(DEFAULT_DATAKITCHEN_URL, key.base_url)
+        self.assertNotIn(DUMMY_PASSWORD, repr(key))
+        self.assertNotEqual(hashlib.sha256(DUMMY_PASSWORD.encode()).hexdigest(), key.password_hmac)
+        self.assertEqual(key, get_client_key(DUMMY_USERNAME, DUMMY_PASSWORD, b'secret'))
+        self.assertNotEqual(key, get_client_key(DUMMY_USERNAME, DUMMY_PASSWORD, b'other_secret'))
+
+    def test_registries_hash_passwords_with_different_secrets(self, _):
+        self.assertNotEqual(self.registry._secret, ClientRegistry()._secret)
+
+    def test_get_default_registry(self, _):
+        self.assertIs(get_default_registry(), get_default_registry())
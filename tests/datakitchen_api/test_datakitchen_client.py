@@ -1,18 +1,27 @@
 import json
 import os
+import threading
 from pathlib import Path
 from unittest import TestCase
-from unittest.mock import patch, call, mock_open
+from unittest.mock import Mock, patch, call, mock_open
 
-from requests.exceptions import HTTPError
+from requests.exceptions import ConnectionError, HTTPError, ReadTimeout
 
 from dkutils.constants import (
-    API_GET, COMPLETED_SERVING, KITCHEN, ORDER_ID, ORDER_RUN_ID, ORDER_RUN_STATUS, PARAMETERS,
-    PLANNED_SERVING, RECIPE, VARIATION, PARENT_KITCHEN
+    API_DELETE, API_GET, API_POST, API_PUT, COMPLETED_SERVING, KITCHEN, ORDER_ID, ORDER_RUN_ID,
+    ORDER_RUN_STATUS, PARAMETERS, PLANNED_SERVING, RECIPE, VARIATION, PARENT_KITCHEN
+)
+from dkutils.circuit_breaker import CircuitBreaker, CircuitBreakerOpenError
+from dkutils.datakitchen_api.datakitchen_client import (
+    DataKitchenClient, OrderCreationError, ScopedDataKitchenClient, create_using_context, is_idempotent_request
 )
-from dkutils.datakitchen_api.datakitchen_client import DataKitchenClient, create_using_context
 from dkutils.datakitchen_api.datetime_utils import get_utc_timestamp
+from dkutils.datakitchen_api.recipe import Recipe
 from dkutils.dictionary_comparator import DictionaryComparator
+from dkutils.instrumentation import MetricsRegistry, set_instrumentation
+from dkutils.rate_limiter import RateLimiter
+from dkutils.retry import RetryPolicy
+from dkutils.tracing import InMemorySpanExporter, Tracer, set_tracer
 
 PARENT_DIR = Path(__file__).parent
 DUMMY_PORT = "443"
@@ -101,7 +110,36 @@ class TestDataKitchenClient(TestCase):
         self.assertEqual(dk_client.kitchen, 'kitchen')
         self.assertEqual(dk_client.recipe, 'recipe')
         self.assertEqual(dk_client.variation, 'variation')
-        self.assertFalse(dk_client._valid_attributes)
+
+    @patch('dkutils.datakitchen_api.datakitchen_client.requests.post')
+    def test_scope(self, mock_post):
+        recipe_client = self.dk_client.scope(recipe=DUMMY_RECIPE)
+        variation_client = recipe_client.scope(variation=DUMMY_VARIATION)
+        mock_post.assert_not_called()
+        self.assertIsInstance(variation_client, ScopedDataKitchenClient)
+        self.assertEqual(DUMMY_KITCHEN, variation_client.kitchen)
+        self.assertEqual(DUMMY_RECIPE, variation_client.recipe)
+        self.assertEqual(DUMMY_VARIATION, variation_client.variation)
+        self.assertIsNone(recipe_client.variation)
+        self.assertIsNone(self.dk_client.recipe)
+        self.assertEqual('other_kitchen', recipe_client.scope(kitchen='other_kitchen').kitchen)
+        for attribute in ('kitchen', 'recipe', 'variation', 'rate_limiter', 'retry_policy', 'circuit_breaker'):
+            with self.assertRaises(AttributeError):
+                setattr(variation_client, attribute, None)
+        with self.assertRaises(AttributeError):
+            variation_client.set_kitchen('other_kitchen')
+        self.assertEqual(DUMMY_KITCHEN, variation_client.kitchen)
+
+    @patch('dkutils.datakitchen_api.datakitchen_client.requests.get')
+    @patch('dkutils.datakitchen_api.datakitchen_client.requests.post')
+    def test_scoped_client_shares_token(self, mock_post, mock_get):
+        mock_post.return_value.text = DUMMY_AUTH_TOKEN
+        scoped_client = self.dk_client.scope(recipe=DUMMY_RECIPE)
+        mock_get.return_value.raise_for_status.side_effect = HTTPError('Invalid token')
+        scoped_client._refresh_token()
+        mock_post.assert_called_once_with(f'{DUMMY_URL}/v2/login', data=DUMMY_CREDENTIALS, headers=None)
+        self.assertEqual(DUMMY_HEADERS, self.dk_client._headers)
+        self.assertEqual(DUMMY_HEADERS, self.dk_client.scope()._headers)
 
     @patch('dkutils.datakitchen_api.datakitchen_client.requests.get')
     @patch('dkutils.datakitchen_api.datakitchen_client.requests.post')
@@ -114,6 +152,16 @@ class TestDataKitchenClient(TestCase):
         self.assertEqual(dk_client._headers, DUMMY_HEADERS)
         self.assertEqual(dk_client._token, DUMMY_AUTH_TOKEN)
 
+    @patch('dkutils.datakitchen_api.datakitchen_client.logger')
+    @patch('dkutils.datakitchen_api.datakitchen_client.requests.get')
+    @patch('dkutils.datakitchen_api.datakitchen_client.requests.post')
+    def test_refresh_invalid_token_does_not_log_error(self, mock_post, mock_get, mock_logger):
+        mock_get.return_value.raise_for_status.side_effect = HTTPError('401 Client Error')
+        mock_post.return_value.text = DUMMY_AUTH_TOKEN
+        DataKitchenClient(DUMMY_USERNAME, DUMMY_PASSWORD, base_url=DUMMY_URL, retry_policy=RetryPolicy())
+        mock_logger.error.assert_not_called()
+        mock_get.assert_called_once()
+
     @patch('dkutils.datakitchen_api.datakitchen_client._basic_auth_str')
     def test_with_api_token(self, mock_auth):
         dk_client = DataKitchenClient(DUMMY_USERNAME, DUMMY_PASSWORD, is_api_token=True)
@@ -350,6 +398,44 @@ class TestDataKitchenClient(TestCase):
             dk_client.get_order_run_details(DUMMY_ORDER_RUN_ID)
         self.assertEqual('Undefined attributes: kitchen', cm.exception.args[0])
 
+    @patch('dkutils.datakitchen_api.datakitchen_client.requests.post')
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient._validate_token')
+    def test_iter_order_run_log_entries(self, _, mock_post):
+        log_entries = [{'message': f'Message {i}', 'record_type': 'INFO'} for i in range(10)]
+        content = json.dumps({'servings': [{'hid': DUMMY_ORDER_RUN_ID, 'log': {'lines': log_entries}}]})
+        chunks = [content[i:i + 16].encode('utf-8') for i in range(0, len(content), 16)]
+        mock_response = Mock()
+        mock_response.iter_content.return_value = iter(chunks)
+        mock_post.return_value = mock_response
+
+        dk_client = DataKitchenClient(DUMMY_USERNAME, DUMMY_PASSWORD, base_url=DUMMY_URL)
+        dk_client.kitchen = DUMMY_KITCHEN
+        observed_log_entries = dk_client.iter_order_run_log_entries(DUMMY_ORDER_RUN_ID)
+        mock_post.assert_called_once_with(
+            f'{DUMMY_URL}/v2/order/details/{DUMMY_KITCHEN}',
+            headers=None,
+            json={
+                'logs': True,
+                'serving_hid': DUMMY_ORDER_RUN_ID,
+                'servingjson': False,
+                'summary': False,
+                'testresults': False,
+                'timingresults': False
+            },
+            stream=True
+        )
+        self.assertEqual(log_entries, list(observed_log_entries))
+        mock_response.close.assert_called_once()
+
+    @patch('dkutils.datakitchen_api.datakitchen_client.requests.post')
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient._validate_token')
+    def test_iter_order_run_log_entries_raise_error(self, _, mock_post):
+        dk_client = DataKitchenClient(DUMMY_USERNAME, DUMMY_PASSWORD, base_url=DUMMY_URL)
+        dk_client.kitchen = DUMMY_KITCHEN
+        mock_post.return_value = MockResponse(raise_error=True)
+        with self.assertRaises(HTTPError):
+            dk_client.iter_order_run_log_entries(DUMMY_ORDER_RUN_ID)
+
     @patch('dkutils.datakitchen_api.datakitchen_client.requests.post')
     @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient._validate_token')
     def test_get_order_run_status(self, _, mock_post):
@@ -452,6 +538,42 @@ class TestDataKitchenClient(TestCase):
         expected_statuses = {DUMMY_ORDER_RUN_ID: COMPLETED_SERVING, 'Foo': COMPLETED_SERVING}
         self.assertEqual(order_run_statuses, expected_statuses)
 
+    @patch('dkutils.wait_loop.time.sleep')
+    @patch('dkutils.datakitchen_api.datakitchen_client.requests.post')
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient._validate_token')
+    def test_monitor_order_runs_tracing(self, _, mock_post, __):
+        mock_post.side_effect = [
+            MockResponse(json={'servings': [{
+                'status': PLANNED_SERVING
+            }]}),
+            MockResponse(json={'servings': [{
+                'status': COMPLETED_SERVING
+            }]}),
+        ]
+        dk_client = DataKitchenClient(DUMMY_USERNAME, DUMMY_PASSWORD, base_url=DUMMY_URL)
+        exporter = InMemorySpanExporter()
+        set_tracer(Tracer(exporter))
+        self.addCleanup(set_tracer, None)
+        dk_client.monitor_order_runs(1, 10, {DUMMY_ORDER_RUN_ID: DUMMY_KITCHEN})
+
+        spans = {span.span_id: span for span in exporter.get_finished_spans()}
+        stacks = []
+        for span in spans.values():
+            names = [span.name]
+            while span.parent_id in spans:
+                span = spans[span.parent_id]
+                names.insert(0, span.name)
+            stacks.append(tuple(names))
+        monitor, poll = 'DataKitchenClient.monitor_order_runs', 'DataKitchenClient.poll_order_runs'
+        self.assertEqual(1, stacks.count((monitor, )))
+        self.assertEqual(2, stacks.count((monitor, poll)))
+        self.assertEqual(2, stacks.count((monitor, poll, 'POST order/details/{}')))
+        self.assertEqual(1, stacks.count((monitor, 'WaitLoop.sleep')))
+        self.assertIn((monitor, poll, 'DataKitchenClient.validate_token'), stacks)
+        # Checking that the kitchen is set sends no request
+        validation_spans = ('DataKitchenClient.validate_recipe', 'DataKitchenClient.validate_variation')
+        self.assertFalse([stack for stack in stacks if stack[-1] in validation_spans])
+
     @patch('dkutils.datakitchen_api.datakitchen_client.requests.post')
     @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient._validate_token')
     def test_monitor_order_runs_timeout(self, _, mock_post):
@@ -523,7 +645,7 @@ class TestDataKitchenClient(TestCase):
         ]
         mock_put.side_effect = [MockResponse(json={ORDER_ID: DUMMY_ORDER_ID})]
         mock_get.side_effect = [MockResponse(json={'servings': [{'hid': DUMMY_ORDER_RUN_ID}]})]
-        mock_post.side_effect = [MockResponse(json={'servings': [{'status': PLANNED_SERVING}]})]
+        mock_post.side_effect = [MockResponse(json={'servings': [{'status': PLANNED_SERVING}]})] * 2
 
         dk_client = DataKitchenClient(DUMMY_USERNAME, DUMMY_PASSWORD, base_url=DUMMY_URL)
         results = dk_client.create_and_monitor_orders(orders_details, 1, 2)
@@ -583,6 +705,221 @@ class TestDataKitchenClient(TestCase):
         self.assertFalse(results[2])
         mock_ensure_attributes.assert_called()
 
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient._ensure_attributes')
+    @patch('dkutils.datakitchen_api.datakitchen_client.requests.post')
+    @patch('dkutils.datakitchen_api.datakitchen_client.requests.get')
+    @patch('dkutils.datakitchen_api.datakitchen_client.requests.put')
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient._validate_token')
+    def test_create_and_monitor_orders_with_duration_predictor(self, _, mock_put, mock_get, mock_post, __):
+        orders_details = [{KITCHEN: DUMMY_KITCHEN, RECIPE: DUMMY_RECIPE, VARIATION: DUMMY_VARIATION}]
+        mock_put.side_effect = [MockResponse(json={ORDER_ID: DUMMY_ORDER_ID})]
+        mock_get.side_effect = [MockResponse(json={'servings': [{'hid': DUMMY_ORDER_RUN_ID}]})]
+        mock_post.side_effect = [
+            MockResponse(json={'servings': [{'status': PLANNED_SERVING}]}),
+            MockResponse(json={'servings': [{'status': COMPLETED_SERVING}]}),
+        ]
+        duration_predictor = Mock()
+        duration_predictor.get_timeout_secs.return_value = 2
+        duration_predictor.get_sleep_secs.return_value = 0.1
+
+        dk_client = DataKitchenClient(DUMMY_USERNAME, DUMMY_PASSWORD, base_url=DUMMY_URL)
+        results = dk_client.create_and_monitor_orders(
+            orders_details, 1, None, duration_predictor=duration_predictor
+        )
+
+        self.assertEqual(COMPLETED_SERVING, results[0][0][ORDER_RUN_STATUS])
+        self.assertIsNone(dk_client.kitchen)
+        self.assertIsNone(dk_client.recipe)
+        duration_predictor.get_timeout_secs.assert_called_once_with([(DUMMY_RECIPE, DUMMY_VARIATION)], 1)
+        order_runs, default_sleep_secs = duration_predictor.get_sleep_secs.call_args[0]
+        self.assertEqual(DUMMY_RECIPE, order_runs[0][0])
+        self.assertEqual(1, default_sleep_secs)
+
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient.get_order_run_status')
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient._get_order_runs')
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient._ensure_attributes')
+    @patch('dkutils.datakitchen_api.datakitchen_client.requests.put')
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient._validate_token')
+    def test_create_and_monitor_orders_creates_orders_concurrently(
+        self, _, mock_put, __, mock_get_order_runs, mock_get_order_run_status
+    ):
+        orders_details = [{
+            KITCHEN: DUMMY_KITCHEN,
+            RECIPE: DUMMY_RECIPE,
+            VARIATION: DUMMY_VARIATION,
+            PARAMETERS: {
+                'DT': str(index)
+            }
+        } for index in range(6)]
+        # Each order is only created once 3 orders are being created concurrently
+        barrier = threading.Barrier(3, timeout=5)
+        order_ids = iter(f'order_{index}' for index in range(6))
+
+        def put(*args, **kwargs):
+            barrier.wait()
+            return MockResponse(json={ORDER_ID: next(order_ids)})
+
+        mock_put.side_effect = put
+        mock_get_order_runs.side_effect = lambda order_id, **_: [{'hid': f'run_{order_id}'}]
+        mock_get_order_run_status.return_value = COMPLETED_SERVING
+        exporter = InMemorySpanExporter()
+        set_tracer(Tracer(exporter))
+        self.addCleanup(set_tracer, None)
+
+        completed_orders, active_orders, queued_orders = self.dk_client.create_and_monitor_orders(
+            orders_details, 0, 5, max_concurrent=3, max_submit_workers=3
+        )
+
+        self.assertEqual([str(index) for index in range(6)], [o[PARAMETERS]['DT'] for o in completed_orders])
+        self.assertEqual(6, len({o[ORDER_ID] for o in completed_orders}))
+        self.assertEqual([f'run_{o[ORDER_ID]}' for o in completed_orders], [o[ORDER_RUN_ID] for o in completed_orders])
+        self.assertFalse(active_orders)
+        self.assertFalse(queued_orders)
+        # The order runs are looked up once, when the orders are created
+        self.assertEqual(6, mock_get_order_runs.call_count)
+        self.assertEqual(6, mock_get_order_run_status.call_count)
+        spans = exporter.get_finished_spans()
+        root_span_ids = [span.span_id for span in spans if span.name == 'DataKitchenClient.create_and_monitor_orders']
+        self.assertEqual(1, len(root_span_ids))
+        self.assertEqual(
+            root_span_ids * 6,
+            [span.parent_id for span in spans if span.name == 'DataKitchenClient.create_order']
+        )
+
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient.get_order_run_status')
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient._get_order_runs')
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient._ensure_attributes')
+    @patch('dkutils.datakitchen_api.datakitchen_client.requests.put')
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient._validate_token')
+    def test_create_and_monitor_orders_monitors_created_orders_if_creation_fails(
+        self, _, mock_put, __, mock_get_order_runs, mock_get_order_run_status
+    ):
+        orders_details = [{
+            KITCHEN: DUMMY_KITCHEN,
+            RECIPE: DUMMY_RECIPE,
+            VARIATION: DUMMY_VARIATION,
+            PARAMETERS: {
+                'DT': str(index)
+            }
+        } for index in range(4)]
+
+        def put(*args, **kwargs):
+            dt = kwargs['json']['parameters']['DT']
+            if dt == '1':
+                raise HTTPError('Failed to create order')
+            return MockResponse(json={ORDER_ID: f'order_{dt}'})
+
+        mock_put.side_effect = put
+        mock_get_order_runs.side_effect = lambda order_id, **_: [{'hid': f'run_{order_id}'}]
+        mock_get_order_run_status.return_value = COMPLETED_SERVING
+
+        with self.assertLogs('dkutils.datakitchen_api.datakitchen_client', 'ERROR'):
+            with self.assertRaises(OrderCreationError) as context:
+                self.dk_client.create_and_monitor_orders(orders_details, 0, 5, max_concurrent=2)
+
+        error = context.exception
+        self.assertEqual(['1'], [o[PARAMETERS]['DT'] for o, _ in error.failed_orders])
+        self.assertIsInstance(error.failed_orders[0][1], HTTPError)
+        self.assertIs(error.failed_orders[0][1], error.__cause__)
+        # The slot of the failed order is reused, so all the other orders are created and monitored
+        self.assertEqual(['0', '2', '3'], [o[PARAMETERS]['DT'] for o in error.completed_orders])
+        self.assertEqual(
+            ['run_order_0', 'run_order_2', 'run_order_3'], [o[ORDER_RUN_ID] for o in error.completed_orders]
+        )
+        self.assertFalse(error.active_orders)
+        self.assertFalse(error.queued_orders)
+
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient.get_order_run_status')
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient._ensure_attributes')
+    @patch('dkutils.datakitchen_api.datakitchen_client.requests.put')
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient._validate_token')
+    def test_create_and_monitor_orders_stop_on_creation_error(
+        self, _, mock_put, __, mock_get_order_run_status
+    ):
+        orders_details = [{KITCHEN: DUMMY_KITCHEN, RECIPE: DUMMY_RECIPE, VARIATION: DUMMY_VARIATION}] * 3
+        mock_put.side_effect = HTTPError('Failed to create order')
+
+        with self.assertLogs('dkutils.datakitchen_api.datakitchen_client', 'ERROR'):
+            with self.assertRaises(OrderCreationError) as context:
+                self.dk_client.create_and_monitor_orders(
+                    orders_details, 0, 5, max_concurrent=1, stop_on_error=True
+                )
+
+        self.assertEqual(1, mock_put.call_count)
+        self.assertEqual(1, len(context.exception.failed_orders))
+        self.assertEqual(2, len(context.exception.queued_orders))
+        mock_get_order_run_status.assert_not_called()
+
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient._ensure_attributes')
+    @patch('dkutils.datakitchen_api.datakitchen_client.requests.get')
+    @patch('dkutils.datakitchen_api.datakitchen_client.requests.put')
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient._validate_token')
+    def test_create_and_monitor_orders_does_not_log_missing_order_run_on_creation(
+        self, _, mock_put, mock_get, __
+    ):
+        orders_details = [{KITCHEN: DUMMY_KITCHEN, RECIPE: DUMMY_RECIPE, VARIATION: DUMMY_VARIATION}]
+        mock_put.return_value = MockResponse(json={ORDER_ID: DUMMY_ORDER_ID})
+        mock_get.return_value = MockResponse(raise_error=True)
+
+        with self.assertNoLogs('dkutils.datakitchen_api.datakitchen_client', 'ERROR'):
+            completed_orders, active_orders, _ = self.dk_client.create_and_monitor_orders(
+                orders_details, 1, 0
+            )
+
+        self.assertFalse(completed_orders)
+        self.assertIsNone(active_orders[0][ORDER_RUN_ID])
+
+    @patch('dkutils.datakitchen_api.datakitchen_client.requests.put')
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient._validate_token')
+    def test_create_and_monitor_orders_without_orders(self, _, mock_put):
+        self.assertEqual(([], [], []), self.dk_client.create_and_monitor_orders([], 1, 2))
+        mock_put.assert_not_called()
+
+    @patch('dkutils.datakitchen_api.datakitchen_client.requests.put')
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient._validate_token')
+    def test_create_and_monitor_orders_unpredictable_duration_raises_value_error(self, _, mock_put):
+        orders_details = [{KITCHEN: DUMMY_KITCHEN, RECIPE: DUMMY_RECIPE, VARIATION: DUMMY_VARIATION}]
+        duration_predictor = Mock()
+        duration_predictor.get_timeout_secs.return_value = None
+
+        dk_client = DataKitchenClient(DUMMY_USERNAME, DUMMY_PASSWORD, base_url=DUMMY_URL)
+        with self.assertRaises(ValueError):
+            dk_client.create_and_monitor_orders(orders_details, 1, None, duration_predictor=duration_predictor)
+        mock_put.assert_not_called()
+
+    @patch('dkutils.datakitchen_api.datakitchen_client.requests.post')
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient._validate_token')
+    def test_monitor_order_runs_with_duration_predictor(self, _, mock_post):
+        mock_post.side_effect = [
+            MockResponse(
+                json={
+                    'servings': [{
+                        'status': PLANNED_SERVING,
+                        'recipe_name': DUMMY_RECIPE,
+                        'variation_name': DUMMY_VARIATION
+                    }]
+                }
+            ),
+            MockResponse(json={'servings': [{
+                'status': COMPLETED_SERVING
+            }]}),
+        ]
+        duration_predictor = Mock()
+        duration_predictor.get_timeout_secs.return_value = 2
+        duration_predictor.get_sleep_secs.return_value = 0.1
+
+        dk_client = DataKitchenClient(DUMMY_USERNAME, DUMMY_PASSWORD, base_url=DUMMY_URL)
+        order_run_statuses = dk_client.monitor_order_runs(
+            1, None, {DUMMY_ORDER_RUN_ID: DUMMY_KITCHEN}, duration_predictor=duration_predictor
+        )
+        self.assertEqual({DUMMY_ORDER_RUN_ID: COMPLETED_SERVING}, order_run_statuses)
+        self.assertEqual(
+            [(DUMMY_RECIPE, DUMMY_VARIATION)], list(duration_predictor.get_timeout_secs.call_args[0][0])
+        )
+        duration_predictor.get_sleep_secs.assert_called_once()
+        # The recipe and variation are taken from the details retrieved when polling
+        self.assertEqual(2, mock_post.call_count)
+
     @patch('dkutils.datakitchen_api.datakitchen_client.requests.post')
     @patch('dkutils.datakitchen_api.datakitchen_client.requests.get')
     @patch('dkutils.datakitchen_api.datakitchen_client.requests.put')
@@ -714,6 +1051,150 @@ class TestDataKitchenClient(TestCase):
         kitchens = dk_client.get_kitchens()
         self.assertListEqual(kitchens, expected_kitchens)
 
+    @staticmethod
+    def get_throttled_response():
+        response = Mock(status_code=429, headers={'Retry-After': '0'})
+        response.raise_for_status.side_effect = HTTPError('429 Too Many Requests', response=response)
+        return response
+
+    @patch('dkutils.datakitchen_api.datakitchen_client.requests.get')
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient._validate_token')
+    def test_rate_limiter_retries_throttled_requests(self, _, mock_get):
+        rate_limiter = RateLimiter(rate=10)
+        dk_client = DataKitchenClient(
+            DUMMY_USERNAME, DUMMY_PASSWORD, base_url=DUMMY_URL, rate_limiter=rate_limiter
+        )
+        throttled_response = self.get_throttled_response()
+        mock_get.side_effect = [throttled_response, MockResponse(json={'kitchens': [{'name': 'kitchen1'}]})]
+        self.assertListEqual(['kitchen1'], dk_client.get_kitchens())
+        self.assertEqual(2, mock_get.call_count)
+        throttled_response.close.assert_called_once()
+        # Halved by the throttled response, then increased by the successful one
+        self.assertEqual(5.5, rate_limiter.get_rate())
+
+    @patch('dkutils.retry.time.sleep')
+    @patch('dkutils.datakitchen_api.datakitchen_client.requests.get')
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient._validate_token')
+    def test_retry_policy_retries_failed_requests(self, _, mock_get, __):
+        retry_policy = RetryPolicy()
+        dk_client = DataKitchenClient(
+            DUMMY_USERNAME, DUMMY_PASSWORD, base_url=DUMMY_URL, retry_policy=retry_policy
+        )
+        mock_get.side_effect = [
+            ConnectionError('Connection reset by peer'),
+            MockResponse(json={'kitchens': [{'name': 'kitchen1'}]})
+        ]
+        self.assertListEqual(['kitchen1'], dk_client.get_kitchens())
+        self.assertEqual(1, retry_policy.metrics.snapshot()['retries'])
+
+    @patch('dkutils.retry.time.sleep')
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient._ensure_attributes')
+    @patch('dkutils.datakitchen_api.datakitchen_client.requests.put')
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient._validate_token')
+    def test_retry_policy_does_not_retry_non_idempotent_requests(self, _, mock_put, *__):
+        dk_client = DataKitchenClient(
+            DUMMY_USERNAME,
+            DUMMY_PASSWORD,
+            base_url=DUMMY_URL,
+            kitchen=DUMMY_KITCHEN,
+            recipe=DUMMY_RECIPE,
+            variation=DUMMY_VARIATION,
+            retry_policy=RetryPolicy()
+        )
+        mock_put.side_effect = ReadTimeout('Read timed out')
+        with self.assertRaises(ReadTimeout):
+            dk_client.create_order()
+        mock_put.assert_called_once()
+
+        # Unless the caller opts in
+        dk_client.retry_non_idempotent = True
+        mock_put.side_effect = [ReadTimeout('Read timed out'), MockResponse(json={ORDER_ID: DUMMY_ORDER_ID})]
+        self.assertEqual(DUMMY_ORDER_ID, dk_client.create_order().json()[ORDER_ID])
+        self.assertEqual(3, mock_put.call_count)
+
+    def test_is_idempotent_request(self):
+        self.assertTrue(is_idempotent_request(API_GET, 'kitchen/list'))
+        self.assertTrue(is_idempotent_request(API_POST, f'order/details/{DUMMY_KITCHEN}'))
+        self.assertTrue(is_idempotent_request(API_POST, f'recipe/get/{DUMMY_KITCHEN}/{DUMMY_RECIPE}'))
+        self.assertTrue(is_idempotent_request(API_DELETE, f'order/delete/{DUMMY_ORDER_ID}'))
+        self.assertFalse(is_idempotent_request(API_PUT, f'order/create/{DUMMY_KITCHEN}/{DUMMY_RECIPE}'))
+        self.assertFalse(is_idempotent_request(API_PUT, f'order/resume/{DUMMY_ORDER_RUN_ID}'))
+        self.assertFalse(is_idempotent_request(API_POST, f'recipe/create/{DUMMY_KITCHEN}/{DUMMY_RECIPE}'))
+        self.assertFalse(is_idempotent_request(API_POST, 'unknown/endpoint'))
+
+    @patch('dkutils.retry.time.sleep')
+    @patch('dkutils.datakitchen_api.datakitchen_client.requests.get')
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient._validate_token')
+    def test_instrumentation_records_requests(self, _, mock_get, __):
+        registry = MetricsRegistry()
+        set_instrumentation(registry)
+        self.addCleanup(set_instrumentation, None)
+        dk_client = DataKitchenClient(
+            DUMMY_USERNAME, DUMMY_PASSWORD, base_url=DUMMY_URL, retry_policy=RetryPolicy()
+        )
+        dk_client.kitchen = DUMMY_KITCHEN
+        kitchens_response = MockResponse(json={'kitchens': [{'name': DUMMY_KITCHEN, 'kitchen-staff': []}]})
+        mock_get.side_effect = [
+            ConnectionError('Connection reset by peer'),
+            kitchens_response,
+            MockResponse(json={'recipes': [DUMMY_RECIPE]}),
+            kitchens_response,
+        ]
+        self.assertEqual([DUMMY_RECIPE], dk_client.get_recipes())
+        dk_client.get_kitchens()
+        summary = {row['endpoint']: row for row in registry.summary()}
+        self.assertEqual({'kitchen/list', 'kitchen/recipenames/{}'}, set(summary))
+        self.assertEqual(3, summary['kitchen/list']['requests'])
+        self.assertEqual(1, summary['kitchen/list']['retries'])
+        self.assertEqual(1, summary['kitchen/list']['errors'])
+        self.assertEqual('GET', summary['kitchen/recipenames/{}']['method'])
+
+    @patch('dkutils.datakitchen_api.datakitchen_client.requests.get')
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient._validate_token')
+    def test_circuit_breaker_fails_fast(self, _, mock_get):
+        dk_client = DataKitchenClient(
+            DUMMY_USERNAME,
+            DUMMY_PASSWORD,
+            base_url=DUMMY_URL,
+            circuit_breaker=CircuitBreaker(failure_threshold=1)
+        )
+        mock_get.side_effect = ConnectionError('Connection refused')
+        with self.assertRaises(ConnectionError):
+            dk_client.get_kitchens()
+        with self.assertRaises(CircuitBreakerOpenError):
+            dk_client.get_kitchens()
+        mock_get.assert_called_once()
+
+    @patch('dkutils.datakitchen_api.datakitchen_client.requests.get')
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient._validate_token')
+    def test_rate_limiter_raises_error_after_max_retries(self, _, mock_get):
+        dk_client = DataKitchenClient(
+            DUMMY_USERNAME, DUMMY_PASSWORD, base_url=DUMMY_URL, rate_limiter=RateLimiter(max_retries=1)
+        )
+        mock_get.side_effect = [self.get_throttled_response(), self.get_throttled_response()]
+        with self.assertRaises(HTTPError):
+            dk_client.get_kitchens()
+        self.assertEqual(2, mock_get.call_count)
+
+    @patch('dkutils.retry.time.sleep')
+    @patch('dkutils.datakitchen_api.datakitchen_client.requests.get')
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient._validate_token')
+    def test_throttled_requests_are_not_retried_by_both_rate_limiter_and_retry_policy(self, _, mock_get, mock_sleep):
+        retry_policy = RetryPolicy(tries=3)
+        dk_client = DataKitchenClient(
+            DUMMY_USERNAME,
+            DUMMY_PASSWORD,
+            base_url=DUMMY_URL,
+            rate_limiter=RateLimiter(max_retries=1),
+            retry_policy=retry_policy
+        )
+        mock_get.side_effect = [self.get_throttled_response(), self.get_throttled_response()]
+        with self.assertRaises(HTTPError):
+            dk_client.get_kitchens()
+        self.assertEqual(2, mock_get.call_count)
+        self.assertEqual(0, retry_policy.metrics.snapshot()['retries'])
+        mock_sleep.assert_not_called()
+
     @patch('dkutils.datakitchen_api.datakitchen_client.requests.post')
     @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient._validate_token')
     def test_update_kitchen_vault(self, _, mock_post):
@@ -860,6 +1341,24 @@ class TestDataKitchenClient(TestCase):
         mock_get_kitchen_info.assert_called_once_with()
         mock_update_kitchen_info.assert_called_once_with(kitchen_info_with_new_overrides)
 
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient._update_kitchen')
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient._get_kitchen_info')
+    def test_patch_overrides(self, mock_get_kitchen_info, mock_update_kitchen_info):
+        mock_get_kitchen_info.return_value = {
+            "name": DUMMY_KITCHEN,
+            RECIPE_OVERRIDES: {
+                "something": "blue",
+                "other": "green"
+            }
+        }
+        patch = [{'op': 'replace', 'path': '/something', 'value': 'new'}]
+        expected_overrides = {"something": "new", "other": "green"}
+        self.assertEqual(expected_overrides, self.dk_client.patch_overrides(patch))
+        mock_update_kitchen_info.assert_called_once_with({
+            "name": DUMMY_KITCHEN,
+            RECIPE_OVERRIDES: expected_overrides
+        })
+
     @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient._get_kitchens_info')
     def test_compare_overrides_when_non_existent_kitchen_raises_error(self, mock_get_kitchens_info):
         mock_get_kitchens_info.return_value = {DUMMY_KITCHEN: {"name": DUMMY_KITCHEN}}
@@ -1004,7 +1503,12 @@ class TestDataKitchenClient(TestCase):
             password=DUMMY_PASSWORD,
             recipe=DUMMY_RECIPE,
             username=DUMMY_USERNAME,
-            variation=DUMMY_VARIATION
+            variation=DUMMY_VARIATION,
+            rate_limiter=None,
+            retry_policy=None,
+            circuit_breaker=None,
+            validate_attributes=True,
+            retry_non_idempotent=False
         )
 
     @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient')
@@ -1022,7 +1526,12 @@ class TestDataKitchenClient(TestCase):
             password=DUMMY_PASSWORD,
             recipe=DUMMY_RECIPE,
             username=DUMMY_USERNAME,
-            variation=DUMMY_VARIATION
+            variation=DUMMY_VARIATION,
+            rate_limiter=None,
+            retry_policy=None,
+            circuit_breaker=None,
+            validate_attributes=True,
+            retry_non_idempotent=False
         )
 
     def test_get_override_names_that_do_not_exist_when_none_overrides_given_then_raises_valueerror(
@@ -1234,6 +1743,89 @@ class TestDataKitchenClient(TestCase):
         mock_recipes.assert_called_once()
         mock_variations.assert_called_once_with()
 
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient.get_variations')
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient.get_recipes')
+    def test_ensure_attributes_is_memoized_per_tuple(self, mock_recipes, mock_variations):
+        variations = [f'variation_{index}' for index in range(10)]
+        mock_recipes.return_value = RECIPES
+        mock_variations.return_value = {variation: {} for variation in variations}
+        clients = [self.dk_client.scope(recipe=DUMMY_RECIPE, variation=variation) for variation in variations]
+        for index in range(1000):
+            clients[index % 10]._ensure_attributes(KITCHEN, RECIPE, VARIATION)
+        self.dk_client.recipe = DUMMY_RECIPE
+        self.dk_client.variation = variations[0]
+        self.dk_client._ensure_attributes(KITCHEN, RECIPE, VARIATION)
+        mock_recipes.assert_called_once()
+        self.assertEqual(10, mock_variations.call_count)
+
+    @patch('dkutils.datakitchen_api.datakitchen_client.time.monotonic')
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient.get_variations')
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient.get_recipes')
+    def test_ensure_attributes_caches_invalid_tuples(self, mock_recipes, mock_variations, mock_monotonic):
+        mock_monotonic.return_value = 0
+        mock_recipes.return_value = RECIPES
+        mock_variations.side_effect = [{DUMMY_VARIATION: {}}, {DUMMY_VARIATION: {}, 'new_variation': {}}]
+        client = self.dk_client.scope(recipe=DUMMY_RECIPE, variation='new_variation')
+        for _ in range(2):
+            with self.assertRaises(ValueError) as cm:
+                client._ensure_attributes(VARIATION)
+            self.assertEqual(
+                f'new_variation is not one of the available variations: {DUMMY_VARIATION}', cm.exception.args[0]
+            )
+        mock_variations.assert_called_once()
+        mock_monotonic.return_value = 60
+        client._ensure_attributes(VARIATION)
+        mock_recipes.assert_called_once()
+        self.assertEqual(2, mock_variations.call_count)
+
+    @patch('dkutils.datakitchen_api.datakitchen_client.time.monotonic')
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient.get_recipes')
+    def test_ensure_attributes_expires_valid_tuples(self, mock_recipes, mock_monotonic):
+        mock_monotonic.return_value = 0
+        mock_recipes.side_effect = [RECIPES, ['other_recipe']]
+        client = self.dk_client.scope(recipe=DUMMY_RECIPE)
+        client._ensure_attributes(RECIPE)
+        mock_monotonic.return_value = 299
+        client._ensure_attributes(RECIPE)
+        mock_recipes.assert_called_once()
+        # The recipe was deleted meanwhile
+        mock_monotonic.return_value = 300
+        with self.assertRaises(ValueError):
+            client._ensure_attributes(RECIPE)
+        self.assertEqual(2, mock_recipes.call_count)
+
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient._api_request')
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient.get_recipes')
+    def test_deleting_recipe_clears_validated_attributes(self, mock_recipes, _):
+        mock_recipes.side_effect = [RECIPES, ['other_recipe']]
+        client = self.dk_client.scope(recipe=DUMMY_RECIPE)
+        client._ensure_attributes(RECIPE)
+        Recipe(self.dk_client, DUMMY_RECIPE).delete(DUMMY_KITCHEN)
+        with self.assertRaises(ValueError):
+            client._ensure_attributes(RECIPE)
+        self.assertEqual(2, mock_recipes.call_count)
+
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient.get_recipes')
+    def test_ensure_attributes_does_not_cache_http_errors(self, mock_recipes):
+        mock_recipes.side_effect = [HTTPError('Failed API Call'), RECIPES]
+        self.dk_client.recipe = DUMMY_RECIPE
+        with self.assertRaises(HTTPError):
+            self.dk_client._ensure_attributes(RECIPE)
+        self.dk_client._ensure_attributes(RECIPE)
+        self.assertEqual(2, mock_recipes.call_count)
+
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient.get_recipes')
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient._validate_token')
+    def test_ensure_attributes_without_validation(self, _, mock_recipes):
+        dk_client = DataKitchenClient(
+            DUMMY_USERNAME, DUMMY_PASSWORD, base_url=DUMMY_URL, kitchen=DUMMY_KITCHEN, validate_attributes=False
+        )
+        dk_client.scope(recipe=DUMMY_RECIPE, variation=DUMMY_VARIATION)._ensure_attributes(VARIATION)
+        mock_recipes.assert_not_called()
+        with self.assertRaises(ValueError) as cm:
+            dk_client._ensure_attributes(VARIATION)
+        self.assertEqual('Undefined attributes: recipe,variation', cm.exception.args[0])
+
     @patch('dkutils.datakitchen_api.datakitchen_client.requests.get')
     @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient._validate_token')
     def test_get_order_status(self, _, mock_get):
@@ -0,0 +1,114 @@
+from unittest import TestCase
+from unittest.mock import Mock
+
+from dkutils.constants import COMPLETED_SERVING, SERVING_ERROR
+from dkutils.datakitchen_api.duration_predictor import DurationEstimate, DurationPredictor
+from dkutils.datakitchen_api.order_run_history import OrderRunHistory
+from .test_order_run_history import HOUR_MILLIS, get_order_run
+
+
+def get_orders(durations):
+    """
+    Build a get_orders response with one order per (recipe, variation) key of durations, whose
+    order runs completed in the provided durations in seconds.
+    """
+    orders = {'orders': [], 'servings': {}}
+    for index, ((recipe, variation), order_durations) in enumerate(durations.items()):
+        order_id = f'order_{index}'
+        orders['orders'].append({'hid': order_id, 'recipe': recipe, 'variation': variation})
+        orders['servings'][order_id] = {
+            'servings': [
+                get_order_run(
+                    f'{order_id}_run_{run_index}', order_id, COMPLETED_SERVING, run_index * HOUR_MILLIS,
+                    duration * 1000, variation
+                ) for run_index, duration in enumerate(order_durations)
+            ]
+        }
+    return orders
+
+
+DURATIONS = {
+    ('Recipe_1', 'variation_1'): [10, 20, 30, 40],
+    ('Recipe_1', 'variation_2'): [100],
+    ('Recipe_2', 'variation_1'): [5],
+}
+
+
+class TestDurationPredictor(TestCase):
+
+    def setUp(self):
+        self.client = Mock()
+        self.client.get_orders.return_value = get_orders(DURATIONS)
+        self.history = OrderRunHistory()
+        self.history.update(self.client)
+        self.predictor = DurationPredictor(self.history, percentile=100)
+
+    def test_get_estimate(self):
+        self.assertEqual(DurationEstimate(4, 25.0, 40.0), self.predictor.get_estimate('Recipe_1', 'variation_1'))
+
+    def test_get_estimate_falls_back_to_recipe(self):
+        self.assertEqual(DurationEstimate(5, 30.0, 100.0), self.predictor.get_estimate('Recipe_1', 'variation_2'))
+
+    def test_get_estimate_too_few_runs(self):
+        self.assertIsNone(self.predictor.get_estimate('Recipe_2', 'variation_1'))
+        self.assertIsNone(self.predictor.get_estimate('Unknown', 'variation_1'))
+        self.assertIsNone(self.predictor.predict_duration('Recipe_2', 'variation_1'))
+
+    def test_get_estimate_without_history(self):
+        predictor = DurationPredictor(OrderRunHistory())
+        self.assertIsNone(predictor.get_estimate('Recipe_1', 'variation_1'))
+        self.assertEqual(7, predictor.get_sleep_secs([('Recipe_1', 'variation_1', 995)], 7, 1000))
+
+    def test_get_estimate_ignores_failed_runs(self):
+        orders = get_orders({('Recipe_2', 'variation_1'): [5, 5]})
+        orders['servings']['order_0']['servings'][0]['status'] = SERVING_ERROR
+        self.client.get_orders.return_value = orders
+        self.history.update(self.client)
+        self.assertIsNone(self.predictor.get_estimate('Recipe_2', 'variation_1'))
+
+    def test_predictions_are_refreshed_on_update(self):
+        self.assertEqual(40.0, self.predictor.predict_duration('Recipe_1', 'variation_1'))
+        orders = get_orders({('Recipe_1', 'variation_1'): [10, 20, 30, 40, 50]})
+        self.client.get_orders.return_value = orders
+        self.history.update(self.client)
+        self.assertEqual(50.0, self.predictor.predict_duration('Recipe_1', 'variation_1'))
+
+    def test_predict_completion_time(self):
+        self.assertEqual(1025.0, self.predictor.predict_completion_time('Recipe_1', 'variation_1', 1000))
+        self.assertEqual(
+            1040.0, self.predictor.predict_completion_time('Recipe_1', 'variation_1', 1000, upper=True)
+        )
+        self.assertIsNone(self.predictor.predict_completion_time('Recipe_2', 'variation_1', 1000))
+
+    def test_get_sleep_secs(self):
+        now = 1000
+        # Sleep until the median completion time
+        self.assertEqual(20, self.predictor.get_sleep_secs([('Recipe_1', 'variation_1', 995)], 7, now))
+        # Poll overdue order runs at a fraction of their median duration, bounded by the min sleep
+        self.assertEqual(5, self.predictor.get_sleep_secs([('Recipe_1', 'variation_1', 900)], 7, now))
+        # Bounded by the max sleep
+        predictor = DurationPredictor(self.history, percentile=100, max_sleep_secs=10)
+        self.assertEqual(10, predictor.get_sleep_secs([('Recipe_1', 'variation_1', 995)], 7, now))
+        # Shortest sleep of all order runs, using the default for unpredictable ones
+        order_runs = [('Recipe_1', 'variation_1', 995), ('Recipe_2', 'variation_1', 995)]
+        self.assertEqual(7, self.predictor.get_sleep_secs(order_runs, 7, now))
+        self.assertEqual(7, self.predictor.get_sleep_secs([], 7, now))
+
+    def test_get_timeout_secs(self):
+        orders = [('Recipe_1', 'variation_1')] * 3
+        self.assertEqual(60.0, self.predictor.get_timeout_secs(orders))
+        self.assertEqual(120.0, self.predictor.get_timeout_secs(orders, max_concurrent=2))
+        self.assertEqual(0, self.predictor.get_timeout_secs([]))
+
+    def test_get_timeout_secs_unpredictable_order(self):
+        orders = [('Recipe_1', 'variation_1'), ('Recipe_2', 'variation_1')]
+        self.assertIsNone(self.predictor.get_timeout_secs(orders, max_concurrent=1))
+        self.assertEqual(
+            75.0, self.predictor.get_timeout_secs(orders, max_concurrent=1, default_duration_secs=10)
+        )
+
+    def test_invalid_arguments_raise_value_error(self):
+        with self.assertRaises(ValueError):
+            DurationPredictor(self.history, percentile=101)
+        with self.assertRaises(ValueError):
+            DurationPredictor(self.history, min_sleep_secs=10, max_sleep_secs=5)
@@ -0,0 +1,163 @@
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+import pandas as pd
+
+from dkutils.constants import ACTIVE_SERVING, COMPLETED_SERVING, SERVING_ERROR
+from dkutils.datakitchen_api.order_run_history import (
+    COLUMNS,
+    OrderRunHistory,
+    get_order_runs_frame,
+)
+
+HOUR_MILLIS = 3600 * 1000
+
+
+def get_order_run(order_run_id, order_id, status, start_time, duration, variation):
+    order_run = {
+        'hid': order_run_id,
+        'order_id': order_id,
+        'status': status,
+        'timings': {
+            'start-time': start_time
+        },
+        'variation_name': variation
+    }
+    if duration is not None:
+        order_run['timings']['duration'] = duration
+        order_run['timings']['end-time'] = start_time + duration
+    return order_run
+
+
+ORDERS = {
+    'orders': [
+        {
+            'hid': 'order_1',
+            'recipe': 'Recipe_1',
+            'variation': 'variation_1'
+        },
+        {
+            'hid': 'order_2',
+            'recipe': 'Recipe_2',
+            'variation': 'variation_2'
+        },
+    ],
+    'servings': {
+        'order_1': {
+            'servings': [
+                get_order_run('run_1', 'order_1', COMPLETED_SERVING, 0, 10000, 'variation_1'),
+                get_order_run('run_2', 'order_1', SERVING_ERROR, HOUR_MILLIS, 20000, 'variation_1'),
+                get_order_run('run_3', 'order_1', COMPLETED_SERVING, 30 * HOUR_MILLIS, 30000, 'variation_1'),
+            ],
+            'total': 3
+        },
+        'order_2': {
+            'servings': [
+                get_order_run('run_4', 'order_2', ACTIVE_SERVING, 40 * HOUR_MILLIS, None, 'variation_2'),
+            ],
+            'total': 1
+        }
+    }
+}
+
+UPDATED_ORDERS = {
+    'orders': [ORDERS['orders'][1]],
+    'servings': {
+        'order_2': {
+            'servings': [
+                get_order_run('run_4', 'order_2', COMPLETED_SERVING, 40 * HOUR_MILLIS, 5000, 'variation_2'),
+                get_order_run('run_5', 'order_2', SERVING_ERROR, 41 * HOUR_MILLIS, 6000, 'variation_2'),
+            ],
+            'total': 2
+        }
+    }
+}
+
+
+class TestOrderRunHistory(TestCase):
+
+    def setUp(self):
+        self.client = Mock()
+        self.client.get_orders.return_value = ORDERS
+        self.history = OrderRunHistory()
+        self.history.update(self.client)
+
+    def test_get_order_runs_frame(self):
+        runs = get_order_runs_frame(ORDERS)
+        self.assertListEqual(COLUMNS, list(runs.columns))
+        self.assertListEqual(['run_1', 'run_2', 'run_3', 'run_4'], list(runs['order_run_id']))
+        self.assertListEqual(['Recipe_1'] * 3 + ['Recipe_2'], list(runs['recipe']))
+        self.assertEqual('category', runs['status'].dtype.name)
+        self.assertEqual(pd.Timestamp('1970-01-01 01:00:20', tz='UTC'), runs['end_time'][1])
+        self.assertListEqual([10.0, 20.0, 30.0], list(runs['duration_secs'][:3]))
+        self.assertTrue(pd.isna(runs['duration_secs'][3]))
+
+    def test_get_order_runs_frame_empty(self):
+        self.assertListEqual(COLUMNS, list(get_order_runs_frame({'servings': {}}).columns))
+
+    def test_update(self):
+        self.client.get_orders.assert_called_once_with(time_period_hours=None, order_run_count=100000)
+        self.assertListEqual(['run_4', 'run_3', 'run_2', 'run_1'], list(self.history.runs['order_run_id']))
+
+        self.client.get_orders.return_value = UPDATED_ORDERS
+        self.assertEqual(1, self.history.update(self.client, time_period_hours=24))
+        self.client.get_orders.assert_called_with(time_period_hours=24, order_run_count=100000)
+        runs = self.history.runs.set_index('order_run_id')
+        self.assertListEqual(['run_5', 'run_4', 'run_3', 'run_2', 'run_1'], list(runs.index))
+        self.assertEqual(COMPLETED_SERVING, runs['status']['run_4'])
+        self.assertEqual(5.0, runs['duration_secs']['run_4'])
+
+    @patch('dkutils.datakitchen_api.order_run_history.time.time')
+    def test_update_since_last_update(self, mock_time):
+        mock_time.return_value = self.history.last_update_time + 2.5 * 3600
+        self.history.update(self.client, time_period_hours=24, since_last_update=True)
+        self.client.get_orders.assert_called_with(time_period_hours=4, order_run_count=100000)
+        self.assertEqual(4, len(self.history.runs))
+
+    def test_get_duration_percentiles(self):
+        percentiles = self.history.get_duration_percentiles(percentiles=[50, 100])
+        self.assertListEqual(['runs', 'p50', 'p100'], list(percentiles.columns))
+        self.assertListEqual([2, 20.0, 30.0], list(percentiles.loc[('Recipe_1', 'variation_1')]))
+        self.assertEqual(1, len(percentiles))
+
+    def test_get_duration_percentiles_all_statuses_no_group_by(self):
+        percentiles = self.history.get_duration_percentiles(percentiles=[50], by=[], statuses=None)
+        self.assertListEqual([3, 20.0], list(percentiles.iloc[0]))
+
+    def test_get_duration_percentiles_empty_history(self):
+        history = OrderRunHistory()
+        percentiles = history.get_duration_percentiles(percentiles=[50, 90])
+        self.assertListEqual(['runs', 'p50', 'p90'], list(percentiles.columns))
+        self.assertListEqual(['recipe', 'variation'], list(percentiles.index.names))
+        self.assertEqual(0, len(percentiles))
+        self.assertEqual(0, len(history.get_duration_percentiles(by=['recipe'])))
+        self.assertEqual(0, len(history.get_duration_percentiles(by=[])))
+
+    def test_get_duration_percentiles_active_runs_only(self):
+        self.client.get_orders.return_value = {
+            'orders': [ORDERS['orders'][1]],
+            'servings': {
+                'order_2': ORDERS['servings']['order_2']
+            }
+        }
+        history = OrderRunHistory()
+        history.update(self.client)
+        for statuses in [(COMPLETED_SERVING, ), None]:
+            percentiles = history.get_duration_percentiles(percentiles=[50], statuses=statuses)
+            self.assertListEqual(['runs', 'p50'], list(percentiles.columns))
+            self.assertEqual(0, len(percentiles))
+
+    def test_get_duration_percentiles_invalid_column_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            self.history.get_duration_percentiles(by=['foo'])
+
+    def test_get_failure_rates(self):
+        failure_rates = self.history.get_failure_rates(by=['recipe'])
+        self.assertListEqual([3, 1, 1 / 3], list(failure_rates.loc['Recipe_1']))
+        self.assertNotIn('Recipe_2', failure_rates.index)
+
+    def test_get_throughput(self):
+        throughput = self.history.get_throughput(freq='1D')
+        self.assertListEqual([2, 1], list(throughput['runs']))
+        self.assertListEqual([1, 0], list(throughput['failures']))
+        self.assertEqual(pd.Timestamp('1970-01-02', tz='UTC'), throughput.index[1])
@@ -1,5 +1,7 @@
 from unittest import TestCase
-from unittest.mock import patch
+from unittest.mock import Mock, patch
+
+from requests.exceptions import HTTPError
 
 from dkutils.datakitchen_api.datakitchen_client import DataKitchenClient
 from dkutils.datakitchen_api.order_run_monitor import (
@@ -8,6 +10,8 @@ from dkutils.datakitchen_api.order_run_monitor import (
     get_ingredient_owner_order_run_id,
     get_order_run_url,
 )
+from dkutils.retry import RetryPolicy
+from dkutils.tracing import InMemorySpanExporter, Tracer, set_tracer
 from .test_datakitchen_client import (
     DUMMY_USERNAME,
     DUMMY_PASSWORD,
@@ -145,6 +149,29 @@ ORDER_RUN_DETAILS = {
     }
 }
 
+LOG_ENTRIES = [
+    {
+        'message': 'Starting node',
+        'node': 'Fail_Node',
+        'record_type': 'INFO',
+        'syslogts': '2022-08-16T14:38:57-05:00'
+    },
+    {
+        'exc_desc': None,
+        'message': 'Test Fail: DKDataTestFailed',
+        'node': 'Fail_Node',
+        'record_type': 'ERROR',
+        'syslogts': '2022-08-16T14:38:58-05:00',
+        'traceback': None
+    },
+    {
+        'message': 'Monitoring',
+        'node': 'Order_Run_Monitor',
+        'record_type': 'WARNING',
+        'syslogts': '2022-08-16T14:38:59-05:00'
+    },
+]
+
 USER_INFO = {
     'customer_git_name': 'im',
     'customer_git_org': 'DKImplementation',
@@ -203,7 +230,7 @@ class TestOrderRunMonitor(TestCase):
             DUMMY_USERNAME, DUMMY_PASSWORD, kitchen=DUMMY_KITCHEN, base_url=DUMMY_URL
         )
 
-    @patch('dkutils.datakitchen_api.order_run_monitor.ApiClient')
+    @patch('dkutils.datakitchen_api.order_run_monitor.events_ingestion_client.ApiClient')
     @patch('dkutils.datakitchen_api.order_run_monitor.get_ingredient_owner_order_run_id')
     @patch('dkutils.datakitchen_api.order_run_monitor.get_customer_code')
     @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient.get_order_run_details')
@@ -219,7 +246,7 @@ class TestOrderRunMonitor(TestCase):
         )
         self.assertListEqual(self.order_run_monitor._nodes_to_ignore, EXPECTED_NODES_TO_IGNORE)
 
-    @patch('dkutils.datakitchen_api.order_run_monitor.ApiClient')
+    @patch('dkutils.datakitchen_api.order_run_monitor.events_ingestion_client.ApiClient')
     @patch('dkutils.datakitchen_api.order_run_monitor.get_ingredient_owner_order_run_id')
     @patch('dkutils.datakitchen_api.order_run_monitor.get_customer_code')
     @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient.get_order_run_details')
@@ -236,14 +263,16 @@ class TestOrderRunMonitor(TestCase):
         conditional_nodes = order_run_monitor.get_conditional_nodes()
         self.assertListEqual(conditional_nodes, EXPECTED_CONDITIONAL_NODES)
 
-    @patch('dkutils.datakitchen_api.order_run_monitor.ApiClient')
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient.iter_order_run_log_entries')
+    @patch('dkutils.datakitchen_api.order_run_monitor.events_ingestion_client.ApiClient')
     @patch('dkutils.datakitchen_api.order_run_monitor.get_ingredient_owner_order_run_id')
     @patch('dkutils.datakitchen_api.order_run_monitor.get_customer_code')
     @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient.get_order_run_details')
     def test_monitor(
         self, mock_get_order_run_details, mock_get_customer_code,
-        mock_get_ingredient_owner_order_run_id, _
+        mock_get_ingredient_owner_order_run_id, _, mock_iter_order_run_log_entries
     ):
+        mock_iter_order_run_log_entries.return_value = iter(LOG_ENTRIES)
         mock_get_order_run_details.side_effect = [ORDER_RUN_DETAILS, ORDER_RUN_DETAILS]
         mock_get_customer_code.return_value = 'im'
         mock_get_ingredient_owner_order_run_id.return_value = None
@@ -253,8 +282,64 @@ class TestOrderRunMonitor(TestCase):
         result = order_run_monitor.monitor()
         self.assertListEqual(result[0], EXPECTED_SUCCESSFUL_NODES)
         self.assertListEqual(result[1], EXPECTED_FAILED_NODES)
+        mock_iter_order_run_log_entries.assert_called_once()
+
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient.iter_order_run_log_entries')
+    @patch('dkutils.datakitchen_api.order_run_monitor.events_ingestion_client.ApiClient')
+    @patch('dkutils.datakitchen_api.order_run_monitor.get_ingredient_owner_order_run_id')
+    @patch('dkutils.datakitchen_api.order_run_monitor.get_customer_code')
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient.get_order_run_details')
+    def test_monitor_tracing(
+        self, mock_get_order_run_details, mock_get_customer_code,
+        mock_get_ingredient_owner_order_run_id, _, mock_iter_order_run_log_entries
+    ):
+        mock_iter_order_run_log_entries.return_value = iter(LOG_ENTRIES)
+        mock_get_order_run_details.side_effect = [ORDER_RUN_DETAILS, ORDER_RUN_DETAILS]
+        mock_get_customer_code.return_value = 'im'
+        mock_get_ingredient_owner_order_run_id.return_value = None
+        order_run_monitor = OrderRunMonitor(
+            self.dk_client, EVENTS_API_KEY, ORDER_RUN_ID, PIPELINE_NAME
+        )
+        exporter = InMemorySpanExporter()
+        set_tracer(Tracer(exporter))
+        self.addCleanup(set_tracer, None)
+        order_run_monitor.monitor()
+
+        spans = exporter.get_finished_spans()
+        root = spans[-1]
+        self.assertEqual('OrderRunMonitor.monitor', root.name)
+        children = {span.name for span in spans if span.parent_id == root.span_id}
+        self.assertEqual({
+            'OrderRunMonitor.get_nodes_info',
+            'OrderRunMonitor.process_log_entries',
+            'OrderRunMonitor.publish_run_status',
+            'Node.publish_run_status_event',
+            'Node.publish_tests',
+        }, children)
+
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient.iter_order_run_log_entries')
+    @patch('dkutils.datakitchen_api.order_run_monitor.events_ingestion_client.EventsApi')
+    @patch('dkutils.datakitchen_api.order_run_monitor.events_ingestion_client.ApiClient')
+    @patch('dkutils.datakitchen_api.order_run_monitor.get_ingredient_owner_order_run_id')
+    @patch('dkutils.datakitchen_api.order_run_monitor.get_customer_code')
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient.get_order_run_details')
+    def test_process_log_entries(
+        self, mock_get_order_run_details, mock_get_customer_code,
+        mock_get_ingredient_owner_order_run_id, _, mock_events_api, mock_iter_order_run_log_entries
+    ):
+        mock_get_order_run_details.return_value = ORDER_RUN_DETAILS
+        mock_get_customer_code.return_value = 'im'
+        mock_get_ingredient_owner_order_run_id.return_value = None
+        mock_iter_order_run_log_entries.return_value = iter(LOG_ENTRIES)
+        order_run_monitor = OrderRunMonitor(
+            self.dk_client, EVENTS_API_KEY, PIPELINE_NAME, ORDER_RUN_ID
+        )
+        order_run_monitor.process_log_entries()
+        post_message_log = mock_events_api.return_value.post_message_log
+        post_message_log.assert_called_once()
+        self.assertEqual('Test Fail: DKDataTestFailed', post_message_log.call_args.args[0].message)
 
-    @patch('dkutils.datakitchen_api.order_run_monitor.ApiClient')
+    @patch('dkutils.datakitchen_api.order_run_monitor.events_ingestion_client.ApiClient')
     @patch('dkutils.datakitchen_api.order_run_monitor.get_ingredient_owner_order_run_id')
     @patch('dkutils.datakitchen_api.order_run_monitor.get_customer_code')
     @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient.get_order_run_details')
@@ -284,6 +369,17 @@ class TestOrderRunMonitor(TestCase):
         expected_customer_code = 'im'
         self.assertEqual(observed_customer_code, expected_customer_code)
 
+    @patch('dkutils.retry.time.sleep')
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient._refresh_token')
+    @patch('dkutils.datakitchen_api.datakitchen_client.requests.get')
+    def test_get_customer_code_is_only_retried_by_client(self, mock_get, *_):
+        error = HTTPError('503 Error', response=Mock(status_code=503, headers={}))
+        mock_get.return_value = Mock(status_code=503, raise_for_status=Mock(side_effect=error))
+        self.dk_client.retry_policy = RetryPolicy()
+        with self.assertRaises(HTTPError):
+            get_customer_code(self.dk_client)
+        self.assertEqual(3, mock_get.call_count)
+
     @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient._api_request')
     def test_get_ingredient_owner_order_run_id(self, mock_request):
         mock_request.return_value = MockResponse(json=ORDER_STATUS)
@@ -0,0 +1,134 @@
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+
+from dkutils.constants import PARENT_KITCHEN, RECIPE_OVERRIDES
+from dkutils.datakitchen_api.datakitchen_client import DataKitchenClient
+from dkutils.datakitchen_api.overrides_utils import (
+    DIFFERENT_VALUE,
+    ONLY_IN_KITCHEN,
+    ONLY_IN_OTHER,
+    OverrideDrift,
+    get_kitchen_pairs,
+    get_override_comparisons,
+    get_override_drift,
+    write_override_drift_csv,
+)
+from dkutils.dictionary_comparator import DictionaryComparator
+from .test_datakitchen_client import (
+    DUMMY_USERNAME,
+    DUMMY_PASSWORD,
+    DUMMY_KITCHEN,
+    DUMMY_URL,
+)
+
+PARENT_DIR = Path(__file__).parent
+PRODUCTION = 'Production'
+DEVELOPMENT = 'Development'
+FEATURE = 'Feature'
+KITCHENS_INFO = {
+    PRODUCTION: {
+        'name': PRODUCTION,
+        PARENT_KITCHEN: None,
+        RECIPE_OVERRIDES: {
+            'one': 1,
+            'two': 2
+        }
+    },
+    DEVELOPMENT: {
+        'name': DEVELOPMENT,
+        PARENT_KITCHEN: PRODUCTION,
+        RECIPE_OVERRIDES: {
+            'one': 1,
+            'two': 'II',
+            'three': 3
+        }
+    },
+    FEATURE: {
+        'name': FEATURE,
+        PARENT_KITCHEN: DEVELOPMENT,
+        RECIPE_OVERRIDES: {
+            'one': 1,
+            'two': 'II',
+            'three': 3
+        }
+    },
+}
+
+
+class TestOverridesUtilsNoClient(TestCase):
+
+    def test_get_kitchen_pairs_parent(self):
+        self.assertEqual([(DEVELOPMENT, PRODUCTION), (FEATURE, DEVELOPMENT)],
+                         get_kitchen_pairs(KITCHENS_INFO))
+
+    def test_get_kitchen_pairs_other(self):
+        self.assertEqual([(DEVELOPMENT, PRODUCTION), (FEATURE, PRODUCTION)],
+                         get_kitchen_pairs(KITCHENS_INFO, other=PRODUCTION))
+
+    def test_get_kitchen_pairs_pairwise(self):
+        self.assertEqual([(PRODUCTION, DEVELOPMENT), (PRODUCTION, FEATURE),
+                          (DEVELOPMENT, FEATURE)],
+                         get_kitchen_pairs(KITCHENS_INFO, pairwise=True))
+
+    def test_get_kitchen_pairs_skips_unavailable_parent(self):
+        kitchens_info = {FEATURE: KITCHENS_INFO[FEATURE]}
+        self.assertEqual([], get_kitchen_pairs(kitchens_info))
+
+    def test_get_kitchen_pairs_when_kitchen_not_found_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            get_kitchen_pairs(KITCHENS_INFO, kitchens=[DUMMY_KITCHEN])
+
+    def test_get_kitchen_pairs_when_other_not_found_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            get_kitchen_pairs(KITCHENS_INFO, other=DUMMY_KITCHEN)
+
+
+class TestOverridesUtils(TestCase):
+
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient._validate_token')
+    def setUp(self, _):
+        self.dk_client = DataKitchenClient(DUMMY_USERNAME, DUMMY_PASSWORD, base_url=DUMMY_URL)
+
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient._get_kitchens_info')
+    def test_get_override_comparisons(self, mock_get_kitchens_info):
+        mock_get_kitchens_info.return_value = KITCHENS_INFO
+        comparisons = get_override_comparisons(self.dk_client)
+        development_overrides = KITCHENS_INFO[DEVELOPMENT][RECIPE_OVERRIDES]
+        self.assertEqual({
+            (DEVELOPMENT, PRODUCTION):
+                DictionaryComparator(development_overrides, KITCHENS_INFO[PRODUCTION][RECIPE_OVERRIDES]),
+            (FEATURE, DEVELOPMENT):
+                DictionaryComparator(KITCHENS_INFO[FEATURE][RECIPE_OVERRIDES], development_overrides),
+        }, comparisons)
+        mock_get_kitchens_info.assert_called_once_with()
+
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient._get_kitchens_info')
+    def test_get_override_drift(self, mock_get_kitchens_info):
+        mock_get_kitchens_info.return_value = KITCHENS_INFO
+        self.assertEqual([
+            OverrideDrift(DEVELOPMENT, PRODUCTION, 'three', ONLY_IN_KITCHEN, 3, None),
+            OverrideDrift(DEVELOPMENT, PRODUCTION, 'two', DIFFERENT_VALUE, 'II', 2),
+            OverrideDrift(FEATURE, PRODUCTION, 'three', ONLY_IN_KITCHEN, 3, None),
+            OverrideDrift(FEATURE, PRODUCTION, 'two', DIFFERENT_VALUE, 'II', 2),
+        ], get_override_drift(self.dk_client, other=PRODUCTION))
+        mock_get_kitchens_info.assert_called_once_with()
+
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient._get_kitchens_info')
+    def test_get_override_drift_only_in_other(self, mock_get_kitchens_info):
+        mock_get_kitchens_info.return_value = KITCHENS_INFO
+        self.assertEqual([
+            OverrideDrift(PRODUCTION, FEATURE, 'three', ONLY_IN_OTHER, None, 3),
+            OverrideDrift(PRODUCTION, FEATURE, 'two', DIFFERENT_VALUE, 2, 'II'),
+        ], get_override_drift(self.dk_client, kitchens=[PRODUCTION, FEATURE], pairwise=True))
+
+    def test_write_override_drift_csv(self):
+        drift = [OverrideDrift(DEVELOPMENT, PRODUCTION, 'two', DIFFERENT_VALUE, 'II', 2)]
+        observed_path = PARENT_DIR / 'observed_override_drift.csv'
+        write_override_drift_csv(drift, observed_path)
+        with open(observed_path) as observed_file:
+            self.assertListEqual([
+                'kitchen,other_kitchen,override,drift_type,kitchen_value,other_value\n',
+                f'{DEVELOPMENT},{PRODUCTION},two,{DIFFERENT_VALUE},II,2\n'
+            ], observed_file.readlines())
+        observed_path.unlink()
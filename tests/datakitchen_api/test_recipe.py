@@ -4,7 +4,7 @@ from unittest.mock import patch
 from requests.exceptions import HTTPError
 
 from dkutils.datakitchen_api.datakitchen_client import DataKitchenClient
-from dkutils.datakitchen_api.recipe import Recipe, NodeNotFoundError
+from dkutils.datakitchen_api.recipe import Recipe, NodeNotFoundError, get_git_blob_sha
 from .test_datakitchen_client import (
     DUMMY_USERNAME, DUMMY_PASSWORD, DUMMY_URL, DUMMY_KITCHEN, DUMMY_RECIPE, MockResponse
 )
@@ -40,7 +40,75 @@ RECIPE_FILES_DICT_OUTPUT = {
 
 NODE_FILES_DICT_OUTPUT = {
     'node1/description1.json': '{\n    "type": "DKNode_Container"\n}',
-    'node2/description2.json': '{\n    "type": "DKNode_Container"\n}'
+    'node2/description2.json': '{\n    "type": "DKNode_Container"\n}',
+    'node2/notebook.json': '{}'
+}
+
+MOCK_RECIPE_TREE_RESPONSE_JSON = {
+    'recipe-tree': {
+        DUMMY_RECIPE: {
+            DUMMY_RECIPE: [{
+                'filename': 'README.md',
+                'sha': get_git_blob_sha('README contents'),
+                'type': 'blob'
+            }, {
+                'filename': 'variables.json',
+                'sha': get_git_blob_sha('{\n    "variable-list": {\n\n    }\n\n}\n'),
+                'type': 'blob'
+            }],
+            f'{DUMMY_RECIPE}/node1': [{
+                'filename': 'description1.json',
+                'sha': get_git_blob_sha('{\n    "type": "DKNode_Container"\n}'),
+                'type': 'blob'
+            }]
+        }
+    }
+}
+
+RECIPE_TREE_OUTPUT = {
+    'README.md': get_git_blob_sha('README contents'),
+    'variables.json': get_git_blob_sha('{\n    "variable-list": {\n\n    }\n\n}\n'),
+    'node1/description1.json': get_git_blob_sha('{\n    "type": "DKNode_Container"\n}'),
+}
+
+MOCK_NODE_TREE_RESPONSE_JSON = {
+    'recipe-tree': {
+        DUMMY_RECIPE: {
+            DUMMY_RECIPE: [{
+                'filename': 'README.md',
+                'sha': 'sha1'
+            }],
+            f'{DUMMY_RECIPE}/node1': [{
+                'filename': 'description1.json',
+                'sha': 'sha2'
+            }],
+            f'{DUMMY_RECIPE}/node2': [{
+                'filename': 'description2.json',
+                'sha': 'sha3'
+            }, {
+                'filename': 'notebook.json',
+                'sha': 'sha4'
+            }]
+        }
+    }
+}
+
+MOCK_NODE_FILES_RESPONSE_JSON = {
+    'recipes': {
+        DUMMY_RECIPE: {
+            f'{DUMMY_RECIPE}/node1': [{
+                'filename': 'description1.json',
+                'json': '{\n    "type": "DKNode_Container"\n}'
+            }],
+            f'{DUMMY_RECIPE}/node2': [{
+                'filename': 'description2.json',
+                'json': '{\n    "type": "DKNode_Container"\n}'
+            }, {
+                'filename': 'notebook.json',
+                'json': '{}'
+            }]
+        }
+    }
 }
 
 UPDATE_FILES = {'README.md': 'New README contents', 'new_file.txt': 'New file contents'}
@@ -114,29 +182,94 @@ class TestRecipe(TestCase):
         self.assertEqual(RECIPE_FILES_DICT_OUTPUT, recipe_files_dict)
 
     @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient._validate_token')
-    @patch('dkutils.datakitchen_api.datakitchen_client.requests.get')
-    def test_get_node_files(self, mock_get, _):
-        mock_get.return_value = MockResponse(json=MOCK_RECIPE_FILES_RESPONSE_JSON)
+    @patch('dkutils.datakitchen_api.datakitchen_client.requests.post')
+    def test_get_node_files(self, mock_post, _):
+        mock_post.side_effect = [
+            MockResponse(json=MOCK_NODE_TREE_RESPONSE_JSON),
+            MockResponse(json=MOCK_NODE_FILES_RESPONSE_JSON),
+        ]
         recipe = Recipe(self.dk_client, DUMMY_RECIPE)
         node_files_dict = recipe.get_node_files(DUMMY_KITCHEN, ['node1', 'node2'])
-        mock_get.assert_called_with(
-            f'{DUMMY_URL}/v2/recipe/get/{DUMMY_KITCHEN}/{DUMMY_RECIPE}', headers=None, json={}
+        mock_post.assert_called_with(
+            f'{DUMMY_URL}/v2/recipe/get/{DUMMY_KITCHEN}/{DUMMY_RECIPE}',
+            headers=None,
+            json={
+                'include-recipe-tree': False,
+                'recipe-files': list(NODE_FILES_DICT_OUTPUT.keys())
+            }
         )
         self.assertEqual(NODE_FILES_DICT_OUTPUT, node_files_dict)
 
     @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient._validate_token')
-    @patch('dkutils.datakitchen_api.datakitchen_client.requests.get')
-    def test_get_node_files_missing_nodes(self, mock_get, _):
-        mock_get.return_value = MockResponse(json=MOCK_RECIPE_FILES_RESPONSE_JSON)
+    @patch('dkutils.datakitchen_api.datakitchen_client.requests.post')
+    def test_get_node_files_missing_nodes(self, mock_post, _):
+        mock_post.return_value = MockResponse(json=MOCK_NODE_TREE_RESPONSE_JSON)
         recipe = Recipe(self.dk_client, DUMMY_RECIPE)
         with self.assertRaises(NodeNotFoundError):
             recipe.get_node_files(DUMMY_KITCHEN, ['node1', 'node3'])
+        mock_post.assert_called_once()
 
     @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient._validate_token')
-    @patch('dkutils.datakitchen_api.datakitchen_client.requests.get')
     @patch('dkutils.datakitchen_api.datakitchen_client.requests.post')
-    def test_update_recipe_files(self, mock_post, mock_get, _):
-        mock_get.return_value = MockResponse(json=MOCK_RECIPE_FILES_RESPONSE_JSON)
+    def test_get_node_files_refreshes_cached_node_index(self, mock_post, _):
+        mock_post.side_effect = [
+            MockResponse(json=MOCK_NODE_TREE_RESPONSE_JSON),
+            MockResponse(json=MOCK_NODE_FILES_RESPONSE_JSON),
+            MockResponse(json=MOCK_NODE_TREE_RESPONSE_JSON),
+        ]
+        recipe = Recipe(self.dk_client, DUMMY_RECIPE)
+        # The cached index predates node2
+        recipe._node_indexes[DUMMY_KITCHEN] = {'node1': ['node1/description1.json']}
+        recipe.get_node_files(DUMMY_KITCHEN, ['node1', 'node2'])
+        self.assertEqual(2, mock_post.call_count)
+        with self.assertRaises(NodeNotFoundError):
+            recipe.get_node_files(DUMMY_KITCHEN, ['node3'])
+        self.assertEqual(3, mock_post.call_count)
+
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient._validate_token')
+    @patch('dkutils.datakitchen_api.datakitchen_client.requests.post')
+    def test_get_node_index(self, mock_post, _):
+        mock_post.return_value = MockResponse(json=MOCK_NODE_TREE_RESPONSE_JSON)
+        recipe = Recipe(self.dk_client, DUMMY_RECIPE)
+        expected_index = {
+            'node1': ['node1/description1.json'],
+            'node2': ['node2/description2.json', 'node2/notebook.json']
+        }
+        self.assertEqual(expected_index, recipe.get_node_index(DUMMY_KITCHEN))
+        self.assertEqual(expected_index, recipe.get_node_index(DUMMY_KITCHEN))
+        mock_post.assert_called_once()
+        recipe.get_node_index(DUMMY_KITCHEN, refresh=True)
+        self.assertEqual(2, mock_post.call_count)
+
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient._validate_token')
+    @patch('dkutils.datakitchen_api.datakitchen_client.requests.post')
+    def test_get_node_index_discarded_on_update(self, mock_post, _):
+        mock_post.return_value = MockResponse(json=MOCK_NODE_TREE_RESPONSE_JSON)
+        recipe = Recipe(self.dk_client, DUMMY_RECIPE)
+        recipe.get_node_index(DUMMY_KITCHEN)
+        recipe.delete_recipe_files(DUMMY_KITCHEN, FILEPATHS_TO_DELETE)
+        recipe.get_node_index(DUMMY_KITCHEN)
+        self.assertEqual(3, mock_post.call_count)
+
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient._validate_token')
+    @patch('dkutils.datakitchen_api.datakitchen_client.requests.post')
+    def test_get_recipe_tree(self, mock_post, _):
+        mock_post.return_value = MockResponse(json=MOCK_RECIPE_TREE_RESPONSE_JSON)
+        recipe_tree = Recipe(self.dk_client, DUMMY_RECIPE).get_recipe_tree(DUMMY_KITCHEN)
+        mock_post.assert_called_with(
+            f'{DUMMY_URL}/v2/recipe/get/{DUMMY_KITCHEN}/{DUMMY_RECIPE}',
+            headers=None,
+            json={
+                'include-recipe-tree': True,
+                'recipe-files': ['description.json']
+            }
+        )
+        self.assertEqual(RECIPE_TREE_OUTPUT, recipe_tree)
+
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient._validate_token')
+    @patch('dkutils.datakitchen_api.datakitchen_client.requests.post')
+    def test_update_recipe_files(self, mock_post, _):
+        mock_post.return_value = MockResponse(json=MOCK_RECIPE_TREE_RESPONSE_JSON)
         Recipe(self.dk_client, DUMMY_RECIPE).update_recipe_files(DUMMY_KITCHEN, UPDATE_FILES)
         mock_post.assert_called_with(
             f'{DUMMY_URL}/v2/recipe/update/{DUMMY_KITCHEN}/{DUMMY_RECIPE}',
@@ -164,3 +297,115 @@ class TestRecipe(TestCase):
                 'message': f'Deleting recipe files {FILEPATHS_TO_DELETE}'
             }
         )
+
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient._validate_token')
+    @patch('dkutils.datakitchen_api.datakitchen_client.requests.post')
+    def test_patch_recipe_files(self, mock_post, _):
+        mock_post.return_value = MockResponse(json=MOCK_RECIPE_FILES_RESPONSE_JSON)
+        patch = [{'op': 'add', 'path': '/variable-list/DT', 'value': '20200529'}]
+        Recipe(self.dk_client, DUMMY_RECIPE).patch_recipe_files(
+            DUMMY_KITCHEN, {'variables.json': patch}
+        )
+        mock_post.assert_any_call(
+            f'{DUMMY_URL}/v2/recipe/get/{DUMMY_KITCHEN}/{DUMMY_RECIPE}',
+            headers=None,
+            json={
+                'include-recipe-tree': False,
+                'recipe-files': ['variables.json']
+            }
+        )
+        files = {
+            'variables.json': {
+                'contents': '{\n    "variable-list": {\n        "DT": "20200529"\n    }\n}',
+                'isNew': False
+            }
+        }
+        mock_post.assert_called_with(
+            f'{DUMMY_URL}/v2/recipe/update/{DUMMY_KITCHEN}/{DUMMY_RECIPE}',
+            headers=None,
+            json={
+                'skipFormat': True,
+                'skipCompile': True,
+                'files': files,
+                'message': f'Patching recipe files {files.keys()}'
+            }
+        )
+
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient._validate_token')
+    @patch('dkutils.datakitchen_api.datakitchen_client.requests.post')
+    def test_patch_recipe_files_missing_files(self, mock_post, _):
+        mock_post.return_value = MockResponse(json=MOCK_RECIPE_FILES_RESPONSE_JSON)
+        with self.assertRaises(FileNotFoundError):
+            Recipe(self.dk_client, DUMMY_RECIPE).patch_recipe_files(
+                DUMMY_KITCHEN, {'missing.json': []}
+            )
+
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient._validate_token')
+    @patch('dkutils.datakitchen_api.datakitchen_client.requests.post')
+    def test_sync_recipe_files(self, mock_post, _):
+        mock_post.return_value = MockResponse(json=MOCK_RECIPE_TREE_RESPONSE_JSON)
+        filepaths = {
+            'README.md': 'README contents',
+            'variables.json': 'New variables contents',
+            'new_file.txt': 'New file contents',
+        }
+        responses = Recipe(self.dk_client, DUMMY_RECIPE).sync_recipe_files(DUMMY_KITCHEN, filepaths)
+        self.assertEqual(1, len(responses))
+        self.assertEqual(2, mock_post.call_count)
+        files = {
+            'variables.json': {
+                'contents': 'New variables contents',
+                'isNew': False
+            },
+            'new_file.txt': {
+                'contents': 'New file contents',
+                'isNew': True
+            }
+        }
+        mock_post.assert_called_with(
+            f'{DUMMY_URL}/v2/recipe/update/{DUMMY_KITCHEN}/{DUMMY_RECIPE}',
+            headers=None,
+            json={
+                'skipFormat': True,
+                'skipCompile': True,
+                'files': files,
+                'message': f'Syncing recipe files {files.keys()}'
+            }
+        )
+
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient._validate_token')
+    @patch('dkutils.datakitchen_api.datakitchen_client.requests.post')
+    def test_sync_recipe_files_unchanged(self, mock_post, _):
+        mock_post.return_value = MockResponse(json=MOCK_RECIPE_TREE_RESPONSE_JSON)
+        responses = Recipe(self.dk_client, DUMMY_RECIPE).sync_recipe_files(
+            DUMMY_KITCHEN, {'README.md': 'README contents'}
+        )
+        self.assertEqual([], responses)
+        mock_post.assert_called_once()
+
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient._validate_token')
+    @patch('dkutils.datakitchen_api.datakitchen_client.requests.post')
+    def test_sync_recipe_files_with_recipe_tree(self, mock_post, _):
+        recipe_tree = {'README.md': get_git_blob_sha('README contents')}
+        responses = Recipe(self.dk_client, DUMMY_RECIPE).sync_recipe_files(
+            DUMMY_KITCHEN, {'README.md': 'README contents', 'new_file.txt': 'New file contents'},
+            recipe_tree=recipe_tree
+        )
+        self.assertEqual(1, len(responses))
+        mock_post.assert_called_once()
+        self.assertEqual(
+            {'new_file.txt': {'contents': 'New file contents', 'isNew': True}},
+            mock_post.call_args.kwargs['json']['files']
+        )
+
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient._validate_token')
+    @patch('dkutils.datakitchen_api.datakitchen_client.requests.post')
+    def test_sync_recipe_files_batches(self, mock_post, _):
+        mock_post.return_value = MockResponse(json=MOCK_RECIPE_TREE_RESPONSE_JSON)
+        filepaths = {'a.txt': 'aaaa', 'b.txt': 'bbbb', 'c.txt': 'cccccccc'}
+        responses = Recipe(self.dk_client, DUMMY_RECIPE).sync_recipe_files(
+            DUMMY_KITCHEN, filepaths, max_batch_bytes=8
+        )
+        self.assertEqual(2, len(responses))
+        batches = [c.kwargs['json']['files'] for c in mock_post.call_args_list[1:]]
+        self.assertEqual([['a.txt', 'b.txt'], ['c.txt']], [list(b.keys()) for b in batches])
@@ -0,0 +1,181 @@
+import json
+
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import patch
+
+from dkutils.datakitchen_api.datakitchen_client import DataKitchenClient
+from dkutils.datakitchen_api.recipe import Recipe, get_git_blob_sha
+from dkutils.datakitchen_api.recipe_mirror import MANIFEST_FILENAME, MirrorChanges, RecipeMirror
+from .test_datakitchen_client import (
+    DUMMY_USERNAME, DUMMY_PASSWORD, DUMMY_URL, DUMMY_KITCHEN, DUMMY_RECIPE
+)
+
+README = 'README.md'
+NODE_FILE = str(Path('node1') / 'description.json')
+REMOTE_FILES = {README: 'README contents', NODE_FILE: '{\n    "type": "DKNode_Container"\n}'}
+
+
+def get_tree(files):
+    return {path: get_git_blob_sha(contents) for path, contents in files.items()}
+
+
+@patch.object(Recipe, 'delete_recipe_files')
+@patch.object(Recipe, 'sync_recipe_files')
+@patch.object(Recipe, 'get_recipe_files')
+@patch.object(Recipe, 'get_recipe_tree')
+class TestRecipeMirror(TestCase):
+
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient._validate_token')
+    def setUp(self, _):
+        dk_client = DataKitchenClient(
+            DUMMY_USERNAME, DUMMY_PASSWORD, kitchen=DUMMY_KITCHEN, base_url=DUMMY_URL
+        )
+        self.recipe = Recipe(dk_client, DUMMY_RECIPE)
+        self.temp_dir = TemporaryDirectory()
+        self.local_path = Path(self.temp_dir.name) / DUMMY_RECIPE
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def pull(self, mock_tree, mock_files, remote_files=REMOTE_FILES):
+        mock_tree.return_value = get_tree(remote_files)
+        mock_files.side_effect = lambda _, paths: {p: remote_files[p] for p in paths}
+        return RecipeMirror(self.recipe, DUMMY_KITCHEN, self.local_path).pull()
+
+    def test_pull(self, mock_tree, mock_files, *_):
+        changes = self.pull(mock_tree, mock_files)
+        self.assertEqual(MirrorChanges(updated=[README, NODE_FILE]), changes)
+        self.assertEqual(REMOTE_FILES[NODE_FILE], (self.local_path / NODE_FILE).read_text())
+        with open(self.local_path / MANIFEST_FILENAME) as manifest_file:
+            self.assertEqual(get_tree(REMOTE_FILES), json.load(manifest_file)['files'])
+
+    def test_pull_retrieves_only_changed_files(self, mock_tree, mock_files, *_):
+        self.pull(mock_tree, mock_files)
+        remote_files = {README: 'New README contents', 'new.txt': 'New file contents'}
+        changes = self.pull(mock_tree, mock_files, remote_files)
+        mock_files.assert_called_with(DUMMY_KITCHEN, [README, 'new.txt'])
+        self.assertEqual(MirrorChanges(updated=[README, 'new.txt'], deleted=[NODE_FILE]), changes)
+        self.assertFalse((self.local_path / NODE_FILE).exists())
+
+    def test_pull_reports_conflicts(self, mock_tree, mock_files, *_):
+        self.pull(mock_tree, mock_files)
+        (self.local_path / README).write_text('Local README contents')
+        changes = self.pull(mock_tree, mock_files, {**REMOTE_FILES, README: 'New README contents'})
+        mock_files.assert_called_with(DUMMY_KITCHEN, [])
+        self.assertEqual(MirrorChanges(conflicts=[README]), changes)
+        self.assertEqual('Local README contents', (self.local_path / README).read_text())
+
+    def test_pull_reports_remote_edit_of_locally_deleted_file(self, mock_tree, mock_files, *_):
+        self.pull(mock_tree, mock_files)
+        (self.local_path / NODE_FILE).unlink()
+        mirror = RecipeMirror(self.recipe, DUMMY_KITCHEN, self.local_path)
+        mock_tree.return_value = get_tree({**REMOTE_FILES, NODE_FILE: '{}'})
+        self.assertEqual(MirrorChanges(conflicts=[NODE_FILE]), mirror.pull())
+        self.assertFalse((self.local_path / NODE_FILE).exists())
+        self.assertEqual(MirrorChanges(deleted=[NODE_FILE]), mirror.get_local_changes())
+
+    def test_pull_with_force_overwrites_local_changes(self, mock_tree, mock_files, *_):
+        self.pull(mock_tree, mock_files)
+        (self.local_path / README).write_text('Local README contents')
+        (self.local_path / NODE_FILE).unlink()
+        remote_files = {README: 'New README contents', NODE_FILE: '{}'}
+        mock_tree.return_value = get_tree(remote_files)
+        mock_files.side_effect = lambda _, paths: {p: remote_files[p] for p in paths}
+        mirror = RecipeMirror(self.recipe, DUMMY_KITCHEN, self.local_path)
+        self.assertEqual(MirrorChanges(updated=[README, NODE_FILE]), mirror.pull(force=True))
+        self.assertEqual('{}', (self.local_path / NODE_FILE).read_text())
+        self.assertEqual(MirrorChanges(), mirror.get_local_changes())
+
+    def test_push(self, mock_tree, mock_files, mock_sync, mock_delete):
+        self.pull(mock_tree, mock_files)
+        (self.local_path / README).write_text('Local README contents')
+        (self.local_path / 'new.txt').write_text('New file contents')
+        (self.local_path / NODE_FILE).unlink()
+
+        mirror = RecipeMirror(self.recipe, DUMMY_KITCHEN, self.local_path)
+        changes = mirror.push()
+        self.assertEqual(MirrorChanges(updated=[README, 'new.txt'], deleted=[NODE_FILE]), changes)
+        mock_sync.assert_called_once_with(
+            DUMMY_KITCHEN, {
+                README: 'Local README contents',
+                'new.txt': 'New file contents'
+            },
+            recipe_tree=mock_tree.return_value
+        )
+        mock_delete.assert_called_once_with(DUMMY_KITCHEN, [NODE_FILE])
+        self.assertEqual(MirrorChanges(), mirror.get_local_changes())
+
+    def test_push_without_changes(self, mock_tree, mock_files, mock_sync, mock_delete):
+        self.pull(mock_tree, mock_files)
+        changes = RecipeMirror(self.recipe, DUMMY_KITCHEN, self.local_path).push()
+        self.assertEqual(MirrorChanges(), changes)
+        mock_sync.assert_not_called()
+        mock_delete.assert_not_called()
+
+    def test_push_reports_remote_edit_of_locally_modified_file(
+        self, mock_tree, mock_files, mock_sync, mock_delete
+    ):
+        self.pull(mock_tree, mock_files)
+        (self.local_path / README).write_text('Local README contents')
+        (self.local_path / 'new.txt').write_text('New file contents')
+        mock_tree.return_value = get_tree({**REMOTE_FILES, README: 'New README contents'})
+
+        mirror = RecipeMirror(self.recipe, DUMMY_KITCHEN, self.local_path)
+        changes = mirror.push()
+        self.assertEqual(MirrorChanges(updated=['new.txt'], conflicts=[README]), changes)
+        mock_sync.assert_called_once_with(
+            DUMMY_KITCHEN, {'new.txt': 'New file contents'}, recipe_tree=mock_tree.return_value
+        )
+        mock_delete.assert_not_called()
+        self.assertEqual(MirrorChanges(updated=[README]), mirror.get_local_changes())
+
+    def test_push_reports_remote_edit_of_locally_deleted_file(
+        self, mock_tree, mock_files, mock_sync, mock_delete
+    ):
+        self.pull(mock_tree, mock_files)
+        (self.local_path / NODE_FILE).unlink()
+        mock_tree.return_value = get_tree({**REMOTE_FILES, NODE_FILE: '{}'})
+
+        mirror = RecipeMirror(self.recipe, DUMMY_KITCHEN, self.local_path)
+        changes = mirror.push()
+        self.assertEqual(MirrorChanges(conflicts=[NODE_FILE]), changes)
+        mock_sync.assert_not_called()
+        mock_delete.assert_not_called()
+        self.assertEqual(MirrorChanges(deleted=[NODE_FILE]), mirror.get_local_changes())
+
+    def test_push_with_force_overwrites_remote_changes(
+        self, mock_tree, mock_files, mock_sync, mock_delete
+    ):
+        self.pull(mock_tree, mock_files)
+        (self.local_path / README).write_text('Local README contents')
+        (self.local_path / NODE_FILE).unlink()
+        mock_tree.reset_mock()
+
+        mirror = RecipeMirror(self.recipe, DUMMY_KITCHEN, self.local_path)
+        changes = mirror.push(force=True)
+        self.assertEqual(MirrorChanges(updated=[README], deleted=[NODE_FILE]), changes)
+        mock_tree.assert_not_called()
+        mock_sync.assert_called_once_with(DUMMY_KITCHEN, {README: 'Local README contents'}, recipe_tree=None)
+        mock_delete.assert_called_once_with(DUMMY_KITCHEN, [NODE_FILE])
+        self.assertEqual(MirrorChanges(), mirror.get_local_changes())
+
+    def test_push_skips_changes_already_in_kitchen(
+        self, mock_tree, mock_files, mock_sync, mock_delete
+    ):
+        self.pull(mock_tree, mock_files)
+        (self.local_path / README).write_text('New README contents')
+        (self.local_path / NODE_FILE).unlink()
+        mock_tree.return_value = get_tree({README: 'New README contents'})
+
+        mirror = RecipeMirror(self.recipe, DUMMY_KITCHEN, self.local_path)
+        self.assertEqual(MirrorChanges(), mirror.push())
+        mock_sync.assert_not_called()
+        mock_delete.assert_not_called()
+        self.assertEqual(MirrorChanges(), mirror.get_local_changes())
+
+    def test_manifest_for_other_recipe_raises_value_error(self, mock_tree, mock_files, *_):
+        self.pull(mock_tree, mock_files)
+        with self.assertRaises(ValueError):
+            RecipeMirror(Recipe(None, 'other_recipe'), DUMMY_KITCHEN, self.local_path)
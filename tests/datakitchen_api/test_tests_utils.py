@@ -2,18 +2,32 @@ import json
 
 from nose.tools import nottest
 from pathlib import Path
+from tempfile import TemporaryDirectory
 from unittest import TestCase
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 
+import pandas as pd
+
+from requests.exceptions import HTTPError
+
+from dkutils.circuit_breaker import CircuitBreaker
 from dkutils.datakitchen_api.datakitchen_client import DataKitchenClient
 from dkutils.datakitchen_api.tests_utils import (
+    TestInfo,
+    TestInventoryCache,
     extract_tests_from_files,
     get_recipe_test_paths,
+    get_recipe_test_infos,
     get_test_infos,
     is_valid_test_directory,
     is_valid_test_file,
+    iter_test_info_columns,
+    iter_test_infos,
+    test_infos_to_dataframe,
     write_test_infos_csv,
+    write_test_infos_parquet,
 )
+from dkutils.retry import RetryBudget, RetryPolicy
 
 from .test_datakitchen_client import (
     DUMMY_USERNAME,
@@ -22,12 +36,19 @@ from .test_datakitchen_client import (
     DUMMY_URL,
 )
 
+TestInfo = nottest(TestInfo)
+TestInventoryCache = nottest(TestInventoryCache)
 extract_tests_from_files = nottest(extract_tests_from_files)
+get_recipe_test_infos = nottest(get_recipe_test_infos)
 get_recipe_test_paths = nottest(get_recipe_test_paths)
 get_test_infos = nottest(get_test_infos)
 is_valid_test_directory = nottest(is_valid_test_directory)
 is_valid_test_file = nottest(is_valid_test_file)
+iter_test_info_columns = nottest(iter_test_info_columns)
+iter_test_infos = nottest(iter_test_infos)
+test_infos_to_dataframe = nottest(test_infos_to_dataframe)
 write_test_infos_csv = nottest(write_test_infos_csv)
+write_test_infos_parquet = nottest(write_test_infos_parquet)
 
 DATESTAMP = '2021-04-07 12:36:01.047096'
 PARENT_DIR = Path(__file__).parent
@@ -53,6 +74,29 @@ EXPECTED_TEST_PATHS = [
 ]
 
 
+def load_json(filename):
+    with open(PARENT_DIR.joinpath(filename)) as json_file:
+        return json.load(json_file)
+
+
+def mock_get_recipe_side_effect(recipe_files=None, include_recipe_tree=False):
+    if include_recipe_tree:
+        return load_json('get_recipe_with_tests.json')
+    return load_json('get_recipe_only_test_files_no_tree.json')
+
+
+def mock_get_recipe_files_side_effect(recipe_files=None, include_recipe_tree=False):
+    # Only return the requested files, as the API does
+    recipes = load_json('get_recipe_only_test_files_no_tree.json')['recipes']
+    for recipe_name, recipe_contents in recipes.items():
+        for file_dir, files in recipe_contents.items():
+            recipe_contents[file_dir] = [
+                file_info for file_info in files
+                if str(Path(file_dir) / file_info['filename'])[len(recipe_name) + 1:] in recipe_files
+            ]
+    return {'recipes': recipes}
+
+
 class TestTestsUtilsNoClient(TestCase):
 
     def test_is_valid_test_directory_1(self):
@@ -139,6 +183,90 @@ class TestTestsUtils(TestCase):
         self.assertEqual('Foo', self.dk_client.kitchen)
         self.assertEqual('Training_Sales_Forecast', self.dk_client.recipe)
 
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient.get_recipe')
+    def test_extract_tests_from_files_in_chunks(self, mock_get_recipe):
+        self.dk_client.recipe = 'Training_Sales_Forecast'
+        mock_get_recipe.side_effect = mock_get_recipe_files_side_effect
+        test_infos = extract_tests_from_files(
+            self.dk_client, DATESTAMP, EXPECTED_TEST_PATHS, chunk_size=5, max_workers=2
+        )
+        self.assertEqual(16, len(test_infos))
+        self.assertEqual(4, mock_get_recipe.call_count)
+        for call in mock_get_recipe.call_args_list:
+            self.assertLessEqual(len(call.kwargs['recipe_files']), 5)
+
+    @patch('dkutils.retry.time.sleep')
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient.get_recipe')
+    def test_extract_tests_from_files_splits_failed_chunk(self, mock_get_recipe, _):
+        self.dk_client.recipe = 'Training_Sales_Forecast'
+
+        def side_effect(recipe_files=None, include_recipe_tree=False):
+            if len(recipe_files) > 10:
+                raise HTTPError('Gateway Timeout', response=Mock(status_code=504))
+            return mock_get_recipe_files_side_effect(recipe_files, include_recipe_tree)
+
+        mock_get_recipe.side_effect = side_effect
+        test_infos = extract_tests_from_files(self.dk_client, DATESTAMP, EXPECTED_TEST_PATHS)
+        self.assertEqual(16, len(test_infos))
+        # Three failed attempts for the whole chunk, then one attempt for each half
+        self.assertEqual(5, mock_get_recipe.call_count)
+
+    @patch('dkutils.retry.time.sleep')
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient.get_recipe')
+    def test_extract_tests_from_files_splits_failed_chunk_once(self, mock_get_recipe, _):
+        self.dk_client.recipe = 'Training_Sales_Forecast'
+        mock_get_recipe.side_effect = HTTPError('Gateway Timeout', response=Mock(status_code=504))
+        with self.assertRaises(HTTPError):
+            extract_tests_from_files(self.dk_client, DATESTAMP, EXPECTED_TEST_PATHS, max_workers=1)
+        # Three failed attempts for the whole chunk, then three for the first half, which isn't split
+        self.assertEqual(6, mock_get_recipe.call_count)
+
+    @patch('dkutils.retry.time.sleep')
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient.get_recipe')
+    def test_extract_tests_from_files_does_not_split_on_server_errors(self, mock_get_recipe, _):
+        self.dk_client.recipe = 'Training_Sales_Forecast'
+        mock_get_recipe.side_effect = HTTPError('Service Unavailable', response=Mock(status_code=503))
+        with self.assertRaises(HTTPError):
+            extract_tests_from_files(self.dk_client, DATESTAMP, EXPECTED_TEST_PATHS)
+        self.assertEqual(3, mock_get_recipe.call_count)
+
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient.get_recipe')
+    def test_extract_tests_from_files_does_not_split_without_retry_budget(self, mock_get_recipe):
+        self.dk_client.recipe = 'Training_Sales_Forecast'
+        self.dk_client.retry_policy = RetryPolicy(budget=RetryBudget(min_retries=0))
+        mock_get_recipe.side_effect = HTTPError('Gateway Timeout', response=Mock(status_code=504))
+        with self.assertRaises(HTTPError):
+            extract_tests_from_files(self.dk_client, DATESTAMP, EXPECTED_TEST_PATHS)
+        # The requests are only retried by the client, whose get_recipe is mocked
+        mock_get_recipe.assert_called_once()
+
+    @patch('dkutils.retry.time.sleep')
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient.get_recipe')
+    def test_extract_tests_from_files_does_not_split_with_open_circuit(self, mock_get_recipe, _):
+        self.dk_client.recipe = 'Training_Sales_Forecast'
+        self.dk_client.circuit_breaker = CircuitBreaker(failure_threshold=1)
+
+        def side_effect(recipe_files=None, include_recipe_tree=False):
+            self.dk_client.circuit_breaker.on_failure('recipe')
+            raise HTTPError('Gateway Timeout', response=Mock(status_code=504))
+
+        mock_get_recipe.side_effect = side_effect
+        with self.assertRaises(HTTPError):
+            extract_tests_from_files(self.dk_client, DATESTAMP, EXPECTED_TEST_PATHS)
+        self.assertEqual(3, mock_get_recipe.call_count)
+
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient.get_recipe')
+    def test_extract_tests_from_files_client_error_raises(self, mock_get_recipe):
+        self.dk_client.recipe = 'Training_Sales_Forecast'
+        mock_get_recipe.side_effect = HTTPError('Not Found', response=Mock(status_code=404))
+        with self.assertRaises(HTTPError):
+            extract_tests_from_files(self.dk_client, DATESTAMP, EXPECTED_TEST_PATHS)
+        mock_get_recipe.assert_called_once()
+
+    def test_extract_tests_from_files_invalid_chunk_size_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            extract_tests_from_files(self.dk_client, DATESTAMP, EXPECTED_TEST_PATHS, chunk_size=0)
+
     @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient.get_recipe')
     def test_get_test_infos(self, mock_get_recipe):
         side_effects = []
@@ -152,6 +280,81 @@ class TestTestsUtils(TestCase):
         self.assertEqual(len(test_infos), 16)
         self.assertEqual('Foo', self.dk_client.kitchen)
 
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient.get_recipe')
+    def test_get_test_infos_concurrently(self, mock_get_recipe):
+        mock_get_recipe.side_effect = mock_get_recipe_side_effect
+        recipes = ['Training_Sales_Forecast', 'Other_Recipe', 'Another_Recipe']
+        test_infos = get_test_infos(self.dk_client, DATESTAMP, recipes, max_workers=3)
+        self.assertEqual(48, len(test_infos))
+        self.assertEqual(
+            ['Training_Sales_Forecast'] * 16 + ['Other_Recipe'] * 16 + ['Another_Recipe'] * 16,
+            [test_info.recipe for test_info in test_infos]
+        )
+
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient.get_recipe')
+    def test_get_recipe_test_infos_does_not_modify_client(self, mock_get_recipe):
+        mock_get_recipe.side_effect = mock_get_recipe_side_effect
+        test_infos = get_recipe_test_infos(
+            self.dk_client, DATESTAMP, 'Foo', 'Training_Sales_Forecast'
+        )
+        self.assertEqual(16, len(test_infos))
+        self.assertEqual({'Foo'}, {test_info.kitchen for test_info in test_infos})
+        self.assertEqual(DUMMY_KITCHEN, self.dk_client.kitchen)
+        self.assertIsNone(self.dk_client.recipe)
+
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient.get_recipe')
+    def test_get_recipe_test_infos_no_test_paths(self, mock_get_recipe):
+        mock_get_recipe.return_value = load_json('get_recipe_readme_with_tree.json')
+        self.assertEqual([], get_recipe_test_infos(self.dk_client, DATESTAMP, 'Foo', 'Recipe_Test'))
+        mock_get_recipe.assert_called_once()
+
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient.get_recipe')
+    def test_get_recipe_test_infos_in_chunks(self, mock_get_recipe):
+        mock_get_recipe.side_effect = lambda recipe_files=None, include_recipe_tree=False: (
+            mock_get_recipe_side_effect(recipe_files, include_recipe_tree) if include_recipe_tree else
+            mock_get_recipe_files_side_effect(recipe_files, include_recipe_tree)
+        )
+        test_infos = get_recipe_test_infos(
+            self.dk_client, DATESTAMP, 'Foo', 'Training_Sales_Forecast', chunk_size=5, max_chunk_workers=2
+        )
+        self.assertEqual(16, len(test_infos))
+        files_calls = [call for call in mock_get_recipe.call_args_list if not call.kwargs.get('include_recipe_tree')]
+        self.assertEqual(4, len(files_calls))
+        for call in files_calls:
+            self.assertLessEqual(len(call.kwargs['recipe_files']), 5)
+
+    def test_get_recipe_test_infos_invalid_chunk_size_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            get_recipe_test_infos(self.dk_client, DATESTAMP, 'Foo', 'Training_Sales_Forecast', chunk_size=0)
+
+    @patch('dkutils.datakitchen_api.tests_utils._extract_tests_by_path', return_value={})
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient.get_recipe')
+    def test_iter_test_infos_passes_chunk_arguments(self, mock_get_recipe, mock_extract_tests_by_path):
+        mock_get_recipe.side_effect = mock_get_recipe_side_effect
+        test_infos = iter_test_infos(
+            self.dk_client, DATESTAMP, ['Training_Sales_Forecast'], chunk_size=5, max_chunk_workers=2
+        )
+        self.assertEqual([], list(test_infos))
+        _, _, _, chunk_size, max_chunk_workers = mock_extract_tests_by_path.call_args[0]
+        self.assertEqual((5, 2), (chunk_size, max_chunk_workers))
+
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient.get_recipe')
+    def test_iter_test_infos(self, mock_get_recipe):
+        mock_get_recipe.side_effect = mock_get_recipe_side_effect
+        progress = []
+        recipes = ['Training_Sales_Forecast', 'Other_Recipe']
+        test_infos = iter_test_infos(
+            self.dk_client,
+            DATESTAMP,
+            recipes,
+            kitchen='Foo',
+            max_workers=2,
+            progress_callback=lambda done, total, _: progress.append((done, total))
+        )
+        self.assertEqual(32, sum(1 for _ in test_infos))
+        self.assertEqual([(1, 2), (2, 2)], progress)
+        self.assertEqual(DUMMY_KITCHEN, self.dk_client.kitchen)
+
     @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient.get_recipe')
     def test_write_test_infos_csv(self, mock_get_recipe):
         side_effects = []
@@ -168,3 +371,131 @@ class TestTestsUtils(TestCase):
         with open(expected_test_infos_path) as expected_file, \
                 open(observed_test_infos_path) as observed_file:
             self.assertListEqual(expected_file.readlines(), observed_file.readlines())
+
+
+class TestTestInfoColumns(TestCase):
+
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient._validate_token')
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient.get_recipe')
+    def setUp(self, mock_get_recipe, _):
+        mock_get_recipe.side_effect = mock_get_recipe_side_effect
+        dk_client = DataKitchenClient(
+            DUMMY_USERNAME, DUMMY_PASSWORD, kitchen=DUMMY_KITCHEN, base_url=DUMMY_URL
+        )
+        self.test_infos = get_test_infos(dk_client, DATESTAMP, ['Training_Sales_Forecast'])
+        self.temp_dir = TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_iter_test_info_columns(self):
+        row_groups = list(iter_test_info_columns(iter(self.test_infos), row_group_size=5))
+        self.assertEqual([5, 5, 5, 1], [len(columns['test']) for columns in row_groups])
+        self.assertEqual(list(TestInfo.keys()), list(row_groups[0].keys()))
+        self.assertEqual(
+            [test_info.node for test_info in self.test_infos],
+            [node for columns in row_groups for node in columns['node']]
+        )
+
+    def test_iter_test_info_columns_invalid_row_group_size_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            next(iter_test_info_columns(self.test_infos, row_group_size=0))
+
+    def test_test_infos_to_dataframe(self):
+        expected = pd.read_csv(
+            PARENT_DIR / 'expected_test_infos.csv', dtype=str, keep_default_na=False
+        )
+        observed = test_infos_to_dataframe(self.test_infos, row_group_size=5)
+        self.assertEqual(expected.values.tolist(), observed.astype(str).values.tolist())
+        self.assertListEqual(list(expected.columns), list(observed.columns))
+
+    def test_test_infos_to_dataframe_empty(self):
+        self.assertListEqual(list(TestInfo.keys()), list(test_infos_to_dataframe([]).columns))
+
+    def test_write_test_infos_parquet(self):
+        observed_path = Path(self.temp_dir.name) / 'test_infos.parquet'
+        self.assertEqual(16, write_test_infos_parquet(self.test_infos, observed_path, row_group_size=5))
+        self.assertEqual(
+            test_infos_to_dataframe(self.test_infos).astype(str).values.tolist(),
+            pd.read_parquet(observed_path).values.tolist()
+        )
+
+    def test_test_info_is_slotted(self):
+        with self.assertRaises(AttributeError):
+            self.test_infos[0].foo = 'bar'
+
+
+class TestTestInventoryCache(TestCase):
+
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient._validate_token')
+    def setUp(self, _):
+        self.dk_client = DataKitchenClient(
+            DUMMY_USERNAME, DUMMY_PASSWORD, kitchen=DUMMY_KITCHEN, base_url=DUMMY_URL
+        )
+        self.temp_dir = TemporaryDirectory()
+        self.cache_path = Path(self.temp_dir.name) / 'test_inventory.json'
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def get_recipe_test_infos(self, cache, datestamp=DATESTAMP):
+        return get_recipe_test_infos(
+            self.dk_client, datestamp, DUMMY_KITCHEN, 'Training_Sales_Forecast', cache=cache
+        )
+
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient.get_recipe')
+    def test_get_recipe_test_infos_reuses_cached_tests(self, mock_get_recipe):
+        mock_get_recipe.side_effect = mock_get_recipe_side_effect
+        cache = TestInventoryCache()
+        expected_test_infos = self.get_recipe_test_infos(cache)
+        self.assertEqual(16, len(expected_test_infos))
+        self.assertEqual(2, mock_get_recipe.call_count)
+
+        mock_get_recipe.reset_mock()
+        self.assertEqual(expected_test_infos, self.get_recipe_test_infos(cache))
+        # Only the recipe tree is retrieved
+        mock_get_recipe.assert_called_once_with(
+            recipe_files=['description.json'], include_recipe_tree=True
+        )
+
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient.get_recipe')
+    def test_get_recipe_test_infos_retrieves_changed_files(self, mock_get_recipe):
+        tree_response = load_json('get_recipe_with_tests.json')
+        mock_get_recipe.side_effect = lambda recipe_files=None, include_recipe_tree=False: \
+            tree_response if include_recipe_tree else mock_get_recipe_files_side_effect(recipe_files)
+        cache = TestInventoryCache()
+        expected_test_infos = self.get_recipe_test_infos(cache)
+
+        recipe_tree = tree_response['recipe-tree']['Training_Sales_Forecast']
+        recipe_tree['Training_Sales_Forecast/Train_Model'][1]['sha'] = 'changed'
+        mock_get_recipe.reset_mock()
+        self.assertEqual(expected_test_infos, self.get_recipe_test_infos(cache))
+        self.assertEqual(2, mock_get_recipe.call_count)
+        mock_get_recipe.assert_called_with(
+            recipe_files=['Train_Model/notebook.json'], include_recipe_tree=False
+        )
+
+    @patch('dkutils.datakitchen_api.datakitchen_client.DataKitchenClient.get_recipe')
+    def test_save_and_load(self, mock_get_recipe):
+        mock_get_recipe.side_effect = mock_get_recipe_side_effect
+        cache = TestInventoryCache(self.cache_path)
+        self.get_recipe_test_infos(cache)
+        cache.save()
+
+        mock_get_recipe.reset_mock()
+        test_infos = self.get_recipe_test_infos(TestInventoryCache(self.cache_path), 'later')
+        self.assertEqual(16, len(test_infos))
+        self.assertEqual({'later'}, {test_info.datestamp for test_info in test_infos})
+        mock_get_recipe.assert_called_once()
+
+    def test_get_tests_with_different_sha_returns_none(self):
+        cache = TestInventoryCache()
+        cache.update_recipe(DUMMY_KITCHEN, 'Recipe', {'Node/notebook.json': ('sha', [])})
+        self.assertEqual([], cache.get_tests(DUMMY_KITCHEN, 'Recipe', 'Node/notebook.json', 'sha', DATESTAMP))
+        self.assertIsNone(
+            cache.get_tests(DUMMY_KITCHEN, 'Recipe', 'Node/notebook.json', 'other', DATESTAMP)
+        )
+
+    def test_save_without_path_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            TestInventoryCache().save()
@@ -185,7 +185,7 @@ class Test(TestCase):
 
 class TestGmailClient(TestCase):
 
-    @patch('dkutils.gmail_api.gmail_client.build')
+    @patch('dkutils.gmail_api.gmail_client.discovery.build')
     def setUp(self, mock_build):
         self.test_dir = tempfile.TemporaryDirectory()
         self.client = GMailClient({})
@@ -201,7 +201,7 @@ class TestGmailClient(TestCase):
         self.assertEqual("Credentials file must exist", cm.exception.args[0])
 
     @patch('dkutils.gmail_api.gmail_client.pickle')
-    @patch('dkutils.gmail_api.gmail_client.InstalledAppFlow')
+    @patch('dkutils.gmail_api.gmail_client.google_auth_oauthlib_flow.InstalledAppFlow')
     def test_create_base64_encoded_token(self, mock_installed_app_flow, mock_pickle):
         base64_token_file = Path(self.test_dir.name) / 'token.b64'
         credentials_file = RESOURCES / "credentials.json"
@@ -238,7 +238,7 @@ class TestGmailClient(TestCase):
 
         mock_getenv.assert_called_once_with(variable_name)
 
-    @patch('dkutils.gmail_api.gmail_client.build')
+    @patch('dkutils.gmail_api.gmail_client.discovery.build')
     def test_constructor(self, mock_build):
         creds = {}
 
@@ -2,7 +2,7 @@ from jira.exceptions import JIRAError
 from unittest import TestCase
 from unittest.mock import patch
 
-from dkutils.jira_api.jira_client import JiraClient
+from dkutils.jira_api.jira_client import JiraClient, _observe_response
 
 DUMMY_API_KEY = 'dummy_api_key'
 DUMMY_COMMENT = 'dummy_comment'
@@ -51,6 +51,7 @@ class TestJiraClient(TestCase):
         options = {'server': DUMMY_SERVER}
         basic_auth = (DUMMY_USERNAME, DUMMY_API_KEY)
         self.mock_jira.assert_called_once_with(options, basic_auth=basic_auth)
+        self.mock_jira_instance._session.hooks['response'].append.assert_called_once_with(_observe_response)
 
     def test_transition_issue(self):
         self.mock_jira_instance.issue.return_value = DUMMY_ISSUE
@@ -18,7 +18,7 @@ TYPE_TEXT = 'text'
 
 class TestDataFrameWrapper(TestCase):
 
-    @patch('dkutils.reporting.dataframe_wrapper.create_engine')
+    @patch('dkutils.reporting.dataframe_wrapper.sqlalchemy.create_engine')
     def test_snowflake(self, create_engine):
         DataFrameWrapper.snowflake(USERNAME, PASSWORD, SNOWFLAKE_ACCOUNT, DATABASE, WAREHOSE)
 
@@ -27,7 +27,7 @@ class TestDataFrameWrapper(TestCase):
             f"/{DATABASE}?warehouse={WAREHOSE}"
         )
 
-    @patch('dkutils.reporting.dataframe_wrapper.create_engine')
+    @patch('dkutils.reporting.dataframe_wrapper.sqlalchemy.create_engine')
     def test_postgresql(self, mock_create_engine):
         DataFrameWrapper.postgresql(USERNAME, PASSWORD, HOSTNAME, DATABASE, PORT)
 
@@ -35,7 +35,7 @@ class TestDataFrameWrapper(TestCase):
             f"postgresql://{USERNAME}:{PASSWORD}@{HOSTNAME}:{PORT}/{DATABASE}"
         )
 
-    @patch('dkutils.reporting.dataframe_wrapper.create_engine')
+    @patch('dkutils.reporting.dataframe_wrapper.sqlalchemy.create_engine')
     def test_mssql(self, mock_create_engine):
         DataFrameWrapper.mssql(USERNAME, PASSWORD, HOSTNAME, DATABASE, PORT)
 
@@ -43,7 +43,7 @@ class TestDataFrameWrapper(TestCase):
             f"mssql+pymssql://{USERNAME}:{PASSWORD}@{HOSTNAME}:{PORT}/{DATABASE}"
         )
 
-    @patch('dkutils.reporting.dataframe_wrapper.create_engine')
+    @patch('dkutils.reporting.dataframe_wrapper.sqlalchemy.create_engine')
     def setUp(self, mock_create_engine) -> None:
         self.sut = DataFrameWrapper("")
         self.mock_engine = mock_create_engine.return_value
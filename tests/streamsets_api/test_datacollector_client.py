@@ -1,6 +1,9 @@
 from unittest import TestCase
 from unittest.mock import patch
 
+from requests.exceptions import ConnectionError
+
+from dkutils.retry import RetryPolicy
 from dkutils.streamsets_api.datacollector_client import DataCollectorClient, PipelineStatus
 from tests.datakitchen_api.test_datakitchen_client import MockResponse
 
@@ -54,6 +57,14 @@ class TestDataCollectorClient(TestCase):
         )
         self.assertEqual(PIPELINE_STATUS, status)
 
+    @patch('dkutils.retry.time.sleep')
+    @patch('dkutils.streamsets_api.datacollector_client.requests.get')
+    def test_get_pipeline_full_status_with_retry_policy(self, mock_get, _):
+        mock_get.side_effect = [ConnectionError('Connection reset by peer'), MockResponse(json=PIPELINE_STATUS)]
+        client = DataCollectorClient(HOST, PORT, USER, PASSWORD, retry_policy=RetryPolicy())
+        self.assertEqual(PIPELINE_STATUS, client.get_pipeline_full_status(PIPELINE_ID))
+        self.assertEqual(2, mock_get.call_count)
+
     @patch('dkutils.streamsets_api.datacollector_client.requests.get')
     def test_get_pipeline_status(self, mock_get):
         mock_get.return_value = MockResponse(json=PIPELINE_STATUS)
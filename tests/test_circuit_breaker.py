@@ -0,0 +1,103 @@
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from requests.exceptions import ConnectionError, HTTPError
+
+from dkutils.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitBreakerOpenError,
+)
+
+ENDPOINT = 'order'
+
+
+def fail():
+    raise ConnectionError('Connection refused')
+
+
+@patch('dkutils.circuit_breaker.time.monotonic')
+class TestCircuitBreaker(TestCase):
+
+    def setUp(self):
+        self.circuit_breaker = CircuitBreaker(failure_threshold=2, recovery_timeout_secs=10)
+
+    def open_circuit(self):
+        for _ in range(2):
+            with self.assertRaises(ConnectionError):
+                self.circuit_breaker.call(ENDPOINT, fail)
+
+    def test_opens_after_consecutive_failures(self, mock_monotonic):
+        mock_monotonic.return_value = 0
+        with self.assertRaises(ConnectionError):
+            self.circuit_breaker.call(ENDPOINT, fail)
+        self.assertEqual(CLOSED, self.circuit_breaker.get_state(ENDPOINT))
+        with self.assertRaises(ConnectionError):
+            self.circuit_breaker.call(ENDPOINT, fail)
+        self.assertEqual(OPEN, self.circuit_breaker.get_state(ENDPOINT))
+
+        f = Mock()
+        mock_monotonic.return_value = 4
+        with self.assertRaises(CircuitBreakerOpenError) as cm:
+            self.circuit_breaker.call(ENDPOINT, f)
+        f.assert_not_called()
+        self.assertEqual(6, cm.exception.retry_after_secs)
+        # Other endpoints are unaffected
+        self.assertEqual('result', self.circuit_breaker.call('recipe', lambda: 'result'))
+
+    def test_success_resets_failures(self, mock_monotonic):
+        mock_monotonic.return_value = 0
+        with self.assertRaises(ConnectionError):
+            self.circuit_breaker.call(ENDPOINT, fail)
+        self.circuit_breaker.call(ENDPOINT, lambda: None)
+        with self.assertRaises(ConnectionError):
+            self.circuit_breaker.call(ENDPOINT, fail)
+        self.assertEqual(CLOSED, self.circuit_breaker.get_state(ENDPOINT))
+
+    def test_client_errors_are_not_failures(self, mock_monotonic):
+        mock_monotonic.return_value = 0
+
+        def not_found():
+            raise HTTPError('Not Found', response=Mock(status_code=404))
+
+        for _ in range(3):
+            with self.assertRaises(HTTPError):
+                self.circuit_breaker.call(ENDPOINT, not_found)
+        self.assertEqual(CLOSED, self.circuit_breaker.get_state(ENDPOINT))
+
+    def test_half_open_probe_success_closes_circuit(self, mock_monotonic):
+        mock_monotonic.return_value = 0
+        self.open_circuit()
+        mock_monotonic.return_value = 10
+        self.assertEqual(HALF_OPEN, self.circuit_breaker.get_state(ENDPOINT))
+
+        # Only one probe is allowed at a time
+        self.circuit_breaker.before_call(ENDPOINT)
+        with self.assertRaises(CircuitBreakerOpenError):
+            self.circuit_breaker.before_call(ENDPOINT)
+        self.circuit_breaker.on_success(ENDPOINT)
+        self.assertEqual(CLOSED, self.circuit_breaker.get_state(ENDPOINT))
+
+    def test_half_open_probe_failure_opens_circuit(self, mock_monotonic):
+        mock_monotonic.return_value = 0
+        self.open_circuit()
+        mock_monotonic.return_value = 10
+        with self.assertRaises(ConnectionError):
+            self.circuit_breaker.call(ENDPOINT, fail)
+        self.assertEqual(OPEN, self.circuit_breaker.get_state(ENDPOINT))
+        mock_monotonic.return_value = 19
+        self.assertEqual(OPEN, self.circuit_breaker.get_state(ENDPOINT))
+
+    def test_reset(self, mock_monotonic):
+        mock_monotonic.return_value = 0
+        self.open_circuit()
+        self.circuit_breaker.reset(ENDPOINT)
+        self.assertEqual(CLOSED, self.circuit_breaker.get_state(ENDPOINT))
+
+    def test_invalid_arguments_raise_value_error(self, _):
+        with self.assertRaises(ValueError):
+            CircuitBreaker(failure_threshold=0)
+        with self.assertRaises(ValueError):
+            CircuitBreaker(half_open_max_calls=0)
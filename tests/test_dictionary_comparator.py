@@ -1,5 +1,18 @@
+import json
+
 from unittest import TestCase
-from dkutils.dictionary_comparator import DictionaryComparator
+from unittest.mock import patch
+
+from dkutils.dictionary_comparator import (
+    MISSING,
+    Conflict,
+    DictionaryComparator,
+    Difference,
+    apply_patch,
+    escape_json_pointer_token,
+    three_way_merge,
+    unescape_json_pointer_token,
+)
 
 THREE = 'three'
 DICT_1 = {'one': 1, THREE: 3}
@@ -7,6 +20,8 @@ DICT_2 = {'two': 2, THREE: 3}
 DICT_3 = {'one': 1, THREE: 'III'}
 KEYS_1 = DICT_1.keys()
 KEYS_2 = DICT_2.keys()
+NESTED_1 = {'one': 1, 'two': {'a': 1, 'b': 2}, 'list': [1, {'x': 1}], 'a/b': {'c~d': 1}}
+NESTED_2 = {'two': {'a': 1, 'b': 'II'}, 'list': [1, {'x': 2}, 3], 'a/b': {'c~d': 2}, THREE: 3}
 
 
 class TestDictionaryComparator(TestCase):
@@ -71,3 +86,128 @@ class TestDictionaryComparator(TestCase):
 
     def test__eq__on_non_dictionary_comparator_returns_false(self):
         self.assertNotEqual(DictionaryComparator(DICT_1, DICT_2), "bob")
+
+    def test_iter_differences_when_same_returns_nothing(self):
+        self.assertEqual([], list(DictionaryComparator(NESTED_1, dict(NESTED_1)).iter_differences()))
+
+    def test_iter_differences(self):
+        self.assertEqual([
+            Difference('/one', 1, MISSING),
+            Difference('/two/b', 2, 'II'),
+            Difference('/list/1/x', 1, 2),
+            Difference('/list/2', MISSING, 3),
+            Difference('/a~1b/c~0d', 1, 2),
+            Difference(f'/{THREE}', MISSING, 3),
+        ], list(DictionaryComparator(NESTED_1, NESTED_2).iter_differences()))
+
+    def test_iter_differences_when_types_differ(self):
+        self.assertEqual([Difference('/two', {'a': 1}, [1])],
+                         list(DictionaryComparator({'two': {'a': 1}}, {'two': [1]}).iter_differences()))
+
+    def test_iter_differences_when_values_are_equal_but_types_differ(self):
+        left = {'flag': True, 'count': 1, 'nested': {'ratio': 1}, 'items': [0]}
+        right = {'flag': 1, 'count': 1.0, 'nested': {'ratio': True}, 'items': [False]}
+        self.assertEqual([
+            Difference('/flag', True, 1),
+            Difference('/count', 1, 1.0),
+            Difference('/nested/ratio', 1, True),
+            Difference('/items/0', 0, False),
+        ], list(DictionaryComparator(left, right).iter_differences()))
+
+    @patch(
+        'dkutils.dictionary_comparator.escape_json_pointer_token', wraps=escape_json_pointer_token
+    )
+    def test_iter_differences_skips_equal_subtrees(self, mock_escape):
+        left = {'same': {str(index): [index, {'value': index}] for index in range(100)}, 'changed': 1}
+        right = {'same': json.loads(json.dumps(left['same'])), 'changed': 2}
+        self.assertEqual(
+            [Difference('/changed', 1, 2)], list(DictionaryComparator(left, right).iter_differences())
+        )
+        # Only the top-level keys are visited
+        self.assertEqual(2, mock_escape.call_count)
+
+    def test_iter_differences_with_keys_of_different_types(self):
+        left = {1: {'a': 1}, 'b': {'c': True}}
+        right = {1: {'a': 1}, 'b': {'c': 1}}
+        self.assertEqual(
+            [Difference('/b/c', True, 1)], list(DictionaryComparator(left, right).iter_differences())
+        )
+
+    def test_get_differences(self):
+        left = {'one': 1, 'two': NESTED_1['two']}
+        right = {'two': NESTED_2['two']}
+        self.assertEqual({
+            '/one': (1, MISSING),
+            '/two/b': (2, 'II')
+        },
+                         DictionaryComparator(left, right).get_differences())
+
+    def test_escape_json_pointer_token(self):
+        self.assertEqual('a~1b~0c', escape_json_pointer_token('a/b~c'))
+        self.assertEqual('1', escape_json_pointer_token(1))
+
+    def test_unescape_json_pointer_token(self):
+        self.assertEqual('a/b~c', unescape_json_pointer_token('a~1b~0c'))
+
+    def test_get_patch_when_same_returns_empty_list(self):
+        self.assertEqual([], DictionaryComparator(NESTED_1, NESTED_1).get_patch())
+
+    def test_get_patch(self):
+        self.assertEqual([
+            {'op': 'remove', 'path': '/one'},
+            {'op': 'replace', 'path': '/two/b', 'value': 'II'},
+            {'op': 'replace', 'path': '/list/1/x', 'value': 2},
+            {'op': 'add', 'path': '/list/2', 'value': 3},
+            {'op': 'replace', 'path': '/a~1b/c~0d', 'value': 2},
+            {'op': 'add', 'path': f'/{THREE}', 'value': 3},
+        ], DictionaryComparator(NESTED_1, NESTED_2).get_patch())
+
+    def test_get_patch_removes_list_items_from_the_end(self):
+        self.assertEqual([
+            {'op': 'remove', 'path': '/list/2'},
+            {'op': 'remove', 'path': '/list/1'},
+        ], DictionaryComparator({'list': [1, 2, 3]}, {'list': [1]}).get_patch())
+
+    def test_apply_patch_round_trip(self):
+        for left, right in [(NESTED_1, NESTED_2), (NESTED_2, NESTED_1), ({'l': [1, 2, 3]}, {'l': [4]})]:
+            patch = DictionaryComparator(left, right).get_patch()
+            self.assertEqual(right, apply_patch(left, patch))
+
+    def test_apply_patch_does_not_modify_document(self):
+        document = {'one': {'a': 1}}
+        apply_patch(document, [{'op': 'replace', 'path': '/one/a', 'value': 2}])
+        self.assertEqual({'one': {'a': 1}}, document)
+
+    def test_apply_patch_when_path_missing_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            apply_patch(DICT_1, [{'op': 'replace', 'path': '/two', 'value': 2}])
+
+    def test_apply_patch_when_op_unsupported_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            apply_patch(DICT_1, [{'op': 'move', 'from': '/one', 'path': '/two'}])
+
+    def test_three_way_merge_without_conflicts(self):
+        base = {'one': 1, 'two': {'a': 1}, THREE: 3}
+        left = {'one': 'I', 'two': {'a': 1, 'b': 2}, THREE: 3}
+        right = {'one': 1, 'two': {'a': 1, 'c': 3}}
+        self.assertEqual(({'one': 'I', 'two': {'a': 1, 'b': 2, 'c': 3}}, []),
+                         three_way_merge(base, left, right))
+
+    def test_three_way_merge_compares_types(self):
+        base = {'one': 1, 'two': 2, THREE: 3}
+        left = {'one': True, 'two': 2.0, THREE: 3}
+        right = {'one': 1, 'two': 'II', THREE: 3.0}
+        merged, conflicts = three_way_merge(base, left, right)
+        self.assertEqual({'one': True, 'two': 2.0, THREE: 3.0}, merged)
+        self.assertIs(True, merged['one'])
+        self.assertIsInstance(merged[THREE], float)
+        self.assertEqual([Conflict('/two', 2, 2.0, 'II')], conflicts)
+
+    def test_three_way_merge_with_conflicts(self):
+        base = {'one': 1, 'two': 2}
+        left = {'one': 'I', 'two': 'II'}
+        right = {'one': 'uno'}
+        merged, conflicts = DictionaryComparator(left, right).merge_three_way(base)
+        self.assertEqual(left, merged)
+        self.assertEqual([Conflict('/one', 1, 'I', 'uno'), Conflict('/two', 2, 'II', MISSING)],
+                         conflicts)
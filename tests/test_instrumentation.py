@@ -0,0 +1,131 @@
+from datetime import timedelta
+from unittest import TestCase
+from unittest.mock import Mock
+
+from requests.exceptions import ConnectionError
+
+from dkutils.instrumentation import (
+    DATAKITCHEN_CLIENT,
+    JIRA_CLIENT,
+    MetricsRegistry,
+    RequestEvent,
+    get_endpoint_template,
+    get_instrumentation,
+    observe_request,
+    observe_response,
+    set_instrumentation,
+)
+
+
+def get_response(status_code=200, body=b'', content=b'{}'):
+    response = Mock(status_code=status_code, headers={}, _content=content)
+    response.request.body = body
+    return response
+
+
+def get_event(endpoint='order/status/{}', status=200, latency_secs=0.2, attempt=0, error=None):
+    return RequestEvent(
+        client=DATAKITCHEN_CLIENT,
+        method='GET',
+        endpoint=endpoint,
+        status=status,
+        latency_secs=latency_secs,
+        request_bytes=10,
+        response_bytes=100,
+        attempt=attempt,
+        error=error
+    )
+
+
+class TestInstrumentation(TestCase):
+
+    def setUp(self):
+        self.registry = MetricsRegistry()
+        set_instrumentation(self.registry)
+        self.addCleanup(set_instrumentation, None)
+
+    def test_get_endpoint_template(self):
+        self.assertEqual('v1/workflows/{}/jobs', get_endpoint_template('/v1/workflows/5f3e1a/jobs/?limit=10'))
+        self.assertEqual(
+            'api/v16.0/systems',
+            get_endpoint_template('https://veeva.example.com/api/v16.0/systems?name=x')
+        )
+        self.assertEqual(
+            'order/servings/{}/{}', get_endpoint_template('order/servings/Dev/abc', {'order', 'servings'})
+        )
+
+    def test_observe_request(self):
+        response = get_response(body=b'{"a": 1}', content=b'[1, 2]')
+        self.assertIs(response, observe_request(DATAKITCHEN_CLIENT, 'get', 'kitchen/list', lambda: response))
+        [row] = self.registry.summary()
+        self.assertEqual('GET', row['method'])
+        self.assertEqual(1, row['requests'])
+        self.assertEqual(0, row['errors'])
+        self.assertEqual(8, row['request_bytes'])
+        self.assertEqual(6, row['response_bytes'])
+
+    def test_observe_request_error(self):
+        send = Mock(side_effect=ConnectionError('Connection refused'))
+        with self.assertRaises(ConnectionError):
+            observe_request(DATAKITCHEN_CLIENT, 'get', 'kitchen/list', send, attempt=1)
+        [row] = self.registry.summary()
+        self.assertEqual(1, row['errors'])
+        self.assertEqual(1, row['retries'])
+        self.assertIn('status="error"', self.registry.to_prometheus())
+
+    def test_observe_request_without_instrumentation(self):
+        set_instrumentation(None)
+        self.assertIsNone(get_instrumentation())
+        self.assertEqual('result', observe_request(DATAKITCHEN_CLIENT, 'get', 'kitchen/list', lambda: 'result'))
+        self.assertEqual([], self.registry.summary())
+
+    def test_observe_response(self):
+        response = get_response(status_code=404, content=None)
+        response.headers = {'Content-Length': '42'}
+        response.request.method = 'get'
+        response.url = 'https://jira.example.com/rest/api/2/issue/IM-1/transitions'
+        response.elapsed = timedelta(milliseconds=250)
+        observe_response(JIRA_CLIENT, response)
+        [row] = self.registry.summary()
+        self.assertEqual('rest/api/{}/issue/{}/transitions', row['endpoint'])
+        self.assertEqual(0.25, row['total_secs'])
+        self.assertEqual(42, row['response_bytes'])
+        self.assertEqual(1, row['errors'])
+
+    def test_summary_sorted_by_total_time(self):
+        self.registry.on_request(get_event(endpoint='kitchen/list', latency_secs=0.1))
+        for _ in range(3):
+            self.registry.on_request(get_event(latency_secs=0.2))
+        summary = self.registry.summary()
+        self.assertEqual(['order/status/{}', 'kitchen/list'], [row['endpoint'] for row in summary])
+        self.assertAlmostEqual(0.2, summary[0]['mean_secs'])
+        self.assertEqual(300, summary[0]['response_bytes'])
+        self.registry.reset()
+        self.assertEqual([], self.registry.summary())
+
+    def test_to_prometheus(self):
+        registry = MetricsRegistry(latency_buckets=(0.1, 1))
+        registry.on_request(get_event(latency_secs=0.05))
+        registry.on_request(get_event(latency_secs=0.5, attempt=1, status=503))
+        registry.on_request(get_event(endpoint='say "hi"', latency_secs=2))
+        labels = 'client="datakitchen",method="GET",endpoint="order/status/{}"'
+        lines = registry.to_prometheus().splitlines()
+        for line in (
+            '# TYPE dkutils_requests_total counter',
+            f'dkutils_requests_total{{{labels},status="200"}} 1',
+            f'dkutils_requests_total{{{labels},status="503"}} 1',
+            f'dkutils_request_retries_total{{{labels}}} 1',
+            f'dkutils_request_sent_bytes_total{{{labels}}} 20',
+            '# TYPE dkutils_request_duration_seconds histogram',
+            f'dkutils_request_duration_seconds_bucket{{{labels},le="0.1"}} 1',
+            f'dkutils_request_duration_seconds_bucket{{{labels},le="1"}} 2',
+            f'dkutils_request_duration_seconds_bucket{{{labels},le="+Inf"}} 2',
+            f'dkutils_request_duration_seconds_sum{{{labels}}} 0.55',
+            f'dkutils_request_duration_seconds_count{{{labels}}} 2',
+            'dkutils_request_duration_seconds_count{client="datakitchen",method="GET",endpoint="say \\"hi\\""} 1',
+        ):
+            self.assertIn(line, lines)
+
+    def test_invalid_latency_buckets_raise_value_error(self):
+        with self.assertRaises(ValueError):
+            MetricsRegistry(latency_buckets=(1, 0.5))
@@ -0,0 +1,116 @@
+import json
+
+from unittest import TestCase
+from unittest.mock import Mock
+
+from dkutils import json_codec
+from dkutils.json_codec import (
+    JSON,
+    ORJSON,
+    get_json_backend,
+    get_json_backends,
+    iter_json_array,
+    loads,
+    register_json_backend,
+    response_json,
+    set_json_backend,
+)
+
+
+class TestJsonCodec(TestCase):
+
+    def setUp(self):
+        self.default_backend = get_json_backend()
+
+    def tearDown(self):
+        set_json_backend(self.default_backend)
+        json_codec._decoders.pop('test', None)
+
+    def test_orjson_is_default_backend_when_installed(self):
+        self.assertEqual(ORJSON, get_json_backend())
+        self.assertEqual([JSON, ORJSON], get_json_backends())
+
+    def test_loads(self):
+        for backend in get_json_backends():
+            set_json_backend(backend)
+            self.assertEqual({'a': [1, 2.5, None]}, loads('{"a": [1, 2.5, null]}'))
+            self.assertEqual({'a': 'é'}, loads('{"a": "é"}'.encode('utf-8')))
+
+    def test_loads_falls_back_to_json(self):
+        set_json_backend(ORJSON)
+        self.assertEqual(2**70, loads(str(2**70)))
+
+    def test_loads_invalid_json_raises_value_error(self):
+        for backend in get_json_backends():
+            set_json_backend(backend)
+            with self.assertRaises(json.JSONDecodeError):
+                loads('{"a": ')
+
+    def test_register_json_backend(self):
+        mock_loads = Mock(return_value={'a': 1})
+        register_json_backend('test', mock_loads)
+        set_json_backend('test')
+        self.assertEqual({'a': 1}, loads('{}'))
+        mock_loads.assert_called_once_with('{}')
+
+    def test_set_unknown_json_backend_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            set_json_backend('unknown')
+
+    def test_response_json(self):
+        response = Mock(content=b'{"a": 1}')
+        self.assertEqual({'a': 1}, response_json(response))
+        response.json.assert_not_called()
+
+    def test_response_json_without_bytes_content(self):
+        response = Mock(content='RESPONSE CONTENT')
+        response.json.return_value = {'a': 1}
+        self.assertEqual({'a': 1}, response_json(response))
+
+
+class TestIterJsonArray(TestCase):
+
+    def get_chunks(self, document, chunk_size):
+        content = json.dumps(document).encode('utf-8')
+        return [content[i:i + chunk_size] for i in range(0, len(content), chunk_size)]
+
+    def test_iter_json_array(self):
+        lines = [{'message': f'Message {i} é', 'number': i * 1000} for i in range(20)]
+        document = {
+            'orders': [{'order_id': 'a]}'}],
+            'servings': [{
+                'count': 12345,
+                'log': {
+                    'lines': lines
+                },
+                'status': 'COMPLETED'
+            }]
+        }
+        path = ('servings', 0, 'log', 'lines')
+        for chunk_size in [1, 2, 3, 7, 100, 100000]:
+            self.assertEqual(lines, list(iter_json_array(self.get_chunks(document, chunk_size), path)))
+
+    def test_iter_json_array_document(self):
+        self.assertEqual([1, 223, 4], list(iter_json_array([b'[1, 22', b'3, 4]'])))
+        self.assertEqual(['a', 'b'], list(iter_json_array(['["a", ', '"b"]'])))
+
+    def test_iter_json_array_stops_reading_after_array(self):
+
+        def chunks():
+            yield b'{"lines": [1, 2], "other": '
+            raise AssertionError('Document read past the array')
+
+        self.assertEqual([1, 2], list(iter_json_array(chunks(), ('lines',))))
+
+    def test_iter_json_array_missing_or_null(self):
+        for document in [{}, {'log': None}, {'log': {'lines': None}}, {'log': {'lines': []}}]:
+            self.assertEqual([], list(iter_json_array(self.get_chunks(document, 3), ('log', 'lines'))))
+        self.assertEqual([], list(iter_json_array(self.get_chunks({'servings': []}, 3), ('servings', 0))))
+
+    def test_iter_json_array_truncated_document_raises_json_decode_error(self):
+        with self.assertRaises(json.JSONDecodeError):
+            list(iter_json_array([b'{"lines": [1, 2'], ('lines',)))
+
+    def test_iter_json_array_not_an_array_raises_json_decode_error(self):
+        with self.assertRaises(json.JSONDecodeError):
+            list(iter_json_array([b'{"lines": {"a": 1}}'], ('lines',)))
@@ -0,0 +1,71 @@
+import subprocess
+import sys
+
+from unittest import TestCase
+from unittest.mock import patch
+
+import dkutils
+
+from dkutils.lazy_import import LazyModule, lazy_import
+
+# Modules imported by DataKitchen container nodes, which must not import heavy dependencies until
+# they're used
+CORE_MODULES = [
+    'dkutils.datakitchen_api.datakitchen_client',
+    'dkutils.datakitchen_api.order_run_monitor',
+    'dkutils.datakitchen_api.tests_utils',
+    'dkutils.gmail_api.gmail_client',
+    'dkutils.jira_api.jira_client',
+    'dkutils.reporting.dataframe_wrapper',
+    'dkutils.retry',
+]
+
+HEAVY_DEPENDENCIES = ['asyncio', 'events_ingestion_client', 'googleapiclient', 'pandas', 'sqlalchemy']
+
+
+class TestLazyImport(TestCase):
+
+    def test_lazy_import(self):
+        with patch.dict(sys.modules):
+            sys.modules.pop('colorsys', None)
+            colorsys = lazy_import('colorsys')
+            self.assertIsInstance(colorsys, LazyModule)
+            self.assertNotIn('colorsys', sys.modules)
+            self.assertEqual((0, 0, 1), colorsys.rgb_to_hsv(1, 1, 1))
+            self.assertIn('colorsys', sys.modules)
+            self.assertIn('rgb_to_hsv', dir(colorsys))
+
+    def test_lazy_import_of_imported_module(self):
+        self.assertIs(sys, lazy_import('sys'))
+
+    def test_patch_lazy_module(self):
+        colorsys = LazyModule('colorsys')
+        with patch.object(colorsys, 'rgb_to_hsv', return_value='hsv'):
+            self.assertEqual('hsv', colorsys.rgb_to_hsv(1, 1, 1))
+        self.assertEqual((0, 0, 1), colorsys.rgb_to_hsv(1, 1, 1))
+
+    def test_missing_module_raises_import_error_on_use(self):
+        module = lazy_import('dkutils_missing_module')
+        with self.assertRaises(ImportError):
+            module.loads('{}')
+
+    def test_lazy_submodules(self):
+        self.assertIn('datakitchen_api', dir(dkutils))
+        tracing = dkutils.tracing
+        self.assertIs(sys.modules['dkutils.tracing'], tracing)
+        with self.assertRaises(AttributeError):
+            dkutils.missing_module
+
+    def test_core_modules_do_not_import_heavy_dependencies(self):
+        result = subprocess.run(
+            [
+                sys.executable,
+                '-c',
+                f'import sys; import {", ".join(CORE_MODULES)}; '
+                f'print(",".join(name for name in {HEAVY_DEPENDENCIES!r} if name in sys.modules))',
+            ],
+            capture_output=True,
+            text=True,
+            check=True
+        )
+        self.assertEqual('', result.stdout.strip())
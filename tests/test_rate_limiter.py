@@ -0,0 +1,113 @@
+import threading
+import time
+
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from dkutils.rate_limiter import RateLimiter, TokenBucket, get_retry_after_secs
+
+
+def get_response(status_code, retry_after=None):
+    return Mock(status_code=status_code, headers={'Retry-After': retry_after} if retry_after else {})
+
+
+class TestGetRetryAfterSecs(TestCase):
+
+    def test_seconds(self):
+        self.assertEqual(2.0, get_retry_after_secs(get_response(429, '2')))
+
+    def test_http_date(self):
+        retry_time = datetime.now(timezone.utc) + timedelta(seconds=30)
+        retry_after_secs = get_retry_after_secs(get_response(429, format_datetime(retry_time, usegmt=True)))
+        self.assertAlmostEqual(30, retry_after_secs, delta=2)
+
+    def test_missing_or_invalid(self):
+        self.assertIsNone(get_retry_after_secs(get_response(429)))
+        self.assertIsNone(get_retry_after_secs(get_response(429, 'soon')))
+        self.assertIsNone(get_retry_after_secs(object()))
+
+
+class TestTokenBucket(TestCase):
+
+    def test_reserve(self):
+        bucket = TokenBucket(10, capacity=2)
+        self.assertEqual(0, bucket.reserve())
+        self.assertEqual(0, bucket.reserve())
+        self.assertAlmostEqual(0.1, bucket.reserve(), delta=0.01)
+        self.assertAlmostEqual(0.2, bucket.reserve(), delta=0.01)
+
+    def test_acquire(self):
+        bucket = TokenBucket(20, capacity=1)
+        start_time = time.monotonic()
+        for _ in range(3):
+            bucket.acquire()
+        self.assertGreaterEqual(time.monotonic() - start_time, 0.09)
+
+
+class TestRateLimiter(TestCase):
+
+    def test_throttled_response_decreases_rate_and_pauses(self):
+        rate_limiter = RateLimiter(rate=10, endpoint_rates={'order': 4})
+        self.assertEqual(3, rate_limiter.on_response('order', get_response(429, '3')))
+        self.assertEqual(5, rate_limiter.get_rate())
+        self.assertEqual(2, rate_limiter.get_rate('order'))
+        self.assertEqual(5, rate_limiter.get_rate('recipe'))
+
+        with patch('dkutils.rate_limiter.time.sleep') as mock_sleep:
+            with rate_limiter.limit('recipe'):
+                pass
+        self.assertAlmostEqual(3, mock_sleep.call_args[0][0], delta=0.5)
+
+    def test_successful_responses_restore_rate(self):
+        rate_limiter = RateLimiter(rate=10, increase_fraction=0.5)
+        self.assertEqual(1, rate_limiter.on_response(None, get_response(429)))
+        self.assertIsNone(rate_limiter.on_response(None, get_response(200)))
+        self.assertEqual(10, rate_limiter.get_rate())
+        self.assertIsNone(rate_limiter.on_response(None, get_response(200)))
+        self.assertEqual(10, rate_limiter.get_rate())
+
+    def test_rate_is_not_decreased_below_min_rate(self):
+        rate_limiter = RateLimiter(rate=1, min_rate=0.8)
+        rate_limiter.on_response(None, get_response(429, '0'))
+        self.assertEqual(0.8, rate_limiter.get_rate())
+
+    def test_service_unavailable_is_throttled_only_with_retry_after(self):
+        rate_limiter = RateLimiter()
+        self.assertIsNone(rate_limiter.on_response(None, get_response(503)))
+        self.assertEqual(0, rate_limiter.on_response(None, get_response(503, '0')))
+
+    def test_retry_after_is_capped(self):
+        rate_limiter = RateLimiter(max_retry_after_secs=10)
+        self.assertEqual(10, rate_limiter.on_response(None, get_response(429, '86400')))
+
+    def test_max_concurrent(self):
+        rate_limiter = RateLimiter(rate=1000, max_concurrent=2)
+        lock = threading.Lock()
+        in_flight = []
+        max_in_flight = []
+
+        def request():
+            with rate_limiter.limit():
+                with lock:
+                    in_flight.append(1)
+                    max_in_flight.append(len(in_flight))
+                time.sleep(0.05)
+                with lock:
+                    in_flight.pop()
+
+        threads = [threading.Thread(target=request) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(2, max(max_in_flight))
+
+    def test_invalid_arguments_raise_value_error(self):
+        with self.assertRaises(ValueError):
+            RateLimiter(rate=0)
+        with self.assertRaises(ValueError):
+            RateLimiter(endpoint_rates={'order': -1})
+        with self.assertRaises(ValueError):
+            RateLimiter(max_concurrent=0)
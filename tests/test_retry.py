@@ -0,0 +1,163 @@
+import asyncio
+
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from requests.exceptions import ConnectionError, HTTPError, ReadTimeout
+
+from dkutils.retry import (
+    RetryBudget,
+    RetryMetrics,
+    RetryPolicy,
+    call_with_fallback_retry,
+    is_retryable_error,
+    is_server_error,
+    is_throttled_error,
+)
+
+
+def get_http_error(status_code, headers=None):
+    return HTTPError(f'{status_code} Error', response=Mock(status_code=status_code, headers=headers or {}))
+
+
+@patch('dkutils.retry.time.sleep')
+class TestRetryPolicy(TestCase):
+
+    def test_is_retryable_error(self, _):
+        self.assertTrue(is_retryable_error(get_http_error(503)))
+        self.assertTrue(is_retryable_error(get_http_error(429)))
+        self.assertTrue(is_retryable_error(ConnectionError('Connection reset by peer')))
+        self.assertTrue(is_retryable_error(ReadTimeout()))
+        self.assertFalse(is_retryable_error(get_http_error(404)))
+        self.assertFalse(is_retryable_error(ValueError()))
+        self.assertTrue(is_server_error(get_http_error(500)))
+        self.assertFalse(is_server_error(get_http_error(429)))
+
+    def test_retries_until_success(self, mock_sleep):
+        f = Mock(side_effect=[ConnectionError(), get_http_error(502), 'result'], __name__='f')
+        policy = RetryPolicy(tries=3, delay=1, backoff=2)
+        self.assertEqual('result', policy(f)())
+        self.assertEqual(3, f.call_count)
+        delays = [c.args[0] for c in mock_sleep.call_args_list]
+        self.assertTrue(0 <= delays[0] <= 1 and 0 <= delays[1] <= 2, delays)
+        metrics = policy.metrics.snapshot()
+        self.assertEqual(1, metrics['calls'])
+        self.assertEqual(2, metrics['retries'])
+        self.assertEqual(0, metrics['failures'])
+        self.assertAlmostEqual(sum(delays), metrics['time_lost_secs'])
+
+    def test_raises_error_after_tries(self, _):
+        f = Mock(side_effect=ConnectionError(), __name__='f')
+        policy = RetryPolicy(tries=2)
+        with self.assertRaises(ConnectionError):
+            policy.call(f)
+        self.assertEqual(2, f.call_count)
+        self.assertEqual(1, policy.metrics.snapshot()['failures'])
+
+    def test_does_not_retry_client_errors(self, mock_sleep):
+        f = Mock(side_effect=get_http_error(400), __name__='f')
+        with self.assertRaises(HTTPError):
+            RetryPolicy().call(f)
+        f.assert_called_once()
+        mock_sleep.assert_not_called()
+
+    def test_delay_without_jitter(self, _):
+        policy = RetryPolicy(delay=2, backoff=3, max_delay=10, jitter=False)
+        self.assertEqual([2, 6, 10], [policy.get_delay(retry) for retry in range(3)])
+
+    def test_delay_is_at_least_retry_after(self, _):
+        policy = RetryPolicy(delay=1)
+        self.assertEqual(30, policy.get_delay(0, get_http_error(429, {'Retry-After': '30'})))
+
+    def test_retry_after_is_capped(self, _):
+        policy = RetryPolicy(max_delay=float('inf'), max_retry_after=120)
+        self.assertEqual(120, policy.get_delay(0, get_http_error(503, {'Retry-After': '86400'})))
+
+    def test_excluding(self, _):
+        self.assertTrue(is_throttled_error(get_http_error(429)))
+        self.assertTrue(is_throttled_error(get_http_error(503, {'Retry-After': '1'})))
+        self.assertFalse(is_throttled_error(get_http_error(503)))
+        policy = RetryPolicy(tries=3)
+        f = Mock(side_effect=get_http_error(429), __name__='f')
+        with self.assertRaises(HTTPError):
+            policy.excluding(is_throttled_error).call(f)
+        f.assert_called_once()
+        f = Mock(side_effect=[get_http_error(503), 'result'], __name__='f')
+        self.assertEqual('result', policy.excluding(is_throttled_error).call(f))
+        self.assertEqual(2, policy.metrics.snapshot()['calls'])
+
+    def test_budget_limits_retries(self, _):
+        policy = RetryPolicy(tries=5, budget=RetryBudget(ratio=0, min_retries=2))
+        f = Mock(side_effect=ConnectionError(), __name__='f')
+        with self.assertRaises(ConnectionError):
+            policy.call(f)
+        self.assertEqual(3, f.call_count)
+        self.assertEqual(1, policy.metrics.snapshot()['budget_exhausted'])
+
+    def test_budget_deposits(self, _):
+        budget = RetryBudget(ratio=0.5, min_retries=0)
+        self.assertFalse(budget.withdraw())
+        budget.deposit()
+        budget.deposit()
+        self.assertTrue(budget.withdraw())
+        self.assertFalse(budget.withdraw())
+
+    def test_budget_is_capped(self, _):
+        policy = RetryPolicy(tries=3, budget=RetryBudget(ratio=0.2, min_retries=2, max_retries=5))
+        for _ in range(1000):
+            policy.call(lambda: None)
+        f = Mock(side_effect=ConnectionError(), __name__='f')
+        for _ in range(10):
+            with self.assertRaises(ConnectionError):
+                policy.call(f)
+        # At most 5 retries accumulated by the successful calls, and 10 * 0.2 deposited by the failed
+        # ones, rather than 2 retries per failed call
+        metrics = policy.metrics.snapshot()
+        self.assertLessEqual(metrics['retries'], 7)
+        self.assertGreaterEqual(metrics['retries'], 5)
+        self.assertEqual(10 + metrics['retries'], f.call_count)
+
+    def test_shared_metrics(self, _):
+        metrics = RetryMetrics()
+        RetryPolicy(metrics=metrics).call(lambda: None)
+        RetryPolicy(metrics=metrics).call(lambda: None)
+        self.assertEqual(2, metrics.snapshot()['calls'])
+        metrics.reset()
+        self.assertEqual(0, metrics.snapshot()['calls'])
+
+    def test_call_with_fallback_retry(self, _):
+        f = Mock(side_effect=get_http_error(503))
+        with self.assertRaises(HTTPError):
+            call_with_fallback_retry(None, f)
+        self.assertEqual(3, f.call_count)
+
+        # The client's policy already retries the requests made by f
+        f.reset_mock()
+        with self.assertRaises(HTTPError):
+            call_with_fallback_retry(RetryPolicy(), f)
+        f.assert_called_once()
+
+    def test_invalid_tries_raises_value_error(self, _):
+        with self.assertRaises(ValueError):
+            RetryPolicy(tries=0)
+
+    @patch('dkutils.retry.asyncio.sleep')
+    def test_async(self, mock_async_sleep, mock_sleep):
+        attempts = []
+
+        async def no_sleep(_):
+            pass
+
+        mock_async_sleep.side_effect = no_sleep
+
+        @RetryPolicy(tries=3)
+        async def flaky():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise get_http_error(503)
+            return 'result'
+
+        self.assertEqual('result', asyncio.run(flaky()))
+        self.assertEqual(3, len(attempts))
+        self.assertEqual(2, mock_async_sleep.call_count)
+        mock_sleep.assert_not_called()
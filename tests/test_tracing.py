@@ -0,0 +1,115 @@
+import io
+import json
+
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import Mock
+
+from dkutils.instrumentation import DATAKITCHEN_CLIENT, observe_request
+from dkutils.tracing import (
+    ERROR,
+    ConsoleSpanExporter,
+    FileSpanExporter,
+    InMemorySpanExporter,
+    Tracer,
+    get_current_span,
+    is_tracing,
+    read_spans,
+    set_tracer,
+    start_as_current_span,
+    to_folded_stacks,
+    traced,
+)
+
+
+@traced()
+def traced_function(value):
+    return value
+
+
+class TestTracing(TestCase):
+
+    def setUp(self):
+        self.exporter = InMemorySpanExporter()
+        set_tracer(Tracer(self.exporter))
+        self.addCleanup(set_tracer, None)
+
+    def test_no_op_by_default(self):
+        set_tracer(None)
+        self.assertFalse(is_tracing())
+        with start_as_current_span('operation', attributes={'key': 'value'}) as span:
+            span.set_attribute('other_key', 1)
+            self.assertFalse(span.is_recording())
+        self.assertEqual('value', traced_function('value'))
+        self.assertEqual([], self.exporter.get_finished_spans())
+
+    def test_nested_spans(self):
+        with start_as_current_span('parent', attributes={'key': 'value'}) as parent:
+            self.assertIs(parent, get_current_span())
+            with start_as_current_span('child'):
+                pass
+            self.assertEqual(1, traced_function(1))
+        self.assertIsNone(get_current_span())
+
+        child, function, root = self.exporter.get_finished_spans()
+        self.assertEqual('child', child.name)
+        self.assertEqual('traced_function', function.name)
+        self.assertEqual({'key': 'value'}, root.attributes)
+        self.assertIsNone(root.parent_id)
+        for span in (child, function):
+            self.assertEqual(root.span_id, span.parent_id)
+            self.assertEqual(root.trace_id, span.trace_id)
+        self.assertGreaterEqual(root.duration_secs, child.duration_secs)
+
+    def test_exception_is_recorded(self):
+        with self.assertRaises(ValueError):
+            with start_as_current_span('operation'):
+                raise ValueError('Invalid value')
+        [span] = self.exporter.get_finished_spans()
+        self.assertEqual(ERROR, span.status)
+        self.assertEqual('ValueError', span.events[0]['attributes']['exception.type'])
+
+    def test_request_span(self):
+        with start_as_current_span('operation'):
+            observe_request(DATAKITCHEN_CLIENT, 'get', 'kitchen/list', lambda: Mock(status_code=200))
+        request_span, operation_span = self.exporter.get_finished_spans()
+        self.assertEqual('GET kitchen/list', request_span.name)
+        self.assertEqual(operation_span.span_id, request_span.parent_id)
+        self.assertEqual(200, request_span.attributes['http.response.status_code'])
+        self.assertEqual('kitchen/list', request_span.attributes['http.route'])
+
+    def test_console_exporter(self):
+        out = io.StringIO()
+        set_tracer(Tracer(ConsoleSpanExporter(out)))
+        with start_as_current_span('operation', attributes={'key': 'value'}):
+            pass
+        span = json.loads(out.getvalue())
+        self.assertEqual('operation', span['name'])
+        self.assertEqual({'key': 'value'}, span['attributes'])
+
+    def test_file_exporter_and_folded_stacks(self):
+        with TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / 'spans.jsonl'
+            exporter = FileSpanExporter(path)
+            set_tracer(Tracer(exporter))
+            with start_as_current_span('parent'):
+                with start_as_current_span('child'):
+                    pass
+            exporter.shutdown()
+            spans = read_spans(path)
+        self.assertEqual(['child', 'parent'], [span['name'] for span in spans])
+        stacks = [line.rsplit(' ', 1)[0] for line in to_folded_stacks(spans)]
+        self.assertEqual(['parent', 'parent;child'], stacks)
+
+    def test_folded_stacks_self_time(self):
+        spans = [
+            {'span_id': 'a', 'parent_id': None, 'name': 'monitor', 'duration_secs': 10},
+            {'span_id': 'b', 'parent_id': 'a', 'name': 'poll', 'duration_secs': 2},
+            {'span_id': 'c', 'parent_id': 'a', 'name': 'poll', 'duration_secs': 3},
+            {'span_id': 'd', 'parent_id': 'c', 'name': 'GET order/status', 'duration_secs': 1},
+        ]
+        self.assertEqual(
+            ['monitor 5000000', 'monitor;poll 4000000', 'monitor;poll;GET order/status 1000000'],
+            to_folded_stacks(spans)
+        )
@@ -20,3 +20,22 @@ class TestWaitLoop(TestCase):
         elapsed_time = time.time() - start_time
         msg = f'Elapsed time ({elapsed_time}) should be > wait loop timeout ({duration_secs})'
         self.assertGreaterEqual(elapsed_time, duration_secs, msg)
+
+    def test_wait_loop_callable_sleep(self):
+        sleeps = [0.1, 0.2]
+        wait_loop = WaitLoop(lambda: sleeps.pop(0), 0.5)
+
+        iterations = 0
+        while wait_loop:
+            iterations += 1
+            if not sleeps:
+                break
+        self.assertEqual(3, iterations)
+
+    def test_wait_loop_sleep_does_not_exceed_duration(self):
+        wait_loop = WaitLoop(60, 0.2)
+
+        start_time = time.time()
+        while wait_loop:
+            pass
+        self.assertLess(time.time() - start_time, 5)